@@ -9,6 +9,9 @@ Functionality:
 - Campaign Indexing: List all scheduled and completed outreach efforts.
 - Deep Dive Views: Retrieve detailed outreach payloads for a specific campaign.
 - Real-time Analytics: Derive funnel conversion metrics (Discovered → Qualified → Engaged).
+
+Engagement counts are read from the ``campaign_metrics`` rollup, which is
+exact at all times; the counter columns on ``campaigns`` lag it slightly.
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
@@ -17,6 +20,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.core.database import get_db
 from app.models.campaign import Campaign
+from app.modules.analytics.campaign_metrics import campaign_totals
 from app.schemas.campaign import CampaignResponse, CampaignDetailResponse, CampaignStatsResponse
 
 router = APIRouter(prefix="/campaigns", dependencies=[Depends(get_current_user)])
@@ -31,7 +35,12 @@ async def list_campaigns(db: AsyncSession = Depends(get_db)):
     """
     stmt = select(Campaign).order_by(Campaign.campaign_date.desc())
     result = await db.execute(stmt)
-    return result.scalars().all()
+    campaigns = result.scalars().all()
+    totals = await campaign_totals(db, [c.id for c in campaigns])
+    return [
+        CampaignResponse.model_validate(c).model_copy(update=totals.get(c.id, {}))
+        for c in campaigns
+    ]
 
 @router.get("/{campaign_id}", response_model=CampaignDetailResponse)
 async def get_campaign(campaign_id: str, db: AsyncSession = Depends(get_db)):
@@ -53,15 +62,16 @@ async def get_campaign(campaign_id: str, db: AsyncSession = Depends(get_db)):
     campaign = result.scalars().first()
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
-    return campaign
+    totals = await campaign_totals(db, [campaign.id])
+    return CampaignDetailResponse.model_validate(campaign).model_copy(update=totals.get(campaign.id, {}))
 
 @router.get("/{campaign_id}/stats", response_model=CampaignStatsResponse)
 async def get_campaign_stats(campaign_id: str, db: AsyncSession = Depends(get_db)):
     """
     Computes real-time engagement statistics for a given campaign.
 
-    Cross-references the campaign date against lead discovery and qualification
-    timestamps to derive funnel metrics (discovered → qualified → sent → opened → clicked → replied).
+    Reads leads discovered and qualified on the campaign date from the daily
+    funnel rollup to derive funnel metrics (discovered → qualified → sent → opened → clicked → replied).
 
     Args:
         campaign_id: UUID string identifying the target campaign.
@@ -78,17 +88,20 @@ async def get_campaign_stats(campaign_id: str, db: AsyncSession = Depends(get_db
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
         
-    from app.models.lead import Lead
-    from sqlalchemy import func
-    
-    discovered = await db.scalar(select(func.count(Lead.id)).where(func.date(Lead.discovered_at) == campaign.campaign_date))
-    qualified = await db.scalar(select(func.count(Lead.id)).where(func.date(Lead.qualified_at) == campaign.campaign_date))
-    
+    from datetime import timedelta
+    from app.modules.analytics.daily_funnel import funnel_totals
+
+    day = campaign.campaign_date
+    funnel = await funnel_totals(db, day, day + timedelta(days=1))
+    discovered, qualified = funnel["discovered"], funnel["qualified"]
+
+    totals = (await campaign_totals(db, [campaign.id])).get(campaign.id, {})
+
     return {
         "total_discovered": discovered or 0,
         "total_qualified": qualified or 0,
-        "emails_sent": campaign.emails_sent,
-        "emails_opened": campaign.emails_opened,
-        "links_clicked": campaign.links_clicked,
-        "replies_received": campaign.replies_received
+        "emails_sent": totals.get("emails_sent", campaign.emails_sent or 0),
+        "emails_opened": totals.get("emails_opened", campaign.emails_opened or 0),
+        "links_clicked": totals.get("links_clicked", campaign.links_clicked or 0),
+        "replies_received": totals.get("replies_received", campaign.replies_received or 0),
     }
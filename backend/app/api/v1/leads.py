@@ -6,23 +6,30 @@ prospect lifecycle. It serves as the primary data source for the frontend
 dashboard, enabling granular filtering and bulk data extraction.
 
 Functionality:
-- Paginated Search: Filter leads by city, category, status, and discovery date.
-- CSV Extraction: Export filtered datasets for external CRM usage.
+- Cursor-Paginated Search: Filter leads by city, category, status, and discovery date.
+- CSV/NDJSON Extraction: Stream filtered datasets for external CRM usage.
 - Enrichment Review: Retrieve detailed AI qualification scores and social signals.
 - Manual Maintenance: Authorize status overrides and lead deletion.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select, func
-from typing import Optional, List
+from sqlalchemy import select
+from typing import Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-import csv
-import io
-from datetime import date
+from datetime import date, datetime, time, timedelta
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
+from app.core.pagination import (
+    InvalidCursor,
+    estimate_count,
+    exact_count,
+    keyset_page,
+    table_estimate,
+)
+from app.core.streaming_export import CSV, EXPORT_FORMATS, MEDIA_TYPES, gzip_stream, stream_rows
 from app.models.lead import Lead
+from app.modules.analytics.daily_funnel import funnel_totals
 from app.schemas.lead import (
     LeadResponse, 
     LeadUpdate, 
@@ -32,6 +39,60 @@ from app.schemas.lead import (
 
 router = APIRouter(prefix="/leads", dependencies=[Depends(get_current_user)])
 
+def _apply_filters(
+    stmt,
+    status: Optional[str],
+    city: Optional[str],
+    category: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+):
+    """
+    Shared list/export filters. Date bounds are half-open ranges on
+    ``created_at`` so the column's index stays usable.
+    """
+    if status:
+        stmt = stmt.where(Lead.status == status)
+    if city:
+        stmt = stmt.where(Lead.city.ilike(f"%{city}%"))
+    if category:
+        stmt = stmt.where(Lead.category.ilike(f"%{category}%"))
+    if date_from:
+        try:
+            parsed_from = date.fromisoformat(date_from)
+            stmt = stmt.where(Lead.created_at >= datetime.combine(parsed_from, time.min))
+        except ValueError:
+            pass  # Ignore invalid date strings; filter is simply not applied
+    if date_to:
+        try:
+            parsed_to = date.fromisoformat(date_to)
+            stmt = stmt.where(Lead.created_at < datetime.combine(parsed_to + timedelta(days=1), time.min))
+        except ValueError:
+            pass  # Ignore invalid date strings; filter is simply not applied
+    return stmt
+
+
+async def _count_leads(db: AsyncSession, stmt, exact: bool) -> Tuple[int, bool]:
+    """
+    ``(total, is_exact)`` for the filtered lead query.
+
+    Unless ``exact`` is requested the total is an estimate: PostgreSQL's
+    planner row estimate for filtered queries, ``pg_class.reltuples`` (or the
+    daily funnel rollup's discovered total) for the whole table. Databases
+    without planner estimates fall back to an exact count when filtered.
+    """
+    if not exact:
+        if stmt.whereclause is not None:
+            estimate = await estimate_count(db, stmt)
+        else:
+            estimate = await table_estimate(db, Lead.__tablename__)
+            if estimate is None:
+                estimate = (await funnel_totals(db, date.min, date.max))["discovered"]
+        if estimate is not None:
+            return estimate, False
+    return await exact_count(db, stmt), True
+
+
 @router.get("", response_model=LeadListResponse)
 async def list_leads(
     status: Optional[str] = None,
@@ -39,15 +100,18 @@ async def list_leads(
     category: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = None,
     limit: int = Query(50, ge=1, le=100),
+    count: bool = Query(False, description="Compute an exact total instead of an estimate."),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Retrieves a paginated, optionally filtered list of discovered leads.
+    Retrieves one page of optionally filtered leads, newest first.
 
     Supports filtering by lifecycle status, geographic city, business category,
-    and discovery date range. Results are ordered by creation date (newest first).
+    and discovery date range. Pages are keyset-paginated on
+    ``(created_at, id)``: pass the ``next_cursor`` or ``prev_cursor`` of the
+    current page to move, so every page costs the same however deep it is.
 
     Args:
         status: Filter by lead lifecycle status (e.g. 'qualified', 'email_sent').
@@ -55,134 +119,106 @@ async def list_leads(
         category: Case-insensitive partial match on the business category.
         date_from: ISO date string — only return leads created on or after this date.
         date_to: ISO date string — only return leads created on or before this date.
-        page: 1-indexed page number for pagination (default: 1).
+        cursor: Opaque cursor from a previous page; omit for the first page.
         limit: Maximum leads per page, capped at 100 (default: 50).
+        count: When true, ``total`` is an exact ``COUNT(*)``; otherwise it is
+            an estimate and ``total_exact`` is false.
 
     Returns:
-        LeadListResponse: Paginated response containing leads array, total count, and page metadata.
+        LeadListResponse: The page of leads, the total, and the neighbouring cursors.
+
+    Raises:
+        HTTPException 400: If the cursor is malformed.
     """
-    stmt = select(Lead)
-    if status:
-        stmt = stmt.where(Lead.status == status)
-    if city:
-        stmt = stmt.where(Lead.city.ilike(f"%{city}%"))
-    if category:
-        stmt = stmt.where(Lead.category.ilike(f"%{category}%"))
-    if date_from:
-        try:
-            parsed_from = date.fromisoformat(date_from)
-            stmt = stmt.where(func.date(Lead.created_at) >= parsed_from)
-        except ValueError:
-            pass  # Ignore invalid date strings
-    if date_to:
-        try:
-            parsed_to = date.fromisoformat(date_to)
-            stmt = stmt.where(func.date(Lead.created_at) <= parsed_to)
-        except ValueError:
-            pass  # Ignore invalid date strings
-        
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total = await db.scalar(count_stmt)
-    if total is None:
-        total = 0
-    
-    stmt = stmt.offset((page - 1) * limit).limit(limit).order_by(Lead.created_at.desc())
-    result = await db.execute(stmt)
-    leads = result.scalars().all()
-    
-    pages = (total + limit - 1) // limit if total > 0 else 1
-    
+    stmt = _apply_filters(select(Lead), status, city, category, date_from, date_to)
+    try:
+        page = await keyset_page(db, stmt, (Lead.created_at, Lead.id), cursor, limit)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    total, total_exact = await _count_leads(db, stmt, count)
+
     return {
-        "leads": leads,
+        "leads": page.items,
         "total": total,
-        "page": page,
-        "pages": pages
+        "total_exact": total_exact,
+        "limit": limit,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
     }
 
-@router.get("/export/csv")
-async def export_leads_csv(
+_EXPORT_COLUMNS = (
+    ("ID", Lead.id),
+    ("Business Name", Lead.business_name),
+    ("Email", Lead.email),
+    ("Phone", Lead.phone),
+    ("City", Lead.city),
+    ("Category", Lead.category),
+    ("Status", Lead.status),
+    ("Created At", Lead.created_at),
+)
+
+def _export_response(stmt, fmt: str, compress: bool) -> StreamingResponse:
+    body = stream_rows(stmt.order_by(Lead.created_at.desc(), Lead.id.desc()), _EXPORT_COLUMNS, fmt)
+    filename, media_type = f"leads_{date.today()}.{fmt}", MEDIA_TYPES[fmt]
+    if compress:
+        body, filename, media_type = gzip_stream(body), f"{filename}.gz", "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+@router.get("/export")
+async def export_leads(
     status: Optional[str] = None,
     city: Optional[str] = None,
     category: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    fmt: str = Query(CSV, alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    gzip: bool = False,
 ):
     """
-    Exports the filtered lead set as a downloadable CSV attachment.
+    Streams the filtered lead set as a CSV or NDJSON attachment.
 
-    Applies the same filter criteria as the list endpoint. The response streams
-    an RFC-4180-compliant CSV file with columns: ID, Business Name, Email,
-    Phone, City, Category, Status, and Created At.
+    Applies the same filter criteria as the list endpoint and exports every
+    matching lead, newest first, with columns: ID, Business Name, Email,
+    Phone, City, Category, Status, and Created At (NDJSON uses the field
+    names as keys).
 
-    Row Limit:
-        A hard cap of 10,000 rows is enforced to protect the database from
-        unbounded full-table scans triggered by a single HTTP request. When
-        the result set is truncated, an ``X-Export-Truncated: true`` response
-        header is included so the client can surface a warning to the user.
+    Rows are read from a server-side cursor in batches and encoded as they
+    arrive, so memory use is flat however large the export and the download
+    starts immediately (chunked transfer encoding, no Content-Length).
+
+    Args:
+        fmt: ``csv`` (default, RFC 4180 with a header row) or ``ndjson``.
+        gzip: Compress the stream; the attachment is then ``.csv.gz``/``.ndjson.gz``.
 
     Returns:
-        StreamingResponse: A `text/csv` attachment named `leads_YYYY-MM-DD.csv`.
+        StreamingResponse: A `leads_YYYY-MM-DD.<format>` attachment.
     """
-    # Hard cap — prevents a single export request from doing a full table-scan
-    # and streaming gigabytes of data. Adjust via application config if needed.
-    CSV_EXPORT_LIMIT = 10_000
-
-    stmt = select(Lead)
-    if status:
-        stmt = stmt.where(Lead.status == status)
-    if city:
-        stmt = stmt.where(Lead.city.ilike(f"%{city}%"))
-    if category:
-        stmt = stmt.where(Lead.category.ilike(f"%{category}%"))
-    if date_from:
-        try:
-            parsed_from = date.fromisoformat(date_from)
-            stmt = stmt.where(func.date(Lead.created_at) >= parsed_from)
-        except ValueError:
-            pass  # Ignore invalid date strings; filter is simply not applied
-    if date_to:
-        try:
-            parsed_to = date.fromisoformat(date_to)
-            stmt = stmt.where(func.date(Lead.created_at) <= parsed_to)
-        except ValueError:
-            pass  # Ignore invalid date strings; filter is simply not applied
-
-    # Fetch one extra row beyond the cap to detect truncation without a separate
-    # COUNT query; we discard the extra row before writing.
-    stmt = stmt.limit(CSV_EXPORT_LIMIT + 1).order_by(Lead.created_at.desc())
-    result = await db.execute(stmt)
-    leads = result.scalars().all()
-
-    truncated = len(leads) > CSV_EXPORT_LIMIT
-    if truncated:
-        leads = leads[:CSV_EXPORT_LIMIT]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["ID", "Business Name", "Email", "Phone", "City", "Category", "Status", "Created At"])
-    for lead in leads:
-        writer.writerow([
-            str(lead.id), lead.business_name, lead.email or "", lead.phone or "",
-            lead.city or "", lead.category or "", lead.status, str(lead.created_at)
-        ])
+    stmt = _apply_filters(select(Lead), status, city, category, date_from, date_to)
+    return _export_response(stmt, fmt, gzip)
 
-    output.seek(0)
+@router.get("/export/csv")
+async def export_leads_csv(
+    status: Optional[str] = None,
+    city: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    gzip: bool = False,
+):
+    """
+    Streams the filtered lead set as a CSV attachment.
 
-    response_headers = {
-        "Content-Disposition": f"attachment; filename=leads_{date.today()}.csv",
-    }
-    if truncated:
-        # Inform the client that the export was capped; the full dataset requires
-        # additional filtering or a direct database extract.
-        response_headers["X-Export-Truncated"] = "true"
-        response_headers["X-Export-Row-Limit"] = str(CSV_EXPORT_LIMIT)
+    Equivalent to ``/leads/export?format=csv``; kept for existing clients.
 
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers=response_headers,
-    )
+    Returns:
+        StreamingResponse: A `text/csv` attachment named `leads_YYYY-MM-DD.csv`.
+    """
+    stmt = _apply_filters(select(Lead), status, city, category, date_from, date_to)
+    return _export_response(stmt, CSV, gzip)
 
 @router.get("/{lead_id}", response_model=LeadDetailResponse)
 async def get_lead(lead_id: str, db: AsyncSession = Depends(get_db)):
@@ -4,16 +4,19 @@ Provides read access to automated pipeline performance reports and
 facilitates Excel workbook downloads for administrative review.
 """
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 import datetime
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.core.database import get_db
 from app.models.daily_report import DailyReport
-from app.schemas.report import ReportResponse
+from app.modules.analytics.daily_funnel import funnel_breakdown
+from app.modules.reporting.excel_builder import XLSX_MEDIA_TYPE, report_filename
+from app.modules.reporting.range_export import stream_range_report
+from app.schemas.report import FunnelRow, ReportResponse
 
 router = APIRouter(prefix="/reports", dependencies=[Depends(get_current_user)])
 
@@ -32,6 +35,72 @@ async def list_reports(db: AsyncSession = Depends(get_db)):
     result = await db.execute(stmt)
     return result.scalars().all()
 
+_FUNNEL_GROUPS = {"day", "city", "category", "tier"}
+
+@router.get("/funnel", response_model=List[FunnelRow], response_model_exclude_none=True)
+async def get_funnel(
+    start: datetime.date,
+    end: datetime.date,
+    group_by: str = "day",
+    city: Optional[str] = None,
+    category: Optional[str] = None,
+    tier: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retrieves lead funnel counts for an inclusive date range from the daily
+    funnel rollup.
+
+    Args:
+        start: First day (YYYY-MM-DD).
+        end: Last day (YYYY-MM-DD), inclusive.
+        group_by: Comma-separated subset of day, city, category, tier.
+        city / category / tier: Optional segment filters.
+
+    Returns:
+        List[FunnelRow]: discovered → qualified → emailed → opened → clicked → replied per group.
+
+    Raises:
+        HTTPException 400: If the range is inverted or group_by names an unknown column.
+    """
+    groups = [g.strip() for g in group_by.split(",") if g.strip()]
+    if end < start or not groups or not set(groups) <= _FUNNEL_GROUPS:
+        raise HTTPException(status_code=400, detail="Invalid date range or group_by")
+    return await funnel_breakdown(
+        db, start, end + datetime.timedelta(days=1), groups,
+        city=city, category=category, tier=tier,
+    )
+
+_EXPORT_MAX_DAYS = 366
+
+@router.get("/export")
+async def export_report_range(start: datetime.date, end: datetime.date):
+    """
+    Streams an Excel report covering an inclusive date range.
+
+    The workbook has the summed funnel counters, a per-day breakdown and
+    every lead discovered, emailed or replying in the range. It is generated
+    for the request in bounded memory (write-only sheets fed from a
+    server-side cursor) rather than loaded from a stored daily file.
+
+    Args:
+        start: First day (YYYY-MM-DD).
+        end: Last day (YYYY-MM-DD), inclusive.
+
+    Returns:
+        StreamingResponse: An `.xlsx` attachment.
+
+    Raises:
+        HTTPException 400: If the range is inverted or longer than 366 days.
+    """
+    if end < start or (end - start).days >= _EXPORT_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Invalid date range (max {_EXPORT_MAX_DAYS} days)")
+    return StreamingResponse(
+        stream_range_report(start, end),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={report_filename(start, end)}"},
+    )
+
 @router.get("/{date}", response_model=ReportResponse)
 async def get_report_by_date(date: datetime.date, db: AsyncSession = Depends(get_db)):
     """
@@ -78,6 +147,6 @@ async def download_report(date: datetime.date, db: AsyncSession = Depends(get_db
         
     return FileResponse(
         path=report.report_file_path,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        media_type=XLSX_MEDIA_TYPE,
         filename=os.path.basename(report.report_file_path)
     )
@@ -2,14 +2,14 @@
 Engagement tracking API endpoints.
 Provides routes to process email pixel loads and link clicks.
 """
-from fastapi import APIRouter, Request, Depends, Response
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import RedirectResponse
 import base64
-import hmac
-import hashlib
 from loguru import logger
-from app.core.database import get_db
-from app.modules.tracking.pixel_tracker import TrackingService
+from app.core.database import get_session_maker
+from app.modules.tracking.bot_filter import tracking_filter
+from app.modules.tracking.pixel_tracker import TrackingEvent, record_tracking_events, tracking_event_buffer
+from app.modules.tracking.token_codec import TrackingClaims, decode_tracking_token
 from app.config import get_settings
 
 settings = get_settings()
@@ -17,51 +17,46 @@ router = APIRouter()
 
 PIXEL_GIF = base64.b64decode("R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw==")
 
-def _verify_tracking_token(token: str) -> bool:
+async def _record(claims: TrackingClaims, token: str, event_type: str, request: Request,
+                  url_clicked: str = None) -> None:
     """
-    Verifies the HMAC signature of a tracking token.
+    Queues the event for the write-behind flusher; no database work happens
+    here unless the buffer is full, in which case the event is written inline.
+    Scanner/prefetch hits and repeats are dropped first (see ``bot_filter``).
     """
-    try:
-        if "." not in token:
-            return False
-        b64_payload, b64_sig = token.split(".", 1)
-        # Add padding back
-        payload_bytes = base64.urlsafe_b64decode(b64_payload + "===")
-        payload_str = payload_bytes.decode("utf-8")
-        
-        expected_sig = hmac.new(
-            settings.SECURITY_SALT.encode(),
-            payload_str.encode(),
-            hashlib.sha256
-        ).digest()
-        
-        actual_sig = base64.urlsafe_b64decode(b64_sig + "===")
-        return hmac.compare_digest(actual_sig, expected_sig)
-    except Exception:
-        return False
+    event = TrackingEvent.from_request(claims, token, event_type, request, url_clicked)
+    record, _ = tracking_filter.check(token, event_type, event.ip_address, event.user_agent)
+    if not record:
+        return
+    if tracking_event_buffer.put(event):
+        return
+    async with get_session_maker()() as db:
+        await record_tracking_events(db, [event])
 
 @router.get("/track/open/{token}")
-async def track_email_open(token: str, request: Request, db=Depends(get_db)):
+async def track_email_open(token: str, request: Request):
     """
     HTTP GET endpoint for the embedded 1x1 tracking pixel.
     Registers an 'open' event and returns a transparent GIF.
     Verifies signature to prevent spoofing.
     """
-    if not _verify_tracking_token(token):
+    claims = decode_tracking_token(token)
+    if claims is None:
         return Response(content=PIXEL_GIF, media_type="image/gif")
 
-    await TrackingService.log_event(db, token, "open", request)
+    await _record(claims, token, "open", request)
     return Response(content=PIXEL_GIF, media_type="image/gif")
 
 @router.get("/track/click/{token}")
-async def track_email_click(token: str, url: str, request: Request, db=Depends(get_db)):
+async def track_email_click(token: str, url: str, request: Request):
     """
     HTTP GET endpoint for wrapped hyperlink redirection.
     Registers a 'click' event before issuing an HTTP 307 Redirect.
     Includes security validation to prevent Open Redirect vulnerabilities and token spoofing.
     """
     # Security: Verify token signature
-    if not _verify_tracking_token(token):
+    claims = decode_tracking_token(token)
+    if claims is None:
         # Even if signature fails, we redirect to the destination but don't log the event
         # This ensures the user experience isn't broken by a potential configuration mismatch
         return RedirectResponse(url=url)
@@ -73,5 +68,5 @@ async def track_email_click(token: str, url: str, request: Request, db=Depends(g
         logger.warning(f"Blocked potential Open Redirect attempt to: {url}")
         return RedirectResponse(url=settings.APP_URL)
 
-    await TrackingService.log_event(db, token, "click", request, url_clicked=url)
+    await _record(claims, token, "click", request, url_clicked=url)
     return RedirectResponse(url=url)
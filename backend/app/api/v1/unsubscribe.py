@@ -6,15 +6,13 @@ for the associated lead.
 """
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
-import hmac
-import hashlib
-import base64
 from app.config import get_settings
 from app.core.database import get_db
 from loguru import logger
 from app.models.lead import Lead
+from app.modules.tracking.token_codec import decode_tracking_token
 
 settings = get_settings()
 router = APIRouter()
@@ -24,44 +22,23 @@ async def unsubscribe_lead(tracking_token: str, request: Request, db: AsyncSessi
     """
     Handles unsubscribe requests via the unique tracking token.
     Updates the lead status to 'unsubscribed' and disables follow-ups.
-    Verifies HMAC signature to prevent IDOR attacks.
+    Verifies HMAC signature to prevent IDOR attacks; the lead is updated by
+    primary key straight from the token's claims.
     """
     try:
-        if "." not in tracking_token:
-            raise ValueError("Invalid token format")
-            
-        b64_payload, b64_sig = tracking_token.split(".", 1)
-        
-        payload_bytes = base64.urlsafe_b64decode(b64_payload + "===")
-        payload_str = payload_bytes.decode("utf-8")
-        
-        expected_sig = hmac.new(
-            settings.SECURITY_SALT.encode(),
-            payload_str.encode(),
-            hashlib.sha256
-        ).digest()
-        
-        actual_sig = base64.urlsafe_b64decode(b64_sig + "===")
-        
-        if not hmac.compare_digest(actual_sig, expected_sig):
+        claims = decode_tracking_token(tracking_token)
+        if claims is None:
             logger.warning(f"Invalid signature attempt for token: {tracking_token}")
             return HTMLResponse(content="<h2>Invalid or Tampered Link</h2>", status_code=400)
 
-        if "_" not in payload_str:
-             raise ValueError("Malformed payload")
-             
-        lead_id_str, _ = payload_str.split("_", 1)
-        lead_id = int(lead_id_str)
-            
-        stmt = select(Lead).where(Lead.id == lead_id)
-        result = await db.execute(stmt)
-        lead = result.scalars().first()
-        
-        if lead:
-            lead.status = "unsubscribed"
-            lead.followup_sequence_active = False
-            await db.commit()
-            
+        result = await db.execute(
+            update(Lead)
+            .where(Lead.id == claims.lead_id)
+            .values(status="unsubscribed", followup_sequence_active=False)
+        )
+        await db.commit()
+
+        if result.rowcount:
             return """
             <html>
                 <body style="font-family: sans-serif; text-align: center; padding: 50px;">
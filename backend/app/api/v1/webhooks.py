@@ -16,16 +16,20 @@ import hmac
 import logging
 from datetime import datetime, timezone, timedelta
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.core.database import get_db
-from app.models.campaign import EmailOutreach
 from app.models.subscription import PaymentOrder, Subscription
 from app.models.user import User
 from app.modules.billing.razorpay_client import verify_webhook_signature
+from app.modules.tracking.delivery_events import (
+    apply_delivery_events,
+    delivery_event_buffer,
+    parse_brevo_payload,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -64,62 +68,49 @@ def _verify_brevo_secret(provided: str | None) -> None:
 @router.post("/webhooks/brevo")
 async def brevo_webhook(
     request: Request,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     x_brevo_secret: str | None = Header(default=None),
 ) -> dict:
     """
-    Parses delivery telemetry from the Brevo SMTP gateway webhook.
+    Accepts delivery telemetry from the Brevo SMTP gateway webhook.
 
     Translates ``delivered``, ``bounced``, and related event types into local
     ``EmailOutreach`` status updates so the dashboard reflects accurate delivery
     state without polling the Brevo API.
 
+    Events are queued on the in-process write-behind buffer and the request is
+    acknowledged immediately; the buffer applies them in grouped batches (see
+    ``app/modules/tracking/delivery_events.py``). If the buffer is full the
+    events are applied inline instead.
+
     Request Headers:
         X-Brevo-Secret: Shared secret for request authentication (see BREVO_WEBHOOK_SECRET).
 
     Request Body (JSON):
+        A single event object, or an array of them (Brevo batched webhooks):
+
         event (str):       Brevo event type (e.g. "delivered", "hard_bounce").
         email (str):       Recipient email address.
-        message-id (str):  Brevo message identifier used to locate the local record.
+        message-id (str):  Message-ID of the email. Every outgoing email carries a
+                           Message-ID generated at send time and stored on
+                           ``EmailOutreach.brevo_message_id`` (unique index), so
+                           the row is found by index lookup.
         reason (str):      Optional bounce reason string.
 
     Returns:
-        {"status": "ok"} on successful processing.
+        {"status": "ok", "accepted": <events queued or applied>}.
     """
     # Authenticate the request before touching the database.
     _verify_brevo_secret(x_brevo_secret)
 
     try:
-        payload = await request.json()
-        event = payload.get("event")
-        email = payload.get("email")
-        message_id = payload.get("message-id")
-
-        logger.info("Received Brevo webhook: event=%s for email=%s", event, email)
+        events = parse_brevo_payload(await request.json())
+        overflow = [event for event in events if not delivery_event_buffer.put(event)]
+        if overflow:
+            logger.warning("Delivery event buffer full; applying %d events inline", len(overflow))
+            await apply_delivery_events(db, overflow)
 
-        if event == "delivered" and message_id:
-            stmt = (
-                update(EmailOutreach)
-                .where(EmailOutreach.brevo_message_id == message_id)
-                .values(status="delivered")
-            )
-            await db.execute(stmt)
-            await db.commit()
-
-        elif (
-            event in ["bounced", "hard_bounce", "soft_bounce", "spam", "blocked"]
-            and message_id
-        ):
-            stmt = (
-                update(EmailOutreach)
-                .where(EmailOutreach.brevo_message_id == message_id)
-                .values(status="bounced", bounce_reason=payload.get("reason", event))
-            )
-            await db.execute(stmt)
-            await db.commit()
-
-        return {"status": "ok"}
+        return {"status": "ok", "accepted": len(events)}
 
     except HTTPException:
         raise  # Re-raise auth errors unchanged
@@ -13,6 +13,7 @@ Key Features:
 4. Environment Persistence: Includes a best-effort mechanism to persist changes back to .env.
 """
 
+import ipaddress
 import os
 from functools import lru_cache
 from typing import Any, Union
@@ -151,6 +152,27 @@ class Settings(BaseSettings):
     The Groq model to use.
     """
 
+    GROQ_BATCH_SIZE: int = 5
+    """
+    Leads packed into one batched Groq request for email, follow-up and Threads scoring. 1 disables batching.
+    """
+
+    # LLM response cache (see app/modules/personalization/llm_cache.py)
+    LLM_CACHE_ENABLED: bool = True
+    """
+    Master switch for the in-process LLM response cache. Call sites still opt in individually.
+    """
+
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    """
+    Seconds a cached completion stays valid.
+    """
+
+    LLM_CACHE_MAX_ENTRIES: int = 2048
+    """
+    Maximum cached completions before least-recently-used entries are evicted.
+    """
+
     # ── Meta Threads Lead Generation ──────────────────────────────
     # Threads API OAuth credentials (obtainable from Meta Developer Portal)
     THREADS_APP_ID: str = ""
@@ -240,6 +262,29 @@ class Settings(BaseSettings):
     The Brevo SMTP password.
     """
 
+    SMTP_SENDERS: list[dict] = []
+    """
+    Sender accounts as JSON, e.g. [{"id": "a1", "username": "...", "password": "...",
+    "from_email": "...", "daily_quota": 300, "warmup_days": 14, "warmup_start": 20,
+    "started_on": "2024-05-01"}]. host/port/from_name/reply_to default to the BREVO_*/FROM_* values.
+    Empty uses the single BREVO_SMTP_USER account with a 300/day quota.
+    """
+
+    SMTP_POOL_SIZE: int = 2
+    """
+    Maximum pooled SMTP connections kept open per relay account.
+    """
+
+    SMTP_KEEPALIVE_SECONDS: int = 60
+    """
+    Interval between NOOP keepalives sent on idle pooled SMTP connections.
+    """
+
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 300
+    """
+    Idle time after which a pooled SMTP connection is closed.
+    """
+
     FROM_EMAIL: str
     """
     The from email address.
@@ -271,6 +316,37 @@ class Settings(BaseSettings):
     The IMAP password.
     """
 
+    IMAP_MAILBOX: str = "INBOX"
+    """
+    Mailbox polled for replies.
+    """
+
+    IMAP_FETCH_BATCH: int = 200
+    """
+    New messages fetched per UID FETCH command.
+    """
+
+    IMAP_INITIAL_LOOKBACK_MINUTES: int = 1440
+    """
+    How far back a poll searches when the UID checkpoint cannot be used (UIDVALIDITY
+    changed, or no checkpoint and the server reports no UIDNEXT).
+    """
+
+    IMAP_BODY_MAX_BYTES: int = 16384
+    """
+    Bytes of a reply's text/plain part downloaded for classification; attachments and HTML are never fetched.
+    """
+
+    IMAP_IDLE_ENABLED: bool = False
+    """
+    Hold an IMAP IDLE connection and poll as soon as new mail arrives, in addition to the scheduled poll.
+    """
+
+    IMAP_IDLE_SECONDS: int = 1740
+    """
+    IDLE is re-issued after this long (RFC 2177 servers drop idle clients after ~30 minutes).
+    """
+
     # Notification and Alerting
     ADMIN_EMAIL: str
     """
@@ -335,6 +411,130 @@ class Settings(BaseSettings):
     Must be at least 60 seconds to avoid triggering Brevo rate limits and spam filters.
     """
 
+    # Outbox workers (see app/modules/outreach/outbox.py)
+    OUTBOX_WORKERS: int = 2
+    """
+    Concurrent outbox workers per process during the outreach stage.
+    """
+
+    OUTBOX_BATCH_SIZE: int = 10
+    """
+    Rows a worker claims per SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+
+    OUTBOX_COMMIT_BATCH: int = 10
+    """
+    Send outcomes buffered before they are committed together (also flushed every few seconds).
+    """
+
+    OUTBOX_LEASE_SECONDS: int = 900
+    """
+    Claim lease length. Workers renew while sending; a crashed worker's rows become claimable once it lapses.
+    """
+
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    """
+    Send attempts per email before it is marked failed.
+    """
+
+    OUTBOX_BACKOFF_BASE_SECONDS: int = 300
+    """
+    Retry delay after the first failed attempt; doubles per attempt, capped at one hour.
+    """
+
+    # Dispatch shaping (see app/modules/outreach/dispatch_scheduler.py)
+    DISPATCH_SENDER_BURST: int = 1
+    """
+    Sends a sender account may make back-to-back before EMAIL_SEND_INTERVAL_SECONDS pacing applies.
+    """
+
+    DISPATCH_DOMAIN_MAX_PER_HOUR: int = 20
+    """
+    Default maximum sends per hour to any single recipient domain (gmail.com, outlook.com, ...).
+    """
+
+    DISPATCH_DOMAIN_LIMITS: dict[str, int] = {}
+    """
+    Per-domain overrides of DISPATCH_DOMAIN_MAX_PER_HOUR, as JSON, e.g. {"gmail.com": 30}.
+    """
+
+    DISPATCH_DAILY_CAP: int = 0
+    """
+    Shop-wide maximum emails (outreach + follow-ups) per local day. 0 = the sum of sender account quotas.
+    """
+
+    DISPATCH_WINDOW_START_HOUR: int = 8
+    """
+    Local hour (DISPATCH_TIMEZONE) at which the sending window opens.
+    """
+
+    DISPATCH_WINDOW_END_HOUR: int = 20
+    """
+    Local hour (DISPATCH_TIMEZONE) at which the sending window closes; unsent mail stays queued.
+    """
+
+    DISPATCH_TIMEZONE: str = "Asia/Kolkata"
+    """
+    Timezone for the sending window and the daily cap. Matches the scheduler timezone.
+    """
+
+    DISPATCH_CONCURRENCY: int = 4
+    """
+    Maximum emails in flight at once when the send plan allows overlap.
+    """
+
+    # Write-behind ingestion (see app/core/write_behind.py)
+    WEBHOOK_FLUSH_INTERVAL_MS: int = 250
+    """
+    Maximum time a Brevo webhook event waits in memory before it is written.
+    """
+
+    WEBHOOK_FLUSH_BATCH: int = 500
+    """
+    Webhook events applied per flush; a full batch is flushed immediately.
+    """
+
+    WEBHOOK_BUFFER_MAX: int = 10000
+    """
+    Pending webhook events held in memory. When full, events are written inline by the request.
+    """
+
+    TRACKING_FLUSH_INTERVAL_MS: int = 500
+    """
+    Maximum time an open/click event waits in memory before it is written.
+    """
+
+    TRACKING_FLUSH_BATCH: int = 1000
+    """
+    Open/click events written per flush; a full batch is flushed immediately.
+    """
+
+    TRACKING_BUFFER_MAX: int = 50000
+    """
+    Pending open/click events held in memory. When full, events are written inline by the request.
+    """
+
+    # Tracking fast-path filter (see app/modules/tracking/bot_filter.py)
+    TRACKING_DEDUP_WINDOW_SECONDS: int = 300
+    """
+    Repeat hits for the same token, event type and client /24 within this window are dropped.
+    """
+
+    TRACKING_DEDUP_MAX_ENTRIES: int = 100000
+    """
+    Size of the in-memory dedup LRU.
+    """
+
+    TRACKING_SUPPRESS_CLASSES: list[str] = ["scanner", "prefetch"]
+    """
+    Hit classes that are never recorded: any of "scanner", "prefetch", "proxy".
+    """
+
+    TRACKING_BOT_NETWORKS: list[str] = []
+    """
+    Extra networks to classify, as "class:cidr" entries, e.g. ["scanner:203.0.113.0/24"].
+    """
+
     # ── Field Validators ──────────────────────────────────────────────────────
     # These run at startup and raise a ValueError (shown as a clear error message)
     # if any pipeline scheduling value is outside its valid range, preventing silent
@@ -342,7 +542,7 @@ class Settings(BaseSettings):
 
     @field_validator(
         "DISCOVERY_HOUR", "QUALIFICATION_HOUR", "PERSONALIZATION_HOUR",
-        "OUTREACH_HOUR", "REPORT_HOUR",
+        "OUTREACH_HOUR", "REPORT_HOUR", "DISPATCH_WINDOW_START_HOUR",
         mode="before",
     )
     @classmethod
@@ -379,6 +579,49 @@ class Settings(BaseSettings):
             )
         return v
 
+    @field_validator("DISPATCH_WINDOW_END_HOUR", mode="before")
+    @classmethod
+    def validate_window_end(cls, v: Any) -> int:
+        """Ensures the sending window closes between 1 and 24 (24 = midnight)."""
+        v = int(v)
+        if not (1 <= v <= 24):
+            raise ValueError(f"DISPATCH_WINDOW_END_HOUR must be between 1 and 24, got {v}.")
+        return v
+
+    @field_validator("TRACKING_BOT_NETWORKS")
+    @classmethod
+    def validate_bot_networks(cls, v: list[str]) -> list[str]:
+        """Ensures every entry is "class:cidr" with a known class and a parseable network."""
+        for entry in v:
+            kind, sep, cidr = entry.partition(":")
+            if not sep or kind.strip() not in ("scanner", "prefetch", "proxy"):
+                raise ValueError(
+                    f"TRACKING_BOT_NETWORKS entry {entry!r} must be \"class:cidr\" "
+                    "with class one of scanner, prefetch, proxy."
+                )
+            try:
+                ipaddress.ip_network(cidr.strip(), strict=False)
+            except ValueError:
+                raise ValueError(f"TRACKING_BOT_NETWORKS entry {entry!r} has an invalid network {cidr!r}.") from None
+        return v
+
+    # Attachment Artifact Store (content-addressed proposal attachments)
+    ARTIFACT_STORE_DIR: str = ""
+    """
+    Directory for the on-disk content-addressed attachment store.
+    Leave empty to keep artifacts in memory only.
+    """
+
+    ARTIFACT_CACHE_MAX_MB: int = 64
+    """
+    Upper bound, in MB, for each in-memory artifact cache (raw blobs and encoded MIME bodies).
+    """
+
+    ARTIFACT_RETENTION_DAYS: int = 14
+    """
+    On-disk artifacts not written within this many days are pruned after each outreach run.
+    """
+
     # Branding and Redirects
     BOOKING_LINK: str = ""
     """
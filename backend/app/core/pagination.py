@@ -0,0 +1,153 @@
+"""
+Keyset pagination and cheap row counts.
+
+Pages are addressed by an opaque cursor holding the sort key of a boundary
+row instead of an ``OFFSET``::
+
+    WHERE (created_at, id) < (:created_at, :id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit + 1
+
+so every page is one index range scan of ``limit + 1`` rows however deep it
+is. The extra row only tells whether another page exists. A cursor is
+``base64url(json)`` of the key values plus a direction (``n`` for the page
+after the row, ``p`` for the page before it); it is not signed, since
+forging one only moves the window.
+
+Totals are counted exactly only when asked for; :func:`estimate_count`
+returns PostgreSQL's planner estimate for the filtered query instead.
+"""
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+NEXT = "n"
+PREV = "p"
+
+
+class InvalidCursor(ValueError):
+    """The cursor string is malformed or does not match the sort key."""
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load(column, raw: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    return python_type(raw)
+
+
+def encode_cursor(values: Sequence[Any], direction: str) -> str:
+    payload = json.dumps({"k": [_dump(v) for v in values], "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> Tuple[list, str]:
+    """Returns ``(key values, direction)``; raises :class:`InvalidCursor`."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        raw, direction = payload["k"], payload["d"]
+        values = [_load(key, value) for key, value in zip(keys, raw)]
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if direction not in (NEXT, PREV) or len(raw) != len(keys):
+        raise InvalidCursor(cursor)
+    return values, direction
+
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence,
+    cursor: Optional[str],
+    limit: int,
+) -> KeysetPage:
+    """
+    One page of ``stmt`` (selecting a single ORM entity) in descending
+    ``keys`` order.
+
+    Args:
+        keys: Mapped columns forming a unique sort key, e.g.
+            ``(Lead.created_at, Lead.id)``; back them with a matching index.
+        cursor: A ``next_cursor``/``prev_cursor`` from an earlier page, or
+            None for the first page.
+    """
+    direction = NEXT
+    if cursor:
+        values, direction = decode_cursor(cursor, keys)
+        boundary = tuple_(*keys)
+        bound = tuple_(*(literal(value, key.type) for key, value in zip(keys, values)))
+        stmt = stmt.where(boundary < bound if direction == NEXT else boundary > bound)
+
+    order = [key.desc() for key in keys] if direction == NEXT else [key.asc() for key in keys]
+    rows = (await db.execute(stmt.order_by(*order).limit(limit + 1))).scalars().all()
+    has_more = len(rows) > limit
+    items = list(rows[:limit])
+    if direction == PREV:
+        items.reverse()
+
+    def key_of(item) -> list:
+        return [getattr(item, key.key) for key in keys]
+
+    # Forward: a later page exists if the extra row came back; an earlier one
+    # whenever we arrived by cursor. Backward: the other way round.
+    has_next = has_more if direction == NEXT else bool(cursor)
+    has_prev = bool(cursor) if direction == NEXT else has_more
+    return KeysetPage(
+        items=items,
+        next_cursor=encode_cursor(key_of(items[-1]), NEXT) if items and has_next else None,
+        prev_cursor=encode_cursor(key_of(items[0]), PREV) if items and has_prev else None,
+    )
+
+
+async def exact_count(db: AsyncSession, stmt: Select) -> int:
+    return await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery())) or 0
+
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> Optional[int]:
+    """
+    The planner's row estimate for ``stmt`` (``EXPLAIN``, no execution), or
+    None on databases without one. Accuracy follows the table statistics
+    kept by autovacuum/``ANALYZE``.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+    sql = str(stmt.order_by(None).compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}))
+    conn = await db.connection()
+    plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def table_estimate(db: AsyncSession, table_name: str) -> Optional[int]:
+    """``pg_class.reltuples`` for an unfiltered table, or None if unknown."""
+    if db.bind.dialect.name != "postgresql":
+        return None
+    reltuples = await db.scalar(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table_name},
+    )
+    # -1 until the table has been vacuumed or analyzed once.
+    return int(reltuples) if reltuples is not None and reltuples >= 0 else None
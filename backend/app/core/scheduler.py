@@ -145,6 +145,15 @@ def setup_scheduler():
         replace_existing=True
     )
 
+    # Refresh campaigns' counter columns from the metrics rollup — always active
+    from app.modules.analytics.campaign_metrics import run_campaign_metrics_merge
+    scheduler.add_job(
+        run_campaign_metrics_merge,
+        IntervalTrigger(minutes=15),
+        id="campaign_metrics_merge",
+        replace_existing=True,
+    )
+
     # Subscription expiry check — always active, runs daily at 2 AM IST
     scheduler.add_job(
         check_subscription_expiry,
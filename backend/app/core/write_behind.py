@@ -0,0 +1,181 @@
+"""
+Write-Behind Buffers.
+
+Lets request handlers hand records to the database without waiting for it.
+A handler calls :meth:`WriteBehindBuffer.put` (non-blocking) and returns; a
+background flusher drains the buffer in batches and passes each batch to the
+buffer's ``flush`` coroutine, which applies it with a few set-based statements.
+
+A batch is flushed when ``max_batch`` records are pending or
+``flush_interval_ms`` has passed since the first pending record, whichever
+comes first. The buffer is bounded by ``max_pending``: ``put`` returns False
+when it is full so the caller can fall back to writing inline instead of
+growing memory without limit.
+
+Every buffer registers itself so :func:`drain_write_behind_buffers` (called on
+application shutdown) can flush whatever is still pending. Closing asks the
+flusher to stop and waits for the batch it is writing rather than cancelling
+it, since a cancelled flush would lose records already taken off the queue.
+
+The flusher task belongs to the event loop it was started on; a buffer used
+from a new loop (e.g. a fresh loop per test) starts a new flusher there.
+"""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Generic, List, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+_buffers: List["WriteBehindBuffer"] = []
+
+
+class WriteBehindBuffer(Generic[T]):
+    """
+    A bounded in-process queue drained in batches by a background flusher.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[List[T]], Awaitable[None]],
+        max_batch: int = 500,
+        flush_interval_ms: int = 250,
+        max_pending: int = 10000,
+    ):
+        self.name = name
+        self._flush_batch = flush
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_pending = max_pending
+
+        self._pending: Deque[T] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self.stats = {"queued": 0, "flushed": 0, "batches": 0, "rejected": 0, "errors": 0}
+        _buffers.append(self)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # ── Producer side ─────────────────────────────────────────────────────────
+
+    def put(self, item: T) -> bool:
+        """
+        Queues ``item`` for the next flush.
+
+        Returns:
+            bool: False if the buffer is full; the item was not queued.
+        """
+        self._bind_loop()
+        if len(self._pending) >= self.max_pending:
+            self.stats["rejected"] += 1
+            return False
+        self._pending.append(item)
+        self.stats["queued"] += 1
+        if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    # ── Flusher ───────────────────────────────────────────────────────────────
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and (self._closing or self._flusher is not None and not self._flusher.done()):
+            # Records put while closing are picked up by close()'s final drain.
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+            # Give a burst time to accumulate unless a full batch is waiting.
+            if len(self._pending) < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._wait_for_full_batch(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def _wait_for_full_batch(self) -> None:
+        while len(self._pending) < self.max_batch and not self._closing:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+    async def flush(self) -> int:
+        """
+        Applies everything pending now, ``max_batch`` records at a time.
+
+        A batch whose ``flush`` raises is logged and dropped; the records are
+        telemetry and retrying a poison batch forever would stall the rest.
+
+        Returns:
+            int: Number of records applied.
+        """
+        self._bind_loop()
+        return await self._drain()
+
+    async def _drain(self) -> int:
+        applied = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+                try:
+                    await self._flush_batch(batch)
+                    applied += len(batch)
+                    self.stats["flushed"] += len(batch)
+                    self.stats["batches"] += 1
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Write-behind buffer '{self.name}' dropped a batch of {len(batch)}: {e}")
+        return applied
+
+    async def close(self) -> None:
+        """Stops the flusher after its in-flight batch, then flushes what is left."""
+        loop = asyncio.get_running_loop()
+        flusher = self._flusher
+        if self._loop is not loop:
+            # The flusher's loop is gone (or going); it cannot be awaited here.
+            if flusher is not None:
+                flusher.cancel()
+            flusher = None
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+        self._closing = True
+        try:
+            if flusher is not None and not flusher.done():
+                self._wakeup.set()
+                try:
+                    await flusher
+                except Exception as e:
+                    logger.warning(f"Write-behind buffer '{self.name}' flusher failed on close: {e}")
+            await self._drain()
+        finally:
+            self._closing = False
+            self._flusher = None
+            self._loop = None
+            self._flush_lock = None
+
+
+async def drain_write_behind_buffers() -> None:
+    """Flushes and stops every buffer. Called on application shutdown."""
+    for buffer in list(_buffers):
+        try:
+            pending = len(buffer)
+            await buffer.close()
+            if pending:
+                logger.info(f"Drained {pending} pending records from '{buffer.name}'")
+        except Exception as e:
+            logger.warning(f"Error draining write-behind buffer '{buffer.name}': {e}")
@@ -27,6 +27,8 @@ from loguru import logger
 from app.config import get_settings
 from app.core.scheduler import scheduler, setup_scheduler
 from app.core.database import verify_tables_exist
+from app.core.write_behind import drain_write_behind_buffers
+from app.modules.outreach.smtp_pool import close_smtp_pools
 from app.api.router import api_router
 
 @asynccontextmanager
@@ -47,6 +49,14 @@ async def lifespan(app: FastAPI):
     # Setup background task scheduling (Discovery, Qualification, Outreach)
     setup_scheduler()
 
+    # Optional IMAP IDLE push: poll for replies as soon as new mail arrives
+    reply_listener = None
+    if get_settings().IMAP_IDLE_ENABLED:
+        from app.modules.tracking.reply_tracker import ReplyIdleListener
+        from app.tasks.daily_pipeline import poll_replies
+        reply_listener = ReplyIdleListener(poll_replies)
+        reply_listener.start()
+
     # NOTE: The system is designed to be extensible. While we currently use 
     # APScheduler for simplicity, the codebase retains structure compatible 
     # with Celery/Redis for future horizontal scaling requirements.
@@ -56,6 +66,12 @@ async def lifespan(app: FastAPI):
     # ── Shutdown ─────────────────────────────────────────────
     # Gracefully stop the scheduler to prevent orphaned tasks
     scheduler.shutdown(wait=False)
+    if reply_listener is not None:
+        await reply_listener.stop()
+    # Write out webhook and tracking events still waiting in write-behind buffers
+    await drain_write_behind_buffers()
+    # Release pooled, authenticated SMTP connections to the relay
+    await close_smtp_pools()
     logger.info("Application shutdown complete. Scheduler stopped.")
 
 # Initialize FastAPI application with optimized metadata for OpenAPI/Swagger documentation
@@ -24,9 +24,12 @@ from app.models.user import User
 # ── Lead pipeline models ───────────────────────────────────────────────────────
 from app.models.lead import Lead
 from app.models.campaign import Campaign, EmailOutreach
+from app.models.campaign_metric import CampaignMetric
+from app.models.daily_funnel import DailyFunnel
 from app.models.email_event import EmailEvent
 from app.models.daily_report import DailyReport
 from app.models.prompt_config import PromptConfig
+from app.models.mailbox_checkpoint import MailboxCheckpoint
 
 # ── Meta Threads integration models ───────────────────────────────────────────
 from app.models.threads import (
@@ -6,7 +6,7 @@ to specific campaigns and tracks the detailed delivery state of every
 individual email sent by the system.
 """
 import uuid
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Date, ARRAY, ForeignKey, Text, JSON
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Date, ARRAY, ForeignKey, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -43,6 +43,9 @@ class EmailOutreach(Base):
     Tracks delivery status and engagement metadata.
     """
     __tablename__ = "email_outreach"
+    __table_args__ = (
+        Index("ix_email_outreach_status_next_attempt", "status", "next_attempt_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), index=True)
@@ -56,13 +59,30 @@ class EmailOutreach(Base):
     ai_generated = Column(Boolean, default=True)
     has_attachment = Column(Boolean, default=False)
     attachment_names = Column(JSON, nullable=True)
+    # Render inputs for proposal attachments, rendered lazily at dispatch time
+    # (see app.modules.personalization.proposal_artifacts).
+    proposal_context = Column(JSON, nullable=True)
+    # Content-addressed digests of the rendered attachments
+    # (see app.modules.outreach.artifact_store).
+    attachment_refs = Column(JSON, nullable=True)
 
     status = Column(String(50), default="queued")
+    # Sender pool account the email went out from
+    # (see app.modules.outreach.sender_pool).
+    sender_account = Column(String(255), nullable=True, index=True)
 
-    sent_at = Column(DateTime(timezone=True), nullable=True)
+    # Outbox bookkeeping (see app.modules.outreach.outbox).
+    attempt_count = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    claimed_by = Column(String(128), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    sent_at = Column(DateTime(timezone=True), nullable=True, index=True)
     delivered_at = Column(DateTime(timezone=True), nullable=True)
     bounce_reason = Column(Text, nullable=True)
-    brevo_message_id = Column(String(255), nullable=True)
+    # RFC 5322 Message-ID set at send time; delivery webhooks match on it.
+    brevo_message_id = Column(String(255), nullable=True, unique=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     lead = relationship("Lead", back_populates="outreach")
@@ -0,0 +1,29 @@
+"""
+Campaign Metrics Rollup Model
+
+Per-campaign, per-hour engagement counters. Writers add to the row for the
+current hour with an atomic upsert instead of read-modify-writing the
+``campaigns`` row, so concurrent sends, opens and replies never contend on
+a single hot row and no increment is lost.
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.models import Base
+
+class CampaignMetric(Base):
+    """
+    One campaign's counters for one UTC hour.
+
+    Totals are the sum over a campaign's buckets; ``Campaign.emails_sent`` and
+    friends are refreshed from these sums periodically (see
+    ``app/modules/analytics/campaign_metrics.py``).
+    """
+    __tablename__ = "campaign_metrics"
+
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+
+    emails_sent = Column(Integer, nullable=False, default=0, server_default="0")
+    emails_opened = Column(Integer, nullable=False, default=0, server_default="0")
+    links_clicked = Column(Integer, nullable=False, default=0, server_default="0")
+    replies_received = Column(Integer, nullable=False, default=0, server_default="0")
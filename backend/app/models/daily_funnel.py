@@ -0,0 +1,34 @@
+"""
+Daily Funnel Rollup Model
+
+Lead funnel counters per UTC day and lead segment (city × category × tier).
+Pipeline stages and the tracking flusher add to these rows with atomic
+upserts as leads move through the funnel, so dashboards and reports read a
+handful of rows per day instead of scanning ``leads``.
+"""
+from sqlalchemy import Column, Date, Integer, String
+from app.models import Base
+
+class DailyFunnel(Base):
+    """
+    One segment's funnel transitions on one day.
+
+    Segment columns are never NULL (unknown values are stored as ``""``) so
+    they can form the primary key. Each counter records the day of the
+    transition itself: a lead discovered on Monday and replying on Friday
+    adds to Monday's ``discovered`` and Friday's ``replied``. Maintained by
+    ``app/modules/analytics/daily_funnel.py``.
+    """
+    __tablename__ = "daily_funnel"
+
+    day = Column(Date, primary_key=True)
+    city = Column(String(100), primary_key=True, default="")
+    category = Column(String(100), primary_key=True, default="")
+    tier = Column(String(2), primary_key=True, default="")
+
+    discovered = Column(Integer, nullable=False, default=0, server_default="0")
+    qualified = Column(Integer, nullable=False, default=0, server_default="0")
+    emailed = Column(Integer, nullable=False, default=0, server_default="0")
+    opened = Column(Integer, nullable=False, default=0, server_default="0")
+    clicked = Column(Integer, nullable=False, default=0, server_default="0")
+    replied = Column(Integer, nullable=False, default=0, server_default="0")
@@ -14,7 +14,7 @@ import uuid
 from datetime import datetime
 from sqlalchemy import (
     Boolean, Column, DateTime, Float,
-    ForeignKey, Integer, JSON, String, Text,
+    ForeignKey, Index, Integer, JSON, String, Text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -103,17 +103,18 @@ class Lead(Base):
     discovered_at  = Column(
         DateTime(timezone=True), default=func.now(), nullable=False, index=True
     )
-    qualified_at   = Column(DateTime(timezone=True), nullable=True)
-    email_sent_at  = Column(DateTime(timezone=True), nullable=True)
+    # Indexed for the daily report's half-open range filters
+    qualified_at   = Column(DateTime(timezone=True), nullable=True, index=True)
+    email_sent_at  = Column(DateTime(timezone=True), nullable=True, index=True)
     first_opened_at = Column(
-        DateTime(timezone=True), nullable=True,
+        DateTime(timezone=True), nullable=True, index=True,
         comment="Timestamp of first email open pixel hit."
     )
     first_clicked_at = Column(
-        DateTime(timezone=True), nullable=True,
+        DateTime(timezone=True), nullable=True, index=True,
         comment="Timestamp of first tracked link click."
     )
-    first_replied_at = Column(DateTime(timezone=True), nullable=True)
+    first_replied_at = Column(DateTime(timezone=True), nullable=True, index=True)
 
     # Follow-up Sequence Tracking
     followup_count           = Column(Integer, default=0)
@@ -126,6 +127,10 @@ class Lead(Base):
     reply_confidence      = Column(Float, nullable=True)
     reply_key_signal      = Column(Text, nullable=True)
     suggested_reply_draft = Column(Text, nullable=True)
+    reply_decision_source = Column(
+        String(20), nullable=True,
+        comment="rules | llm — which classifier stage set reply_classification."
+    )
 
     # Metadata
     raw_places_data = Column(
@@ -155,6 +160,12 @@ class Lead(Base):
     )
 
 
+# Reply matching looks leads up by case-insensitive sender address.
+Index("ix_leads_email_lower", func.lower(Lead.email))
+# Keyset pagination of the leads API walks (created_at, id) in either direction.
+Index("ix_leads_created_at_id", Lead.created_at, Lead.id)
+
+
 class LeadSocialNetwork(Base):
     """
     Stores individual social media profiles found during qualification.
@@ -0,0 +1,24 @@
+"""
+Mailbox Checkpoint Model
+
+Remembers how far the reply poller has read a mailbox, as the IMAP
+UIDVALIDITY / UID pair, so each poll fetches only messages it has not seen.
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.models import Base
+
+class MailboxCheckpoint(Base):
+    """
+    High-water mark for one IMAP mailbox.
+
+    ``last_uid`` is only meaningful while the server's UIDVALIDITY equals
+    ``uid_validity``; when it changes, UIDs were renumbered and the poller
+    starts over from a time-bounded search.
+    """
+    __tablename__ = "mailbox_checkpoints"
+
+    mailbox = Column(String(512), primary_key=True)
+    uid_validity = Column(BigInteger, nullable=False)
+    last_uid = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,139 @@
+"""
+Campaign metrics rollup.
+
+All campaign counters (sent, opened, clicked, replied) are written to
+``campaign_metrics`` as atomic upserts into the current hour's bucket::
+
+    INSERT ... ON CONFLICT (campaign_id, bucket_start)
+    DO UPDATE SET emails_opened = campaign_metrics.emails_opened + excluded.emails_opened
+
+Readers sum the buckets (:func:`campaign_totals`), which is exact at any
+moment. The legacy ``campaigns`` counter columns are refreshed from the
+rollup by :func:`merge_campaign_metrics` on a schedule, so existing consumers
+keep working without every event locking the campaign row.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Mapping, Optional
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.campaign import Campaign
+from app.models.campaign_metric import CampaignMetric
+
+METRICS = ("emails_sent", "emails_opened", "links_clicked", "replies_received")
+
+
+def hour_bucket(at: Optional[datetime] = None) -> datetime:
+    """Start of the UTC hour containing ``at`` (naive UTC, like sent_at)."""
+    at = at or datetime.utcnow()
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+async def record_metrics(
+    db: AsyncSession,
+    deltas: Mapping[object, Mapping[str, int]],
+    at: Optional[datetime] = None,
+) -> None:
+    """
+    Adds ``deltas`` (``{campaign_id: {metric: n}}``) to the current bucket.
+
+    Runs in the caller's transaction; one upsert statement for all campaigns.
+    """
+    bucket = hour_bucket(at)
+    rows = []
+    for campaign_id, counts in deltas.items():
+        if not campaign_id:
+            continue
+        row = {name: int(counts.get(name, 0)) for name in METRICS}
+        if any(row.values()):
+            rows.append({"campaign_id": campaign_id, "bucket_start": bucket, **row})
+    if not rows:
+        return
+
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(CampaignMetric).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CampaignMetric.campaign_id, CampaignMetric.bucket_start],
+        set_={name: getattr(CampaignMetric, name) + getattr(stmt.excluded, name) for name in METRICS},
+    )
+    await db.execute(stmt)
+
+
+def count_by_campaign(campaign_ids: Iterable, metric: str) -> Dict[object, Counter]:
+    """Builds ``record_metrics`` deltas counting one ``metric`` per occurrence."""
+    deltas: Dict[object, Counter] = {}
+    for campaign_id in campaign_ids:
+        if campaign_id:
+            deltas.setdefault(campaign_id, Counter())[metric] += 1
+    return deltas
+
+
+async def campaign_totals(
+    db: AsyncSession,
+    campaign_ids: Optional[Iterable] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[object, Dict[str, int]]:
+    """
+    Sums the rollup per campaign, optionally limited to ``[since, until)``.
+
+    Campaigns without any bucket are absent from the result.
+    """
+    stmt = select(
+        CampaignMetric.campaign_id,
+        *(func.sum(getattr(CampaignMetric, name)).label(name) for name in METRICS),
+    ).group_by(CampaignMetric.campaign_id)
+    if campaign_ids is not None:
+        stmt = stmt.where(CampaignMetric.campaign_id.in_(list(campaign_ids)))
+    if since is not None:
+        stmt = stmt.where(CampaignMetric.bucket_start >= since)
+    if until is not None:
+        stmt = stmt.where(CampaignMetric.bucket_start < until)
+
+    result = await db.execute(stmt)
+    return {
+        row.campaign_id: {name: int(getattr(row, name) or 0) for name in METRICS}
+        for row in result.all()
+    }
+
+
+async def merge_campaign_metrics(db: AsyncSession) -> int:
+    """
+    Refreshes the ``campaigns`` counter columns from the rollup in one UPDATE.
+
+    Returns:
+        int: Number of campaign rows refreshed.
+    """
+    def total(name):
+        return (
+            select(func.coalesce(func.sum(getattr(CampaignMetric, name)), 0))
+            .where(CampaignMetric.campaign_id == Campaign.id)
+            .scalar_subquery()
+        )
+
+    has_metrics = select(CampaignMetric.campaign_id).where(CampaignMetric.campaign_id == Campaign.id).exists()
+    result = await db.execute(
+        update(Campaign)
+        .where(has_metrics)
+        .values({name: total(name) for name in METRICS})
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def run_campaign_metrics_merge():
+    """Scheduled entry point for :func:`merge_campaign_metrics`."""
+    from app.core.database import get_session_maker
+
+    async with get_session_maker()() as db:
+        try:
+            merged = await merge_campaign_metrics(db)
+            logger.debug(f"Merged campaign metrics rollup into {merged} campaigns")
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Campaign metrics merge failed: {e}")
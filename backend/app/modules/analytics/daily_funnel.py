@@ -0,0 +1,216 @@
+"""
+Daily funnel rollup.
+
+Lead funnel transitions are counted in ``daily_funnel`` per UTC day and
+segment (city × category × tier) as they happen:
+
+  ===========  ==========================  ======================================
+  metric       written by                  lead timestamp (used by the rebuild)
+  ===========  ==========================  ======================================
+  discovered   discovery stage             ``discovered_at``
+  qualified    qualification stage         ``qualified_at``
+  emailed      ``outbox.apply_outcomes``   ``email_sent_at``
+  opened       tracking flusher            ``first_opened_at``
+  clicked      tracking flusher            ``first_clicked_at``
+  replied      ``reply_matcher``           ``first_replied_at``
+  ===========  ==========================  ======================================
+
+A lead's tier is only known after qualification, so discovery records it
+untiered and the qualification stage moves that count to the lead's tier
+(:func:`retier_discovered`). Every metric is therefore keyed by the lead's
+current segment, exactly as :func:`rebuild_daily_funnel` groups them.
+
+Writers call :func:`record_funnel` in their own transaction; it is one
+``INSERT ... ON CONFLICT DO UPDATE SET n = n + excluded.n`` for all segments.
+Readers sum a day range (:func:`funnel_totals`, :func:`funnel_breakdown`),
+so their cost grows with days and segments, not with leads.
+
+:func:`rebuild_daily_funnel` recomputes a day range from ``leads`` (backfill
+or repair after a missed write); ``scripts/rebuild_daily_funnel.py`` runs it.
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import Date, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.daily_funnel import DailyFunnel
+from app.models.lead import Lead
+
+FUNNEL_METRICS = ("discovered", "qualified", "emailed", "opened", "clicked", "replied")
+SEGMENTS = ("city", "category", "tier")
+_UPSERT_CHUNK = 1000
+
+_TIMESTAMPS = {
+    "discovered": Lead.discovered_at,
+    "qualified": Lead.qualified_at,
+    "emailed": Lead.email_sent_at,
+    "opened": Lead.first_opened_at,
+    "clicked": Lead.first_clicked_at,
+    "replied": Lead.first_replied_at,
+}
+
+FunnelKey = Tuple[date, str, str, str]
+
+
+def segment_of(lead) -> Tuple[str, str, str]:
+    """``(city, category, tier)`` of a Lead or any row exposing those columns."""
+    return (lead.city or "", lead.category or "", lead.lead_tier or "")
+
+
+def _utc_day(when: datetime) -> date:
+    # Naive timestamps are already UTC (utcnow); aware ones are converted.
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    return when.date()
+
+
+def count_funnel(
+    transitions: Iterable[Tuple[object, Optional[datetime]]],
+    metric: str,
+) -> Dict[FunnelKey, Counter]:
+    """
+    Builds :func:`record_funnel` deltas counting one ``metric`` per transition.
+
+    Args:
+        transitions: ``(lead, when)`` pairs; ``when`` defaults to now (UTC).
+    """
+    deltas: Dict[FunnelKey, Counter] = {}
+    for lead, when in transitions:
+        day = _utc_day(when or datetime.utcnow())
+        deltas.setdefault((day, *segment_of(lead)), Counter())[metric] += 1
+    return deltas
+
+
+def retier_discovered(leads: Iterable) -> Dict[FunnelKey, Counter]:
+    """
+    Builds :func:`record_funnel` deltas moving each tiered lead's
+    ``discovered`` count (on its ``discovered_at`` day) from the untiered
+    segment it was recorded under to its tier.
+    """
+    deltas: Dict[FunnelKey, Counter] = {}
+    for lead in leads:
+        if not lead.lead_tier or lead.discovered_at is None:
+            continue
+        day = _utc_day(lead.discovered_at)
+        city, category, tier = segment_of(lead)
+        deltas.setdefault((day, city, category, ""), Counter())["discovered"] -= 1
+        deltas.setdefault((day, city, category, tier), Counter())["discovered"] += 1
+    return deltas
+
+
+async def record_funnel(db: AsyncSession, deltas: Mapping[FunnelKey, Mapping[str, int]]) -> None:
+    """
+    Adds ``deltas`` (``{(day, city, category, tier): {metric: n}}``) to the rollup.
+
+    Runs in the caller's transaction; one upsert statement for all segments
+    (per 1000 rows).
+    """
+    rows = []
+    for (day, city, category, tier), counts in deltas.items():
+        row = {name: int(counts.get(name, 0)) for name in FUNNEL_METRICS}
+        if any(row.values()):
+            rows.append({"day": day, "city": city, "category": category, "tier": tier, **row})
+    if not rows:
+        return
+
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    # Chunked so a multi-month rebuild stays under the bind-parameter limit.
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        stmt = dialect.insert(DailyFunnel).values(rows[start:start + _UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyFunnel.day, DailyFunnel.city, DailyFunnel.category, DailyFunnel.tier],
+            set_={name: getattr(DailyFunnel, name) + getattr(stmt.excluded, name) for name in FUNNEL_METRICS},
+        )
+        await db.execute(stmt)
+
+
+def _filters(since: date, until: date, segment: Mapping[str, Optional[str]]) -> list:
+    conditions = [DailyFunnel.day >= since, DailyFunnel.day < until]
+    for name in SEGMENTS:
+        if segment.get(name) is not None:
+            conditions.append(getattr(DailyFunnel, name) == segment[name])
+    return conditions
+
+
+async def funnel_totals(
+    db: AsyncSession,
+    since: date,
+    until: date,
+    **segment: Optional[str],
+) -> Dict[str, int]:
+    """
+    Funnel counters summed over ``[since, until)``, optionally for one
+    ``city``/``category``/``tier``.
+    """
+    row = (await db.execute(
+        select(*(func.coalesce(func.sum(getattr(DailyFunnel, m)), 0).label(m) for m in FUNNEL_METRICS))
+        .where(*_filters(since, until, segment))
+    )).one()
+    return {m: int(row._mapping[m]) for m in FUNNEL_METRICS}
+
+
+async def funnel_breakdown(
+    db: AsyncSession,
+    since: date,
+    until: date,
+    group_by: Sequence[str] = ("day",),
+    **segment: Optional[str],
+) -> List[Dict]:
+    """Funnel counters over ``[since, until)`` grouped by ``day`` and/or segment columns."""
+    keys = [getattr(DailyFunnel, name) for name in group_by]
+    rows = await db.execute(
+        select(*keys, *(func.sum(getattr(DailyFunnel, m)).label(m) for m in FUNNEL_METRICS))
+        .where(*_filters(since, until, segment))
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+async def rebuild_daily_funnel(db: AsyncSession, since: date, until: date) -> int:
+    """
+    Recomputes ``[since, until)`` from ``leads`` and replaces those days.
+
+    One grouped query per metric, each restricted by a range on that metric's
+    (indexed) timestamp. Commits.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    start, end = (datetime.combine(d, datetime.min.time()) for d in (since, until))
+    counts: Dict[FunnelKey, Counter] = {}
+    for metric, column in _TIMESTAMPS.items():
+        day = (
+            func.date(func.timezone("UTC", column), type_=Date)
+            if db.bind.dialect.name == "postgresql"
+            else func.date(column, type_=Date)
+        ).label("day")
+        rows = await db.execute(
+            select(
+                day,
+                func.coalesce(Lead.city, "").label("city"),
+                func.coalesce(Lead.category, "").label("category"),
+                func.coalesce(Lead.lead_tier, "").label("tier"),
+                func.count().label("n"),
+            )
+            .where(column >= start, column < end)
+            .group_by(day, Lead.city, Lead.category, Lead.lead_tier)
+        )
+        for row in rows:
+            counts.setdefault((row.day, row.city, row.category, row.tier), Counter())[metric] += row.n
+
+    await db.execute(delete(DailyFunnel).where(DailyFunnel.day >= since, DailyFunnel.day < until))
+    await record_funnel(db, counts)
+    await db.commit()
+    logger.info(f"Rebuilt daily_funnel for {since} → {until}: {len(counts)} rows")
+    return len(counts)
+
+
+def days_back(days: int, today: Optional[date] = None) -> Tuple[date, date]:
+    """``[today - days + 1, tomorrow)`` — the last ``days`` days including today."""
+    today = today or datetime.utcnow().date()
+    return today - timedelta(days=days - 1), today + timedelta(days=1)
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 from app.models.lead import Lead
 from app.models.campaign import Campaign, EmailOutreach
+from app.models.campaign_metric import CampaignMetric
 from app.models.prompt_config import PromptConfig
 from app.modules.personalization.groq_client import GroqClient
 
@@ -25,10 +26,11 @@ async def _run_weekly_optimization_core(db: AsyncSession):
     one_week_ago = datetime.utcnow() - timedelta(days=7)
     
     # 1. Analyze campaign stats
-    stmt = select(func.sum(Campaign.emails_sent), func.sum(Campaign.emails_opened), 
-                  func.sum(Campaign.links_clicked), func.sum(Campaign.replies_received)) \
+    stmt = select(func.sum(CampaignMetric.emails_sent), func.sum(CampaignMetric.emails_opened),
+                  func.sum(CampaignMetric.links_clicked), func.sum(CampaignMetric.replies_received)) \
+           .join(Campaign, Campaign.id == CampaignMetric.campaign_id) \
            .where(Campaign.campaign_date >= one_week_ago.date())
-           
+
     res = await db.execute(stmt)
     sent, opened, clicked, replies = res.first()
     
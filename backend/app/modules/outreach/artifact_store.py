@@ -0,0 +1,241 @@
+"""
+Content-Addressed Attachment Store.
+
+Maps the SHA-256 digest of an attachment to its bytes so identical renders are
+stored once, no matter how many leads or sends reference them, and caches the
+base64-encoded MIME body per digest so repeat sends skip re-encoding.
+
+Layers:
+  - Memory:  a size-bounded LRU of blobs and of their encoded MIME payloads.
+  - Disk:    optional, enabled by ``ARTIFACT_STORE_DIR``. Blobs are written
+             once to ``<dir>/<digest[:2]>/<digest>``; writing an existing
+             digest is a no-op, which is where the dedup comes from.
+             :meth:`ArtifactStore.prune` expires old blobs but keeps any
+             still referenced by an unsent outreach row.
+
+Outreach rows reference artifacts by digest (``EmailOutreach.attachment_refs``)
+rather than by file path, so retries and later sends resolve straight from the
+store.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from email import base64mime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def content_digest(content: bytes) -> str:
+    """Returns the hex SHA-256 digest used as an artifact's address."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class _BoundedLRU:
+    """A byte-size-bounded LRU keyed by digest."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes | str]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: str, value) -> None:
+        if key in self._items:
+            self._items.move_to_end(key)
+            return
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        self._items[key] = value
+        self._size += size
+        while self._size > self.max_bytes and self._items:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= len(evicted)
+
+    def pop(self, key: str) -> None:
+        value = self._items.pop(key, None)
+        if value is not None:
+            self._size -= len(value)
+
+
+class ArtifactStore:
+    """
+    Hash-to-blob store with a per-digest encoded MIME payload cache.
+
+    Thread-safe: proposal rendering runs in worker threads via
+    ``asyncio.to_thread`` and writes into the same store the event loop reads.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_memory_bytes: int = 64 * 1024 * 1024):
+        self.root = Path(root).resolve() if root else None
+        self._blobs = _BoundedLRU(max_memory_bytes)
+        self._encoded = _BoundedLRU(max_memory_bytes)
+        self._aliases: "OrderedDict[str, List[Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"puts": 0, "dedup_hits": 0, "encode_hits": 0, "encode_misses": 0}
+
+    # ── Blob storage ──────────────────────────────────────────────────────────
+
+    def _path_for(self, digest: str) -> Optional[Path]:
+        if not self.root:
+            return None
+        return self.root / digest[:2] / digest
+
+    def put(self, content: bytes) -> str:
+        """
+        Stores ``content`` and returns its digest.
+
+        Identical content always maps to the same digest and is only kept once
+        in memory and on disk.
+        """
+        digest = content_digest(content)
+        path = self._path_for(digest)
+        with self._lock:
+            self.stats["puts"] += 1
+            known = self._blobs.get(digest) is not None
+            self._blobs.put(digest, content)
+            stored = path.exists() if path is not None else known
+            if stored:
+                self.stats["dedup_hits"] += 1
+        if stored or path is None:
+            return digest
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent readers never see a partial blob.
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.warning(f"Artifact store could not persist {digest[:12]}: {e}")
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Returns the bytes for ``digest``, or None if the store does not hold it."""
+        with self._lock:
+            content = self._blobs.get(digest)
+        if content is not None:
+            return content
+
+        path = self._path_for(digest)
+        if path is None or not path.exists():
+            return None
+        try:
+            content = path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Artifact store could not read {digest[:12]}: {e}")
+            return None
+        with self._lock:
+            self._blobs.put(digest, content)
+        return content
+
+    def has(self, digest: str) -> bool:
+        """Returns True if the store can resolve ``digest``."""
+        with self._lock:
+            if self._blobs.get(digest) is not None:
+                return True
+        path = self._path_for(digest)
+        return bool(path and path.exists())
+
+    # ── Encoded MIME payloads ─────────────────────────────────────────────────
+
+    def encoded_payload(self, digest: str, content: Optional[bytes] = None) -> Optional[str]:
+        """
+        Returns the base64 MIME body for ``digest``, encoding it at most once.
+
+        Args:
+            digest:  The artifact's address.
+            content: The raw bytes, if the caller already holds them. Avoids a
+                     store lookup on a cache miss.
+        """
+        with self._lock:
+            encoded = self._encoded.get(digest)
+            if encoded is not None:
+                self.stats["encode_hits"] += 1
+                return encoded
+
+        if content is None:
+            content = self.get(digest)
+            if content is None:
+                return None
+
+        encoded = base64mime.body_encode(content, maxlinelen=76, eol="\n")
+        with self._lock:
+            self.stats["encode_misses"] += 1
+            self._encoded.put(digest, encoded)
+        return encoded
+
+    # ── Render memo ───────────────────────────────────────────────────────────
+
+    def remember(self, render_key: str, refs: List[Dict[str, str]], max_entries: int = 4096) -> None:
+        """Records which artifacts a given render input produced."""
+        with self._lock:
+            self._aliases[render_key] = refs
+            self._aliases.move_to_end(render_key)
+            while len(self._aliases) > max_entries:
+                self._aliases.popitem(last=False)
+
+    def recall(self, render_key: str) -> Optional[List[Dict[str, str]]]:
+        """Returns the artifact refs for a previously seen render input, if any."""
+        with self._lock:
+            refs = self._aliases.get(render_key)
+        if refs and all(self.has(ref["sha256"]) for ref in refs):
+            return refs
+        return None
+
+    # ── Maintenance ───────────────────────────────────────────────────────────
+
+    def prune(self, max_age_seconds: int, keep: Iterable[str] = ()) -> int:
+        """
+        Deletes on-disk blobs not written within ``max_age_seconds``.
+
+        Args:
+            max_age_seconds: Age, by mtime, beyond which a blob is removed.
+            keep:            Digests still referenced by unsent outreach rows
+                             (see ``outbox.pending_artifact_digests``); these
+                             are kept whatever their age.
+
+        Returns:
+            int: The number of blobs removed.
+        """
+        if not self.root or not self.root.exists():
+            return 0
+
+        cutoff = time.time() - max_age_seconds
+        keep = set(keep)
+        removed = 0
+        for path in self.root.glob("??/*"):
+            if path.name in keep:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    with self._lock:
+                        self._blobs.pop(path.name)
+                        self._encoded.pop(path.name)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+artifact_store = ArtifactStore(
+    root=settings.ARTIFACT_STORE_DIR or None,
+    max_memory_bytes=settings.ARTIFACT_CACHE_MAX_MB * 1024 * 1024,
+)
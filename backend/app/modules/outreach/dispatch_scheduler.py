@@ -0,0 +1,310 @@
+"""
+Rate-Shaped Dispatch Scheduler.
+
+Replaces the fixed ``asyncio.sleep(2)`` between sends with token buckets that
+encode the actual deliverability constraints:
+
+  - **Sender**: one bucket per sending account, refilled at one token every
+    ``EMAIL_SEND_INTERVAL_SECONDS`` with a burst of ``DISPATCH_SENDER_BURST``.
+  - **Recipient domain**: one bucket per domain (gmail.com, outlook.com, ...),
+    ``DISPATCH_DOMAIN_MAX_PER_HOUR`` per hour unless overridden in
+    ``DISPATCH_DOMAIN_LIMITS``.
+  - **Daily cap**: at most ``DISPATCH_DAILY_CAP`` sends per local day, shared
+    by outreach and follow-ups (0 leaves it to the per-account quotas of the
+    sender pool).
+  - **Window**: nothing is planned outside
+    ``DISPATCH_WINDOW_START_HOUR``–``DISPATCH_WINDOW_END_HOUR`` local time.
+
+Each run first computes a *send plan*: every message gets the earliest time
+at which all of its buckets have a token, picking across domains so a backlog
+for one domain never blocks another. Messages that do not fit before the window
+closes or the daily cap is reached are deferred and stay queued for the next
+run. The plan is then executed with up to ``DISPATCH_CONCURRENCY`` sends in
+flight, each starting at its planned time.
+
+Bucket state lives in the process-wide :data:`dispatch_scheduler`, so
+outreach and follow-up runs draw from the same sender and domain budgets.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+
+settings = get_settings()
+
+DEFAULT_SENDER = "default"
+
+
+class TokenBucket:
+    """
+    A token bucket on an explicit timeline.
+
+    Times are plain floats (seconds on the scheduler's monotonic clock), which
+    lets the planner reserve tokens at future instants.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float, now: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _tokens_at(self, at: float) -> float:
+        elapsed = max(0.0, at - self.updated_at)
+        return min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def available_at(self, now: float) -> float:
+        """Returns the earliest time >= ``now`` at which a token is available."""
+        start = max(now, self.updated_at)
+        tokens = self._tokens_at(start)
+        if tokens >= 1.0:
+            return start
+        return start + (1.0 - tokens) / self.rate
+
+    def take(self, at: float) -> None:
+        """Consumes one token at ``at``, which must be >= :meth:`available_at`."""
+        at = max(at, self.updated_at)
+        self.tokens = self._tokens_at(at) - 1.0
+        self.updated_at = at
+
+
+def recipient_domain(email: str) -> str:
+    """Returns the lower-cased domain part of an address."""
+    return (email or "").rsplit("@", 1)[-1].strip().lower()
+
+
+@dataclass
+class SendPlan:
+    """The outcome of :meth:`DispatchScheduler.plan`."""
+    scheduled: List[Tuple[float, Any]] = field(default_factory=list)
+    """``(delay_seconds, item)`` pairs in send order."""
+    deferred: List[Any] = field(default_factory=list)
+    """Items left for a later run (window closed or daily cap reached)."""
+
+
+class DispatchScheduler:
+    """
+    Plans and executes sends against sender, domain and daily budgets.
+    """
+
+    def __init__(
+        self,
+        send_interval_seconds: float,
+        sender_burst: int = 1,
+        domain_max_per_hour: int = 20,
+        domain_limits: Optional[Dict[str, int]] = None,
+        daily_cap: int = 300,
+        window_start_hour: int = 0,
+        window_end_hour: int = 24,
+        timezone: str = "UTC",
+        concurrency: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+        local_now: Optional[Callable[[], datetime]] = None,
+    ):
+        self.send_interval_seconds = send_interval_seconds
+        self.sender_burst = sender_burst
+        self.domain_max_per_hour = domain_max_per_hour
+        self.domain_limits = {k.lower(): v for k, v in (domain_limits or {}).items()}
+        self.daily_cap = daily_cap
+        self.window_start_hour = window_start_hour
+        self.window_end_hour = window_end_hour
+        self.tz = ZoneInfo(timezone)
+        self.concurrency = concurrency
+        self.clock = clock
+        self.local_now = local_now or (lambda: datetime.now(self.tz))
+
+        self._sender_buckets: Dict[str, TokenBucket] = {}
+        self._domain_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._day: Optional[str] = None
+        self._sent_today = 0
+
+    # ── Buckets ───────────────────────────────────────────────────────────────
+
+    def _sender_bucket(self, sender: str, now: float) -> TokenBucket:
+        bucket = self._sender_buckets.get(sender)
+        if bucket is None:
+            bucket = TokenBucket(1.0 / self.send_interval_seconds, self.sender_burst, now)
+            self._sender_buckets[sender] = bucket
+        return bucket
+
+    def _domain_bucket(self, domain: str, now: float) -> TokenBucket:
+        bucket = self._domain_buckets.get(domain)
+        if bucket is None:
+            per_hour = max(1, self.domain_limits.get(domain, self.domain_max_per_hour))
+            # Burst of one spreads a domain's hourly budget evenly over the hour.
+            bucket = TokenBucket(per_hour / 3600.0, 1, now)
+            self._domain_buckets[domain] = bucket
+        return bucket
+
+    # ── Daily cap and window ──────────────────────────────────────────────────
+
+    def sync_sent_today(self, count: int) -> None:
+        """
+        Aligns the daily counter with the number already sent today.
+
+        The database is authoritative across restarts; the in-process counter
+        covers sends from a run that is still in progress.
+        """
+        day = self.local_now().date().isoformat()
+        if self._day != day:
+            self._day, self._sent_today = day, 0
+        self._sent_today = max(self._sent_today, count)
+
+    def remaining_today(self) -> int:
+        self.sync_sent_today(0)
+        if self.daily_cap <= 0:
+            return 1 << 30
+        return max(0, self.daily_cap - self._sent_today)
+
+    def window_seconds_left(self) -> float:
+        """Seconds until the window closes, or 0 if it is currently closed."""
+        local = self.local_now()
+        if local.hour < self.window_start_hour:
+            return 0.0
+        closes = local.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(
+            hours=self.window_end_hour
+        )
+        return max(0.0, (closes - local).total_seconds())
+
+    # ── Planning ──────────────────────────────────────────────────────────────
+
+    def plan(
+        self,
+        items: List[Any],
+        recipient: Callable[[Any], str],
+        sender: Callable[[Any], str] = lambda _: DEFAULT_SENDER,
+    ) -> SendPlan:
+        """
+        Builds a send plan and reserves the tokens it uses.
+
+        Args:
+            items:     Messages to send, in priority order.
+            recipient: Returns an item's recipient address.
+            sender:    Returns the sender account an item goes out from.
+        """
+        result = SendPlan()
+        horizon = self.window_seconds_left()
+        budget = self.remaining_today()
+        if horizon <= 0 or budget <= 0:
+            result.deferred = list(items)
+            return result
+
+        now = self.clock()
+        deadline = now + horizon
+
+        # FIFO per (sender, domain) so one busy domain cannot stall the rest.
+        queues: "OrderedDict[Tuple[str, str], List[Any]]" = OrderedDict()
+        for item in items:
+            key = (sender(item), recipient_domain(recipient(item)))
+            queues.setdefault(key, []).append(item)
+
+        while queues and len(result.scheduled) < budget:
+            best_key, best_at = None, None
+            for key in queues:
+                sender_id, domain = key
+                at = max(
+                    self._sender_bucket(sender_id, now).available_at(now),
+                    self._domain_bucket(domain, now).available_at(now),
+                )
+                if best_at is None or at < best_at:
+                    best_key, best_at = key, at
+            if best_at > deadline:
+                break
+
+            sender_id, domain = best_key
+            self._sender_bucket(sender_id, now).take(best_at)
+            self._domain_bucket(domain, now).take(best_at)
+            item = queues[best_key].pop(0)
+            if not queues[best_key]:
+                del queues[best_key]
+            result.scheduled.append((best_at - now, item))
+
+        for remaining in queues.values():
+            result.deferred.extend(remaining)
+        return result
+
+    # ── Execution ─────────────────────────────────────────────────────────────
+
+    async def dispatch(
+        self,
+        items: List[Any],
+        recipient: Callable[[Any], str],
+        send: Callable[[Any], Awaitable[bool]],
+        sender: Callable[[Any], str] = lambda _: DEFAULT_SENDER,
+    ) -> Tuple[int, List[Any]]:
+        """
+        Plans ``items`` and sends each at its planned time.
+
+        ``send`` is called once per scheduled item and returns True on
+        success. Exceptions it raises are logged and count as failures.
+
+        Returns:
+            tuple: ``(sent_count, deferred_items)``.
+        """
+        plan = self.plan(items, recipient, sender)
+        if plan.deferred:
+            logger.info(
+                f"Dispatch plan: {len(plan.scheduled)} scheduled, {len(plan.deferred)} deferred "
+                f"(window/daily cap)"
+            )
+        if not plan.scheduled:
+            return 0, plan.deferred
+
+        started = self.clock()
+        slots = asyncio.Semaphore(self.concurrency)
+        sent = 0
+
+        async def _run(delay: float, item: Any) -> None:
+            nonlocal sent
+            wait = delay - (self.clock() - started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with slots:
+                try:
+                    ok = await send(item)
+                except Exception as e:
+                    logger.error(f"Dispatch of {recipient(item)} failed: {e}")
+                    ok = False
+            if ok:
+                sent += 1
+                self._sent_today += 1
+
+        await asyncio.gather(*(_run(delay, item) for delay, item in plan.scheduled))
+        return sent, plan.deferred
+
+
+async def count_sent_today(db: AsyncSession, tz: Optional[ZoneInfo] = None) -> int:
+    """Returns how many emails have been sent since local midnight."""
+    from app.models.campaign import EmailOutreach
+
+    tz = tz or ZoneInfo(settings.DISPATCH_TIMEZONE)
+    local_midnight = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    # sent_at is stored as naive UTC.
+    since = local_midnight.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+    result = await db.execute(
+        select(func.count(EmailOutreach.id)).where(EmailOutreach.sent_at >= since)
+    )
+    return result.scalar() or 0
+
+
+dispatch_scheduler = DispatchScheduler(
+    send_interval_seconds=settings.EMAIL_SEND_INTERVAL_SECONDS,
+    sender_burst=settings.DISPATCH_SENDER_BURST,
+    domain_max_per_hour=settings.DISPATCH_DOMAIN_MAX_PER_HOUR,
+    domain_limits=settings.DISPATCH_DOMAIN_LIMITS,
+    daily_cap=settings.DISPATCH_DAILY_CAP,
+    window_start_hour=settings.DISPATCH_WINDOW_START_HOUR,
+    window_end_hour=settings.DISPATCH_WINDOW_END_HOUR,
+    timezone=settings.DISPATCH_TIMEZONE,
+    concurrency=settings.DISPATCH_CONCURRENCY,
+)
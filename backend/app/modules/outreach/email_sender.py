@@ -2,8 +2,12 @@
 Asynchronous Email Dispatch Module.
 
 Transmits structured HTML outreach communications via an SMTP relay (Brevo).
-Supports optional file attachments and implements automatic retry logic for
-transient SMTP connection failures.
+Supports attachments either as in-memory payloads (:class:`EmailAttachment`)
+or as files on disk, and implements automatic retry logic for transient SMTP
+connection failures.
+
+Messages go out over the pooled, already-authenticated relay connections in
+:mod:`app.modules.outreach.smtp_pool` rather than a new connection per send.
 
 Security notes:
   - Attachment paths are validated against an allowed directory before being
@@ -13,15 +17,22 @@ Security notes:
 """
 
 import os
-from email.message import EmailMessage
-from email.utils import formataddr
+from dataclasses import dataclass
+from email.message import EmailMessage, MIMEPart
+from email.utils import formataddr, make_msgid
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-import aiosmtplib
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from app.config import get_settings
+from app.modules.outreach.artifact_store import artifact_store
+from app.modules.outreach.sender_pool import is_account_error, is_recipient_error
+from app.modules.outreach.smtp_pool import get_smtp_pool
+
+if TYPE_CHECKING:
+    from app.modules.outreach.sender_pool import SenderAccount
 
 settings = get_settings()
 
@@ -34,6 +45,85 @@ _ALLOWED_ATTACHMENT_DIR = Path(os.environ.get("ATTACHMENT_DIR", "/app/attachment
 
 _ALLOWED_EXTENSIONS = {".pdf", ".xlsx", ".xls", ".csv", ".txt"}
 
+# Map extension to MIME subtype (maintype is always "application").
+_SUBTYPE_MAP = {
+    ".pdf": "pdf",
+    ".xlsx": "vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "vnd.ms-excel",
+    ".csv": "csv",
+    ".txt": "plain",
+}
+
+
+@dataclass(frozen=True)
+class EmailAttachment:
+    """
+    An attachment held entirely in memory.
+
+    Lets callers hand rendered documents straight to MIME building without a
+    round trip through the filesystem. When ``digest`` is set the attachment
+    lives in the content-addressed artifact store and its base64 body is
+    encoded once per digest rather than once per send.
+    """
+    filename: str
+    content: bytes
+    subtype: str = "octet-stream"
+    maintype: str = "application"
+    digest: Optional[str] = None
+
+    @classmethod
+    def for_filename(cls, filename: str, content: bytes, digest: Optional[str] = None) -> "EmailAttachment":
+        """Builds an attachment whose MIME subtype is inferred from the extension."""
+        suffix = Path(filename).suffix.lower()
+        return cls(
+            filename=filename,
+            content=content,
+            subtype=_SUBTYPE_MAP.get(suffix, "octet-stream"),
+            digest=digest,
+        )
+
+
+def make_message_id(from_email: Optional[str] = None) -> str:
+    """
+    Returns a new RFC 5322 Message-ID (``<...@domain>``) for an outgoing email.
+
+    Callers store it before sending (``EmailOutreach.brevo_message_id``) so
+    delivery webhooks and replies can be matched back to the row by index.
+    """
+    address = from_email or settings.FROM_EMAIL or ""
+    domain = address.rsplit("@", 1)[-1] if "@" in address else None
+    return make_msgid(domain=domain)
+
+
+def normalize_message_id(value: Optional[str]) -> Optional[str]:
+    """Canonicalises a Message-ID to the stored ``<id@domain>`` form."""
+    if not value:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    if not value.startswith("<"):
+        value = f"<{value}>"
+    return value
+
+
+def _attach_encoded(message: EmailMessage, attachment: EmailAttachment, encoded: str) -> None:
+    """
+    Attaches a part whose base64 body was encoded ahead of time.
+
+    Mirrors what ``EmailMessage.add_attachment`` produces, minus the encoding
+    step, so cached payloads from the artifact store can be reused verbatim.
+    """
+    if message.get_content_maintype() != "multipart" or message.get_content_subtype() != "mixed":
+        message.make_mixed()
+    part = MIMEPart(policy=message.policy)
+    part["Content-Type"] = f"{attachment.maintype}/{attachment.subtype}"
+    part["Content-Transfer-Encoding"] = "base64"
+    part["Content-Disposition"] = "attachment"
+    part.set_param("filename", attachment.filename, header="Content-Disposition")
+    part.set_payload(encoded)
+    message.attach(part)
+
 
 def _safe_attachment_path(filepath: str) -> Path:
     """
@@ -72,12 +162,23 @@ def _safe_attachment_path(filepath: str) -> Path:
     return resolved
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+# Account-level failures (bad credentials, provider quota) are not retried on
+# the same account; the sender pool fails over instead. Permanent recipient
+# rejections would fail again, so they are not retried either.
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_exception(lambda e: not (is_account_error(e) or is_recipient_error(e))),
+    reraise=True,
+)
 async def send_email(
     to_email: str,
     subject: str,
     html_content: str,
     attachment_paths: list[str] = None,
+    attachments: list[EmailAttachment] = None,
+    sender: Optional["SenderAccount"] = None,
+    message_id: Optional[str] = None,
 ) -> bool:
     """
     Transmits an HTML email via the configured SMTP relay (Brevo).
@@ -92,6 +193,11 @@ async def send_email(
         attachment_paths: Optional list of absolute file paths to attach.
                           Each path is validated against the allowed directory
                           before being opened (see ``_safe_attachment_path``).
+        attachments:      Optional list of in-memory attachments, added as-is.
+        sender:           Sender account to send from (see ``sender_pool``).
+                          Defaults to the ``BREVO_SMTP_*`` / ``FROM_*`` settings.
+        message_id:       Message-ID header to send with (see ``make_message_id``).
+                          One is generated when omitted.
 
     Returns:
         bool: True on successful delivery.
@@ -100,16 +206,37 @@ async def send_email(
         Exception: Re-raised on final SMTP failure so Tenacity can record it.
     """
     message = EmailMessage()
-    message["From"] = formataddr((settings.FROM_NAME, settings.FROM_EMAIL))
+    if sender is not None:
+        message["From"] = formataddr((sender.from_name, sender.from_email))
+        reply_to = sender.reply_to
+    else:
+        message["From"] = formataddr((settings.FROM_NAME, settings.FROM_EMAIL))
+        reply_to = settings.REPLY_TO_EMAIL
     message["To"] = to_email
     message["Subject"] = subject
-    if settings.REPLY_TO_EMAIL:
-        message["Reply-To"] = settings.REPLY_TO_EMAIL
+    message["Message-ID"] = normalize_message_id(message_id) or make_message_id(
+        sender.from_email if sender is not None else None
+    )
+    if reply_to:
+        message["Reply-To"] = reply_to
 
     # Plain-text fallback for clients that do not render HTML
     message.set_content("Please enable HTML to view this message.")
     message.add_alternative(html_content, subtype="html")
 
+    for attachment in attachments or []:
+        if attachment.digest:
+            encoded = artifact_store.encoded_payload(attachment.digest, attachment.content)
+            if encoded is not None:
+                _attach_encoded(message, attachment, encoded)
+                continue
+        message.add_attachment(
+            attachment.content,
+            maintype=attachment.maintype,
+            subtype=attachment.subtype,
+            filename=attachment.filename,
+        )
+
     if attachment_paths:
         for filepath in attachment_paths:
             try:
@@ -126,35 +253,19 @@ async def send_email(
             with open(safe_path, "rb") as f:
                 file_data = f.read()
 
-            file_name = safe_path.name
-            suffix = safe_path.suffix.lower()
-
-            # Map extension to MIME subtype
-            subtype_map = {
-                ".xlsx": "vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                ".xls": "vnd.ms-excel",
-                ".csv": "csv",
-                ".txt": "plain",
-            }
-            subtype = subtype_map.get(suffix, "pdf")
-
             message.add_attachment(
                 file_data,
                 maintype="application",
-                subtype=subtype,
-                filename=file_name,
+                subtype=_SUBTYPE_MAP.get(safe_path.suffix.lower(), "pdf"),
+                filename=safe_path.name,
             )
 
     try:
-        await aiosmtplib.send(
-            message,
-            hostname=settings.BREVO_SMTP_HOST,
-            port=settings.BREVO_SMTP_PORT,
-            username=settings.BREVO_SMTP_USER,
-            password=settings.BREVO_SMTP_PASSWORD,
-            use_tls=settings.BREVO_SMTP_PORT == 465,
-            start_tls=settings.BREVO_SMTP_PORT == 587,
-        )
+        if sender is not None:
+            smtp_pool = get_smtp_pool(sender.host, sender.port, sender.username, sender.password)
+        else:
+            smtp_pool = get_smtp_pool()
+        await smtp_pool.send_message(message)
         return True
     except Exception as e:
         logger.error("Failed to send email to %s after retries: %s", to_email, e)
@@ -8,13 +8,21 @@ from datetime import datetime, timedelta
 from loguru import logger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.models.lead import Lead
 from app.models.campaign import Campaign, EmailOutreach
 from app.modules.personalization.groq_client import GroqClient
 from app.modules.personalization.email_generator import render_email_html
-from app.modules.outreach.email_sender import send_email
+from app.modules.analytics.campaign_metrics import record_metrics
+from app.modules.outreach.dispatch_scheduler import count_sent_today, dispatch_scheduler
+from app.modules.outreach.email_sender import make_message_id, send_email
+from app.modules.tracking.token_codec import encode_tracking_token
+from app.modules.outreach.sender_pool import (
+    count_sent_today_by_sender,
+    send_with_failover,
+    sender_pool,
+)
 from app.config import get_settings
 
 settings = get_settings()
@@ -50,9 +58,11 @@ async def run_followup_dispatch(manual: bool = False):
     Cron-triggered dispatcher. Scans for due follow-ups, queries the LLM for 
     contextual sequence progression strings, dispatches the SMTP transport, and 
     updates sequence metadata.
+
+    Sends share the outreach stage's sender, domain and daily budgets via the
+    dispatch scheduler; deferred follow-ups stay due and are picked up next run.
     """
     from app.core.database import get_session_maker
-    from app.tasks.daily_pipeline import _generate_tracking_token
     from app.core.job_manager import job_manager
     from app.modules.notifications.telegram_bot import send_telegram_alert
     
@@ -76,7 +86,10 @@ async def run_followup_dispatch(manual: bool = False):
         if not campaign:
             campaign = Campaign(name=f"Daily Outreach {today}", campaign_date=today)
             db.add(campaign)
-            await db.flush()
+            # Committed on its own so a failed send's rollback cannot undo it.
+            await db.commit()
+        # Plain ids survive a rollback; expired ORM attributes would need IO.
+        campaign_id = campaign.id
 
         stmt = select(Lead).where(
             Lead.status.in_(["email_sent", "opened"]),
@@ -86,71 +99,144 @@ async def run_followup_dispatch(manual: bool = False):
         )
         res = await db.execute(stmt)
         leads = res.scalars().all()
-        
-        for lead in leads:
-            try:
-                next_count = (lead.followup_count or 0) + 1
-                lead_data = {
+
+        # Generate every due follow-up up front; leads are packed
+        # GROQ_BATCH_SIZE per request with per-lead fallback.
+        followup_inputs = {
+            lead.id: (
+                {
                     "business_name": lead.business_name,
                     "category": lead.category,
                     "location": lead.city,
                     "rating": lead.rating,
                     "review_count": lead.review_count,
                     "qualification_notes": lead.qualification_notes
-                }
-                
-                ai_data = await groq_client.generate_followup_email(lead_data, next_count)
-                
-                tracking_token = _generate_tracking_token(lead.id, campaign.id)
-                html_body = render_email_html(
-                    {"business_name": lead.business_name}, 
-                    ai_data.get('body_html', ''), 
-                    tracking_token, 
-                    settings.APP_URL
+                },
+                (lead.followup_count or 0) + 1,
+            )
+            for lead in leads
+        }
+        generated = await groq_client.generate_followup_email_batch(followup_inputs) if leads else {}
+
+        prepared = []
+        for lead in leads:
+            next_count = followup_inputs[lead.id][1]
+            ai_data = generated.get(lead.id)
+            if ai_data is None:
+                logger.error(f"No follow-up content generated for lead {lead.id}; skipping")
+                continue
+
+            outreach_id = uuid4()
+            tracking_token = encode_tracking_token(outreach_id, lead.id, campaign_id)
+            html_body = render_email_html(
+                {"business_name": lead.business_name},
+                ai_data.get('body_html', ''),
+                tracking_token,
+                settings.APP_URL
+            )
+            prepared.append({
+                "lead": lead,
+                "lead_id": lead.id,
+                "to_email": lead.email,
+                "next_count": next_count,
+                "subject": ai_data.get('subject', f"Following up: {lead.business_name}"),
+                "html_body": html_body,
+                "outreach_id": outreach_id,
+                "tracking_token": tracking_token,
+            })
+
+        # Sends overlap under the dispatch scheduler; the session does not.
+        db_lock = asyncio.Lock()
+
+        async def _reload_leads() -> None:
+            # A rollback expires every loaded lead; refresh them in one query
+            # so the remaining sends can keep using them.
+            try:
+                await db.execute(
+                    select(Lead).where(Lead.id.in_([item["lead_id"] for item in prepared]))
+                    .execution_options(populate_existing=True)
                 )
-                
-                subject = ai_data.get('subject', f"Following up: {lead.business_name}")
-                
-                success = await send_email(
-                    to_email=lead.email,
-                    subject=subject,
-                    html_content=html_body,
-                    attachment_paths=[]
+            except Exception as e:
+                logger.error(f"Could not reload follow-up leads after a rollback: {e}")
+
+        async def _send_one(item: dict) -> bool:
+            lead = item["lead"]
+            lead_id = item["lead_id"]
+            try:
+                account = await send_with_failover(
+                    sender_pool,
+                    assigned[lead_id],
+                    lambda sender: send_email(
+                        to_email=item["to_email"],
+                        subject=item["subject"],
+                        html_content=item["html_body"],
+                        attachment_paths=[],
+                        sender=sender,
+                        message_id=item["message_id"],
+                    ),
                 )
-                
-                if success:
+                if account is None:
+                    logger.error(f"Failed to send follow-up to {item['to_email']}")
+                    return False
+
+                # Sends are spread over the window by the scheduler; stamp this
+                # one, not the run's start, so the next follow-up is not early.
+                sent_at = datetime.utcnow()
+                async with db_lock:
                     outreach = EmailOutreach(
-                        lead_id=lead.id,
-                        campaign_id=campaign.id,
-                        to_email=lead.email,
-                        subject=subject,
-                        body_html=html_body,
-                        tracking_token=tracking_token,
+                        id=item["outreach_id"],
+                        lead_id=lead_id,
+                        campaign_id=campaign_id,
+                        to_email=item["to_email"],
+                        subject=item["subject"],
+                        body_html=item["html_body"],
+                        tracking_token=item["tracking_token"],
                         ai_generated=True,
                         has_attachment=False,
                         attachment_names=[],
                         status="sent",
-                        sent_at=now
+                        sent_at=sent_at,
+                        sender_account=account.id,
+                        brevo_message_id=item["message_id"],
                     )
                     db.add(outreach)
-                    
+
+                    next_count = item["next_count"]
                     lead.followup_count = next_count
                     if next_count >= 3:
                         lead.followup_sequence_active = False
                     else:
                         next_interval = FOLLOWUP_SCHEDULE[next_count]["days_after"] - FOLLOWUP_SCHEDULE[next_count-1]["days_after"]
-                        lead.next_followup_at = now + timedelta(days=next_interval)
-                        
-                    campaign.emails_sent += 1
-                    sent_count += 1
+                        lead.next_followup_at = sent_at + timedelta(days=next_interval)
+
+                    await record_metrics(db, {campaign_id: {"emails_sent": 1}}, at=sent_at)
                     await db.commit()
-                else:
-                    logger.error(f"Failed to send follow-up to {lead.email}")
-                
-                await asyncio.sleep(2)
+                return True
             except Exception as e:
-                logger.error(f"Error in follow-up for lead {lead.id}: {e}")
-                await db.rollback()
-                
+                logger.error(f"Error in follow-up for lead {lead_id}: {e}")
+                async with db_lock:
+                    await db.rollback()
+                    await _reload_leads()
+                return False
+
+        if prepared:
+            dispatch_scheduler.sync_sent_today(await count_sent_today(db))
+            sender_pool.sync_sent_today(await count_sent_today_by_sender(db))
+
+            assigned = sender_pool.assign(prepared, key=lambda item: item["lead_id"])
+            sendable = [item for item in prepared if item["lead_id"] in assigned]
+            for item in sendable:
+                # From the assigned account's domain, as in the outreach stage.
+                item["message_id"] = make_message_id(assigned[item["lead_id"]].from_email)
+
+            sent_count, deferred = await dispatch_scheduler.dispatch(
+                sendable,
+                recipient=lambda item: item["to_email"],
+                send=_send_one,
+                sender=lambda item: assigned[item["lead_id"]].id,
+            )
+            for item in deferred:
+                sender_pool.release(assigned[item["lead_id"]])
+
         if sent_count > 0:
             await send_telegram_alert(f"Follow-up phase completed. Dispatched {sent_count} follow-up communications.")
@@ -0,0 +1,314 @@
+"""
+Email Outbox.
+
+Treats ``email_outreach`` as a durable outbox so dispatch can run on several
+workers and several processes at once.
+
+Row lifecycle::
+
+    queued ──claim──▶ sending ──▶ sent
+      ▲                  │
+      └─ backoff / defer ┘──▶ failed   (after OUTBOX_MAX_ATTEMPTS)
+
+  - **Claim**: a worker takes up to ``OUTBOX_BATCH_SIZE`` due rows with
+    ``SELECT ... FOR UPDATE SKIP LOCKED``, marks them ``sending``, stamps
+    ``claimed_by`` and a lease, and increments ``attempt_count``. Concurrent
+    claimers skip each other's locked rows instead of blocking.
+  - **Lease**: a worker renews its leases while the batch is in flight. If it
+    crashes, the lease lapses and the rows become claimable again.
+  - **Backoff**: a failed attempt returns the row to ``queued`` with
+    ``next_attempt_at`` pushed out exponentially; once attempts are exhausted
+    the row is ``failed``.
+
+Outcomes are written back in small batches by :func:`apply_outcomes`: outreach
+rows are flushed together, lead transitions are one set-based ``UPDATE`` and
+campaign counts are one upsert into the ``campaign_metrics`` rollup, so a
+batch costs a handful of statements instead of several per email.
+
+A delivered row must never become claimable again, or its lease lapsing would
+send it twice. If writing outcomes fails the dispatcher retries with the rows'
+in-memory state put back (:func:`snapshot_rows`/:func:`restore_rows`, since a
+rollback expires them), and as a last resort records delivery alone with
+:func:`mark_delivered`.
+
+On SQLite (tests) ``FOR UPDATE`` is a no-op, which is fine for a single process.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, case, inspect, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import NO_VALUE, set_committed_value
+
+from app.config import get_settings
+from app.models.campaign import Campaign, EmailOutreach
+from app.models.lead import Lead
+from app.modules.analytics.campaign_metrics import count_by_campaign, record_metrics
+from app.modules.analytics.daily_funnel import count_funnel, record_funnel
+
+settings = get_settings()
+
+
+def new_worker_id() -> str:
+    """Returns a claim owner ID unique to this process and worker."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def backoff_delay(attempt: int) -> timedelta:
+    """Delay before retry number ``attempt`` (1-based), capped at one hour."""
+    seconds = settings.OUTBOX_BACKOFF_BASE_SECONDS * (2 ** max(0, attempt - 1))
+    return timedelta(seconds=min(seconds, 3600))
+
+
+def _utcnow() -> datetime:
+    # Matches how sent_at and friends are written elsewhere (naive UTC).
+    return datetime.utcnow()
+
+
+async def expire_exhausted(db: AsyncSession) -> int:
+    """Fails rows whose lease lapsed after their final attempt."""
+    result = await db.execute(
+        update(EmailOutreach)
+        .where(
+            EmailOutreach.status == "sending",
+            EmailOutreach.lease_expires_at < _utcnow(),
+            EmailOutreach.attempt_count >= settings.OUTBOX_MAX_ATTEMPTS,
+        )
+        .values(status="failed", last_error="lease expired after final attempt")
+    )
+    return result.rowcount or 0
+
+
+async def pending_artifact_digests(db: AsyncSession) -> set:
+    """Digests in ``attachment_refs`` of rows not yet sent (queued or sending)."""
+    result = await db.execute(
+        select(EmailOutreach.attachment_refs).where(
+            EmailOutreach.status.in_(("queued", "sending")),
+            EmailOutreach.attachment_refs.isnot(None),
+        )
+    )
+    return {ref["sha256"] for refs in result.scalars() for ref in refs or () if ref.get("sha256")}
+
+
+async def claim_batch(db: AsyncSession, worker_id: str, limit: int) -> List[EmailOutreach]:
+    """
+    Claims up to ``limit`` due rows for ``worker_id`` and commits the claim.
+
+    Due rows are ``queued`` rows whose backoff has elapsed, plus ``sending``
+    rows whose lease has lapsed (a crashed worker's claims).
+    """
+    now = _utcnow()
+    await expire_exhausted(db)
+
+    stmt = (
+        select(EmailOutreach)
+        .where(
+            or_(
+                and_(
+                    EmailOutreach.status == "queued",
+                    or_(EmailOutreach.next_attempt_at.is_(None), EmailOutreach.next_attempt_at <= now),
+                ),
+                and_(
+                    EmailOutreach.status == "sending",
+                    EmailOutreach.lease_expires_at < now,
+                ),
+            ),
+            EmailOutreach.attempt_count < settings.OUTBOX_MAX_ATTEMPTS,
+        )
+        .order_by(EmailOutreach.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = (await db.execute(stmt)).scalars().all()
+
+    lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    for row in rows:
+        row.status = "sending"
+        row.claimed_by = worker_id
+        row.lease_expires_at = lease_until
+        row.attempt_count = (row.attempt_count or 0) + 1
+    await db.commit()
+    return list(rows)
+
+
+async def renew_leases(db: AsyncSession, worker_id: str) -> int:
+    """Extends every lease ``worker_id`` still holds."""
+    result = await db.execute(
+        update(EmailOutreach)
+        .where(EmailOutreach.claimed_by == worker_id, EmailOutreach.status == "sending")
+        .values(lease_expires_at=_utcnow() + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS))
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+def mark_failed_attempt(row: EmailOutreach, error: str) -> None:
+    """Schedules a retry with backoff, or fails the row for good."""
+    row.last_error = (error or "")[:2000]
+    row.claimed_by = None
+    row.lease_expires_at = None
+    if (row.attempt_count or 0) >= settings.OUTBOX_MAX_ATTEMPTS:
+        row.status = "failed"
+    else:
+        row.status = "queued"
+        row.next_attempt_at = _utcnow() + backoff_delay(row.attempt_count or 1)
+
+
+async def release(db: AsyncSession, ids: Iterable, worker_id: str) -> None:
+    """
+    Returns claimed rows that were not attempted (window closed, quota
+    reached) to the queue without counting an attempt.
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    await db.execute(
+        update(EmailOutreach)
+        .where(EmailOutreach.id.in_(ids), EmailOutreach.claimed_by == worker_id,
+               EmailOutreach.status == "sending")
+        .values(
+            status="queued",
+            claimed_by=None,
+            lease_expires_at=None,
+            attempt_count=EmailOutreach.attempt_count - 1,
+        )
+    )
+    await db.commit()
+
+
+def mark_sent(row: EmailOutreach, sender_account: Optional[str], sent_at: datetime) -> None:
+    """Records a delivered row; persisted by the next :func:`apply_outcomes`."""
+    row.status = "sent"
+    row.sent_at = sent_at
+    row.sender_account = sender_account
+    row.claimed_by = None
+    row.lease_expires_at = None
+    row.last_error = None
+
+
+async def apply_outcomes(
+    db: AsyncSession,
+    sent: Sequence[EmailOutreach],
+    failed: Sequence[Tuple[EmailOutreach, str]],
+) -> None:
+    """
+    Persists one flush worth of send outcomes in a single transaction.
+
+    ``sent`` rows must already be updated via :func:`mark_sent`; ``failed``
+    rows are passed with their error and rescheduled here. Statements issued:
+    one flush for the outreach rows, one ``UPDATE`` for leads, one upsert
+    each for the campaign and funnel rollups and one campaign activation.
+    """
+    from app.modules.outreach.followup_engine import FOLLOWUP_SCHEDULE
+
+    for row, error in failed:
+        mark_failed_attempt(row, error)
+
+    if sent:
+        now = _utcnow()
+        # Each lead takes its own row's send time, not the flush time.
+        sent_at = {}
+        for row in sent:
+            if row.lead_id:
+                when = row.sent_at or now
+                sent_at[row.lead_id] = max(when, sent_at.get(row.lead_id, when))
+        if sent_at:
+            first_followup = timedelta(days=FOLLOWUP_SCHEDULE[0]["days_after"])
+            # Same transition schedule_followup() applies to a single lead.
+            emailed = (await db.execute(
+                update(Lead)
+                .where(Lead.id.in_(list(sent_at)))
+                .values(
+                    status="email_sent",
+                    email_sent_at=case(sent_at, value=Lead.id),
+                    followup_sequence_active=True,
+                    next_followup_at=case(
+                        {lead_id: when + first_followup for lead_id, when in sent_at.items()},
+                        value=Lead.id,
+                    ),
+                )
+                .returning(Lead.id, Lead.city, Lead.category, Lead.lead_tier)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await record_funnel(db, count_funnel(((lead, sent_at[lead.id]) for lead in emailed), "emailed"))
+
+        per_campaign = count_by_campaign((row.campaign_id for row in sent), "emails_sent")
+        await record_metrics(db, per_campaign, at=now)
+        if per_campaign:
+            await db.execute(
+                update(Campaign)
+                .where(Campaign.id.in_(list(per_campaign)), Campaign.status == "pending")
+                .values(status="active", started_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+    await db.commit()
+
+
+RowSnapshot = Tuple[EmailOutreach, Dict[str, Tuple[Any, bool]]]
+
+
+def snapshot_rows(rows: Iterable[EmailOutreach]) -> List[RowSnapshot]:
+    """Captures each row's loaded column values and whether they are unflushed."""
+    snapshots = []
+    for row in rows:
+        state = inspect(row)
+        values = {}
+        for prop in state.mapper.column_attrs:
+            attr = state.attrs[prop.key]
+            if attr.loaded_value is not NO_VALUE:
+                values[prop.key] = (attr.loaded_value, attr.history.has_changes())
+        snapshots.append((row, values))
+    return snapshots
+
+
+def restore_rows(snapshots: Sequence[RowSnapshot]) -> None:
+    """
+    Puts back what :func:`snapshot_rows` captured after a rollback expired the
+    rows: unflushed changes are re-applied as changes, the rest as loaded
+    state, so the rows can be used again without a reload.
+    """
+    for row, values in snapshots:
+        for key, (value, dirty) in values.items():
+            if dirty:
+                setattr(row, key, value)
+            else:
+                set_committed_value(row, key, value)
+
+
+async def mark_delivered(db: AsyncSession, sent: Sequence[EmailOutreach]) -> None:
+    """
+    Last-resort write for delivered rows whose :func:`apply_outcomes` keeps
+    failing: one short ``UPDATE`` by id that marks them ``sent`` so a lapsed
+    lease cannot send them again. Lead transitions and counters are skipped.
+    """
+    if not sent:
+        return
+    table = EmailOutreach.__table__
+    await db.execute(
+        table.update()
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            status="sent",
+            sent_at=bindparam("b_sent_at"),
+            sender_account=bindparam("b_sender_account"),
+            brevo_message_id=bindparam("b_message_id"),
+            claimed_by=None,
+            lease_expires_at=None,
+            last_error=None,
+        ),
+        [
+            {
+                "b_id": row.id,
+                "b_sent_at": row.sent_at,
+                "b_sender_account": row.sender_account,
+                "b_message_id": row.brevo_message_id,
+            }
+            for row in sent
+        ],
+    )
+    await db.commit()
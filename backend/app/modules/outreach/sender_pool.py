@@ -0,0 +1,343 @@
+"""
+Sender Account Pool.
+
+Spreads outbound mail across several SMTP accounts so daily volume is bounded
+by the sum of their quotas rather than a single account's limit.
+
+Accounts come from ``SMTP_SENDERS`` (a JSON list); when it is empty the pool
+holds one account built from the ``BREVO_SMTP_*`` / ``FROM_*`` settings, which
+preserves single-account behaviour. Each account has:
+
+  - **Quota**: ``daily_quota`` sends per local day.
+  - **Warm-up**: new accounts start at ``warmup_start`` sends/day and ramp
+    linearly to ``daily_quota`` over ``warmup_days`` from ``started_on``.
+  - **Health**: authentication failures bench the account for an hour,
+    quota/rate rejections bench it for the rest of the day, and repeated
+    transient failures bench it briefly. Permanent (5xx) rejections of a
+    recipient are the lead's problem and leave the account untouched.
+
+Messages are assigned to the least-loaded healthy account (sent today relative
+to its effective quota). :func:`send_with_failover` moves a message to the next
+account when the assigned one fails with an account-level error.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+import aiosmtplib
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+
+settings = get_settings()
+
+AUTH_COOLDOWN_SECONDS = 3600
+TRANSIENT_COOLDOWN_SECONDS = 600
+TRANSIENT_FAILURE_LIMIT = 3
+
+# Providers signal per-account throttling with a transient reply and says so
+# (e.g. "452 4.5.3 Too many messages", "421 4.7.0 Rate limit exceeded").
+# Permanent 5xx replies are about the message or its recipient ("550 5.1.1
+# User unknown") and must not bench a healthy account.
+_THROTTLE_CODES = {421, 450, 451, 452}
+_QUOTA_HINTS = (
+    "quota", "too many messages", "too many emails", "rate limit",
+    "rate exceeded", "limit exceeded", "sending limit", "daily limit",
+)
+_AUTH_CODES = {530, 534, 535}
+
+
+def is_auth_error(exc: BaseException) -> bool:
+    return isinstance(exc, aiosmtplib.SMTPAuthenticationError)
+
+
+def _reply(exc: BaseException) -> Optional[aiosmtplib.SMTPResponseException]:
+    """The server reply behind ``exc``; a refused single recipient is unwrapped."""
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused) and exc.recipients:
+        return exc.recipients[0]
+    return exc if isinstance(exc, aiosmtplib.SMTPResponseException) else None
+
+
+def is_quota_error(exc: BaseException) -> bool:
+    reply = _reply(exc)
+    if reply is None or reply.code not in _THROTTLE_CODES:
+        return False
+    message = (reply.message or "").lower()
+    return any(hint in message for hint in _QUOTA_HINTS)
+
+
+def is_recipient_error(exc: BaseException) -> bool:
+    """True if ``exc`` is a permanent rejection of this message or recipient."""
+    reply = _reply(exc)
+    return (
+        reply is not None
+        and not is_auth_error(reply)
+        and 500 <= reply.code < 600
+        and reply.code not in _AUTH_CODES
+    )
+
+
+def is_account_error(exc: BaseException) -> bool:
+    """True if ``exc`` is about the sending account rather than the message."""
+    return is_auth_error(exc) or is_quota_error(exc)
+
+
+@dataclass
+class SenderAccount:
+    """One SMTP relay login and the identity it sends as."""
+    id: str
+    host: str
+    port: int
+    username: str
+    password: str
+    from_email: str
+    from_name: str
+    reply_to: Optional[str] = None
+    daily_quota: int = 300
+    warmup_days: int = 0
+    warmup_start: int = 20
+    started_on: Optional[date] = None
+
+    sent_today: int = 0
+    benched_until: float = 0.0
+    transient_failures: int = 0
+
+    def effective_quota(self, today: date) -> int:
+        """The account's quota for ``today``, following its warm-up ramp."""
+        if not self.warmup_days or not self.started_on:
+            return self.daily_quota
+        age = (today - self.started_on).days
+        if age >= self.warmup_days:
+            return self.daily_quota
+        if age <= 0:
+            return min(self.warmup_start, self.daily_quota)
+        step = (self.daily_quota - self.warmup_start) / self.warmup_days
+        return min(self.daily_quota, int(self.warmup_start + step * age))
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.benched_until
+
+
+def _parse_started_on(value) -> Optional[date]:
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def load_sender_accounts(configs: Optional[List[dict]] = None) -> List[SenderAccount]:
+    """Builds accounts from ``SMTP_SENDERS``, or the single default account."""
+    configs = settings.SMTP_SENDERS if configs is None else configs
+    if not configs:
+        return [SenderAccount(
+            id=settings.FROM_EMAIL,
+            host=settings.BREVO_SMTP_HOST,
+            port=settings.BREVO_SMTP_PORT,
+            username=settings.BREVO_SMTP_USER,
+            password=settings.BREVO_SMTP_PASSWORD,
+            from_email=settings.FROM_EMAIL,
+            from_name=settings.FROM_NAME,
+            reply_to=settings.REPLY_TO_EMAIL or None,
+        )]
+
+    accounts = []
+    for cfg in configs:
+        from_email = cfg["from_email"]
+        accounts.append(SenderAccount(
+            id=cfg.get("id") or from_email,
+            host=cfg.get("host", settings.BREVO_SMTP_HOST),
+            port=int(cfg.get("port", settings.BREVO_SMTP_PORT)),
+            username=cfg["username"],
+            password=cfg["password"],
+            from_email=from_email,
+            from_name=cfg.get("from_name", settings.FROM_NAME),
+            reply_to=cfg.get("reply_to", settings.REPLY_TO_EMAIL or None),
+            daily_quota=int(cfg.get("daily_quota", 300)),
+            warmup_days=int(cfg.get("warmup_days", 0)),
+            warmup_start=int(cfg.get("warmup_start", 20)),
+            started_on=_parse_started_on(cfg.get("started_on")),
+        ))
+    return accounts
+
+
+class SenderPool:
+    """
+    Quota-, warm-up- and health-aware set of sender accounts.
+    """
+
+    def __init__(self, accounts: List[SenderAccount], timezone: str = "UTC",
+                 clock: Callable[[], float] = time.monotonic):
+        if not accounts:
+            raise ValueError("SenderPool requires at least one sender account")
+        self.accounts: Dict[str, SenderAccount] = {a.id: a for a in accounts}
+        self.tz = ZoneInfo(timezone)
+        self.clock = clock
+        self._day: Optional[date] = None
+
+    def _today(self) -> date:
+        today = datetime.now(self.tz).date()
+        if self._day != today:
+            # New day: quotas reset, which also lifts quota benches.
+            self._day = today
+            for account in self.accounts.values():
+                account.sent_today = 0
+        return today
+
+    def sync_sent_today(self, counts: Dict[str, int]) -> None:
+        """Aligns per-account counters with what the database says was sent today."""
+        self._today()
+        for sender_id, count in counts.items():
+            account = self.accounts.get(sender_id)
+            if account:
+                account.sent_today = max(account.sent_today, count)
+
+    def remaining(self, account: SenderAccount) -> int:
+        return max(0, account.effective_quota(self._today()) - account.sent_today)
+
+    def total_remaining(self) -> int:
+        """Sends left today across all currently healthy accounts."""
+        now = self.clock()
+        return sum(self.remaining(a) for a in self.accounts.values() if a.is_healthy(now))
+
+    def choose(self, exclude: Iterable[str] = ()) -> Optional[SenderAccount]:
+        """
+        Returns the least-loaded healthy account with quota left, or None.
+
+        Load is ``sent_today / effective_quota`` so accounts in warm-up fill
+        proportionally rather than first.
+        """
+        today = self._today()
+        now = self.clock()
+        excluded = set(exclude)
+        best, best_load = None, None
+        for account in self.accounts.values():
+            if account.id in excluded or not account.is_healthy(now):
+                continue
+            quota = account.effective_quota(today)
+            if account.sent_today >= quota:
+                continue
+            load = account.sent_today / quota
+            if best_load is None or load < best_load:
+                best, best_load = account, load
+        return best
+
+    def reserve(self, account: SenderAccount) -> None:
+        """Counts a message against ``account`` once it is assigned."""
+        account.sent_today += 1
+
+    def release(self, account: SenderAccount) -> None:
+        """Returns an assigned-but-unsent message's slot to ``account``."""
+        account.sent_today = max(0, account.sent_today - 1)
+
+    def assign(self, items: List, key: Callable) -> Dict:
+        """
+        Assigns and reserves a sender for each item, in order.
+
+        Returns:
+            dict: ``key(item) -> SenderAccount`` for every item that got an
+            account. Items missing from it exceed today's combined quota.
+        """
+        assigned = {}
+        for item in items:
+            account = self.choose()
+            if account is None:
+                break
+            self.reserve(account)
+            assigned[key(item)] = account
+        return assigned
+
+    def record_success(self, account: SenderAccount) -> None:
+        account.transient_failures = 0
+
+    def record_failure(self, account: SenderAccount, exc: BaseException) -> None:
+        """Benches ``account`` according to the kind of failure."""
+        now = self.clock()
+        if is_recipient_error(exc):
+            return
+        if is_auth_error(exc):
+            account.benched_until = now + AUTH_COOLDOWN_SECONDS
+            logger.error(f"Sender {account.id} failed authentication; benched for {AUTH_COOLDOWN_SECONDS}s")
+        elif is_quota_error(exc):
+            account.sent_today = max(account.sent_today, account.effective_quota(self._today()))
+            logger.warning(f"Sender {account.id} hit its provider limit; benched for today")
+        else:
+            account.transient_failures += 1
+            if account.transient_failures >= TRANSIENT_FAILURE_LIMIT:
+                account.benched_until = now + TRANSIENT_COOLDOWN_SECONDS
+                account.transient_failures = 0
+                logger.warning(f"Sender {account.id} failing repeatedly; benched for {TRANSIENT_COOLDOWN_SECONDS}s")
+
+    def snapshot(self) -> List[dict]:
+        today = self._today()
+        now = self.clock()
+        return [
+            {
+                "id": a.id,
+                "sent_today": a.sent_today,
+                "quota_today": a.effective_quota(today),
+                "healthy": a.is_healthy(now),
+            }
+            for a in self.accounts.values()
+        ]
+
+
+async def send_with_failover(
+    pool: "SenderPool",
+    account: Optional[SenderAccount],
+    send: Callable[[SenderAccount], Awaitable[bool]],
+) -> Optional[SenderAccount]:
+    """
+    Sends via ``account``, moving to other accounts on account-level errors.
+
+    ``account`` must already be reserved (see :meth:`SenderPool.reserve`).
+
+    Returns:
+        The account that delivered the message, or None if it was not sent.
+
+    Raises:
+        Exception: Message-level errors from ``send`` (e.g. a rejected
+        recipient) are re-raised; trying another account would not help.
+    """
+    tried: List[str] = []
+    while account is not None:
+        tried.append(account.id)
+        try:
+            if await send(account):
+                pool.record_success(account)
+                return account
+            pool.release(account)
+            return None
+        except Exception as e:
+            pool.release(account)
+            pool.record_failure(account, e)
+            if not is_account_error(e):
+                raise
+            account = pool.choose(exclude=tried)
+            if account is not None:
+                logger.info(f"Failing over to sender {account.id}")
+                pool.reserve(account)
+    return None
+
+
+async def count_sent_today_by_sender(db: AsyncSession, tz: Optional[ZoneInfo] = None) -> Dict[str, int]:
+    """Returns today's send counts per ``EmailOutreach.sender_account``."""
+    from app.models.campaign import EmailOutreach
+
+    tz = tz or ZoneInfo(settings.DISPATCH_TIMEZONE)
+    local_midnight = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    since = local_midnight.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+    result = await db.execute(
+        select(EmailOutreach.sender_account, func.count(EmailOutreach.id))
+        .where(EmailOutreach.sent_at >= since, EmailOutreach.sender_account.isnot(None))
+        .group_by(EmailOutreach.sender_account)
+    )
+    return {sender_id: count for sender_id, count in result.all()}
+
+
+sender_pool = SenderPool(load_sender_accounts(), timezone=settings.DISPATCH_TIMEZONE)
@@ -0,0 +1,253 @@
+"""
+Pooled SMTP Transport.
+
+``aiosmtplib.send`` opens a fresh TCP connection, negotiates STARTTLS and
+authenticates for every message. The pool keeps authenticated connections to
+the relay open and hands them out per message, so a send costs a single
+MAIL/RCPT/DATA exchange.
+
+Behaviour:
+  - Up to ``SMTP_POOL_SIZE`` connections per relay account, reused LIFO so the
+    most recently proven connection goes first.
+  - Idle connections receive a NOOP every ``SMTP_KEEPALIVE_SECONDS`` and are
+    closed after ``SMTP_IDLE_TIMEOUT_SECONDS`` without use.
+  - A connection that drops, times out or answers ``421`` (service closing)
+    is discarded and the message is retried once on a new connection.
+  - Any other SMTP reply (e.g. ``550`` for an unknown recipient) rejects that
+    message only: the envelope is reset with ``RSET``, the connection goes
+    back to the pool, and the error is raised unchanged.
+
+Connections belong to the event loop that opened them. If the pool is used
+from a different loop (e.g. a fresh loop per test), stale connections are
+dropped rather than reused.
+"""
+
+import asyncio
+import time
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+
+import aiosmtplib
+from loguru import logger
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Errors after which the connection is unusable but the message may be retried.
+_RECONNECT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+
+def _is_reconnectable(exc: BaseException) -> bool:
+    if isinstance(exc, _RECONNECT_ERRORS):
+        return True
+    return isinstance(exc, aiosmtplib.SMTPResponseException) and exc.code == 421
+
+
+def _is_message_rejection(exc: BaseException) -> bool:
+    """True if the relay refused this message but the session is still usable."""
+    return (
+        isinstance(exc, (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused))
+        and not _is_reconnectable(exc)
+    )
+
+
+class SMTPConnectionPool:
+    """
+    A bounded pool of authenticated SMTP connections to one relay account.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        max_size: int = 2,
+        keepalive_seconds: int = 60,
+        idle_timeout_seconds: int = 300,
+        timeout: float = 30.0,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_size = max_size
+        self.keepalive_seconds = keepalive_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.timeout = timeout
+
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self.stats = {"connects": 0, "reuses": 0, "reconnects": 0, "sent": 0, "rejected": 0}
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def _bind_loop(self) -> None:
+        """Resets per-loop state when first used, or used from a new loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            logger.debug(f"SMTP pool {self.hostname}: event loop changed, dropping idle connections")
+        self._idle = []
+        self._loop = loop
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._keepalive_task = loop.create_task(self._keepalive_loop())
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        conn = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username or None,
+            password=self.password or None,
+            use_tls=self.port == 465,
+            start_tls=self.port == 587,
+            timeout=self.timeout,
+        )
+        await conn.connect()
+        self.stats["connects"] += 1
+        return conn
+
+    @staticmethod
+    async def _discard(conn: aiosmtplib.SMTP) -> None:
+        try:
+            if conn.is_connected:
+                await conn.quit()
+        except Exception:
+            conn.close()
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            conn, last_used = self._idle.pop()
+            if not conn.is_connected:
+                continue
+            if time.monotonic() - last_used > self.idle_timeout_seconds:
+                await self._discard(conn)
+                continue
+            self.stats["reuses"] += 1
+            return conn
+        return await self._connect()
+
+    def _release(self, conn: aiosmtplib.SMTP) -> None:
+        if conn.is_connected:
+            self._idle.append((conn, time.monotonic()))
+
+    async def _reset(self, conn: aiosmtplib.SMTP) -> None:
+        """Clears a rejected message's envelope and pools the connection, or discards it."""
+        try:
+            await conn.rset()
+        except Exception:
+            await self._discard(conn)
+            return
+        self._release(conn)
+
+    async def _keepalive_loop(self) -> None:
+        """NOOPs idle connections and closes those past the idle timeout."""
+        while True:
+            await asyncio.sleep(self.keepalive_seconds)
+            now = time.monotonic()
+            # Take the idle set out of circulation so a send cannot pick up a
+            # connection mid-NOOP; connections released meanwhile stay on top.
+            idle, self._idle = self._idle, []
+            alive = []
+            for conn, last_used in idle:
+                if now - last_used > self.idle_timeout_seconds:
+                    await self._discard(conn)
+                    continue
+                try:
+                    await conn.noop()
+                    alive.append((conn, last_used))
+                except Exception:
+                    conn.close()
+            self._idle = alive + self._idle
+
+    async def close(self) -> None:
+        """Closes every idle connection and stops the keepalive task."""
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            await self._discard(conn)
+        self._loop = None
+
+    # ── Sending ───────────────────────────────────────────────────────────────
+
+    async def send_message(self, message: EmailMessage) -> None:
+        """
+        Sends ``message`` over a pooled connection.
+
+        Raises:
+            aiosmtplib.SMTPException: If the relay rejects the message, or the
+            send still fails after one reconnect.
+        """
+        self._bind_loop()
+        async with self._slots:
+            for attempt in (1, 2):
+                conn = await self._acquire()
+                try:
+                    await conn.send_message(message)
+                except Exception as e:
+                    if _is_message_rejection(e):
+                        self.stats["rejected"] += 1
+                        await self._reset(conn)
+                        raise
+                    await self._discard(conn)
+                    if attempt == 1 and _is_reconnectable(e):
+                        self.stats["reconnects"] += 1
+                        logger.info(f"SMTP connection to {self.hostname} lost ({e}); reconnecting")
+                        continue
+                    raise
+                self._release(conn)
+                self.stats["sent"] += 1
+                return
+
+
+_pools: Dict[Tuple[str, int, str], SMTPConnectionPool] = {}
+
+
+def get_smtp_pool(
+    hostname: Optional[str] = None,
+    port: Optional[int] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+) -> SMTPConnectionPool:
+    """
+    Returns the shared pool for a relay account, creating it on first use.
+
+    With no arguments this is the default Brevo account from settings.
+    """
+    hostname = hostname or settings.BREVO_SMTP_HOST
+    port = port or settings.BREVO_SMTP_PORT
+    if username is None:
+        username, password = settings.BREVO_SMTP_USER, settings.BREVO_SMTP_PASSWORD
+
+    key = (hostname, port, username)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = SMTPConnectionPool(
+            hostname, port, username, password,
+            max_size=settings.SMTP_POOL_SIZE,
+            keepalive_seconds=settings.SMTP_KEEPALIVE_SECONDS,
+            idle_timeout_seconds=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+        )
+        _pools[key] = pool
+    return pool
+
+
+async def close_smtp_pools() -> None:
+    """Closes every pooled SMTP connection. Called on application shutdown."""
+    for pool in list(_pools.values()):
+        try:
+            await pool.close()
+        except Exception as e:
+            logger.warning(f"Error closing SMTP pool for {pool.hostname}: {e}")
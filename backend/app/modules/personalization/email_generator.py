@@ -2,27 +2,83 @@
 Email template rendering module.
 Utilizes the Jinja2 templating engine to dynamically generate HTML payloads
 for outbound communications, injecting tracking pixels and dynamic content.
+
+The Jinja2 environment, the compiled ``email_html.j2`` template and the bleach
+sanitizer are built once per process. Auto-reload (re-checking the template
+file on disk) is only enabled when ``APP_ENV`` is ``development``; in every
+other environment a render is a single call into the compiled template.
 """
 import os
-from jinja2 import Environment, FileSystemLoader
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+import bleach
+from jinja2 import Environment, FileSystemLoader, Template
 from loguru import logger
+
 from app.config import get_settings
 
 settings = get_settings()
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+TEMPLATE_NAME = "email_html.j2"
+
+# Sanitize AI-generated HTML: allow basic formatting tags but strip scripts/styles.
+ALLOWED_TAGS = frozenset([
+    'p', 'br', 'strong', 'em', 'u', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'span', 'div', 'a', 'b', 'i'
+])
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title', 'target'],
+    '*': ['style'],  # Some basic styling might be used by LLM
+}
+
+# Cleaner instances are not thread-safe; rendering only happens on the event loop.
+_sanitizer = bleach.Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
+
+_env: Optional[Environment] = None
+_template: Optional[Template] = None
+
+
 def get_template_env() -> Environment:
     """
-    Initializes and returns a Jinja2 Environment configured for the localized template directory.
-    
+    Returns the process-wide Jinja2 Environment for the localized template directory.
+
     Returns:
         Environment: The configured Jinja2 templating environment.
     """
-    template_dir = os.path.join(os.path.dirname(__file__), "templates")
-    os.makedirs(template_dir, exist_ok=True)
-    return Environment(loader=FileSystemLoader(template_dir))
+    global _env
+    if _env is None:
+        _env = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            auto_reload=settings.APP_ENV == "development",
+        )
+    return _env
+
+
+def get_email_template() -> Template:
+    """
+    Returns the compiled ``email_html.j2`` template.
+
+    In development the environment's own cache re-checks the file's mtime, so
+    template edits show up without a restart. Elsewhere the compiled template
+    is pinned after the first load.
+
+    Raises:
+        jinja2.TemplateNotFound: If the template file is missing.
+    """
+    global _template
+    env = get_template_env()
+    if env.auto_reload:
+        return env.get_template(TEMPLATE_NAME)
+    if _template is None:
+        _template = env.get_template(TEMPLATE_NAME)
+    return _template
+
+
+def sanitize_email_html(html: str) -> str:
+    """Strips everything outside the allowed tag/attribute set from AI-generated HTML."""
+    return _sanitizer.clean(html or "")
 
-import bleach
 
 def render_email_html(lead_data: Dict[str, Any], ai_body_html: str, tracking_token: str, app_url: str) -> str:
     """
@@ -31,35 +87,9 @@ def render_email_html(lead_data: Dict[str, Any], ai_body_html: str, tracking_tok
     Sanitizes AI-generated content to prevent XSS.
     """
     try:
-        # Sanitize AI-generated HTML
-        # Allow basic formatting tags but strip scripts/styles
-        allowed_tags = [
-            'p', 'br', 'strong', 'em', 'u', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-            'ul', 'ol', 'li', 'span', 'div', 'a', 'b', 'i'
-        ]
-        allowed_attrs = {
-            'a': ['href', 'title', 'target'],
-            '*': ['style'] # Some basic styling might be used by LLM
-        }
-        # In a real scenario, we might want to restrict 'style' more strictly
-        sanitized_body = bleach.clean(
-            ai_body_html,
-            tags=allowed_tags,
-            attributes=allowed_attrs,
-            strip=True
-        )
+        sanitized_body = sanitize_email_html(ai_body_html)
 
-        env = get_template_env()
-        
-        template_file = os.path.join(env.loader.searchpath[0], "email_html.j2")
-        # Ensure the template exists, but omit the fallback overwrite to preserve our new rich template.
-        if not os.path.exists(template_file):
-            logger.error("The email_html.j2 template is missing!")
-            raise FileNotFoundError("email_html.j2 template missing")
-                
-        template = env.get_template("email_html.j2")
-        
-        html_content = template.render(
+        return get_email_template().render(
             business_name=lead_data.get("business_name", "Valued Business"),
             ai_body_html=sanitized_body,
             tracking_token=tracking_token,
@@ -67,7 +97,6 @@ def render_email_html(lead_data: Dict[str, Any], ai_body_html: str, tracking_tok
             reply_email=settings.REPLY_TO_EMAIL or settings.FROM_EMAIL,
             logo_url=settings.IMAGE_BASE_URL
         )
-        return html_content
     except Exception as e:
         logger.exception("Failed to render email with Jinja2 template")
         return f"<html><body>{ai_body_html}<br><br><p>Best regards</p></body></html>"
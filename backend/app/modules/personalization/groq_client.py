@@ -6,6 +6,10 @@ Communicates with the Groq API for dynamic content generation tasks:
   - Follow-up email sequences (up to 3 follow-ups)
   - Daily target city/category selection for the discovery pipeline
 
+Email and follow-up generation also have ``*_batch`` variants that pack up to
+``GROQ_BATCH_SIZE`` leads into one request (see ``llm_batch``), falling back
+to single calls for any lead whose batched result is missing or invalid.
+
 Security notes:
   - All external lead data (business names, categories, etc.) is sanitised
     before being substituted into LLM prompts to mitigate prompt-injection
@@ -16,10 +20,13 @@ Security notes:
 
 import json
 import re
+from typing import Dict, Optional
 from loguru import logger
 from groq import AsyncGroq
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.config import get_settings
+from app.modules.personalization.llm_batch import batch_json_completion, chunked
+from app.modules.personalization.llm_cache import cached_json_completion
 
 settings = get_settings()
 
@@ -56,6 +63,98 @@ def _sanitize_prompt_value(value: str) -> str:
     return value[:_MAX_FIELD_LENGTH]
 
 
+def _email_mapping(lead_data: dict) -> dict:
+    """Sanitised prompt fields for initial outreach generation."""
+    # Lead data originates from external sources (Google Places, web scraping)
+    # and could contain adversarial instructions embedded in scraped content.
+    return {
+        "business_name": _sanitize_prompt_value(lead_data.get('business_name', 'your business')),
+        "category": _sanitize_prompt_value(lead_data.get('category', 'business')),
+        "location": _sanitize_prompt_value(lead_data.get('location', 'your area')),
+        "rating": _sanitize_prompt_value(str(lead_data.get('rating', 'good'))),
+        "review_count": _sanitize_prompt_value(str(lead_data.get('review_count', 'some'))),
+        "qualification_notes": _sanitize_prompt_value(lead_data.get('qualification_notes', 'needs improvement')),
+        "website_title": _sanitize_prompt_value(lead_data.get('website_title', 'None')),
+        "website_services": _sanitize_prompt_value(', '.join(lead_data.get('website_services', []))),
+        "website_year": _sanitize_prompt_value(str(lead_data.get('website_year', 'None'))),
+        "competitor_name": _sanitize_prompt_value(lead_data.get('competitor_name', 'None')),
+    }
+
+
+def _followup_angle(followup_number: int) -> str:
+    if followup_number == 1:
+        return "A brief, polite check-in asking if they had a chance to see the proposal."
+    if followup_number == 2:
+        return "Share a brief valuable stat or tip about their industry regarding digital presence."
+    return "A final, polite 'break-up' email. If they aren't interested, that's fine, but leave the door open."
+
+
+def _valid_email_result(item: dict) -> bool:
+    return (
+        isinstance(item.get("subject"), str) and item["subject"].strip() != ""
+        and isinstance(item.get("body_html"), str) and item["body_html"].strip() != ""
+        and isinstance(item.get("benefits"), list)
+    )
+
+
+def _valid_followup_result(item: dict) -> bool:
+    return (
+        isinstance(item.get("subject"), str) and item["subject"].strip() != ""
+        and isinstance(item.get("body_html"), str) and item["body_html"].strip() != ""
+    )
+
+
+# Shared instruction prefixes for batched requests. Per-lead values travel in
+# the JSON inputs, so these are byte-identical across batches.
+_EMAIL_BATCH_INSTRUCTIONS = """
+You are a professional business development writer. For each business in the
+inputs, write a short, warm outreach email.
+
+Requirements (per business):
+- Subject line: Compelling, mentions business name, max 60 chars
+- Email body: 3 short paragraphs, conversational but professional (in HTML format)
+- Paragraph 1: Acknowledge their business specifically. Mention something from the website_title, website_services, website_year or competitor_name fields if useful.
+- Paragraph 2: Explain what a custom platform/website could do for their specific business type
+- Paragraph 3: Soft CTA - ask if they'd like a free consultation
+- Include 3 specific ROI benefits for their category
+- Tone: Helpful partner, not salesy
+- Length: 150-200 words max
+"""
+
+_FOLLOWUP_BATCH_INSTRUCTIONS = """
+You are a professional business development writer. For each business in the
+inputs, write a short, personalized follow-up email number followup_number
+using that input's angle.
+
+Requirements (per business):
+- Subject line: Relevant to the angle, max 60 chars ("Re: " is good)
+- Email body: 2-3 short paragraphs, conversational, in HTML format (<p> tags)
+- Include a clear but very low-pressure CTA
+- Keep it under 150 words
+"""
+
+
+async def _load_prompt_override(prompt_type: str) -> Optional[str]:
+    """Returns the active ``PromptConfig`` text for ``prompt_type``, if any."""
+    from app.core.database import get_session_maker
+    from app.models.prompt_config import PromptConfig
+    from sqlalchemy import select
+
+    try:
+        async with get_session_maker()() as db:
+            stmt = select(PromptConfig).where(
+                PromptConfig.prompt_type == prompt_type,
+                PromptConfig.is_active == True
+            )
+            res = await db.execute(stmt)
+            db_prompt = res.scalars().first()
+            if db_prompt:
+                return db_prompt.prompt_text
+    except Exception as e:
+        logger.warning(f"Could not load dynamic prompt '{prompt_type}', using fallback: {e}")
+    return None
+
+
 class GroqClient:
     """
     Client for interfacing with the Groq LLM API.
@@ -64,10 +163,13 @@ class GroqClient:
         self.client = AsyncGroq(api_key=settings.GROQ_API_KEY)
         self.model = settings.GROQ_MODEL
 
-    async def generate_email_content(self, lead_data: dict) -> dict:
+    async def generate_email_content(self, lead_data: dict, use_cache: bool = False) -> dict:
         """
         Generates personalized outreach email content and benefits
         based on the provided lead context and deep enrichment data.
+
+        With ``use_cache`` an identical prompt (e.g. a lead retried after a
+        failed personalization run) is served from the LLM response cache.
         """
         prompt_template = f"""
 You are a professional business development writer. Write a short, warm outreach email for:
@@ -101,37 +203,12 @@ Return ONLY a valid JSON object in the following format:
   "benefits": ["Benefit 1", "Benefit 2", "Benefit 3"]
 }}
 """
-        from app.core.database import get_session_maker
-        from app.models.prompt_config import PromptConfig
-        from sqlalchemy import select
-        
-        try:
-            async with get_session_maker()() as db:
-                stmt = select(PromptConfig).where(PromptConfig.prompt_type == "initial_outreach", PromptConfig.is_active == True)
-                res = await db.execute(stmt)
-                db_prompt = res.scalars().first()
-                if db_prompt:
-                    prompt_template = db_prompt.prompt_text
-        except Exception as e:
-            logger.warning(f"Could not load dynamic prompt, using fallback: {e}")
-            
+        prompt_template = await _load_prompt_override("initial_outreach") or prompt_template
+
         from string import Template
-        
+
         # Sanitise all lead fields before substitution to prevent prompt injection.
-        # Lead data originates from external sources (Google Places, web scraping)
-        # and could contain adversarial instructions embedded in scraped content.
-        mapping = {
-            "business_name": _sanitize_prompt_value(lead_data.get('business_name', 'your business')),
-            "category": _sanitize_prompt_value(lead_data.get('category', 'business')),
-            "location": _sanitize_prompt_value(lead_data.get('location', 'your area')),
-            "rating": _sanitize_prompt_value(str(lead_data.get('rating', 'good'))),
-            "review_count": _sanitize_prompt_value(str(lead_data.get('review_count', 'some'))),
-            "qualification_notes": _sanitize_prompt_value(lead_data.get('qualification_notes', 'needs improvement')),
-            "website_title": _sanitize_prompt_value(lead_data.get('website_title', 'None')),
-            "website_services": _sanitize_prompt_value(', '.join(lead_data.get('website_services', []))),
-            "website_year": _sanitize_prompt_value(str(lead_data.get('website_year', 'None'))),
-            "competitor_name": _sanitize_prompt_value(lead_data.get('competitor_name', 'None')),
-        }
+        mapping = _email_mapping(lead_data)
         
         try:
             # Use Template.safe_substitute to ignore extra placeholders in the prompt
@@ -143,22 +220,13 @@ Return ONLY a valid JSON object in the following format:
         
         @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
         async def _call_groq(prompt_text):
-            return await self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt_text,
-                    }
-                ],
-                model=self.model,
-                response_format={"type": "json_object"},
-                temperature=0.7,
+            return await cached_json_completion(
+                self.client, self.model, prompt_text,
+                temperature=0.7, use_cache=use_cache,
             )
 
         try:
-            chat_completion = await _call_groq(prompt)
-            result = chat_completion.choices[0].message.content
-            return json.loads(result)
+            return await _call_groq(prompt)
         except Exception as e:
             logger.exception("Error calling Groq API for personalization")
             return {
@@ -168,10 +236,14 @@ Return ONLY a valid JSON object in the following format:
             }
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    async def generate_daily_targets(self, exclude_cities: list, exclude_categories: list) -> dict:
+    async def generate_daily_targets(self, exclude_cities: list, exclude_categories: list,
+                                     use_cache: bool = False) -> dict:
         """
         Determines novel geographic and categorical targets for discovery,
         bypassing recently utilized combinations.
+
+        With ``use_cache`` a re-run with unchanged exclusions reuses the
+        previous targets instead of paying for a new completion.
         """
         prompt = f"""
 You are an expert sales strategist targeting local businesses in India.
@@ -194,13 +266,10 @@ Example format:
 """
         try:
             logger.info("Calling Groq to generate dynamic daily targets")
-            chat_completion = await self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.model,
-                response_format={"type": "json_object"},
-                temperature=0.8,
+            data = await cached_json_completion(
+                self.client, self.model, prompt,
+                temperature=0.8, use_cache=use_cache,
             )
-            data = json.loads(chat_completion.choices[0].message.content)
             return data.get("targets", [])
         except Exception as e:
             logger.exception("Error generating daily targets with Groq")
@@ -211,12 +280,7 @@ Example format:
         """
         followup_number: 1, 2, or 3
         """
-        if followup_number == 1:
-            angle = "A brief, polite check-in asking if they had a chance to see the proposal."
-        elif followup_number == 2:
-            angle = "Share a brief valuable stat or tip about their industry regarding digital presence."
-        else:
-            angle = "A final, polite 'break-up' email. If they aren't interested, that's fine, but leave the door open."
+        angle = _followup_angle(followup_number)
 
         prompt_template = f"""
 You are a professional business development writer. Write a short, personalized follow-up email #$followup_number for:
@@ -239,22 +303,7 @@ Return ONLY a valid JSON object in the following format:
   "body_html": "<p>...</p>"
 }}
 """
-        from app.core.database import get_session_maker
-        from app.models.prompt_config import PromptConfig
-        from sqlalchemy import select
-        
-        try:
-            async with get_session_maker()() as db:
-                stmt = select(PromptConfig).where(
-                    PromptConfig.prompt_type == f"followup_{followup_number}", 
-                    PromptConfig.is_active == True
-                )
-                res = await db.execute(stmt)
-                db_prompt = res.scalars().first()
-                if db_prompt:
-                    prompt_template = db_prompt.prompt_text
-        except Exception as e:
-            logger.warning(f"Could not load dynamic follow-up prompt, using fallback: {e}")
+        prompt_template = await _load_prompt_override(f"followup_{followup_number}") or prompt_template
 
         from string import Template
         # Sanitise external lead fields before prompt substitution.
@@ -283,3 +332,88 @@ Return ONLY a valid JSON object in the following format:
         except Exception as e:
             logger.exception("Error calling Groq API for followup")
             raise e # Trigger retry
+
+    # ── Batch mode ───────────────────────────────────────────────────────────
+
+    async def generate_email_content_batch(self, leads: Dict[str, dict],
+                                           use_cache: bool = False) -> Dict[str, dict]:
+        """
+        Generates outreach content for many leads, ``GROQ_BATCH_SIZE`` per request.
+
+        Args:
+            leads: Lead context dicts (as for :meth:`generate_email_content`)
+                   keyed by a caller-chosen ID, typically the lead ID.
+
+        Returns:
+            dict: Generated content keyed by the same IDs. Every ID is present:
+            leads the batch could not serve are generated individually, which
+            in turn falls back to the static template on failure.
+        """
+        results: Dict[str, dict] = {}
+        batch_size = settings.GROQ_BATCH_SIZE
+
+        # An operator-edited prompt is a per-lead template; honour it exactly
+        # by staying on single calls.
+        if batch_size > 1 and len(leads) > 1 and not await _load_prompt_override("initial_outreach"):
+            for chunk in chunked(leads.items(), batch_size):
+                inputs = {str(lead_id): _email_mapping(data) for lead_id, data in chunk}
+                served = await batch_json_completion(
+                    self.client, self.model, _EMAIL_BATCH_INSTRUCTIONS, inputs,
+                    result_fields='"subject": "...", "body_html": "<p>...</p>", "benefits": ["...", "...", "..."]',
+                    validate=_valid_email_result, temperature=0.7, use_cache=use_cache,
+                )
+                for lead_id, _ in chunk:
+                    if str(lead_id) in served:
+                        results[lead_id] = served[str(lead_id)]
+
+        for lead_id, data in leads.items():
+            if lead_id not in results:
+                results[lead_id] = await self.generate_email_content(data, use_cache=use_cache)
+        return results
+
+    async def generate_followup_email_batch(self, items: Dict[str, tuple]) -> Dict[str, dict]:
+        """
+        Generates follow-ups for many leads, ``GROQ_BATCH_SIZE`` per request.
+
+        Args:
+            items: ``(lead_data, followup_number)`` tuples keyed by ID.
+
+        Returns:
+            dict: Generated content keyed by ID. IDs whose batched and single
+            attempts both failed are omitted.
+        """
+        results: Dict[str, dict] = {}
+        batch_size = settings.GROQ_BATCH_SIZE
+
+        if batch_size > 1 and len(items) > 1:
+            numbers = {number for _, number in items.values()}
+            overridden = {n for n in numbers if await _load_prompt_override(f"followup_{n}")}
+            batchable = [(k, v) for k, v in items.items() if v[1] not in overridden]
+
+            for chunk in chunked(batchable, batch_size):
+                inputs = {}
+                for item_id, (lead_data, number) in chunk:
+                    inputs[str(item_id)] = {
+                        "business_name": _sanitize_prompt_value(lead_data.get('business_name', 'your business')),
+                        "category": _sanitize_prompt_value(lead_data.get('category', 'business')),
+                        "location": _sanitize_prompt_value(lead_data.get('location', 'your area')),
+                        "followup_number": number,
+                        "angle": _followup_angle(number),
+                    }
+                served = await batch_json_completion(
+                    self.client, self.model, _FOLLOWUP_BATCH_INSTRUCTIONS, inputs,
+                    result_fields='"subject": "...", "body_html": "<p>...</p>"',
+                    validate=_valid_followup_result, temperature=0.7,
+                )
+                for item_id, _ in chunk:
+                    if str(item_id) in served:
+                        results[item_id] = served[str(item_id)]
+
+        for item_id, (lead_data, number) in items.items():
+            if item_id in results:
+                continue
+            try:
+                results[item_id] = await self.generate_followup_email(lead_data, number)
+            except Exception as e:
+                logger.error(f"Follow-up generation failed for {item_id}: {e}")
+        return results
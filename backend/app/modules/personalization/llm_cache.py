@@ -0,0 +1,150 @@
+"""
+LLM Response Cache.
+
+Avoids paying twice for identical Groq completions — re-running
+personalization for a lead left in ``qualified`` after a failure, manually
+re-triggered stages, and the same auto-reply text being classified on every
+poll all produce byte-identical prompts.
+
+Entries are keyed by a SHA-256 fingerprint of (model, temperature class,
+prompt), expire after ``LLM_CACHE_TTL_SECONDS`` and are evicted LRU once
+``LLM_CACHE_MAX_ENTRIES`` is reached. Caching is opt-in per call site via the
+``use_cache`` flag on :func:`cached_json_completion`; hit counts and the
+tokens those hits saved are tracked in :attr:`LLMResponseCache.stats`.
+
+The cache is in-process. It is deliberately not shared across instances:
+a miss only costs the completion the caller would have paid for anyway.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from loguru import logger
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def temperature_class(temperature: float) -> str:
+    """
+    Buckets a sampling temperature for fingerprinting.
+
+    Completions at nearby temperatures are interchangeable for caching
+    purposes; keeping the raw float in the key would only fragment it.
+    """
+    if temperature <= 0.0:
+        return "deterministic"
+    if temperature < 0.5:
+        return "focused"
+    return "creative"
+
+
+def prompt_fingerprint(model: str, prompt: str, temperature: float) -> str:
+    """Returns the cache key for a single-message completion request."""
+    material = f"{model}\x1f{temperature_class(temperature)}\x1f{prompt}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    TTL + size-bounded LRU of raw completion content.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "tokens_saved": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns cached content for ``key``, or None on a miss or expiry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        stored_at, content, tokens = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        self.stats["tokens_saved"] += tokens
+        return content
+
+    def put(self, key: str, content: str, tokens: int = 0) -> None:
+        """Stores completion content along with the tokens it cost to produce."""
+        self._entries[key] = (time.monotonic(), content, tokens)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        """Returns a copy of the counters plus the current entry count."""
+        return {**self.stats, "entries": len(self._entries)}
+
+
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+)
+
+
+async def cached_json_completion(
+    client,
+    model: str,
+    prompt: str,
+    temperature: float,
+    use_cache: bool = False,
+) -> Any:
+    """
+    Runs a single-prompt JSON-mode chat completion, optionally through the cache.
+
+    Only responses that parse as JSON are cached, so a malformed completion is
+    never replayed.
+
+    Args:
+        client:      An ``AsyncGroq`` client (or anything exposing
+                     ``chat.completions.create``).
+        model:       Model identifier.
+        prompt:      The full user prompt.
+        temperature: Sampling temperature.
+        use_cache:   Opt-in flag for this call site.
+
+    Returns:
+        The parsed JSON response.
+    """
+    enabled = use_cache and settings.LLM_CACHE_ENABLED
+    key = prompt_fingerprint(model, prompt, temperature) if enabled else None
+
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit ({key[:12]})")
+            return json.loads(cached)
+
+    chat_completion = await client.chat.completions.create(
+        messages=[{"role": "user", "content": prompt}],
+        model=model,
+        response_format={"type": "json_object"},
+        temperature=temperature,
+    )
+    content = chat_completion.choices[0].message.content
+    parsed = json.loads(content)
+
+    if key:
+        usage = getattr(chat_completion, "usage", None)
+        tokens = getattr(usage, "total_tokens", 0) or 0
+        llm_cache.put(key, content, tokens if isinstance(tokens, int) else 0)
+
+    return parsed
@@ -6,9 +6,10 @@ ReportLab's canvas API for precise layout control.
 Design language: black & white header, grayscale accents, clean card sections,
 data-driven growth chart, and a strong CTA footer.
 """
+import io
 import os
 from datetime import date
-from typing import List, Optional
+from typing import BinaryIO, List, Optional, Union
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import mm
@@ -341,8 +342,141 @@ def _draw_footer(c: canvas.Canvas):
           "Helvetica", 7, GRAY_500, "right")
 
 
+def _render_proposal_pdf(
+    target: Union[str, BinaryIO],
+    business_name: str,
+    category: str,
+    benefits: List[str],
+    rating: Optional[float] = None,
+    review_count: Optional[int] = None,
+    city: Optional[str] = None,
+    qualification_notes: Optional[str] = None,
+) -> None:
+    """
+    Draws the proposal onto ``target``, which may be a file path or any
+    writable binary stream (e.g. :class:`io.BytesIO`).
+
+    ``invariant=1`` pins the document ID and timestamps so identical inputs
+    produce byte-identical output, which lets the artifact store dedup them.
+    """
+    c = canvas.Canvas(target, pagesize=A4, invariant=1)
+    c.setTitle(f"Digital Growth Proposal — {business_name}")
+    c.setAuthor("Cold Scout")
+    c.setSubject("Digital Marketing Proposal")
+
+    # ── Page 1 layout (top → bottom) ─────────────────────────────────────
+    cursor = H  # current y position, decrements as we draw downward
+
+    _draw_header(c, business_name, category)
+    cursor -= 168  # header height + gap
+
+    cursor = _draw_problem_strip(c, cursor)
+    cursor = _draw_stat_row(c, cursor)
+
+    _divider(c, cursor)
+    cursor -= 20
+
+    # Section 1 — What We Found
+    cursor = _draw_section_heading(c, PAD_X, cursor, "1", "What We Found About Your Online Presence")
+    if qualification_notes:
+        notes_display = qualification_notes.replace(" | ", "  •  ")[:200]
+        cursor = _wrapped_text(c, PAD_X, cursor, notes_display,
+                               "Helvetica", 9, MID_GRAY,
+                               max_width=INNER, line_height=13)
+        cursor -= 8
+    else:
+        _text(c, PAD_X, cursor,
+              "Your business has significant untapped digital potential.",
+              "Helvetica", 9, MID_GRAY)
+        cursor -= 20
+
+    # Rating context line
+    if rating and review_count:
+        loc = f" in {city}" if city else ""
+        _badge(c, PAD_X, cursor,
+               f"{rating}★  {review_count} reviews{loc}",
+               DARK_GRAY, WHITE, 8)
+        cursor -= 22
+
+    _divider(c, cursor)
+    cursor -= 20
+
+    # Section 2 — What We'll Do
+    cursor = _draw_section_heading(c, PAD_X, cursor, "2", "How We'll Grow Your Business")
+    safe_benefits = (benefits or [])[:5]
+    if not safe_benefits:
+        safe_benefits = [
+            "Build a fast, mobile-friendly website that ranks on Google",
+            "Set up Google Business Profile to capture local search traffic",
+            "Create a social media presence to engage your community",
+        ]
+    cursor = _draw_benefits(c, cursor, safe_benefits)
+
+    _divider(c, cursor)
+    cursor -= 20
+
+    # Section 3 — Growth Projection
+    cursor = _draw_section_heading(c, PAD_X, cursor, "3", "Projected Growth Impact")
+    cursor = _draw_growth_chart(c, cursor)
+
+    # If we're running out of page space, add a new page
+    if cursor < 220:
+        _draw_footer(c)
+        c.showPage()
+        cursor = H - 40
+
+    _divider(c, cursor)
+    cursor -= 20
+
+    # Section 4 — Timeline
+    cursor = _draw_section_heading(c, PAD_X, cursor, "4", "Project Roadmap")
+    cursor = _draw_timeline(c, cursor)
+
+    _divider(c, cursor)
+    cursor -= 16
+
+    # CTA block
+    cursor = _draw_cta(c, cursor)
+
+    # Footer
+    _draw_footer(c)
+
+    c.save()
+
+
 # ── Public interface ──────────────────────────────────────────────────────────
 
+def render_proposal_pdf_bytes(
+    business_name: str,
+    category: str,
+    benefits: List[str],
+    rating: Optional[float] = None,
+    review_count: Optional[int] = None,
+    city: Optional[str] = None,
+    qualification_notes: Optional[str] = None,
+) -> Optional[bytes]:
+    """
+    Renders the proposal PDF entirely in memory.
+
+    Used by the outreach stage to build attachments at dispatch time without
+    touching the filesystem.
+
+    Returns:
+        bytes: The PDF document, or None on failure.
+    """
+    try:
+        buffer = io.BytesIO()
+        _render_proposal_pdf(
+            buffer, business_name, category, benefits,
+            rating=rating, review_count=review_count, city=city,
+            qualification_notes=qualification_notes,
+        )
+        return buffer.getvalue()
+    except Exception as e:
+        logger.exception(f"Failed to render PDF proposal for {business_name}: {e}")
+        return None
+
+
 def generate_proposal_pdf(
     business_name: str,
     category: str,
@@ -373,89 +507,11 @@ def generate_proposal_pdf(
         os.makedirs("tmp", exist_ok=True)
         filepath = os.path.join("tmp", output_filename)
 
-        c = canvas.Canvas(filepath, pagesize=A4)
-        c.setTitle(f"Digital Growth Proposal — {business_name}")
-        c.setAuthor("Cold Scout")
-        c.setSubject("Digital Marketing Proposal")
-
-        # ── Page 1 layout (top → bottom) ─────────────────────────────────────
-        cursor = H  # current y position, decrements as we draw downward
-
-        _draw_header(c, business_name, category)
-        cursor -= 168  # header height + gap
-
-        cursor = _draw_problem_strip(c, cursor)
-        cursor = _draw_stat_row(c, cursor)
-
-        _divider(c, cursor)
-        cursor -= 20
-
-        # Section 1 — What We Found
-        cursor = _draw_section_heading(c, PAD_X, cursor, "1", "What We Found About Your Online Presence")
-        if qualification_notes:
-            notes_display = qualification_notes.replace(" | ", "  •  ")[:200]
-            cursor = _wrapped_text(c, PAD_X, cursor, notes_display,
-                                   "Helvetica", 9, MID_GRAY,
-                                   max_width=INNER, line_height=13)
-            cursor -= 8
-        else:
-            _text(c, PAD_X, cursor,
-                  "Your business has significant untapped digital potential.",
-                  "Helvetica", 9, MID_GRAY)
-            cursor -= 20
-
-        # Rating context line
-        if rating and review_count:
-            loc = f" in {city}" if city else ""
-            _badge(c, PAD_X, cursor,
-                   f"{rating}★  {review_count} reviews{loc}",
-                   DARK_GRAY, WHITE, 8)
-            cursor -= 22
-
-        _divider(c, cursor)
-        cursor -= 20
-
-        # Section 2 — What We'll Do
-        cursor = _draw_section_heading(c, PAD_X, cursor, "2", "How We'll Grow Your Business")
-        safe_benefits = (benefits or [])[:5]
-        if not safe_benefits:
-            safe_benefits = [
-                "Build a fast, mobile-friendly website that ranks on Google",
-                "Set up Google Business Profile to capture local search traffic",
-                "Create a social media presence to engage your community",
-            ]
-        cursor = _draw_benefits(c, cursor, safe_benefits)
-
-        _divider(c, cursor)
-        cursor -= 20
-
-        # Section 3 — Growth Projection
-        cursor = _draw_section_heading(c, PAD_X, cursor, "3", "Projected Growth Impact")
-        cursor = _draw_growth_chart(c, cursor)
-
-        # If we're running out of page space, add a new page
-        if cursor < 220:
-            _draw_footer(c)
-            c.showPage()
-            cursor = H - 40
-
-        _divider(c, cursor)
-        cursor -= 20
-
-        # Section 4 — Timeline
-        cursor = _draw_section_heading(c, PAD_X, cursor, "4", "Project Roadmap")
-        cursor = _draw_timeline(c, cursor)
-
-        _divider(c, cursor)
-        cursor -= 16
-
-        # CTA block
-        cursor = _draw_cta(c, cursor)
-
-        # Footer
-        _draw_footer(c)
-
-        c.save()
+        _render_proposal_pdf(
+            filepath, business_name, category, benefits,
+            rating=rating, review_count=review_count, city=city,
+            qualification_notes=qualification_notes,
+        )
         logger.info(f"PDF proposal generated: {filepath}")
         return filepath
 
@@ -0,0 +1,175 @@
+"""
+Proposal Artifact Service.
+
+Renders the PDF proposal and the companion ROI workbook for an outreach email
+on demand, immediately before it is dispatched.
+
+The personalization stage no longer writes files: it stores a small,
+JSON-serialisable *render context* on ``EmailOutreach.proposal_context`` and
+the filenames the lead will see on ``EmailOutreach.attachment_names``. The
+outreach stage then calls :func:`resolve_proposal_attachments`, which returns
+in-memory :class:`~app.modules.outreach.email_sender.EmailAttachment` objects
+that go straight into MIME building.
+
+Rendered documents are put into the content-addressed artifact store and the
+outreach row keeps only their digests (``EmailOutreach.attachment_refs``), so:
+  - Retries resolve from the store instead of re-rendering.
+  - Identical renders (same inputs, or byte-identical output) are stored and
+    base64-encoded once, however many leads reference them.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.modules.outreach.artifact_store import artifact_store
+from app.modules.outreach.email_sender import EmailAttachment
+from app.modules.personalization.pdf_generator import render_proposal_pdf_bytes
+from app.modules.personalization.proposal_xlsx_generator import render_proposal_xlsx_bytes
+
+# Bump when the stored context shape changes so old rows can be detected.
+PROPOSAL_CONTEXT_VERSION = 1
+
+
+def proposal_filenames(lead_id: Any) -> List[str]:
+    """Returns the attachment filenames shown to the recipient for a lead."""
+    return [f"Proposal_{lead_id}.pdf", f"Proposal_{lead_id}.xlsx"]
+
+
+def build_proposal_context(lead, benefits: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Captures everything needed to render a lead's proposal later.
+
+    Args:
+        lead:     The :class:`~app.models.lead.Lead` being personalised.
+        benefits: AI-generated value propositions for the proposal.
+
+    Returns:
+        dict: A JSON-serialisable render context for ``EmailOutreach.proposal_context``.
+    """
+    return {
+        "version": PROPOSAL_CONTEXT_VERSION,
+        "lead_id": str(lead.id),
+        "business_name": lead.business_name,
+        "category": lead.category,
+        "benefits": list(benefits or [])[:5],
+        "rating": lead.rating,
+        "review_count": lead.review_count,
+        "city": lead.city,
+        "qualification_notes": lead.qualification_notes,
+    }
+
+
+def _render_key(context: Dict[str, Any]) -> str:
+    """
+    Fingerprints the inputs that affect rendered bytes.
+
+    ``lead_id`` only influences filenames, so it is excluded: two leads with
+    identical render inputs share one set of artifacts.
+    """
+    material = {k: v for k, v in context.items() if k != "lead_id"}
+    return hashlib.sha256(
+        json.dumps(material, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _render_sync(context: Dict[str, Any]) -> List[Tuple[Dict[str, str], bytes]]:
+    """
+    Renders both proposal documents into the artifact store.
+
+    Returns:
+        list: One ``({"kind", "sha256"}, content)`` pair per successfully
+        rendered document; failures drop only the failed document.
+    """
+    common = {
+        "business_name": context.get("business_name") or "Your Business",
+        "category": context.get("category") or "business",
+        "benefits": context.get("benefits") or [],
+        "rating": context.get("rating"),
+        "review_count": context.get("review_count"),
+        "city": context.get("city"),
+    }
+
+    rendered: List[Tuple[Dict[str, str], bytes]] = []
+
+    pdf_bytes = render_proposal_pdf_bytes(
+        qualification_notes=context.get("qualification_notes"), **common
+    )
+    if pdf_bytes:
+        rendered.append(({"kind": "pdf", "sha256": artifact_store.put(pdf_bytes)}, pdf_bytes))
+
+    xlsx_bytes = render_proposal_xlsx_bytes(**common)
+    if xlsx_bytes:
+        rendered.append(({"kind": "xlsx", "sha256": artifact_store.put(xlsx_bytes)}, xlsx_bytes))
+
+    return rendered
+
+
+def _attachments_from_refs(lead_id: Any, refs: List[Dict[str, str]]) -> Optional[List[EmailAttachment]]:
+    """Builds attachments from stored refs, or None if any blob is missing."""
+    names = dict(zip(("pdf", "xlsx"), proposal_filenames(lead_id)))
+    attachments: List[EmailAttachment] = []
+    for ref in refs:
+        content = artifact_store.get(ref["sha256"])
+        if content is None:
+            return None
+        attachments.append(
+            EmailAttachment.for_filename(names[ref["kind"]], content, digest=ref["sha256"])
+        )
+    return attachments
+
+
+async def resolve_proposal_attachments(
+    context: Optional[Dict[str, Any]],
+    refs: Optional[List[Dict[str, str]]] = None,
+) -> Tuple[List[EmailAttachment], List[Dict[str, str]]]:
+    """
+    Returns a lead's proposal documents, rendering them only when needed.
+
+    Resolution order:
+      1. ``refs`` previously recorded on the outreach row.
+      2. Artifacts already rendered for identical inputs.
+      3. A fresh render. ReportLab and openpyxl are CPU-bound and synchronous,
+         so this runs in a worker thread to keep the event loop responsive.
+
+    Args:
+        context: The render context stored by :func:`build_proposal_context`.
+        refs:    Digests recorded on the outreach row by an earlier attempt.
+
+    Returns:
+        tuple: ``(attachments, refs)`` — the refs should be saved on
+        ``EmailOutreach.attachment_refs`` so later attempts skip rendering.
+    """
+    if not context:
+        return [], []
+
+    lead_id = context.get("lead_id")
+    if refs:
+        attachments = _attachments_from_refs(lead_id, refs)
+        if attachments is not None:
+            return attachments, refs
+
+    render_key = _render_key(context)
+    cached_refs = artifact_store.recall(render_key)
+    if cached_refs:
+        attachments = _attachments_from_refs(lead_id, cached_refs)
+        if attachments is not None:
+            return attachments, cached_refs
+
+    try:
+        rendered = await asyncio.to_thread(_render_sync, context)
+    except Exception as e:
+        logger.error(f"Proposal rendering failed for lead {lead_id}: {e}")
+        return [], []
+
+    names = dict(zip(("pdf", "xlsx"), proposal_filenames(lead_id)))
+    new_refs = [ref for ref, _ in rendered]
+    artifact_store.remember(render_key, new_refs)
+    attachments = [
+        EmailAttachment.for_filename(names[ref["kind"]], content, digest=ref["sha256"])
+        for ref, content in rendered
+    ]
+    return attachments, new_refs
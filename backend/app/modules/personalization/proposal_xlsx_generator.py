@@ -8,9 +8,11 @@ Creates a visually formatted Excel workbook for the client that contains:
 Designed to be impressive, interactive, and personalised per lead.
 Brand identity: black & white with shades of gray.
 """
+import io
 import os
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Optional
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
 
 from openpyxl import Workbook
 from openpyxl.styles import (
@@ -19,6 +21,7 @@ from openpyxl.styles import (
 from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, Reference
 from openpyxl.chart.series import SeriesLabel
+from openpyxl.writer.excel import ExcelWriter
 from loguru import logger
 
 # ── Brand colours (openpyxl uses ARGB hex — Black & White theme) ──────────────
@@ -385,8 +388,105 @@ def _build_roadmap_sheet(ws, benefits: List[str]):
     _col_widths(ws, {"A": 32, "B": 14, "C": 14, "D": 12, "E": 44, "F": 14})
 
 
+def _build_proposal_workbook(
+    business_name: str,
+    category: str,
+    benefits: List[str],
+    rating: Optional[float] = None,
+    review_count: Optional[int] = None,
+    city: Optional[str] = None,
+) -> Workbook:
+    """Assembles the three proposal sheets into a new in-memory workbook."""
+    wb = Workbook()
+
+    # Sheet 1 — ROI Projection
+    ws1 = wb.active
+    ws1.title = "📊 ROI Projection"
+    _build_roi_sheet(
+        ws1,
+        business_name,
+        category,
+        city or "Your City",
+        rating or 4.2,
+        review_count or 50,
+    )
+
+    # Sheet 2 — Competitor Snapshot
+    ws2 = wb.create_sheet("🔍 Competitor Snapshot")
+    _build_competitor_sheet(ws2, business_name, category)
+
+    # Sheet 3 — Roadmap
+    ws3 = wb.create_sheet("🗓️ Project Roadmap")
+    _build_roadmap_sheet(ws3, benefits or [])
+
+    # Tab colours (grayscale)
+    ws1.sheet_properties.tabColor = BLACK
+    ws2.sheet_properties.tabColor = DARK_GRAY
+    ws3.sheet_properties.tabColor = MID_GRAY
+
+    return wb
+
+
 # ── Public interface ──────────────────────────────────────────────────────────
 
+# Pinned document and zip-entry timestamps: identical inputs render
+# byte-identical workbooks, so the artifact store can dedup them (as the PDF's
+# ``invariant=1`` does).
+_FIXED_TIMESTAMP = datetime(2000, 1, 1)
+
+
+class _FixedTimeZipFile(ZipFile):
+    """A ZipFile that stamps every entry with ``_FIXED_TIMESTAMP``."""
+
+    def writestr(self, zinfo_or_arcname, data, compress_type=None, compresslevel=None):
+        if not isinstance(zinfo_or_arcname, ZipInfo):
+            zinfo = ZipInfo(zinfo_or_arcname, date_time=_FIXED_TIMESTAMP.timetuple()[:6])
+            zinfo.compress_type = self.compression
+            zinfo.external_attr = 0o600 << 16
+            zinfo_or_arcname = zinfo
+        super().writestr(zinfo_or_arcname, data, compress_type, compresslevel)
+
+    def write(self, filename, arcname=None, compress_type=None, compresslevel=None):
+        # Worksheets are streamed via temp files, whose mtime would leak in.
+        with open(filename, "rb") as f:
+            self.writestr(arcname or os.path.basename(filename), f.read(), compress_type, compresslevel)
+
+
+def _save_reproducible(wb: Workbook, target) -> None:
+    # Workbook.save would restamp properties.modified with the current time.
+    wb.properties.created = wb.properties.modified = _FIXED_TIMESTAMP
+    ExcelWriter(wb, _FixedTimeZipFile(target, "w", ZIP_DEFLATED, allowZip64=True)).save()
+
+
+def render_proposal_xlsx_bytes(
+    business_name: str,
+    category: str,
+    benefits: List[str],
+    rating: Optional[float] = None,
+    review_count: Optional[int] = None,
+    city: Optional[str] = None,
+) -> Optional[bytes]:
+    """
+    Renders the proposal workbook entirely in memory.
+
+    Used by the outreach stage to build attachments at dispatch time without
+    touching the filesystem.
+
+    Returns:
+        bytes: The ``.xlsx`` document, or None on failure.
+    """
+    try:
+        buffer = io.BytesIO()
+        _save_reproducible(_build_proposal_workbook(
+            business_name, category, benefits,
+            rating=rating, review_count=review_count, city=city,
+        ), buffer)
+        return buffer.getvalue()
+    except Exception as e:
+        logger.exception(f"Failed to render xlsx proposal for {business_name}: {e}")
+        return None
+
+
 def generate_proposal_xlsx(
     business_name: str,
     category: str,
@@ -420,33 +520,10 @@ def generate_proposal_xlsx(
         os.makedirs("tmp", exist_ok=True)
         filepath = os.path.join("tmp", output_filename)
 
-        wb = Workbook()
-
-        # Sheet 1 — ROI Projection
-        ws1 = wb.active
-        ws1.title = "📊 ROI Projection"
-        _build_roi_sheet(
-            ws1,
-            business_name,
-            category,
-            city or "Your City",
-            rating or 4.2,
-            review_count or 50,
+        wb = _build_proposal_workbook(
+            business_name, category, benefits,
+            rating=rating, review_count=review_count, city=city,
         )
-
-        # Sheet 2 — Competitor Snapshot
-        ws2 = wb.create_sheet("🔍 Competitor Snapshot")
-        _build_competitor_sheet(ws2, business_name, category)
-
-        # Sheet 3 — Roadmap
-        ws3 = wb.create_sheet("🗓️ Project Roadmap")
-        _build_roadmap_sheet(ws3, benefits or [])
-
-        # Tab colours (grayscale)
-        ws1.sheet_properties.tabColor = BLACK
-        ws2.sheet_properties.tabColor = DARK_GRAY
-        ws3.sheet_properties.tabColor = MID_GRAY
-
         wb.save(filepath)
         logger.info(f"Proposal xlsx generated: {filepath}")
         return filepath
@@ -0,0 +1,116 @@
+"""
+Daily report queries.
+Funnel counters from the ``daily_funnel`` rollup and lightweight detail
+projections for the daily report.
+
+Counters are a sum over one day of rollup rows, so they cost the same however
+large ``leads`` grows. Detail rows select just the columns the workbook
+prints, filtered by half-open ranges on the raw columns::
+
+    discovered_at >= :day_start AND discovered_at < :next_day_start
+
+rather than ``date(discovered_at) = :day``, which hides the column from its
+index. :func:`iter_report_leads` streams the same projection for a date range
+in fixed-size batches for the range export.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.lead import Lead
+from app.modules.analytics.daily_funnel import funnel_totals
+
+# Daily report key → daily_funnel metric
+REPORT_METRICS = (
+    ("leads_discovered", "discovered"),
+    ("leads_qualified", "qualified"),
+    ("emails_sent", "emailed"),
+    ("emails_opened", "opened"),
+    ("links_clicked", "clicked"),
+    ("replies_received", "replied"),
+)
+
+REPORT_LEAD_COLUMNS = (
+    Lead.business_name,
+    Lead.category,
+    Lead.city,
+    Lead.email_sent_at,
+    Lead.first_opened_at,
+    Lead.first_clicked_at,
+    Lead.first_replied_at,
+    Lead.status,
+    Lead.phone,
+    Lead.google_maps_url,
+    Lead.lead_tier,
+)
+
+
+def day_range(day: date) -> Tuple[datetime, datetime]:
+    """``[start, end)`` bounds covering ``day``."""
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def dates_range(since: date, until: date) -> Tuple[datetime, datetime]:
+    """``[since, until)`` as datetime bounds."""
+    return datetime.combine(since, time.min), datetime.combine(until, time.min)
+
+
+def in_range(column, bounds: Tuple[datetime, datetime]):
+    """Half-open, sargable range predicate on ``column``."""
+    start, end = bounds
+    return and_(column >= start, column < end)
+
+
+async def daily_report_metrics(db: AsyncSession, day: date) -> Dict[str, int]:
+    """
+    Funnel counters for ``day``, read from the ``daily_funnel`` rollup.
+
+    ``leads_qualified`` covers both 'qualified' and 'phone_qualified' leads so
+    the report reflects all leads that passed the scoring threshold.
+    """
+    return await report_metrics(db, day, day + timedelta(days=1))
+
+
+async def report_metrics(db: AsyncSession, since: date, until: date) -> Dict[str, int]:
+    """Daily report counters summed over ``[since, until)``."""
+    totals = await funnel_totals(db, since, until)
+    return {key: totals[metric] for key, metric in REPORT_METRICS}
+
+
+def _report_leads_query(bounds: Tuple[datetime, datetime]):
+    return select(*REPORT_LEAD_COLUMNS).where(or_(
+        in_range(Lead.discovered_at, bounds),
+        in_range(Lead.email_sent_at, bounds),
+        in_range(Lead.first_replied_at, bounds),
+    ))
+
+
+async def daily_report_leads(db: AsyncSession, day: date) -> List[Dict[str, Any]]:
+    """Leads discovered, emailed or replying on ``day``, as plain dicts."""
+    rows = await db.execute(_report_leads_query(day_range(day)))
+    return [dict(row._mapping) for row in rows]
+
+
+async def iter_report_leads(
+    db: AsyncSession,
+    since: date,
+    until: date,
+    batch_size: int = 1000,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yields the report lead dicts for ``[since, until)`` in batches of
+    ``batch_size``, oldest discovery first.
+
+    Uses a server-side cursor (``yield_per``), so a multi-month range never
+    materialises in memory.
+    """
+    result = await db.stream(
+        _report_leads_query(dates_range(since, until))
+        .order_by(Lead.discovered_at, Lead.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for rows in result.partitions():
+        yield [dict(row._mapping) for row in rows]
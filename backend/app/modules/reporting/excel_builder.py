@@ -3,133 +3,228 @@ Excel report generation module.
 Utilizes the openpyxl library to systematically assemble quantitative metrics
 and lead status details into a formatted administrative spreadsheet artifact.
 Brand identity: black & white with shades of gray.
+
+Workbooks are built in openpyxl's write-only mode: each appended row is
+serialised to a temporary file straight away, so memory stays flat however
+many leads a report covers. Column widths are fixed up front (write-only
+sheets cannot be measured after the fact) and every cell style is created
+once and shared.
 """
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from datetime import date
+import asyncio
 import os
-from typing import List, Dict, Any
+from datetime import date
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+# ── Brand styles ──────────────────────────────────────────────────────────────
+_TITLE_FONT = Font(name="Calibri", bold=True, size=14, color="FFFFFF")
+_HEADER_FONT = Font(name="Calibri", bold=True, size=12, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
+_DATA_FONT = Font(name="Calibri", size=11, color="000000")
+_DATA_FONT_MUTED = Font(name="Calibri", size=11, color="666666")
+_VALUE_FONT = Font(name="Calibri", bold=True, size=12, color="000000")
+_ALT_FILL = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+_BORDER_BOTTOM = Border(bottom=Side(style="thin", color="EAEAEA"))
+_LEFT = Alignment(horizontal="left", vertical="center")
+_CENTER = Alignment(horizontal="center", vertical="center")
+
+SUMMARY_METRICS = (
+    ("Total leads discovered", "leads_discovered"),
+    ("Qualified leads", "leads_qualified"),
+    ("Emails sent", "emails_sent"),
+    ("Emails opened", "emails_opened"),
+    ("Links clicked", "links_clicked"),
+    ("Replies received", "replies_received"),
+)
+
+DAILY_HEADERS = ("Day", "Discovered", "Qualified", "Emailed", "Opened", "Clicked", "Replied")
+DAILY_COLUMN_WIDTHS = (14, 14, 14, 14, 14, 14, 14)
+
+LEAD_HEADERS = (
+    "Business", "Category", "Location", "Email Sent", "Opened",
+    "Clicked", "Replied", "Status", "Phone", "Google Maps",
+)
+LEAD_COLUMN_WIDTHS = (28, 18, 18, 18, 18, 18, 18, 18, 18, 36)
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _set_widths(ws, widths: Sequence[int]) -> None:
+    for index, width in enumerate(widths):
+        ws.column_dimensions[chr(ord("A") + index)].width = width
+
+
+def _yes_no(value: Any) -> str:
+    return "Yes" if value else "No"
+
+
+def lead_row(lead: Dict[str, Any]) -> Tuple:
+    """Lead Details values for one lead dict (see ``REPORT_LEAD_COLUMNS``)."""
+    return (
+        lead.get("business_name"),
+        lead.get("category"),
+        lead.get("city"),
+        _yes_no(lead.get("email_sent_at")),
+        _yes_no(lead.get("first_opened_at")),
+        _yes_no(lead.get("first_clicked_at")),
+        _yes_no(lead.get("first_replied_at")),
+        lead.get("status"),
+        lead.get("phone"),
+        lead.get("google_maps_url"),
+    )
+
+
+class ReportWorkbook:
+    """
+    Write-only report workbook.
+
+    Sheets are appended in the order they are written; rows cannot be
+    revisited. Typical use::
+
+        book = ReportWorkbook("Report  ·  2026-10-01  →  2026-10-31")
+        book.write_summary(metrics)
+        book.write_daily(rows)
+        for batch in batches:
+            book.append_leads(batch)
+        book.save(path)
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self._wb = Workbook(write_only=True)
+        self._leads = None
+        self._lead_count = 0
+
+    def _sheet(self, name: str, tab_color: str, widths: Sequence[int]):
+        ws = self._wb.create_sheet(name)
+        ws.sheet_view.showGridLines = False
+        ws.sheet_properties.tabColor = tab_color
+        _set_widths(ws, widths)
+        return ws
+
+    def _cell(self, ws, value, font, alignment, fill=None, border=None) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = font
+        cell.alignment = alignment
+        if fill is not None:
+            cell.fill = fill
+        if border is not None:
+            cell.border = border
+        return cell
+
+    def _header(self, ws, headers: Sequence[str]) -> None:
+        ws.row_dimensions[1].height = 26
+        ws.append([self._cell(ws, h, _HEADER_FONT, _CENTER, _HEADER_FILL) for h in headers])
+
+    def write_summary(self, report_data: Dict[str, Any]) -> None:
+        """Sheet 1: title banner and the six funnel counters."""
+        ws = self._sheet("Daily Summary", "000000", (30, 16))
+        ws.merged_cells.add("A1:B1")
+        ws.row_dimensions[1].height = 32
+        ws.append([
+            self._cell(ws, f"Cold Scout  ·  {self.title}", _TITLE_FONT, _CENTER, _HEADER_FILL),
+        ])
+        ws.append([])
+        ws.row_dimensions[3].height = 24
+        ws.append([
+            self._cell(ws, "Metric", _HEADER_FONT, _LEFT, _HEADER_FILL),
+            self._cell(ws, "Value", _HEADER_FONT, _CENTER, _HEADER_FILL),
+        ])
+        for i, (label, key) in enumerate(SUMMARY_METRICS):
+            fill = _ALT_FILL if i % 2 == 0 else None
+            ws.row_dimensions[4 + i].height = 22
+            ws.append([
+                self._cell(ws, label, _DATA_FONT, _LEFT, fill, _BORDER_BOTTOM),
+                self._cell(ws, report_data.get(key, 0), _VALUE_FONT, _CENTER, fill, _BORDER_BOTTOM),
+            ])
+
+    def write_daily(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Per-day funnel counters (``funnel_breakdown(..., ["day"])`` rows)."""
+        ws = self._sheet("Daily Breakdown", "1A1A1A", DAILY_COLUMN_WIDTHS)
+        self._header(ws, DAILY_HEADERS)
+        for i, row in enumerate(rows):
+            fill = _ALT_FILL if i % 2 == 0 else None
+            values = (row["day"], row["discovered"], row["qualified"], row["emailed"],
+                      row["opened"], row["clicked"], row["replied"])
+            ws.append([
+                self._cell(ws, value, _DATA_FONT if ci == 0 else _DATA_FONT_MUTED,
+                           _LEFT if ci == 0 else _CENTER, fill, _BORDER_BOTTOM)
+                for ci, value in enumerate(values)
+            ])
+
+    def append_leads(self, leads: Iterable[Dict[str, Any]]) -> None:
+        """Appends to the Lead Details sheet, creating it on first use."""
+        ws = self._leads
+        if ws is None:
+            ws = self._leads = self._sheet("Lead Details", "333333", LEAD_COLUMN_WIDTHS)
+            # Uniform data-row height without a row_dimensions entry per row.
+            ws.sheet_format.defaultRowHeight = 20
+            ws.sheet_format.customHeight = True
+            self._header(ws, LEAD_HEADERS)
+        for lead in leads:
+            fill = _ALT_FILL if self._lead_count % 2 == 0 else None
+            ws.append([
+                self._cell(ws, value, _DATA_FONT if ci == 0 else _DATA_FONT_MUTED,
+                           _LEFT if ci == 0 else _CENTER, fill, _BORDER_BOTTOM)
+                for ci, value in enumerate(lead_row(lead))
+            ])
+            self._lead_count += 1
+
+    def save(self, path: str) -> str:
+        if self._leads is None:
+            self.append_leads(())
+        self._wb.save(path)
+        return path
+
+
+def report_filename(start: date, end: Optional[date] = None) -> str:
+    if end is None or end == start:
+        return f"ColdScout_Report_{start.strftime('%Y-%m-%d')}.xlsx"
+    return f"ColdScout_Report_{start.strftime('%Y-%m-%d')}_{end.strftime('%Y-%m-%d')}.xlsx"
+
 
 def generate_daily_report_excel(report_data: Dict[str, Any], leads: List[Dict[str, Any]], output_date: date) -> str:
     """
-    Compiles daily performance metrics and individual lead properties into 
+    Compiles daily performance metrics and individual lead properties into
     a multi-sheet formatted Excel workbook.
-    
+
     Args:
         report_data (Dict[str, Any]): Dictionary containing foundational daily metrics.
         leads (List[Dict[str, Any]]): Structurally formatted collection of recent lead data.
         output_date (date): The contextual date associated with the report.
-        
+
     Returns:
         str: Expected file path to the synchronously generated Excel document.
     """
-    wb = openpyxl.Workbook()
-    
-    # ── Brand styles ──────────────────────────────────────────────────────────
-    header_font = Font(name="Calibri", bold=True, size=12, color="FFFFFF")
-    header_fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
-    header_align = Alignment(horizontal="left", vertical="center")
-    
-    data_font = Font(name="Calibri", size=11, color="000000")
-    data_font_muted = Font(name="Calibri", size=11, color="666666")
-    alt_fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-    border_bottom = Border(bottom=Side(style="thin", color="EAEAEA"))
-    
-    # ── Sheet 1: Daily Summary ────────────────────────────────────────────────
-    ws1 = wb.active
-    ws1.title = "Daily Summary"
-    ws1.sheet_view.showGridLines = False
-    
-    # Title row
-    ws1.merge_cells("A1:B1")
-    title_cell = ws1.cell(row=1, column=1, value=f"Cold Scout  ·  Daily Report  ·  {output_date}")
-    title_cell.font = Font(name="Calibri", bold=True, size=14, color="FFFFFF")
-    title_cell.fill = header_fill
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-    ws1.row_dimensions[1].height = 32
-    
-    # Column headers
-    ws1.cell(row=3, column=1, value="Metric").font = header_font
-    ws1.cell(row=3, column=1).fill = header_fill
-    ws1.cell(row=3, column=1).alignment = header_align
-    ws1.cell(row=3, column=2, value="Value").font = header_font
-    ws1.cell(row=3, column=2).fill = header_fill
-    ws1.cell(row=3, column=2).alignment = Alignment(horizontal="center", vertical="center")
-    ws1.row_dimensions[3].height = 24
-    
-    metrics = [
-        ("Total leads discovered", report_data.get('leads_discovered', 0)),
-        ("Qualified leads", report_data.get('leads_qualified', 0)),
-        ("Emails sent", report_data.get('emails_sent', 0)),
-        ("Emails opened", report_data.get('emails_opened', 0)),
-        ("Links clicked", report_data.get('links_clicked', 0)),
-        ("Replies received", report_data.get('replies_received', 0)),
-    ]
-    
-    for i, (label, value) in enumerate(metrics):
-        row = 4 + i
-        c1 = ws1.cell(row=row, column=1, value=label)
-        c1.font = data_font
-        c1.border = border_bottom
-        c2 = ws1.cell(row=row, column=2, value=value)
-        c2.font = Font(name="Calibri", bold=True, size=12, color="000000")
-        c2.alignment = Alignment(horizontal="center", vertical="center")
-        c2.border = border_bottom
-        if i % 2 == 0:
-            c1.fill = alt_fill
-            c2.fill = alt_fill
-        ws1.row_dimensions[row].height = 22
-    
-    ws1.column_dimensions['A'].width = 30
-    ws1.column_dimensions['B'].width = 16
-    
-    # ── Sheet 2: Lead Details ─────────────────────────────────────────────────
-    ws2 = wb.create_sheet("Lead Details")
-    ws2.sheet_view.showGridLines = False
-    
-    headers = ["Business", "Category", "Location", "Email Sent", "Opened", "Clicked", "Replied", "Status", "Phone", "Google Maps"]
-    for i, h in enumerate(headers):
-        c = ws2.cell(row=1, column=i + 1, value=h)
-        c.font = header_font
-        c.fill = header_fill
-        c.alignment = Alignment(horizontal="center", vertical="center")
-    ws2.row_dimensions[1].height = 26
-    
-    for ri, lead in enumerate(leads):
-        row = 2 + ri
-        values = [
-            lead.get("business_name"),
-            lead.get("category"),
-            lead.get("city"),
-            "Yes" if lead.get("email_sent_at") else "No",
-            "Yes" if lead.get("first_opened_at") else "No",
-            "Yes" if lead.get("first_clicked_at") else "No",
-            "Yes" if lead.get("first_replied_at") else "No",
-            lead.get("status"),
-            lead.get("phone"),
-            lead.get("google_maps_url")
-        ]
-        for ci, val in enumerate(values):
-            c = ws2.cell(row=row, column=ci + 1, value=val)
-            c.font = data_font if ci == 0 else data_font_muted
-            c.alignment = Alignment(horizontal="center" if ci > 0 else "left", vertical="center")
-            c.border = border_bottom
-            if ri % 2 == 0:
-                c.fill = alt_fill
-        ws2.row_dimensions[row].height = 20
-        
-    for col in ws2.columns:
-        ws2.column_dimensions[col[0].column_letter].width = 18
-    ws2.column_dimensions['A'].width = 28
-    ws2.column_dimensions['J'].width = 36
-    
-    # Tab colors (grayscale)
-    ws1.sheet_properties.tabColor = "000000"
-    ws2.sheet_properties.tabColor = "333333"
-        
+    book = ReportWorkbook(f"Daily Report  ·  {output_date}")
+    book.write_summary(report_data)
+    book.append_leads(leads)
+
     os.makedirs("tmp", exist_ok=True)
-    filename = f"ColdScout_Report_{output_date.strftime('%Y-%m-%d')}.xlsx"
-    filepath = os.path.join("tmp", filename)
-    wb.save(filepath)
-    
-    return filepath
+    return book.save(os.path.join("tmp", report_filename(output_date)))
+
+
+async def write_range_report_excel(
+    path: str,
+    start: date,
+    end: date,
+    report_data: Dict[str, Any],
+    daily_rows: Iterable[Dict[str, Any]],
+    lead_batches: AsyncIterator[List[Dict[str, Any]]],
+) -> str:
+    """
+    Writes a report covering ``start``…``end`` (inclusive) to ``path``.
+
+    Lead rows are consumed batch by batch from ``lead_batches`` (see
+    ``iter_report_leads``), so only one batch is held in memory; the final
+    zip step runs in a worker thread.
+    """
+    book = ReportWorkbook(f"Report  ·  {start}  →  {end}")
+    book.write_summary(report_data)
+    book.write_daily(daily_rows)
+    async for batch in lead_batches:
+        book.append_leads(batch)
+    return await asyncio.to_thread(book.save, path)
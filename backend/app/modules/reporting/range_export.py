@@ -0,0 +1,52 @@
+"""
+Date-range report export.
+Builds the report workbook for an arbitrary date range and streams it back
+in fixed-size chunks.
+
+Memory is bounded end to end: counters come from the ``daily_funnel``
+rollup, lead rows arrive from a server-side cursor one batch at a time and
+are written straight to openpyxl's write-only sheets, and the finished
+``.xlsx`` is read back from a temporary file. An xlsx is a zip whose
+directory is written last, so the first byte is sent once the workbook is
+complete; the temporary file is removed when the stream ends.
+"""
+import asyncio
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import AsyncIterator
+
+from loguru import logger
+
+from app.core.database import get_session_maker
+from app.modules.analytics.daily_funnel import funnel_breakdown
+from app.modules.reporting.daily_metrics import iter_report_leads, report_metrics
+from app.modules.reporting.excel_builder import write_range_report_excel
+
+_CHUNK_BYTES = 64 * 1024
+
+
+async def build_range_report(path: str, start: date, end: date) -> str:
+    """Writes the ``start``…``end`` (inclusive) report workbook to ``path``."""
+    until = end + timedelta(days=1)
+    async with get_session_maker()() as db:
+        report_data = await report_metrics(db, start, until)
+        daily_rows = await funnel_breakdown(db, start, until, ["day"])
+        await write_range_report_excel(
+            path, start, end, report_data, daily_rows, iter_report_leads(db, start, until),
+        )
+    return path
+
+
+async def stream_range_report(start: date, end: date) -> AsyncIterator[bytes]:
+    """Generates the range workbook and yields its bytes in 64 KiB chunks."""
+    fd, path = tempfile.mkstemp(prefix="coldscout_report_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        await build_range_report(path, start, end)
+        logger.info(f"Range report {start} → {end}: {os.path.getsize(path)} bytes")
+        with open(path, "rb") as fh:
+            while chunk := await asyncio.to_thread(fh.read, _CHUNK_BYTES):
+                yield chunk
+    finally:
+        os.remove(path)
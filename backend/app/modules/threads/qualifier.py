@@ -11,9 +11,11 @@ Scoring criteria (0-100):
   40-59:  Weak signals, low priority (C-tier)
   0-39:   Personal account or irrelevant — skip
 
+Profiles are scored ``GROQ_BATCH_SIZE`` per request; any profile the batch
+could not score is re-scored with a single call.
+
 SAFE: Only updates ThreadsProfile records — never touches the leads table directly.
 """
-import json
 from loguru import logger
 from sqlalchemy import select
 from groq import AsyncGroq
@@ -22,6 +24,8 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from app.config import get_settings
 from app.core.database import get_session_maker
 from app.models.threads import ThreadsProfile, ThreadsPost
+from app.modules.personalization.llm_batch import batch_json_completion, chunked
+from app.modules.personalization.llm_cache import cached_json_completion, llm_cache
 
 settings = get_settings()
 
@@ -52,23 +56,29 @@ async def run_threads_qualification() -> dict:
 
         groq_client = AsyncGroq(api_key=settings.GROQ_API_KEY)
 
+        profile_posts: dict = {}
+        for profile in pending_profiles:
+            # Get recent posts for context
+            posts_stmt = (
+                select(ThreadsPost)
+                .where(ThreadsPost.threads_profile_id == profile.id)
+                .order_by(ThreadsPost.created_at.desc())
+                .limit(5)
+            )
+            posts_result = await db.execute(posts_stmt)
+            recent_posts = posts_result.scalars().all()
+            profile_posts[profile.id] = [p.text for p in recent_posts if p.text]
+
+        scores = await _score_profiles_batch(groq_client, pending_profiles, profile_posts)
+
         for profile in pending_profiles:
             try:
-                # Get recent posts for context
-                posts_stmt = (
-                    select(ThreadsPost)
-                    .where(ThreadsPost.threads_profile_id == profile.id)
-                    .order_by(ThreadsPost.created_at.desc())
-                    .limit(5)
-                )
-                posts_result = await db.execute(posts_stmt)
-                recent_posts = posts_result.scalars().all()
-
-                post_texts = [p.text for p in recent_posts if p.text]
-
-                score, notes = await _score_profile(
-                    groq_client, profile, post_texts
-                )
+                if profile.id in scores:
+                    score, notes = scores[profile.id]
+                else:
+                    score, notes = await _score_profile(
+                        groq_client, profile, profile_posts[profile.id], use_cache=True
+                    )
 
                 profile.ai_score = score
                 profile.qualification_notes = notes
@@ -89,27 +99,37 @@ async def run_threads_qualification() -> dict:
 
         await db.commit()
 
-    logger.info(f"Threads qualification complete: {stats}")
+    logger.info(f"Threads qualification complete: {stats} | LLM cache: {llm_cache.snapshot()}")
     return stats
 
 
+_SCORING_INSTRUCTIONS = """
+You are a B2B lead qualification expert. Analyze this Threads profile and determine
+if this person/business would benefit from web development, digital marketing,
+or software services.
+
+Score this profile on a scale of 0-100 based on:
+1. Business indicators (bio mentions business, services, products)
+2. Digital presence need (posts asking about websites, marketing, growth)
+3. Engagement quality (follower count relative to content quality)
+4. Intent signals (explicit requests for help, recommendations, complaints about tech)
+"""
+
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
 async def _score_profile(groq_client: AsyncGroq, profile: ThreadsProfile,
-                          post_texts: list[str]) -> tuple[int, str]:
+                          post_texts: list[str], use_cache: bool = False) -> tuple[int, str]:
     """
     Use Groq/Llama to analyze a Threads profile and assign a lead score.
 
+    With ``use_cache`` a profile whose bio and posts are unchanged since its
+    last scoring is served from the LLM response cache.
+
     Returns:
         Tuple of (score: int 0-100, qualification_notes: str)
     """
-    posts_context = "\n".join(
-        [f"- {text[:200]}" for text in post_texts[:5]]
-    ) if post_texts else "No posts available"
-
     prompt = f"""
-You are a B2B lead qualification expert. Analyze this Threads profile and determine
-if this person/business would benefit from web development, digital marketing,
-or software services.
+{_SCORING_INSTRUCTIONS.strip()}
 
 Profile:
   - Username: @{profile.username or 'unknown'}
@@ -119,13 +139,7 @@ Profile:
   - Verified: {profile.is_verified}
 
 Recent Posts:
-{posts_context}
-
-Score this profile on a scale of 0-100 based on:
-1. Business indicators (bio mentions business, services, products)
-2. Digital presence need (posts asking about websites, marketing, growth)
-3. Engagement quality (follower count relative to content quality)
-4. Intent signals (explicit requests for help, recommendations, complaints about tech)
+{_posts_context(post_texts)}
 
 Return ONLY a valid JSON object:
 {{
@@ -135,14 +149,66 @@ Return ONLY a valid JSON object:
   "detected_industry": "<industry or 'unknown'>"
 }}
 """
-    chat_completion = await groq_client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}],
-        model=settings.GROQ_MODEL,
-        response_format={"type": "json_object"},
-        temperature=0.3,
+    result = await cached_json_completion(
+        groq_client, settings.GROQ_MODEL, prompt,
+        temperature=0.3, use_cache=use_cache,
     )
+    return _score_from_result(result)
+
+
+def _valid_score_result(item: dict) -> bool:
+    score = item.get("score")
+    return (
+        isinstance(score, (int, float)) and not isinstance(score, bool)
+        and 0 <= score <= 100
+        and isinstance(item.get("notes"), str)
+    )
+
+
+async def _score_profiles_batch(groq_client: AsyncGroq, profiles: list[ThreadsProfile],
+                                profile_posts: dict) -> dict:
+    """
+    Scores profiles ``GROQ_BATCH_SIZE`` per Groq request.
+
+    Returns:
+        Dict of profile ID -> (score, notes) for the profiles the batches
+        scored validly; the caller scores the rest with :func:`_score_profile`.
+    """
+    batch_size = settings.GROQ_BATCH_SIZE
+    if batch_size <= 1 or len(profiles) <= 1:
+        return {}
+
+    scores: dict = {}
+    for chunk in chunked(((str(p.id), p) for p in profiles), batch_size):
+        inputs = {
+            profile_id: {
+                "username": profile.username or "unknown",
+                "name": profile.name or "Not provided",
+                "bio": profile.bio or "No bio",
+                "followers": profile.followers_count or 0,
+                "verified": bool(profile.is_verified),
+                "recent_posts": _posts_context(profile_posts.get(profile.id, [])),
+            }
+            for profile_id, profile in chunk
+        }
+        served = await batch_json_completion(
+            groq_client, settings.GROQ_MODEL, _SCORING_INSTRUCTIONS, inputs,
+            result_fields='"score": <0-100>, "notes": "...", "is_business": <true/false>, "detected_industry": "..."',
+            validate=_valid_score_result, temperature=0.3, use_cache=True,
+        )
+        for profile_id, profile in chunk:
+            if profile_id in served:
+                scores[profile.id] = _score_from_result(served[profile_id])
+    return scores
+
+
+def _posts_context(post_texts: list[str]) -> str:
+    return "\n".join(
+        [f"- {text[:200]}" for text in post_texts[:5]]
+    ) if post_texts else "No posts available"
+
 
-    result = json.loads(chat_completion.choices[0].message.content)
+def _score_from_result(result: dict) -> tuple[int, str]:
     score = min(100, max(0, int(result.get("score", 0))))
     notes = result.get("notes", "No notes provided")
 
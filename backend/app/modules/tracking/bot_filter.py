@@ -0,0 +1,181 @@
+"""
+Tracking fast-path filter.
+Decides, in memory and before anything is queued, whether an open or click
+hit is worth recording.
+
+Two checks run on every hit:
+
+  - **Classification**: the user agent is matched against one precompiled
+    pattern per class and the client IP against known proxy/scanner networks:
+
+      * ``scanner``  — security gateways and link checkers (Barracuda,
+        Mimecast, Proofpoint, Safe Links, HTTP libraries) that fetch every
+        pixel and link on delivery.
+      * ``prefetch`` — privacy prefetchers such as Apple Mail Privacy
+        Protection, which load images whether or not the email is read.
+      * ``proxy``    — mail-provider image proxies (Gmail, Yahoo). These fetch
+        when the recipient opens the message, so they count as opens by default.
+
+    Classes listed in ``TRACKING_SUPPRESS_CLASSES`` are dropped.
+
+  - **Deduplication**: an LRU keyed by ``(token, event type, client network)``
+    (IPv4 /24, IPv6 /48) drops repeats within ``TRACKING_DEDUP_WINDOW_SECONDS``.
+    Proxies and scanners fan one logical open out over several hits from
+    neighbouring addresses; those collapse into one event.
+
+Suppressed hits never reach the write-behind buffer or the database.
+"""
+import ipaddress
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+HUMAN = "human"
+SCANNER = "scanner"
+PREFETCH = "prefetch"
+PROXY = "proxy"
+DUPLICATE = "duplicate"
+
+_UA_PATTERNS = (
+    (SCANNER, re.compile(
+        r"barracuda|mimecast|proofpoint|ppops|symantec|messagelabs|trendmicro|"
+        r"fortiguard|sophos|ironport|safelinks|"
+        r"\bbot\b|bot/|crawler|spider|scanner|"
+        r"python-requests|python-urllib|aiohttp|httpx|curl/|wget/|go-http-client|java/|okhttp|libwww",
+        re.IGNORECASE,
+    )),
+    (PROXY, re.compile(r"googleimageproxy|ggpht\.com|yahoomailproxy|via yahoo", re.IGNORECASE)),
+)
+
+# Apple Mail Privacy Protection fetches through Apple's own network (AS714)
+# with a bare "Mozilla/5.0" user agent, so it is recognised by address.
+_DEFAULT_NETWORKS = (
+    (PREFETCH, "17.0.0.0/8"),
+    (PROXY, "66.102.0.0/20"),
+    (PROXY, "66.249.80.0/20"),
+    (PROXY, "74.125.0.0/16"),
+)
+
+_Network = Tuple[str, object]
+
+
+_NETWORK_CLASSES = (SCANNER, PREFETCH, PROXY)
+
+
+def _load_networks(extra: Iterable[str]) -> List[_Network]:
+    """
+    Parses default networks plus ``class:cidr`` entries from settings.
+
+    Raises:
+        ValueError: An entry has no class, an unknown class or a bad network.
+    """
+    networks = [(cls, ipaddress.ip_network(cidr)) for cls, cidr in _DEFAULT_NETWORKS]
+    for entry in extra:
+        cls, sep, cidr = entry.partition(":")
+        cls = cls.strip()
+        if not sep or cls not in _NETWORK_CLASSES:
+            raise ValueError(
+                f"Bot network {entry!r} must be \"class:cidr\" with class one of {', '.join(_NETWORK_CLASSES)}"
+            )
+        try:
+            networks.append((cls, ipaddress.ip_network(cidr.strip(), strict=False)))
+        except ValueError:
+            raise ValueError(f"Bot network {entry!r} has an invalid network {cidr.strip()!r}") from None
+    return networks
+
+
+def client_network(ip: Optional[str]) -> str:
+    """Collapses an address to its /24 (IPv4) or /48 (IPv6) network."""
+    if not ip:
+        return ""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    prefix = 24 if addr.version == 4 else 48
+    return str(ipaddress.ip_network(f"{addr}/{prefix}", strict=False))
+
+
+class TrackingFilter:
+    """
+    In-memory classifier and time-windowed LRU for tracking hits.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300,
+        max_entries: int = 100000,
+        suppress: Iterable[str] = (SCANNER, PREFETCH),
+        networks: Optional[List[_Network]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.suppress = set(suppress)
+        self.networks = networks if networks is not None else _load_networks(())
+        self.clock = clock
+        self._seen: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self.stats = {HUMAN: 0, SCANNER: 0, PREFETCH: 0, PROXY: 0, DUPLICATE: 0, "suppressed": 0}
+
+    def classify(self, ip: Optional[str], user_agent: Optional[str]) -> str:
+        """Returns the hit's class: human, scanner, prefetch or proxy."""
+        ua = user_agent or ""
+        if not ua.strip():
+            return SCANNER
+        for cls, pattern in _UA_PATTERNS:
+            if pattern.search(ua):
+                return cls
+        if ip:
+            try:
+                addr = ipaddress.ip_address(ip)
+            except ValueError:
+                return HUMAN
+            for cls, network in self.networks:
+                if addr.version == network.version and addr in network:
+                    return cls
+        return HUMAN
+
+    def _is_duplicate(self, key: Tuple[str, str, str]) -> bool:
+        now = self.clock()
+        last = self._seen.get(key)
+        if last is not None and now - last < self.window_seconds:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        return False
+
+    def check(self, token: str, event_type: str, ip: Optional[str], user_agent: Optional[str]) -> Tuple[bool, str]:
+        """
+        Classifies and deduplicates one hit.
+
+        Returns:
+            tuple: ``(record, reason)`` — whether the hit should be recorded,
+            and its class (or ``duplicate``).
+        """
+        cls = self.classify(ip, user_agent)
+        if cls in self.suppress:
+            self.stats[cls] += 1
+            self.stats["suppressed"] += 1
+            return False, cls
+        if self._is_duplicate((token, event_type, client_network(ip))):
+            self.stats[DUPLICATE] += 1
+            self.stats["suppressed"] += 1
+            return False, DUPLICATE
+        self.stats[cls] += 1
+        return True, cls
+
+
+tracking_filter = TrackingFilter(
+    window_seconds=settings.TRACKING_DEDUP_WINDOW_SECONDS,
+    max_entries=settings.TRACKING_DEDUP_MAX_ENTRIES,
+    suppress=settings.TRACKING_SUPPRESS_CLASSES,
+    networks=_load_networks(settings.TRACKING_BOT_NETWORKS),
+)
@@ -0,0 +1,105 @@
+"""
+Delivery event ingestion.
+Applies Brevo delivery telemetry (delivered, bounces, spam complaints) to
+``EmailOutreach`` rows in grouped, set-based batches.
+
+The webhook only parses and enqueues events into :data:`delivery_event_buffer`;
+the buffer's flusher calls :func:`apply_delivery_events`, which issues one
+statement per event type for the whole batch instead of one transaction per
+event.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.database import get_session_maker
+from app.core.write_behind import WriteBehindBuffer
+from app.models.campaign import EmailOutreach
+from app.modules.outreach.email_sender import normalize_message_id
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+BOUNCE_EVENTS = {"bounced", "hard_bounce", "soft_bounce", "spam", "blocked"}
+
+
+@dataclass(frozen=True)
+class DeliveryEvent:
+    """One Brevo event, reduced to what the flusher needs."""
+    event: str
+    message_id: str
+    reason: Optional[str] = None
+
+
+def parse_brevo_payload(payload: Any) -> List[DeliveryEvent]:
+    """
+    Extracts actionable events from a Brevo webhook body.
+
+    Brevo posts either a single event object or, with batched webhooks
+    enabled, a JSON array of them. Events without a Message-ID or of a type
+    we do not track are skipped.
+    """
+    items = payload if isinstance(payload, list) else [payload]
+    events = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        event = item.get("event")
+        message_id = normalize_message_id(item.get("message-id"))
+        if not message_id or (event != "delivered" and event not in BOUNCE_EVENTS):
+            continue
+        events.append(DeliveryEvent(event, message_id, item.get("reason") or event))
+    return events
+
+
+async def apply_delivery_events(db: AsyncSession, events: List[DeliveryEvent]) -> None:
+    """
+    Applies a batch of delivery events in one transaction.
+
+    Deliveries are one ``UPDATE ... WHERE brevo_message_id IN (...)``; bounces
+    are one executemany ``UPDATE`` (each carries its own reason). Deliveries
+    run first so a message that was delivered and then complained about ends
+    up ``bounced``. Deliveries only advance rows still in ``sent`` so a late
+    event never overwrites opened/clicked/replied.
+    """
+    delivered = sorted({e.message_id for e in events if e.event == "delivered"})
+    # Last reason wins when one message reports several bounce events.
+    bounced = {e.message_id: e.reason for e in events if e.event in BOUNCE_EVENTS}
+
+    if delivered:
+        await db.execute(
+            update(EmailOutreach)
+            .where(EmailOutreach.brevo_message_id.in_(delivered), EmailOutreach.status == "sent")
+            .values(status="delivered", delivered_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+
+    if bounced:
+        table = EmailOutreach.__table__
+        await db.execute(
+            table.update()
+            .where(table.c.brevo_message_id == bindparam("b_message_id"))
+            .values(status="bounced", bounce_reason=bindparam("b_reason")),
+            [{"b_message_id": mid, "b_reason": reason} for mid, reason in bounced.items()],
+        )
+
+    await db.commit()
+
+
+async def _flush_delivery_events(events: List[DeliveryEvent]) -> None:
+    async with get_session_maker()() as db:
+        await apply_delivery_events(db, events)
+
+
+delivery_event_buffer: WriteBehindBuffer[DeliveryEvent] = WriteBehindBuffer(
+    "brevo-delivery-events",
+    _flush_delivery_events,
+    max_batch=settings.WEBHOOK_FLUSH_BATCH,
+    flush_interval_ms=settings.WEBHOOK_FLUSH_INTERVAL_MS,
+    max_pending=settings.WEBHOOK_BUFFER_MAX,
+)
@@ -2,120 +2,249 @@
 Email engagement tracking module.
 Provides services to process and record interaction events (opens, clicks)
 associated with dispatched outreach campaigns.
+
+The tracking endpoints do not write on the request path: they queue a
+:class:`TrackingEvent` on :data:`tracking_event_buffer` and return. The
+buffer's flusher calls :func:`apply_tracking_events`, which bulk-inserts the
+events and applies first-open / first-click transitions with set-based
+statements. When the buffer is full the request calls
+:func:`record_tracking_events` itself.
+
+Events carry the IDs decoded from the tracking token (see ``token_codec``),
+so nothing is looked up by token string except for legacy tokens.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import insert, select, update
 from fastapi import Request
+import asyncio
 import logging
+from collections import Counter
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
 
+from app.config import get_settings
+from app.core.database import get_session_maker
+from app.core.write_behind import WriteBehindBuffer
 from app.models.email_event import EmailEvent
-from app.models.campaign import EmailOutreach, Campaign
+from app.models.campaign import EmailOutreach
 from app.models.lead import Lead
+from app.modules.analytics.campaign_metrics import record_metrics
+from app.modules.analytics.daily_funnel import count_funnel, record_funnel
+from app.modules.tracking.token_codec import TrackingClaims
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
-class TrackingService:
+# Statuses an open / click may advance from.
+_LEAD_OPEN_FROM = ["email_sent", "queued_for_send", "delivered"]
+_LEAD_CLICK_FROM = ["email_sent", "opened", "queued_for_send", "delivered"]
+_OUTREACH_OPEN_FROM = ["sent", "queued", "sending", "delivered"]
+_OUTREACH_CLICK_FROM = ["sent", "queued", "sending", "delivered", "opened"]
+
+
+@dataclass(frozen=True)
+class TrackingEvent:
+    """A verified open or click, as captured on the request path."""
+    token: str
+    event_type: str
+    lead_id: UUID
+    campaign_id: Optional[UUID] = None
+    outreach_id: Optional[UUID] = None
+    """None for legacy tokens; resolved by token string at flush time."""
+    url_clicked: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def from_request(cls, claims: TrackingClaims, token: str, event_type: str,
+                     request: Request, url_clicked: str = None) -> "TrackingEvent":
+        return cls(
+            token=token,
+            event_type=event_type,
+            lead_id=claims.lead_id,
+            campaign_id=claims.campaign_id,
+            outreach_id=claims.outreach_id,
+            url_clicked=url_clicked,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent", ""),
+        )
+
+
+async def _resolve_outreach(db: AsyncSession, events: List[TrackingEvent]) -> List[TrackingEvent]:
+    """
+    Drops events whose outreach row no longer exists and fills in
+    ``outreach_id`` for legacy tokens.
+
+    Current tokens need one primary-key ``IN`` lookup; only legacy tokens are
+    looked up by token string.
+    """
+    ids = {e.outreach_id for e in events if e.outreach_id}
+    legacy = {e.token for e in events if not e.outreach_id}
+
+    existing = set()
+    if ids:
+        existing = set((await db.execute(
+            select(EmailOutreach.id).where(EmailOutreach.id.in_(ids))
+        )).scalars().all())
+    by_token = {}
+    if legacy:
+        rows = (await db.execute(
+            select(EmailOutreach.id, EmailOutreach.campaign_id, EmailOutreach.tracking_token)
+            .where(EmailOutreach.tracking_token.in_(legacy))
+        )).all()
+        by_token = {row.tracking_token: row for row in rows}
+
+    resolved = []
+    for e in events:
+        if e.outreach_id:
+            if e.outreach_id in existing:
+                resolved.append(e)
+        elif e.token in by_token:
+            row = by_token[e.token]
+            resolved.append(replace(e, outreach_id=row.id, campaign_id=row.campaign_id))
+    return resolved
+
+
+async def apply_tracking_events(db: AsyncSession, events: List[TrackingEvent]) -> List[Lead]:
     """
-    Service class responsible for handling inbound engagement tracking requests.
-    Updates corresponding lead and outreach entities based on interaction metrics.
+    Persists a batch of tracking events in one transaction.
+
+    Statements issued, regardless of batch size: one primary-key lookup
+    confirming the outreach rows still exist, one bulk INSERT into
+    ``email_events``, a handful of set-based UPDATEs for first-open /
+    first-click timestamps and status cascades, and one upsert into the
+    campaign metrics rollup.
+
+    Returns:
+        list: Leads that were clicked for the first time in this batch
+        (``id`` and ``business_name`` loaded), for alerting.
     """
-    @staticmethod
-    async def log_event(db: AsyncSession, token: str, event_type: str, request: Request, url_clicked: str = None) -> Lead:
-        """
-        Records a discrete interaction event against a specific outreach transmission.
-        Updates the progressive state of the associated lead profile.
-        
-        Args:
-            db (AsyncSession): The active asynchronous database session.
-            token (str): The unique base64 tracking token extracted from the request.
-            event_type (str): The classification of the event (e.g., 'open', 'click').
-            request (Request): The raw FastAPI request object containing client metadata.
-            url_clicked (str, optional): The specific target URL if the event was a click.
-            
-        Returns:
-            Lead: The fully updated Lead entity associated with the event, or None if validation fails.
-        """
-        try:
-            stmt = select(EmailOutreach).where(EmailOutreach.tracking_token == token)
-            result = await db.execute(stmt)
-            outreach = result.scalars().first()
-            
-            if not outreach:
-                return None
-                
-            lead_stmt = select(Lead).where(Lead.id == outreach.lead_id)
-            lead_result = await db.execute(lead_stmt)
-            lead = lead_result.scalars().first()
-            
-            if not lead:
-                return None
-                
-            client_ip = request.client.host if request.client else None
-            user_agent = request.headers.get("user-agent", "")
-            
-            event = EmailEvent(
-                lead_id=outreach.lead_id,
-                outreach_id=outreach.id,
-                tracking_token=token,
-                event_type=event_type,
-                url_clicked=url_clicked,
-                ip_address=client_ip,
-                user_agent=user_agent
-            )
-            db.add(event)
-            
-            # Fetch Campaign to increment stats properly
-            campaign_stmt = select(Campaign).where(Campaign.id == outreach.campaign_id)
-            campaign_res = await db.execute(campaign_stmt)
-            campaign = campaign_res.scalars().first()
-
-            if event_type == "open":
-                if not lead.first_opened_at:
-                    lead.first_opened_at = datetime.utcnow()
-                    if campaign:
-                        campaign.emails_opened += 1
-                
-                if lead.status in ["email_sent", "queued_for_send", "delivered"]:
-                    lead.status = "opened"
-                
-                if not outreach.delivered_at:
-                    outreach.delivered_at = datetime.utcnow()
-                
-                # Cascade status upward to outreach level
-                if outreach.status in ["sent", "queued", "delivered"]:
-                    outreach.status = "opened"
-            
-            elif event_type == "click":
-                if not lead.first_clicked_at:
-                    lead.first_clicked_at = datetime.utcnow()
-                    if campaign:
-                        campaign.links_clicked += 1
-                    
-                    # Fire WhatsApp alert on first click
-                    from app.modules.notifications.whatsapp_bot import send_whatsapp_alert
-                    import asyncio
-                    asyncio.create_task(send_whatsapp_alert(f"HOT LEAD ALERT 🔥\n{lead.business_name} just clicked your proposal link!"))
-                    
-                    from app.modules.outreach.followup_engine import cancel_followup_sequence
-                    await cancel_followup_sequence(lead.id, db)
-                        
-                if not lead.first_opened_at:
-                    lead.first_opened_at = datetime.utcnow()
-                    if campaign:
-                        campaign.emails_opened += 1
-                    
-                if lead.status in ["email_sent", "opened", "queued_for_send", "delivered"]:
-                    lead.status = "clicked"
-                    
-                # Cascade status upward to outreach level
-                if outreach.status in ["sent", "queued", "delivered", "opened"]:
-                    outreach.status = "clicked"
-                    
-            await db.commit()
-            return lead
-            
-        except Exception as e:
-            await db.rollback()
-            logger.error(f"Error logging {event_type} event: {e}")
-            return None
+    events = await _resolve_outreach(db, events)
+    if not events:
+        return []
+
+    await db.execute(insert(EmailEvent), [
+        {
+            "lead_id": e.lead_id,
+            "outreach_id": e.outreach_id,
+            "tracking_token": e.token,
+            "event_type": e.event_type,
+            "url_clicked": e.url_clicked,
+            "ip_address": e.ip_address,
+            "user_agent": e.user_agent,
+            "occurred_at": e.occurred_at,
+        }
+        for e in events
+    ])
+
+    now = datetime.utcnow()
+    campaign_of: Dict = {}
+    opened_leads, clicked_leads = set(), set()
+    opened_outreach, clicked_outreach = set(), set()
+    for e in events:
+        campaign_of.setdefault(e.lead_id, e.campaign_id)
+        # A click implies the email was opened.
+        opened_leads.add(e.lead_id)
+        if e.event_type == "click":
+            clicked_leads.add(e.lead_id)
+            clicked_outreach.add(e.outreach_id)
+        else:
+            opened_outreach.add(e.outreach_id)
+
+    # First-open / first-click transitions. RETURNING yields exactly the leads
+    # this batch moved, so campaign metrics are incremented once per lead.
+    first_opened = (await db.execute(
+        update(Lead)
+        .where(Lead.id.in_(opened_leads), Lead.first_opened_at.is_(None))
+        .values(first_opened_at=now)
+        .returning(Lead.id, Lead.city, Lead.category, Lead.lead_tier)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+    first_clicked: List = []
+    if clicked_leads:
+        first_clicked = (await db.execute(
+            update(Lead)
+            .where(Lead.id.in_(clicked_leads), Lead.first_clicked_at.is_(None))
+            .values(first_clicked_at=now, followup_sequence_active=False)
+            .returning(Lead.id, Lead.business_name, Lead.city, Lead.category, Lead.lead_tier)
+            .execution_options(synchronize_session=False)
+        )).all()
+
+    await db.execute(
+        update(Lead)
+        .where(Lead.id.in_(opened_leads - clicked_leads), Lead.status.in_(_LEAD_OPEN_FROM))
+        .values(status="opened")
+        .execution_options(synchronize_session=False)
+    )
+    if clicked_leads:
+        await db.execute(
+            update(Lead)
+            .where(Lead.id.in_(clicked_leads), Lead.status.in_(_LEAD_CLICK_FROM))
+            .values(status="clicked")
+            .execution_options(synchronize_session=False)
+        )
+
+    if opened_outreach:
+        await db.execute(
+            update(EmailOutreach)
+            .where(EmailOutreach.id.in_(opened_outreach), EmailOutreach.delivered_at.is_(None))
+            .values(delivered_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(EmailOutreach)
+            .where(EmailOutreach.id.in_(opened_outreach), EmailOutreach.status.in_(_OUTREACH_OPEN_FROM))
+            .values(status="opened")
+            .execution_options(synchronize_session=False)
+        )
+    if clicked_outreach:
+        await db.execute(
+            update(EmailOutreach)
+            .where(EmailOutreach.id.in_(clicked_outreach), EmailOutreach.status.in_(_OUTREACH_CLICK_FROM))
+            .values(status="clicked")
+            .execution_options(synchronize_session=False)
+        )
+
+    deltas: Dict = {}
+    for row in first_opened:
+        if campaign_of.get(row.id):
+            deltas.setdefault(campaign_of[row.id], Counter())["emails_opened"] += 1
+    for row in first_clicked:
+        if campaign_of.get(row.id):
+            deltas.setdefault(campaign_of[row.id], Counter())["links_clicked"] += 1
+    await record_metrics(db, deltas)
+
+    funnel = count_funnel(((row, now) for row in first_opened), "opened")
+    for key, counts in count_funnel(((row, now) for row in first_clicked), "clicked").items():
+        funnel.setdefault(key, Counter()).update(counts)
+    await record_funnel(db, funnel)
+
+    await db.commit()
+    return list(first_clicked)
+
+
+async def record_tracking_events(db: AsyncSession, events: List[TrackingEvent]) -> None:
+    """Applies ``events`` and sends the hot-lead alert for each first click."""
+    first_clicked = await apply_tracking_events(db, events)
+
+    from app.modules.notifications.whatsapp_bot import send_whatsapp_alert
+    for lead in first_clicked:
+        asyncio.create_task(send_whatsapp_alert(f"HOT LEAD ALERT 🔥\n{lead.business_name} just clicked your proposal link!"))
+
+
+async def _flush_tracking_events(events: List[TrackingEvent]) -> None:
+    async with get_session_maker()() as db:
+        await record_tracking_events(db, events)
+
+
+tracking_event_buffer: WriteBehindBuffer[TrackingEvent] = WriteBehindBuffer(
+    "tracking-events",
+    _flush_tracking_events,
+    max_batch=settings.TRACKING_FLUSH_BATCH,
+    flush_interval_ms=settings.TRACKING_FLUSH_INTERVAL_MS,
+    max_pending=settings.TRACKING_BUFFER_MAX,
+)
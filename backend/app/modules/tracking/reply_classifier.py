@@ -4,15 +4,22 @@ Leverages LLMs to autonomously parse, classify, and draft responses for incoming
 prospect replies based on predefined interaction taxonomy.
 """
 import json
+from typing import Tuple
 from loguru import logger
 from app.modules.personalization.groq_client import GroqClient
+from app.modules.personalization.llm_cache import cached_json_completion
 from app.models.lead import Lead
+from app.modules.tracking.reply_rules import pre_classify
+from app.modules.tracking.reply_tracker import InboundReply
 
 REPLY_CATEGORIES = ["interested", "not_interested", "auto_reply", "wrong_person", "question", "pricing_inquiry"]
 
-async def classify_reply(email_body: str, email_subject: str) -> dict:
+async def classify_reply(email_body: str, email_subject: str, use_cache: bool = False) -> dict:
     """
     Classifies a prospect's email reply into a structured intent category.
+
+    With ``use_cache`` repeated identical replies (auto-responders, templated
+    bounces) reuse the earlier classification instead of a new Groq call.
     
     Returns:
         dict: Contains 'classification', 'confidence', and a 'key_signal' quote.
@@ -33,17 +40,27 @@ Respond ONLY with a valid JSON object:
 """
     try:
         groq_client = GroqClient()
-        chat_completion = await groq_client.client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=groq_client.model,
-            response_format={"type": "json_object"},
-            temperature=0.0
+        return await cached_json_completion(
+            groq_client.client, groq_client.model, prompt,
+            temperature=0.0, use_cache=use_cache,
         )
-        return json.loads(chat_completion.choices[0].message.content)
     except Exception as e:
         logger.error(f"Error classifying reply: {e}")
         return {"classification": "question", "confidence": 0.5, "key_signal": "parsing failed"}
 
+async def classify_inbound(reply: InboundReply) -> Tuple[dict, str]:
+    """
+    Classifies an inbound reply, trying the local rules before the LLM.
+
+    Returns:
+        tuple: ``(classification_data, source)`` where ``source`` is
+        ``"rules"`` or ``"llm"``.
+    """
+    decision = pre_classify(reply)
+    if decision is not None:
+        return decision, "rules"
+    return await classify_reply(reply.body, reply.subject, use_cache=True), "llm"
+
 async def draft_reply_response(lead: Lead, original_reply_body: str, classification: str) -> str:
     """
     Generates a context-aware HTML draft response based on the reply classification.
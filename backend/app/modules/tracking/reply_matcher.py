@@ -0,0 +1,201 @@
+"""
+Reply correlation.
+Resolves every reply of one poll to its lead and outreach email, and applies
+the resulting status changes, in a fixed number of round trips.
+
+A reply is attributed, in order of preference, by:
+
+  1. **Thread** — a Message-ID in its ``In-Reply-To``/``References`` headers
+     that matches an outgoing ``EmailOutreach.brevo_message_id``. This credits
+     the right lead and email even when a colleague answers from another
+     address or the lead has several outreach emails.
+  2. **Sender** — ``lower(leads.email)`` (backed by ``ix_leads_email_lower``)
+     against the normalised sender address, newest lead first, with that
+     lead's most recent outreach email.
+
+Lookups are three set-based queries per poll regardless of reply count, and
+:func:`apply_replies` writes all leads, outreach rows and campaign counters
+in one transaction.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.campaign import EmailOutreach
+from app.models.lead import Lead
+from app.modules.analytics.campaign_metrics import count_by_campaign, record_metrics
+from app.modules.analytics.daily_funnel import count_funnel, record_funnel
+from app.modules.tracking.reply_tracker import InboundReply
+
+logger = logging.getLogger(__name__)
+
+THREAD = "thread"
+SENDER = "sender"
+
+
+@dataclass
+class ReplyMatch:
+    """A reply resolved to its lead, plus the classification filled in later."""
+    reply: InboundReply
+    lead: Lead
+    outreach_id: Optional[UUID]
+    campaign_id: Optional[UUID]
+    matched_by: str
+    classification: Optional[str] = None
+    confidence: Optional[float] = None
+    key_signal: Optional[str] = None
+    decision_source: Optional[str] = None
+    draft: Optional[str] = None
+
+
+async def _outreach_by_message_id(db: AsyncSession, message_ids: set) -> Dict[str, tuple]:
+    if not message_ids:
+        return {}
+    rows = await db.execute(
+        select(
+            EmailOutreach.brevo_message_id, EmailOutreach.id,
+            EmailOutreach.lead_id, EmailOutreach.campaign_id,
+        ).where(EmailOutreach.brevo_message_id.in_(message_ids))
+    )
+    return {row.brevo_message_id: (row.id, row.lead_id, row.campaign_id) for row in rows}
+
+
+async def _latest_outreach(db: AsyncSession, lead_ids: set) -> Dict[UUID, tuple]:
+    """Most recent outreach email per lead, as ``(outreach_id, campaign_id)``."""
+    if not lead_ids:
+        return {}
+    ranked = (
+        select(
+            EmailOutreach.id, EmailOutreach.lead_id, EmailOutreach.campaign_id,
+            func.row_number().over(
+                partition_by=EmailOutreach.lead_id,
+                order_by=EmailOutreach.created_at.desc(),
+            ).label("rn"),
+        )
+        .where(EmailOutreach.lead_id.in_(lead_ids))
+        .subquery()
+    )
+    rows = await db.execute(select(ranked).where(ranked.c.rn == 1))
+    return {row.lead_id: (row.id, row.campaign_id) for row in rows}
+
+
+async def match_replies(db: AsyncSession, replies: List[InboundReply]) -> List[ReplyMatch]:
+    """
+    Resolves ``replies`` to leads that have not replied before.
+
+    Replies without a match, from leads already marked ``replied``, or from a
+    lead that already has an earlier reply in this batch are dropped.
+    """
+    replies = [r for r in replies if r.sender]
+    if not replies:
+        return []
+
+    threads = await _outreach_by_message_id(db, {mid for r in replies for mid in r.references})
+
+    thread_hits = {}
+    for index, reply in enumerate(replies):
+        hit = next((threads[mid] for mid in reply.references if mid in threads), None)
+        if hit is not None:
+            thread_hits[index] = hit
+
+    senders = {r.sender for i, r in enumerate(replies) if i not in thread_hits}
+    conditions = []
+    if thread_hits:
+        conditions.append(Lead.id.in_({hit[1] for hit in thread_hits.values()}))
+    if senders:
+        conditions.append(func.lower(Lead.email).in_(senders))
+    # populate_existing: apply_replies writes through Core, so refresh any
+    # Lead already in the identity map rather than trusting its stale status.
+    leads = (
+        await db.execute(
+            select(Lead).where(or_(*conditions)).order_by(Lead.created_at.desc())
+            .execution_options(populate_existing=True)
+        )
+    ).scalars().all()
+
+    by_id = {lead.id: lead for lead in leads}
+    by_email: Dict[str, Lead] = {}
+    for lead in leads:
+        if lead.email:
+            by_email.setdefault(lead.email.strip().lower(), lead)
+
+    latest = await _latest_outreach(
+        db, {by_email[s].id for s in senders if s in by_email},
+    )
+
+    matches, seen = [], set()
+    for index, reply in enumerate(replies):
+        if index in thread_hits:
+            outreach_id, lead_id, campaign_id = thread_hits[index]
+            lead, matched_by = by_id.get(lead_id), THREAD
+        else:
+            lead, matched_by = by_email.get(reply.sender), SENDER
+            outreach_id, campaign_id = latest.get(lead.id, (None, None)) if lead else (None, None)
+
+        if lead is None or lead.status == "replied" or lead.id in seen:
+            continue
+        seen.add(lead.id)
+        matches.append(ReplyMatch(reply, lead, outreach_id, campaign_id, matched_by))
+
+    return matches
+
+
+async def apply_replies(db: AsyncSession, matches: List[ReplyMatch]) -> None:
+    """
+    Marks the matched leads and outreach emails replied, stops their follow-up
+    sequences and counts the replies per campaign and in the daily funnel, in
+    one transaction.
+    """
+    if not matches:
+        return
+
+    by_lead = {}
+    for m in matches:
+        by_lead.setdefault(m.lead.id, m)
+
+    def per_lead(value):
+        return case({lead_id: value(m) for lead_id, m in by_lead.items()}, value=Lead.id)
+
+    # Only leads this UPDATE transitions are counted: a reply already applied
+    # by an overlapping run (IDLE push vs. scheduled poll) returns no row.
+    replied_ids = set((await db.execute(
+        update(Lead)
+        .where(Lead.id.in_(list(by_lead)), Lead.status != "replied")
+        .values(
+            status="replied",
+            first_replied_at=per_lead(lambda m: m.reply.reply_time),
+            reply_classification=per_lead(lambda m: m.classification),
+            reply_confidence=per_lead(lambda m: m.confidence),
+            reply_key_signal=per_lead(lambda m: m.key_signal),
+            reply_decision_source=per_lead(lambda m: m.decision_source),
+            suggested_reply_draft=per_lead(lambda m: m.draft),
+            followup_sequence_active=False,
+        )
+        .returning(Lead.id)
+        .execution_options(synchronize_session=False)
+    )).scalars())
+    applied = [m for lead_id, m in by_lead.items() if lead_id in replied_ids]
+
+    outreach_ids = [m.outreach_id for m in matches if m.outreach_id is not None]
+    if outreach_ids:
+        await db.execute(
+            update(EmailOutreach)
+            .where(EmailOutreach.id.in_(outreach_ids), EmailOutreach.status != "replied")
+            .values(status="replied")
+            .execution_options(synchronize_session=False)
+        )
+
+    await record_metrics(db, count_by_campaign(
+        (m.campaign_id for m in applied if m.outreach_id is not None), "replies_received",
+    ))
+    await record_funnel(db, count_funnel(((m.lead, m.reply.reply_time) for m in applied), "replied"))
+
+    await db.commit()
+    logger.info(
+        "Applied %d replies (%d by thread)",
+        len(applied), sum(m.matched_by == THREAD for m in applied),
+    )
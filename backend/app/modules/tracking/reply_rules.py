@@ -0,0 +1,116 @@
+"""
+Rule-based reply pre-classifier.
+Settles the obvious replies locally so only ambiguous ones reach the LLM.
+
+Rules, in order:
+
+  1. **Delivery reports** — ``multipart/report`` content, or a sender such as
+     ``mailer-daemon``/``postmaster``, or a failure-notice subject. These are
+     not replies at all; the pipeline drops them before lead matching.
+  2. **Auto-responders** — RFC 3834 ``Auto-Submitted`` (anything but ``no``),
+     ``X-Autoreply``/``X-Autorespond``, ``Precedence: auto_reply|bulk|junk``,
+     or an out-of-office subject.
+  3. **Short opt-outs and refusals** — the new text above the quoted thread
+     is at most ``_SHORT_REPLY_CHARS`` long and is essentially "unsubscribe",
+     "remove me", "not interested", or "no longer works here".
+
+Everything else returns None and goes to ``classify_reply``.
+"""
+import re
+from typing import Optional
+
+from app.modules.tracking.reply_tracker import InboundReply
+
+BOUNCE = "bounce"
+"""Pseudo-class for delivery reports; never stored on a lead."""
+
+_SHORT_REPLY_CHARS = 200
+
+_BOUNCE_SENDER_RE = re.compile(r"^(mailer-daemon|postmaster|mail-daemon|bounces?)([+@.-]|$)", re.IGNORECASE)
+_BOUNCE_SUBJECT_RE = re.compile(
+    r"undeliverable|undelivered mail|delivery status notification|delivery (has )?failed|"
+    r"mail delivery (failed|subsystem)|returned mail|failure notice|could not be delivered",
+    re.IGNORECASE,
+)
+_AUTO_SUBJECT_RE = re.compile(
+    r"^\s*(auto(matic|matische)?[\s_-]*(reply|response|antwort)|autoreply|out of (the )?office|"
+    r"ooo\b|on (vacation|holiday|leave)|away from (the )?office|abwesenheit|absence|r[ée]ponse automatique)",
+    re.IGNORECASE,
+)
+_AUTO_PRECEDENCE = {"auto_reply", "bulk", "junk"}
+
+_QUOTE_START_RE = re.compile(
+    r"^(>|on .+wrote:\s*$|-{2,}\s*original message|from:\s|sent from my )",
+    re.IGNORECASE,
+)
+_OPT_OUT_RE = re.compile(
+    r"^\W*(please\s+)?(unsubscribe( me)?|remove me( from (your|this) (list|mailing list))?|"
+    r"take me off( your| this)?( mailing)? list|opt[\s-]?out|stop( emailing me)?|do not (contact|email) me)\W*$",
+    re.IGNORECASE,
+)
+_REFUSAL_RE = re.compile(
+    r"^\W*(?:(?:no,?\s*)?(?:thanks|thank you)?[\s,.!]*(?:we(?:'| a)re|i(?:'| a)m)?\s*not interested"
+    r"[\s,.!]*(?:thanks|thank you)?|no,?\s*thank(?:s| you))\W*$",
+    re.IGNORECASE,
+)
+_WRONG_PERSON_RE = re.compile(
+    r"\b(no longer (works?|employed|with)|(has|have) left (the|our) (company|business)|wrong (person|address|email))\b",
+    re.IGNORECASE,
+)
+
+
+def _decision(classification: str, confidence: float, key_signal: str) -> dict:
+    return {"classification": classification, "confidence": confidence, "key_signal": key_signal}
+
+
+def new_text(body: str) -> str:
+    """The reply's own text: everything above the first quoted line."""
+    lines = []
+    for line in (body or "").splitlines():
+        if _QUOTE_START_RE.match(line.strip()):
+            break
+        lines.append(line)
+    return " ".join(" ".join(lines).split())
+
+
+def is_bounce(reply: InboundReply) -> bool:
+    """True for delivery-status notifications and mailer-daemon mail."""
+    headers = dict(reply.headers)
+    content_type = headers.get("content-type", "").lower()
+    if content_type.startswith("multipart/report") or "delivery-status" in content_type:
+        return True
+    return bool(_BOUNCE_SENDER_RE.match(reply.sender) or _BOUNCE_SUBJECT_RE.search(reply.subject or ""))
+
+
+def pre_classify(reply: InboundReply) -> Optional[dict]:
+    """
+    Classifies ``reply`` if a rule is confident.
+
+    Returns:
+        dict: Same shape as ``classify_reply`` (``classification``,
+        ``confidence``, ``key_signal``), or None to defer to the LLM.
+    """
+    if is_bounce(reply):
+        return _decision(BOUNCE, 1.0, reply.subject or reply.sender)
+
+    headers = dict(reply.headers)
+    auto_submitted = headers.get("auto-submitted", "").strip().lower()
+    if auto_submitted and auto_submitted != "no":
+        return _decision("auto_reply", 0.99, f"Auto-Submitted: {auto_submitted}")
+    for name in ("x-autoreply", "x-autorespond"):
+        if name in headers:
+            return _decision("auto_reply", 0.99, f"{name}: {headers[name]}")
+    precedence = headers.get("precedence", "").strip().lower()
+    if precedence in _AUTO_PRECEDENCE:
+        return _decision("auto_reply", 0.95, f"Precedence: {precedence}")
+    if _AUTO_SUBJECT_RE.match(reply.subject or ""):
+        return _decision("auto_reply", 0.95, reply.subject)
+
+    text = new_text(reply.body)
+    if not text or len(text) > _SHORT_REPLY_CHARS:
+        return None
+    if _OPT_OUT_RE.match(text) or _REFUSAL_RE.match(text):
+        return _decision("not_interested", 0.95, text)
+    if _WRONG_PERSON_RE.search(text):
+        return _decision("wrong_person", 0.9, text)
+    return None
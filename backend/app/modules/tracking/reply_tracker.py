@@ -2,100 +2,505 @@
 Inbound reply tracking module.
 Establishes secure IMAP connections to monitor configured mailboxes for
 direct responses from generated leads.
+
+The poller is asynchronous (``aioimaplib``) and incremental:
+
+  - The mailbox's UIDVALIDITY and the highest UID already processed are kept
+    in ``mailbox_checkpoints``. Each poll asks only for UIDs above that mark
+    (``UID SEARCH UID <last+1>:*``) and downloads them with one ``UID FETCH``
+    per ``IMAP_FETCH_BATCH`` messages, so polling cost tracks new mail rather
+    than inbox size.
+  - Without a checkpoint (first run, or first run after upgrading), the
+    mark is seeded from the mailbox's ``UIDNEXT`` and nothing is fetched, so
+    mail handled before the upgrade is not alerted on or classified again.
+  - After UIDVALIDITY changes (or if the server reports no ``UIDNEXT``) the
+    poll falls back to ``SINCE <date>`` bounded by
+    ``IMAP_INITIAL_LOOKBACK_MINUTES``.
+  - The caller saves the returned checkpoint only after it has processed the
+    replies, so a crash re-delivers rather than loses them.
+
+Messages are never downloaded whole. The first ``UID FETCH`` asks for
+``BODYSTRUCTURE`` and only the header fields the pipeline reads (sender,
+subject, date, threading and auto-reply markers); the first ``text/plain``
+part is located in the structure and fetched on its own, capped at
+``IMAP_BODY_MAX_BYTES``. Attachments, HTML alternatives and forwarded
+messages stay on the server, and ``BODY.PEEK`` leaves the ``\\Seen`` flag
+untouched.
+
+:class:`ReplyIdleListener` optionally holds an IDLE connection and triggers a
+poll as soon as the server reports new mail.
 """
-import imaplib
+import asyncio
+import binascii
 import email
-from email.header import decode_header
-from typing import List, Tuple
-from app.config import get_settings
-settings = get_settings()
-import logging
-from datetime import datetime
 import email.utils
+import logging
+import quopri
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.header import decode_header, make_header
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import aioimaplib
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.mailbox_checkpoint import MailboxCheckpoint
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
-async def fetch_recent_replies(since_minutes: int = 30) -> List[Tuple[str, str, datetime]]:
+_UIDVALIDITY_RE = re.compile(rb"UIDVALIDITY (\d+)")
+_UIDNEXT_RE = re.compile(rb"UIDNEXT (\d+)")
+_FETCH_START_RE = re.compile(rb"^\d+ FETCH \(")
+_UID_RE = re.compile(rb"\bUID (\d+)")
+_MESSAGE_ID_RE = re.compile(r"<[^<>\s]+>")
+_SEXP_TOKEN_RE = re.compile(rb'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+')
+
+# Auto-reply / DSN markers are fetched for the rule-based pre-classifier.
+HEADER_FIELDS = (
+    "BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE IN-REPLY-TO REFERENCES "
+    "AUTO-SUBMITTED X-AUTOREPLY X-AUTORESPOND PRECEDENCE CONTENT-TYPE)]"
+)
+_CLASSIFIER_HEADERS = ("auto-submitted", "x-autoreply", "x-autorespond", "precedence", "content-type")
+
+
+class InboundReply(NamedTuple):
+    """One parsed inbound message."""
+    sender: str
+    subject: str
+    reply_time: datetime
+    body: str
+    references: Tuple[str, ...] = ()
+    """Message-IDs this message answers: In-Reply-To first, then References newest-first."""
+    headers: Tuple[Tuple[str, str], ...] = ()
+    """Auto-reply and report markers (lowercased names) present on the message."""
+
+
+@dataclass
+class ReplyBatch:
+    """Replies fetched by one poll, plus the checkpoint to save once processed."""
+    replies: List[InboundReply]
+    mailbox: str
+    uid_validity: Optional[int] = None
+    last_uid: int = 0
+
+
+def mailbox_key() -> str:
+    """Checkpoint key for the configured account and mailbox."""
+    return f"{settings.IMAP_USER}@{settings.IMAP_HOST}/{settings.IMAP_MAILBOX}"
+
+
+async def load_checkpoint(db: AsyncSession, mailbox: str) -> Optional[MailboxCheckpoint]:
+    return await db.get(MailboxCheckpoint, mailbox)
+
+
+async def save_checkpoint(db: AsyncSession, batch: ReplyBatch) -> None:
+    """Persists the high-water mark from ``batch`` (no-op if nothing was read)."""
+    if batch.uid_validity is None:
+        return
+    checkpoint = await db.get(MailboxCheckpoint, batch.mailbox)
+    if checkpoint is None:
+        db.add(MailboxCheckpoint(
+            mailbox=batch.mailbox, uid_validity=batch.uid_validity, last_uid=batch.last_uid,
+        ))
+    else:
+        if checkpoint.uid_validity != batch.uid_validity:
+            checkpoint.uid_validity = batch.uid_validity
+            checkpoint.last_uid = batch.last_uid
+        else:
+            checkpoint.last_uid = max(checkpoint.last_uid, batch.last_uid)
+    await db.commit()
+
+
+def _decode(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    try:
+        return str(make_header(decode_header(value)))
+    except Exception:
+        return value
+
+
+def parse_headers(raw_headers: bytes, body: str = "") -> Optional[InboundReply]:
+    """Builds a reply from fetched header fields and an already-decoded body."""
+    msg = email.message_from_bytes(bytes(raw_headers))
+
+    sender = email.utils.parseaddr(msg.get("From", ""))[1]
+    if not sender:
+        return None
+
+    try:
+        reply_time = email.utils.parsedate_to_datetime(msg.get("Date")).replace(tzinfo=None)
+    except Exception:
+        reply_time = datetime.utcnow()
+
+    references = _MESSAGE_ID_RE.findall(msg.get("In-Reply-To", ""))
+    references += reversed(_MESSAGE_ID_RE.findall(msg.get("References", "")))
+
+    return InboundReply(
+        sender.lower().strip(), _decode(msg.get("Subject")), reply_time, body,
+        tuple(dict.fromkeys(references)),
+        tuple((name, str(msg[name])) for name in _CLASSIFIER_HEADERS if msg[name] is not None),
+    )
+
+
+class FetchItem(NamedTuple):
+    """One ``* n FETCH (...)`` response: its UID, the non-literal text and the literals."""
+    uid: int
+    meta: bytes
+    literals: List[bytes]
+
+
+def parse_fetch_items(lines: List) -> List[FetchItem]:
     """
-    Connects to the designated IMAP server to retrieve recent, unseen email communications.
-    Parses the sender and subject headers for subsequent processing and lead matching.
-    
+    Groups a ``UID FETCH`` response into per-message items.
+
+    aioimaplib returns each ``* n FETCH (... {size}`` line as bytes, followed
+    by the literal as a bytearray and then the rest of the item (possibly
+    more data items, closing with ``)``). The UID may appear before or after
+    the literal, so it is read from all of the item's text.
+    """
+    items = []
+    meta, literals = None, []
+
+    def close():
+        match = _UID_RE.search(meta)
+        if match:
+            items.append(FetchItem(int(match.group(1)), meta, literals))
+
+    for line in lines:
+        if isinstance(line, bytearray):
+            if meta is not None:
+                literals.append(bytes(line))
+            continue
+        if _FETCH_START_RE.match(line):
+            if meta is not None:
+                close()
+            meta, literals = bytes(line), []
+        elif meta is not None:
+            meta += b" " + bytes(line)
+    if meta is not None:
+        close()
+    return items
+
+
+def _parse_sexp(data: bytes) -> list:
+    """Parses an IMAP parenthesised list into nested lists of str/None."""
+    stack = [[]]
+    for match in _SEXP_TOKEN_RE.finditer(data):
+        tok = match.group()
+        if tok == b"(":
+            stack.append([])
+        elif tok == b")":
+            if len(stack) == 1:
+                break
+            done = stack.pop()
+            stack[-1].append(done)
+        elif tok.startswith(b'"'):
+            stack[-1].append(re.sub(rb"\\(.)", rb"\1", tok[1:-1]).decode("utf-8", "replace"))
+        elif tok.upper() == b"NIL":
+            stack[-1].append(None)
+        else:
+            stack[-1].append(tok.decode("ascii", "replace"))
+    return stack[0]
+
+
+def parse_bodystructure(meta: bytes) -> Optional[list]:
+    """Extracts and parses the ``BODYSTRUCTURE (...)`` list from a FETCH item."""
+    start = meta.find(b"BODYSTRUCTURE (")
+    if start < 0:
+        return None
+    start += len(b"BODYSTRUCTURE ")
+    depth, in_quote, escaped = 0, False, False
+    for i in range(start, len(meta)):
+        ch = meta[i:i + 1]
+        if in_quote:
+            if escaped:
+                escaped = False
+            elif ch == b"\\":
+                escaped = True
+            elif ch == b'"':
+                in_quote = False
+        elif ch == b'"':
+            in_quote = True
+        elif ch == b"(":
+            depth += 1
+        elif ch == b")":
+            depth -= 1
+            if depth == 0:
+                parsed = _parse_sexp(meta[start:i + 1])
+                return parsed[0] if parsed else None
+    return None
+
+
+class TextPart(NamedTuple):
+    """Where a message's plain-text body lives and how it is encoded."""
+    section: str
+    charset: Optional[str]
+    encoding: Optional[str]
+
+
+def _param(params, name: str) -> Optional[str]:
+    if not isinstance(params, list):
+        return None
+    for key, value in zip(params[::2], params[1::2]):
+        if isinstance(key, str) and key.upper() == name:
+            return value
+    return None
+
+
+def find_text_part(structure: Optional[list], section: str = "") -> Optional[TextPart]:
+    """
+    Depth-first search for the first inline ``text/plain`` part.
+
+    Multipart bodies list their children first, followed by the subtype;
+    children are numbered ``1``, ``2``, ... and nested as ``1.2``. A
+    single-part message's body is section ``1``. Forwarded messages
+    (``message/rfc822``) and attachments are not descended into.
+    """
+    if not structure:
+        return None
+    if isinstance(structure[0], list):
+        children = []
+        for node in structure:
+            if not isinstance(node, list):
+                break
+            children.append(node)
+        for index, child in enumerate(children, start=1):
+            found = find_text_part(child, f"{section}.{index}" if section else str(index))
+            if found:
+                return found
+        return None
+
+    kind = (structure[0] or "").upper()
+    subtype = (structure[1] or "").upper() if len(structure) > 1 else ""
+    if kind != "TEXT" or subtype != "PLAIN":
+        return None
+    disposition = structure[9] if len(structure) > 9 else None
+    if isinstance(disposition, list) and (disposition[0] or "").upper() == "ATTACHMENT":
+        return None
+    return TextPart(
+        section=section or "1",
+        charset=_param(structure[2] if len(structure) > 2 else None, "CHARSET"),
+        encoding=structure[5] if len(structure) > 5 else None,
+    )
+
+
+def decode_text_part(data: bytes, part: TextPart) -> str:
+    """Decodes a (possibly truncated) text part to str."""
+    encoding = (part.encoding or "").upper()
+    try:
+        if encoding == "BASE64":
+            data = re.sub(rb"\s+", b"", data)
+            data = binascii.a2b_base64(data[:len(data) - len(data) % 4])
+        elif encoding == "QUOTED-PRINTABLE":
+            data = quopri.decodestring(data)
+    except (binascii.Error, ValueError):
+        pass
+    try:
+        return data.decode(part.charset or "utf-8", errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def _check(response, command: str) -> None:
+    if response.result != "OK":
+        raise RuntimeError(f"IMAP {command} failed: {response.result} {response.lines[-1:]}")
+
+
+async def _connect() -> aioimaplib.IMAP4_SSL:
+    imap = aioimaplib.IMAP4_SSL(host=settings.IMAP_HOST, timeout=30)
+    await imap.wait_hello_from_server()
+    _check(await imap.login(settings.IMAP_USER, settings.IMAP_PASSWORD), "LOGIN")
+    return imap
+
+
+async def _select(imap: aioimaplib.IMAP4_SSL) -> Tuple[int, Optional[int]]:
+    """Selects the mailbox and returns its UIDVALIDITY and UIDNEXT (if reported)."""
+    response = await imap.select(settings.IMAP_MAILBOX)
+    _check(response, "SELECT")
+    uid_validity = uid_next = None
+    for line in response.lines:
+        match = _UIDVALIDITY_RE.search(bytes(line))
+        if match:
+            uid_validity = int(match.group(1))
+        match = _UIDNEXT_RE.search(bytes(line))
+        if match:
+            uid_next = int(match.group(1))
+    if uid_validity is None:
+        raise RuntimeError("IMAP SELECT response carried no UIDVALIDITY")
+    return uid_validity, uid_next
+
+
+async def _new_uids(imap: aioimaplib.IMAP4_SSL, last_uid: Optional[int]) -> List[int]:
+    if last_uid is None:
+        since = datetime.utcnow() - timedelta(minutes=settings.IMAP_INITIAL_LOOKBACK_MINUTES)
+        criteria = f"SINCE {since.strftime('%d-%b-%Y')}"
+    else:
+        criteria = f"UID {last_uid + 1}:*"
+    response = await imap.uid_search(criteria, charset=None)
+    _check(response, "UID SEARCH")
+    uids = []
+    for line in response.lines[:-1]:
+        uids.extend(int(tok) for tok in bytes(line).split() if tok.isdigit())
+    # "n:*" always matches the highest UID, even when it is below n.
+    return sorted(uid for uid in set(uids) if last_uid is None or uid > last_uid)
+
+
+async def _fetch_replies(imap: aioimaplib.IMAP4_SSL, uids: List[int]) -> List[tuple]:
+    """
+    Fetches headers and plain-text bodies for ``uids``.
+
+    One command for header fields and structure, then one per distinct text
+    section (most messages share ``1`` or ``1.1``) for the capped body.
+
+    Returns:
+        list: ``(uid, InboundReply or None)`` in UID order.
+    """
+    response = await imap.uid(
+        "fetch", ",".join(map(str, uids)), f"(UID BODYSTRUCTURE {HEADER_FIELDS})",
+    )
+    _check(response, "UID FETCH")
+
+    headers: Dict[int, bytes] = {}
+    parts: Dict[int, TextPart] = {}
+    by_section: Dict[str, List[int]] = {}
+    for item in parse_fetch_items(response.lines):
+        headers[item.uid] = item.literals[0] if item.literals else b""
+        part = find_text_part(parse_bodystructure(item.meta))
+        if part is not None:
+            parts[item.uid] = part
+            by_section.setdefault(part.section, []).append(item.uid)
+
+    bodies: Dict[int, str] = {}
+    for section, section_uids in by_section.items():
+        response = await imap.uid(
+            "fetch", ",".join(map(str, section_uids)),
+            f"(BODY.PEEK[{section}]<0.{settings.IMAP_BODY_MAX_BYTES}>)",
+        )
+        _check(response, "UID FETCH")
+        for item in parse_fetch_items(response.lines):
+            if item.uid in parts and item.literals:
+                bodies[item.uid] = decode_text_part(item.literals[0], parts[item.uid])
+
+    return [(uid, parse_headers(headers[uid], bodies.get(uid, ""))) for uid in sorted(headers)]
+
+
+async def fetch_recent_replies(checkpoint: Optional[MailboxCheckpoint] = None) -> ReplyBatch:
+    """
+    Fetches messages that arrived after ``checkpoint``.
+
     Args:
-        since_minutes (int, optional): The time window in minutes to bound the search. Defaults to 30.
-        
+        checkpoint: The mailbox's saved high-water mark (see :func:`load_checkpoint`).
+
     Returns:
-        List[Tuple[str, str]]: A list of tuples containing the extracted sender email and subject string.
+        ReplyBatch: Parsed replies in UID order and the checkpoint to save
+        after they are processed. Empty (and nothing to save) on errors.
     """
+    batch = ReplyBatch(replies=[], mailbox=mailbox_key())
     if not settings.IMAP_USER or not settings.IMAP_PASSWORD:
         logger.warning("IMAP credentials not set, skipping reply polling.")
-        return []
+        return batch
 
+    imap = None
     try:
-        mail = imaplib.IMAP4_SSL(settings.IMAP_HOST)
-        mail.login(settings.IMAP_USER, settings.IMAP_PASSWORD)
-        mail.select("inbox")
-        
-        status, messages = mail.search(None, "UNSEEN")
-        if status != "OK":
-            mail.logout()
-            return []
-            
-        email_ids = messages[0].split()
-        results = []
-        
-        for e_id in email_ids[-50:]:
-            status, msg_data = mail.fetch(e_id, "(RFC822)")
-            if status != "OK":
-                continue
-                
-            for response_part in msg_data:
-                if isinstance(response_part, tuple):
-                    msg = email.message_from_bytes(response_part[1])
-                    
-                    subject, encoding = decode_header(msg["Subject"])[0]
-                    if isinstance(subject, bytes):
-                        subject = subject.decode(encoding if encoding else "utf-8")
-                        
-                    sender = msg.get("From", "")
-                    if not sender:
-                        continue
-                        
-                    if "<" in sender and ">" in sender:
-                        sender = sender.split("<")[1].split(">")[0]
-                        
-                    date_str = msg.get("Date")
-                    try:
-                        reply_time = email.utils.parsedate_to_datetime(date_str).replace(tzinfo=None)
-                    except:
-                        reply_time = datetime.utcnow()
-                        
-                    body = ""
-                    if msg.is_multipart():
-                        for part in msg.walk():
-                            if part.get_content_type() == "text/plain":
-                                try:
-                                    body = part.get_payload(decode=True).decode()
-                                    break
-                                except:
-                                    pass
-                    else:
-                        try:
-                            body = msg.get_payload(decode=True).decode()
-                        except:
-                            pass
-                            
-                    if sender:
-                        results.append((sender.lower().strip(), subject, reply_time, body))
-        
-        mail.logout()
-        return results
+        imap = await _connect()
+        uid_validity, uid_next = await _select(imap)
+
+        if checkpoint is None and uid_next is not None:
+            # Start from now: earlier mail predates checkpointing and has
+            # already been handled.
+            logger.info(f"No IMAP checkpoint for {batch.mailbox}; starting after UID {uid_next - 1}")
+            batch.uid_validity = uid_validity
+            batch.last_uid = uid_next - 1
+            return batch
+
+        last_uid = None
+        if checkpoint is not None and checkpoint.uid_validity == uid_validity:
+            last_uid = checkpoint.last_uid
+        elif checkpoint is not None:
+            logger.warning("IMAP UIDVALIDITY changed; rescanning recent mail")
+
+        uids = await _new_uids(imap, last_uid)
+        highest = last_uid or 0
+        for start in range(0, len(uids), settings.IMAP_FETCH_BATCH):
+            chunk = uids[start:start + settings.IMAP_FETCH_BATCH]
+            for uid, reply in await _fetch_replies(imap, chunk):
+                highest = max(highest, uid)
+                if reply is not None:
+                    batch.replies.append(reply)
+        # Also advance past UIDs the server listed but returned nothing for.
+        if uids:
+            highest = max(highest, uids[-1])
+
+        batch.uid_validity = uid_validity
+        batch.last_uid = highest
+        return batch
 
     except Exception as e:
         logger.error(f"Error checking replies via IMAP: {e}")
-        return []
+        return ReplyBatch(replies=[], mailbox=batch.mailbox)
     finally:
-        try:
-            if 'mail' in locals() and mail:
-                mail.logout()
-        except:
-            pass
+        if imap is not None:
+            try:
+                await imap.logout()
+            except Exception:
+                pass
+
+
+class ReplyIdleListener:
+    """
+    Holds an IMAP IDLE connection and calls ``on_new_mail`` when the server
+    reports new messages (``EXISTS``), re-issuing IDLE every
+    ``IMAP_IDLE_SECONDS`` and reconnecting with backoff on errors.
+    """
+
+    def __init__(self, on_new_mail: Callable[[], Awaitable[None]]):
+        self.on_new_mail = on_new_mail
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = 5
+        while True:
+            imap = None
+            try:
+                imap = await _connect()
+                await _select(imap)
+                delay = 5
+                while True:
+                    idle = await imap.idle_start(timeout=settings.IMAP_IDLE_SECONDS)
+                    try:
+                        push = await imap.wait_server_push(timeout=settings.IMAP_IDLE_SECONDS)
+                    except asyncio.TimeoutError:
+                        push = []
+                    imap.idle_done()
+                    await asyncio.wait_for(idle, 30)
+                    if isinstance(push, list) and any(b"EXISTS" in bytes(line) for line in push):
+                        await self.on_new_mail()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"IMAP IDLE connection lost ({e}); reconnecting in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 300)
+            finally:
+                if imap is not None:
+                    try:
+                        await imap.logout()
+                    except Exception:
+                        pass
@@ -58,6 +58,7 @@ class LeadResponse(LeadBase):
     reply_confidence: Optional[float] = None
     suggested_reply_draft: Optional[str] = None
     reply_key_signal: Optional[str] = None
+    reply_decision_source: Optional[str] = None
     lead_tier: Optional[str] = None
     website_title: Optional[str] = None
     website_copyright_year: Optional[int] = None
@@ -77,8 +78,10 @@ class LeadUpdate(BaseModel):
     notes: Optional[str] = None
 
 class LeadListResponse(BaseModel):
-    """Paginated response schema for multiple leads."""
+    """One keyset page of leads; follow ``next_cursor``/``prev_cursor`` to move."""
     leads: List[LeadResponse]
     total: int
-    page: int
-    pages: int
+    total_exact: bool
+    limit: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
@@ -18,3 +18,16 @@ class ReportResponse(BaseModel):
     pipeline_ended_at: Optional[datetime] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+class FunnelRow(BaseModel):
+    """One group of the daily funnel rollup; grouping keys not requested are omitted."""
+    day: Optional[date] = None
+    city: Optional[str] = None
+    category: Optional[str] = None
+    tier: Optional[str] = None
+    discovered: int
+    qualified: int
+    emailed: int
+    opened: int
+    clicked: int
+    replied: int
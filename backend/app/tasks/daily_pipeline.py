@@ -3,19 +3,19 @@ Daily lead generation pipeline execution module.
 Orchestrates discovery, qualification, personalization, outreach, and reporting workflows.
 """
 import asyncio
-import base64
 import os
+import time
+import uuid
 from datetime import date, datetime, timedelta
 from loguru import logger
 from app.core.job_manager import job_manager
 from app.core.locks import advisory_lock
 
 
-from sqlalchemy import select, func, update
+from sqlalchemy import select
 from app.core.database import get_session_maker
 from app.models.lead import Lead, SearchHistory
 from app.models.campaign import Campaign, EmailOutreach
-from app.models.email_event import EmailEvent
 from app.models.daily_report import DailyReport
 from app.config import get_settings
 
@@ -26,13 +26,34 @@ from app.modules.discovery.google_places import GooglePlacesClient
 from app.modules.discovery.scraper import scrape_contact_email
 from app.modules.qualification.scorer import qualify_lead
 from app.modules.personalization.groq_client import GroqClient
+from app.modules.personalization.llm_cache import llm_cache
 from app.modules.personalization.email_generator import render_email_html
-from app.modules.personalization.pdf_generator import generate_proposal_pdf
-from app.modules.outreach.email_sender import send_email
-from app.modules.tracking.reply_tracker import fetch_recent_replies
+from app.modules.outreach import outbox
+from app.modules.outreach.dispatch_scheduler import count_sent_today, dispatch_scheduler
+from app.modules.outreach.email_sender import make_message_id, send_email
+from app.modules.outreach.sender_pool import (
+    count_sent_today_by_sender,
+    send_with_failover,
+    sender_pool,
+)
+from app.modules.tracking.reply_matcher import apply_replies, match_replies
+from app.modules.tracking.reply_tracker import (
+    fetch_recent_replies,
+    load_checkpoint,
+    mailbox_key,
+    save_checkpoint,
+)
+from app.modules.tracking.token_codec import encode_tracking_token
+from app.modules.analytics.daily_funnel import count_funnel, record_funnel, retier_discovered
+from app.modules.reporting.daily_metrics import daily_report_leads, daily_report_metrics
 from app.modules.reporting.excel_builder import generate_daily_report_excel
 from app.modules.reporting.email_reporter import send_daily_report_email
-from app.modules.personalization.proposal_xlsx_generator import generate_proposal_xlsx
+from app.modules.personalization.proposal_artifacts import (
+    build_proposal_context,
+    proposal_filenames,
+    resolve_proposal_attachments,
+)
+from app.modules.outreach.artifact_store import artifact_store
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -56,6 +77,7 @@ async def run_discovery_stage(manual: bool = False):
 
     async with advisory_lock("pipeline_discovery"):
         discovered_count = 0
+        discovered_leads: list[Lead] = []
         client = GooglePlacesClient()
         groq_client = GroqClient()
         seen_place_ids: set = set()
@@ -89,7 +111,7 @@ async def run_discovery_stage(manual: bool = False):
                 exclude_categories = list({h.category for h in recent_searches})
 
                 targets = await groq_client.generate_daily_targets(
-                    exclude_cities, exclude_categories
+                    exclude_cities, exclude_categories, use_cache=True
                 )
                 logger.info(f"Generated targets for today: {targets}")
 
@@ -138,6 +160,7 @@ async def run_discovery_stage(manual: bool = False):
 
                         lead = Lead(
                             place_id       = place["id"],
+                            discovered_at  = datetime.utcnow(),
                             business_name  = place.get("displayName", {}).get("text", "Unknown"),
                             category       = category,
                             address        = place.get("formattedAddress"),
@@ -153,8 +176,12 @@ async def run_discovery_stage(manual: bool = False):
                             notes          = "",
                         )
                         db.add(lead)
+                        discovered_leads.append(lead)
                         discovered_count += 1
 
+                await record_funnel(db, count_funnel(
+                    ((lead, lead.discovered_at) for lead in discovered_leads), "discovered"
+                ))
                 db_report.pipeline_status   = "completed"
                 db_report.pipeline_ended_at = datetime.utcnow()
                 await db.commit()
@@ -232,6 +259,13 @@ async def run_qualification_stage(manual: bool = False):
                     lead.status = "rejected"
 
             if leads:
+                await record_funnel(db, count_funnel(
+                    ((lead, lead.qualified_at) for lead in leads
+                     if lead.status in ("qualified", "phone_qualified")),
+                    "qualified",
+                ))
+                # Discovery counted these leads untiered; file them under their tier.
+                await record_funnel(db, retier_discovered(leads))
                 await db.commit()
 
             if qualified_count > 0 or phone_qualified_count > 0:
@@ -270,36 +304,6 @@ async def run_qualification_stage(manual: bool = False):
                 )
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-# Helpers
-# ─────────────────────────────────────────────────────────────────────────────
-
-import hmac
-import hashlib
-
-def _generate_tracking_token(lead_id, campaign_id) -> str:
-    """
-    Generates a secure, URL-safe base64 token for tracking email engagement.
-    Includes an HMAC signature for integrity and to prevent IDOR attacks.
-    """
-    payload = f"{lead_id}_{campaign_id}"
-    secret = settings.SECURITY_SALT.encode()
-    
-    # Calculate signature
-    signature = hmac.new(
-        secret,
-        payload.encode(),
-        hashlib.sha256
-    ).digest()
-    
-    # Bundle payload + signature
-    # Format: base64(payload) . base64(signature)
-    b64_payload = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
-    b64_sig = base64.urlsafe_b64encode(signature).decode().rstrip("=")
-    
-    return f"{b64_payload}.{b64_sig}"
-
-
 # ─────────────────────────────────────────────────────────────────────────────
 # Stage 3 — Personalization  (email-qualified leads only)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -307,7 +311,8 @@ def _generate_tracking_token(lead_id, campaign_id) -> str:
 async def run_personalization_stage(manual: bool = False):
     """
     Executes the personalization phase of the lead generation pipeline.
-    Constructs tailored proposal content and PDFs, then queues emails.
+    Generates tailored email content and queues emails together with the
+    render context for their proposal attachments.
 
     Only processes leads with status = "qualified" (has email).
     Phone-qualified leads are handled manually via the alerts sent in Stage 2.
@@ -340,6 +345,8 @@ async def run_personalization_stage(manual: bool = False):
             )
             leads = result.scalars().all()
 
+            # 1. Enrichment context per lead
+            lead_inputs: dict = {}
             for lead in leads:
                 try:
                     website_content: dict = {}
@@ -358,8 +365,7 @@ async def run_personalization_stage(manual: bool = False):
                     from app.modules.enrichment.competitor_finder import find_top_competitor
                     competitor = await find_top_competitor(lead.category, lead.city, db)
 
-                    # 1. AI-generated email content
-                    ai_data = await groq_client.generate_email_content({
+                    lead_inputs[lead.id] = {
                         "business_name":     lead.business_name,
                         "category":          lead.category,
                         "location":          lead.city,
@@ -371,34 +377,33 @@ async def run_personalization_stage(manual: bool = False):
                         "website_year":      website_content.get("copyright_year"),
                         "is_mobile":         website_content.get("is_mobile_responsive", True),
                         "competitor_name":   competitor["name"] if competitor else None,
-                    })
-
-                    # 2. PDF Proposal — modern multi-section visual document
-                    pdf_path = generate_proposal_pdf(
-                        business_name=lead.business_name,
-                        category=lead.category,
-                        benefits=ai_data.get('benefits', []),
-                        output_filename=f"Proposal_{lead.id}.pdf",
-                        rating=lead.rating,
-                        review_count=lead.review_count,
-                        city=lead.city,
-                        qualification_notes=lead.qualification_notes,
-                    )
+                    }
+                except Exception as e:
+                    logger.error(f"Personalization failed for lead {lead.id} ({lead.business_name}): {e}")
+                    # Keep status as 'qualified' so it can be retried or handled manually
+                    continue
+
+            # 2. AI-generated email content, GROQ_BATCH_SIZE leads per request
+            ai_results = await groq_client.generate_email_content_batch(
+                lead_inputs, use_cache=True
+            ) if lead_inputs else {}
 
-                    # 2b. Companion Excel workbook — ROI projection, competitor gap, roadmap
-                    xlsx_path = generate_proposal_xlsx(
-                        business_name=lead.business_name,
-                        category=lead.category,
-                        benefits=ai_data.get('benefits', []),
-                        output_filename=f"Proposal_{lead.id}.xlsx",
-                        rating=lead.rating,
-                        review_count=lead.review_count,
-                        city=lead.city,
+            for lead in leads:
+                if lead.id not in lead_inputs:
+                    continue
+                try:
+                    ai_data = ai_results[lead.id]
+
+                    # 3. Proposal PDF + ROI workbook — only the render inputs are
+                    #    stored here; the documents are rendered in memory at
+                    #    dispatch time (see proposal_artifacts).
+                    proposal_context = build_proposal_context(
+                        lead, ai_data.get('benefits', [])
                     )
 
-                    # 3. Create Outreach Queue Record — attach both files
-                    attachments = [p for p in [pdf_path, xlsx_path] if p]
-                    tracking_token = _generate_tracking_token(lead.id, campaign.id)
+                    # 4. Create Outreach Queue Record
+                    outreach_id    = uuid.uuid4()
+                    tracking_token = encode_tracking_token(outreach_id, lead.id, campaign.id)
                     html_body = render_email_html(
                         {"business_name": lead.business_name},
                         ai_data.get('body_html', ''),
@@ -407,6 +412,7 @@ async def run_personalization_stage(manual: bool = False):
                     )
 
                     outreach = EmailOutreach(
+                        id              = outreach_id,
                         lead_id         = lead.id,
                         campaign_id     = campaign.id,
                         to_email        = lead.email,
@@ -416,8 +422,9 @@ async def run_personalization_stage(manual: bool = False):
                         body_html       = html_body,
                         tracking_token  = tracking_token,
                         ai_generated    = True,
-                        has_attachment  = bool(attachments),
-                        attachment_names = attachments,
+                        has_attachment  = True,
+                        attachment_names = proposal_filenames(lead.id),
+                        proposal_context = proposal_context,
                         status          = "queued",
                     )
                     db.add(outreach)
@@ -425,7 +432,7 @@ async def run_personalization_stage(manual: bool = False):
                     campaign.total_leads += 1
                     lead.status = "queued_for_send"
                     pers_count  += 1
-                    
+
                 except Exception as e:
                     logger.error(f"Personalization failed for lead {lead.id} ({lead.business_name}): {e}")
                     # Keep status as 'qualified' so it can be retried or handled manually
@@ -439,6 +446,8 @@ async def run_personalization_stage(manual: bool = False):
                         f"Queued {pers_count} customized proposals for automated dispatch."
                     )
 
+        logger.info(f"LLM cache after personalization: {llm_cache.snapshot()}")
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Stage 4 — Outreach dispatch
@@ -447,8 +456,13 @@ async def run_personalization_stage(manual: bool = False):
 async def run_outreach_stage(manual: bool = False):
     """
     Executes the outreach phase of the lead generation pipeline.
-    Dispatches queued emails sequentially with a 2-second gap between sends.
-    Commits after each successful email to prevent batch rollback loss.
+
+    ``email_outreach`` is a durable outbox: ``OUTBOX_WORKERS`` workers (in
+    this and any other process) claim small batches of due rows with
+    ``FOR UPDATE SKIP LOCKED`` and send them through the rate-shaped dispatch
+    scheduler. Failed sends are retried with backoff; rows that do not fit
+    the sending window or quota stay queued for the next run. Outcomes are
+    committed in small batches with set-based lead/campaign updates.
     """
     logger.info("Starting Outreach Dispatch")
 
@@ -456,82 +470,218 @@ async def run_outreach_stage(manual: bool = False):
         logger.warning("🚨 [outreach] is HOLD. Skipping outreach stage.")
         return
 
-    async with advisory_lock("pipeline_outreach"):
-        sent_count = 0
+    workers = max(1, settings.OUTBOX_WORKERS)
+    sent_count = sum(await asyncio.gather(*(_run_outbox_worker() for _ in range(workers))))
 
-        async with get_session_maker()() as db:
-            result = await db.execute(
-                select(EmailOutreach).where(EmailOutreach.status == "queued")
-            )
-            queued_emails = result.scalars().all()
+    if sent_count > 0:
+        await send_telegram_alert(
+            f"Outreach phase completed. "
+            f"Successfully dispatched {sent_count} communications."
+        )
 
-            for email_task in queued_emails:
-                attachments = email_task.attachment_names if email_task.has_attachment else []
-                
-                try:
-                    success = await send_email(
-                        to_email     = email_task.to_email,
-                        subject      = email_task.subject,
-                        html_content = email_task.body_html,
-                        attachment_paths = attachments,
-                    )
+    # Blobs of rows still waiting to go out are kept however old they are.
+    async with get_session_maker()() as db:
+        referenced = await outbox.pending_artifact_digests(db)
+    pruned = await asyncio.to_thread(
+        artifact_store.prune, settings.ARTIFACT_RETENTION_DAYS * 86400, referenced
+    )
+    if pruned:
+        logger.info(f"Pruned {pruned} expired attachment artifacts")
 
-                    if success:
-                        email_task.status  = "sent"
-                        email_task.sent_at = datetime.utcnow()
-                        sent_count += 1
 
-                        # Update lead status
-                        l_res = await db.execute(
-                            select(Lead).where(Lead.id == email_task.lead_id)
-                        )
-                        lead = l_res.scalars().first()
-                        if lead:
-                            lead.status       = "email_sent"
-                            lead.email_sent_at = datetime.utcnow()
+# Longest a send outcome waits in memory before being committed when the
+# OUTBOX_COMMIT_BATCH threshold has not been reached (slow send pacing).
+_OUTCOME_FLUSH_SECONDS = 5
+# Attempts at writing one flush of outcomes, with exponential backoff between.
+_OUTCOME_WRITE_ATTEMPTS = 3
+_OUTCOME_RETRY_SECONDS = 0.5
 
-                            from app.modules.outreach.followup_engine import schedule_followup
-                            await schedule_followup(lead, db)
 
-                        # Update campaign counters
-                        c_res = await db.execute(
-                            select(Campaign).where(Campaign.id == email_task.campaign_id)
-                        )
-                        campaign = c_res.scalars().first()
-                        if campaign:
-                            campaign.emails_sent += 1
-                            if campaign.status == "pending":
-                                campaign.status     = "active"
-                                campaign.started_at = datetime.utcnow()
-
-                        # Commit immediately per email — prevents batch rollback loss
-                        await db.commit()
-                    else:
-                        email_task.status = "failed"
+async def _run_outbox_worker() -> int:
+    """
+    Claims and dispatches outbox batches until none are due.
 
-                except Exception as e:
-                    logger.error(f"Error during email dispatch or DB update for task {email_task.id}: {e}")
-                    email_task.status = "failed"
-                finally:
-                    # Clean up temp PDF/XLSX regardless of DB/SMTP outcome
-                    if attachments:
-                        for att in attachments:
-                            if os.path.exists(att):
-                                try:
-                                    os.remove(att)
-                                except Exception as cleanup_e:
-                                    logger.warning(f"Failed to clean up attachment {att}: {cleanup_e}")
-
-                # Throttle to avoid spam-filter triggers
-                await asyncio.sleep(2)
-
-            if queued_emails:
-                await db.commit()
-                if sent_count > 0:
-                    await send_telegram_alert(
-                        f"Outreach phase completed. "
-                        f"Successfully dispatched {sent_count} communications."
-                    )
+    Returns:
+        int: Emails this worker sent.
+    """
+    worker_id    = outbox.new_worker_id()
+    session_maker = get_session_maker()
+    sent_total   = 0
+
+    async def _renew_leases():
+        while True:
+            await asyncio.sleep(max(1, settings.OUTBOX_LEASE_SECONDS // 3))
+            try:
+                async with session_maker() as lease_db:
+                    await outbox.renew_leases(lease_db, worker_id)
+            except Exception as e:
+                logger.warning(f"Outbox worker {worker_id} could not renew leases: {e}")
+
+    heartbeat = asyncio.create_task(_renew_leases())
+    try:
+        while True:
+            async with session_maker() as db:
+                batch = await outbox.claim_batch(db, worker_id, settings.OUTBOX_BATCH_SIZE)
+                if not batch:
+                    break
+                sent, exhausted = await _dispatch_outbox_batch(db, worker_id, batch)
+            sent_total += sent
+            if exhausted:
+                # Window closed or quota used up — the rest would be deferred too.
+                break
+    finally:
+        heartbeat.cancel()
+    return sent_total
+
+
+async def _dispatch_outbox_batch(db, worker_id: str, batch: list) -> tuple:
+    """
+    Sends one claimed batch.
+
+    Returns:
+        tuple: ``(sent_count, exhausted)`` where ``exhausted`` means some rows
+        were released unattempted because the window or quota ran out.
+    """
+    # Sends overlap, but the session is not concurrency-safe. Outcomes are
+    # buffered and written back in small batches (see outbox.apply_outcomes).
+    db_lock       = asyncio.Lock()
+    pending_sent:   list = []
+    pending_failed: list = []
+    last_flush    = time.monotonic()
+
+    async def _flush_outcomes(force: bool = False) -> None:
+        nonlocal last_flush
+        async with db_lock:
+            pending = len(pending_sent) + len(pending_failed)
+            if not pending:
+                return
+            if (not force and pending < settings.OUTBOX_COMMIT_BATCH
+                    and time.monotonic() - last_flush < _OUTCOME_FLUSH_SECONDS):
+                return
+            sent, failed = pending_sent[:], pending_failed[:]
+            pending_sent.clear()
+            pending_failed.clear()
+            if not await _write_outcomes(sent, failed):
+                if not force:
+                    # Our lease heartbeat keeps the rows claimed; try again next flush.
+                    pending_sent[:0] = sent
+                    pending_failed[:0] = failed
+                else:
+                    await _record_delivery_only(sent)
+            last_flush = time.monotonic()
+
+    async def _write_outcomes(sent: list, failed: list) -> bool:
+        for attempt in range(_OUTCOME_WRITE_ATTEMPTS):
+            # A rollback expires every row in the session, including rows
+            # still being sent; keep their state to put back.
+            snapshots = outbox.snapshot_rows(batch)
+            try:
+                await outbox.apply_outcomes(db, sent, failed)
+                return True
+            except Exception as e:
+                logger.error(
+                    f"Failed to record outcomes for {len(sent) + len(failed)} emails "
+                    f"(attempt {attempt + 1}/{_OUTCOME_WRITE_ATTEMPTS}): {e}"
+                )
+                await db.rollback()
+                outbox.restore_rows(snapshots)
+                if attempt + 1 < _OUTCOME_WRITE_ATTEMPTS:
+                    await asyncio.sleep(_OUTCOME_RETRY_SECONDS * 2 ** attempt)
+        return False
+
+    async def _record_delivery_only(sent: list) -> None:
+        # Delivered rows must not go back to the queue when the lease lapses.
+        # Failed rows may: their retry is a legitimate one.
+        try:
+            async with get_session_maker()() as delivery_db:
+                await outbox.mark_delivered(delivery_db, sent)
+            logger.warning(
+                f"Recorded {len(sent)} deliveries without lead/campaign updates "
+                f"after repeated outcome write failures"
+            )
+        except Exception as e:
+            logger.critical(
+                f"Could not record {len(sent)} delivered emails; they may be re-sent "
+                f"when their lease lapses: {[str(row.id) for row in sent]}: {e}"
+            )
+
+    async def _send_one(email_task: EmailOutreach) -> bool:
+        # Rows queued before lazy rendering carry on-disk paths in
+        # attachment_names instead of a proposal_context.
+        legacy_paths = []
+        attachments  = []
+        if email_task.proposal_context:
+            attachments, email_task.attachment_refs = await resolve_proposal_attachments(
+                email_task.proposal_context, email_task.attachment_refs
+            )
+        elif email_task.has_attachment:
+            legacy_paths = email_task.attachment_names or []
+
+        # Reused across retries so a duplicate delivery carries the same ID.
+        if not email_task.brevo_message_id:
+            email_task.brevo_message_id = make_message_id(assigned[email_task.id].from_email)
+
+        try:
+            account = await send_with_failover(
+                sender_pool,
+                assigned[email_task.id],
+                lambda sender: send_email(
+                    to_email     = email_task.to_email,
+                    subject      = email_task.subject,
+                    html_content = email_task.body_html,
+                    attachment_paths = legacy_paths,
+                    attachments  = attachments,
+                    sender       = sender,
+                    message_id   = email_task.brevo_message_id,
+                ),
+            )
+            if account is None:
+                pending_failed.append((email_task, "send returned no delivery"))
+                return False
+
+            outbox.mark_sent(email_task, account.id, datetime.utcnow())
+            pending_sent.append(email_task)
+            return True
+
+        except Exception as e:
+            logger.error(f"Error during email dispatch for task {email_task.id}: {e}")
+            pending_failed.append((email_task, str(e)))
+            return False
+        finally:
+            await _flush_outcomes()
+            # Clean up legacy temp PDF/XLSX regardless of DB/SMTP outcome
+            if legacy_paths:
+                for att in legacy_paths:
+                    if os.path.exists(att):
+                        try:
+                            os.remove(att)
+                        except Exception as cleanup_e:
+                            logger.warning(f"Failed to clean up attachment {att}: {cleanup_e}")
+
+    # Counted on a session of their own: a transaction opened on ``db`` here
+    # would stay idle across the paced sends until the first outcome flush.
+    async with get_session_maker()() as count_db:
+        dispatch_scheduler.sync_sent_today(await count_sent_today(count_db))
+        sender_pool.sync_sent_today(await count_sent_today_by_sender(count_db))
+
+    # Least-loaded healthy sender per email; beyond the combined quota,
+    # emails go back to the queue.
+    assigned = sender_pool.assign(batch, key=lambda task: task.id)
+    sendable = [task for task in batch if task.id in assigned]
+
+    sent_count, deferred = await dispatch_scheduler.dispatch(
+        sendable,
+        recipient=lambda task: task.to_email,
+        send=_send_one,
+        sender=lambda task: assigned[task.id].id,
+    )
+    for task in deferred:
+        sender_pool.release(assigned[task.id])
+    await _flush_outcomes(force=True)
+
+    unattempted = [task for task in batch if task.id not in assigned] + list(deferred)
+    await outbox.release(db, [task.id for task in unattempted], worker_id)
+    return sent_count, bool(unattempted)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -542,6 +692,13 @@ async def poll_replies(manual: bool = False):
     """
     Monitors the reply inbox via IMAP and updates lead status on replies.
     Also classifies the reply intent and drafts an AI response for hot leads.
+
+    Replies are matched to leads and applied as one batch (see
+    ``reply_matcher``), so database round trips do not grow with the number
+    of replies.
+
+    Only mail after the stored UID checkpoint is fetched; the checkpoint is
+    advanced once the batch has been processed.
     """
     logger.info("Polling for replies")
 
@@ -550,93 +707,74 @@ async def poll_replies(manual: bool = False):
         return
 
     async with advisory_lock("pipeline_reply_poll"):
-        replies = await fetch_recent_replies(since_minutes=30)
-
         async with get_session_maker()() as db:
-            for sender_email, subject, reply_time, body in replies:
-                if not sender_email:
-                    continue
+            batch = await fetch_recent_replies(await load_checkpoint(db, mailbox_key()))
 
-                stmt = (
-                    select(Lead)
-                    .where(Lead.email == sender_email)
-                    .order_by(Lead.created_at.desc())
-                    .limit(1)
-                )
-                res  = await db.execute(stmt)
-                lead = res.scalars().first()
-
-                if not lead or lead.status == "replied":
-                    continue
-
-                try:
-                    lead.status          = "replied"
-                    lead.first_replied_at = reply_time
-
-                    # Update associated outreach record and campaign metrics
-                    out_res = await db.execute(
-                        select(EmailOutreach)
-                        .where(EmailOutreach.lead_id == lead.id)
-                        .order_by(EmailOutreach.created_at.desc())
-                        .limit(1)
-                    )
-                    outreach = out_res.scalars().first()
-                    if outreach:
-                        if outreach.status != "replied":
-                            outreach.status = "replied"
+            from app.modules.tracking.reply_classifier import (
+                classify_inbound, draft_reply_response,
+            )
+            from app.modules.tracking.reply_rules import is_bounce
+            from app.modules.notifications.whatsapp_bot import send_whatsapp_alert
 
-                        camp_res = await db.execute(
-                            select(Campaign).where(Campaign.id == outreach.campaign_id)
-                        )
-                        campaign = camp_res.scalars().first()
-                        if campaign:
-                            campaign.replies_received += 1
+            # Delivery reports are not replies; keep them away from lead matching
+            replies = [reply for reply in batch.replies if not is_bounce(reply)]
+            if len(replies) < len(batch.replies):
+                logger.info(f"Skipped {len(batch.replies) - len(replies)} delivery reports in reply inbox")
 
-                    # Classify reply intent
-                    from app.modules.tracking.reply_classifier import (
-                        classify_reply, draft_reply_response,
-                    )
-                    from app.modules.notifications.whatsapp_bot import send_whatsapp_alert
+            matches = await match_replies(db, replies)
 
-                    classification_data      = await classify_reply(body, subject)
-                    lead.reply_classification = classification_data.get("classification")
-                    lead.reply_confidence     = classification_data.get("confidence")
-                    lead.reply_key_signal     = classification_data.get("key_signal")
+            # Classify reply intent (local rules first, LLM only when ambiguous)
+            # and draft responses for hot leads
+            for match in matches:
+                try:
+                    classification_data, match.decision_source = await classify_inbound(match.reply)
+                    match.classification = classification_data.get("classification")
+                    match.confidence     = classification_data.get("confidence")
+                    match.key_signal     = classification_data.get("key_signal")
 
-                    if lead.reply_classification in [
+                    if match.classification in [
                         "interested", "question", "pricing_inquiry"
                     ]:
-                        draft = await draft_reply_response(
-                            lead, body, lead.reply_classification
-                        )
-                        lead.suggested_reply_draft = draft
-
-                        hot_msg = (
-                            f"🔥 INTERESTED REPLY — {lead.business_name}\n"
-                            f"Signal: {lead.reply_key_signal}\n"
-                            f"Reply draft saved. Review at /api/v1/leads/{lead.id}"
-                        )
-                        await send_telegram_alert(hot_msg)
-                        await send_whatsapp_alert(hot_msg)
-                    else:
-                        alert_msg = (
-                            f"📩 Reply Detected.\n"
-                            f"Lead: {lead.business_name}\n"
-                            f"Classification: {lead.reply_classification}\n"
-                            f"Email: {lead.email}"
+                        match.draft = await draft_reply_response(
+                            match.lead, match.reply.body, match.classification
                         )
-                        await send_telegram_alert(alert_msg)
-                        await send_whatsapp_alert(alert_msg)
-
-                    await db.commit()
+                except Exception as e:
+                    logger.error(f"Error classifying reply for {match.reply.sender}: {e}")
+            if matches:
+                by_rules = sum(m.decision_source == "rules" for m in matches)
+                logger.info(f"Classified {len(matches)} replies: {by_rules} by rules, {len(matches) - by_rules} by LLM")
 
-                    # Cancel any pending follow-ups now that the lead has replied
-                    from app.modules.outreach.followup_engine import cancel_followup_sequence
-                    await cancel_followup_sequence(lead.id, db)
+            # One transaction for every lead, outreach row and campaign counter;
+            # follow-up sequences stop in the same update.
+            try:
+                await apply_replies(db, matches)
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Error applying {len(matches)} replies: {e}")
+                return
+
+            for match in matches:
+                lead = match.lead
+                if match.draft is not None:
+                    hot_msg = (
+                        f"🔥 INTERESTED REPLY — {lead.business_name}\n"
+                        f"Signal: {match.key_signal}\n"
+                        f"Reply draft saved. Review at /api/v1/leads/{lead.id}"
+                    )
+                    await send_telegram_alert(hot_msg)
+                    await send_whatsapp_alert(hot_msg)
+                else:
+                    alert_msg = (
+                        f"📩 Reply Detected.\n"
+                        f"Lead: {lead.business_name}\n"
+                        f"Classification: {match.classification}\n"
+                        f"Email: {lead.email}"
+                    )
+                    await send_telegram_alert(alert_msg)
+                    await send_whatsapp_alert(alert_msg)
 
-                except Exception as e:
-                    await db.rollback()
-                    logger.error(f"Error processing reply for {sender_email}: {e}")
+            # Only now advance the UID high-water mark past these messages.
+            await save_checkpoint(db, batch)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -649,6 +787,7 @@ async def generate_daily_report(manual: bool = False):
 
     Counts both 'qualified' and 'phone_qualified' leads in the qualified total
     so the report accurately reflects all leads that passed the scoring threshold.
+    See ``app.modules.reporting.daily_metrics`` for the queries.
     """
     logger.info("Generating Daily Report")
 
@@ -660,58 +799,9 @@ async def generate_daily_report(manual: bool = False):
         today = date.today()
 
         async with get_session_maker()() as db:
-            # Aggregated metrics for report_data
-            leads_discovered = await db.scalar(
-                select(func.count(Lead.id)).where(func.date(Lead.discovered_at) == today)
-            )
-            leads_qualified = await db.scalar(
-                select(func.count(Lead.id)).where(
-                    (func.date(Lead.qualified_at) == today) & 
-                    Lead.status.in_(["qualified", "phone_qualified"])
-                )
-            )
-            emails_sent = await db.scalar(
-                select(func.count(EmailOutreach.id)).where(
-                    (func.date(EmailOutreach.sent_at) == today) & 
-                    (EmailOutreach.status == "sent")
-                )
-            )
-            
-            # Fetch leads involved in today's activities for detail list
-            leads_res = await db.execute(
-                select(Lead).where(
-                    (func.date(Lead.discovered_at) == today)
-                    | (func.date(Lead.email_sent_at) == today)
-                    | (func.date(Lead.first_replied_at) == today)
-                )
-            )
-            report_leads = leads_res.scalars().all()
-            
-            report_data = {
-                "leads_discovered": leads_discovered or 0,
-                "leads_qualified": leads_qualified or 0,
-                "emails_sent": emails_sent or 0,
-                "emails_opened": len([l for l in report_leads if l.first_opened_at and l.first_opened_at.date() == today]),
-                "links_clicked": len([l for l in report_leads if l.first_clicked_at and l.first_clicked_at.date() == today]),
-                "replies_received": len([l for l in report_leads if l.first_replied_at and l.first_replied_at.date() == today]),
-            }
-
-            lead_dicts = [
-                {
-                    "business_name":   l.business_name,
-                    "category":        l.category,
-                    "city":            l.city,
-                    "email_sent_at":   l.email_sent_at,
-                    "first_opened_at": l.first_opened_at,
-                    "first_clicked_at": l.first_clicked_at,
-                    "first_replied_at": l.first_replied_at,
-                    "status":          l.status,
-                    "phone":           l.phone,
-                    "google_maps_url": l.google_maps_url,
-                    "lead_tier":       l.lead_tier,
-                }
-                for l in report_leads
-            ]
+            # One aggregate over indexed half-open ranges, plus a column projection
+            report_data = await daily_report_metrics(db, today)
+            lead_dicts  = await daily_report_leads(db, today)
 
             excel_path = generate_daily_report_excel(report_data, lead_dicts, today)
             await send_daily_report_email(report_data, excel_path, today)
@@ -0,0 +1,35 @@
+"""Add proposal_context column to email_outreach
+
+Revision ID: 3c9d2e7f1a04
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2e7f1a04'
+down_revision: Union[str, None] = 'f1a2b3c4d5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add proposal_context to email_outreach.
+    Stores the render inputs for proposal attachments so the PDF and XLSX are
+    generated in memory at dispatch time instead of written to tmp/.
+    """
+    op.add_column(
+        'email_outreach',
+        sa.Column('proposal_context', sa.JSON(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Remove proposal_context column from email_outreach."""
+    op.drop_column('email_outreach', 'proposal_context')
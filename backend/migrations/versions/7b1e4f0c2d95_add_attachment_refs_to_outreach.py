@@ -0,0 +1,35 @@
+"""Add attachment_refs column to email_outreach
+
+Revision ID: 7b1e4f0c2d95
+Revises: 3c9d2e7f1a04
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4f0c2d95'
+down_revision: Union[str, None] = '3c9d2e7f1a04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add attachment_refs to email_outreach.
+    Holds the SHA-256 digests of rendered attachments in the content-addressed
+    artifact store, so outreach references artifacts by hash instead of path.
+    """
+    op.add_column(
+        'email_outreach',
+        sa.Column('attachment_refs', sa.JSON(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Remove attachment_refs column from email_outreach."""
+    op.drop_column('email_outreach', 'attachment_refs')
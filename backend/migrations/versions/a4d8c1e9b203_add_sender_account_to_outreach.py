@@ -0,0 +1,40 @@
+"""Add sender_account column to email_outreach
+
+Revision ID: a4d8c1e9b203
+Revises: 7b1e4f0c2d95
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8c1e9b203'
+down_revision: Union[str, None] = '7b1e4f0c2d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add sender_account to email_outreach.
+    Records which sender pool account dispatched each email, and backs the
+    per-account daily quota count.
+    """
+    op.add_column(
+        'email_outreach',
+        sa.Column('sender_account', sa.String(length=255), nullable=True)
+    )
+    op.create_index(
+        op.f('ix_email_outreach_sender_account'),
+        'email_outreach', ['sender_account'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Remove sender_account column from email_outreach."""
+    op.drop_index(op.f('ix_email_outreach_sender_account'), table_name='email_outreach')
+    op.drop_column('email_outreach', 'sender_account')
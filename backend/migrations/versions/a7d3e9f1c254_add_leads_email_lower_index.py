@@ -0,0 +1,31 @@
+"""Add functional index on lower(leads.email) for reply matching
+
+Revision ID: a7d3e9f1c254
+Revises: f2c8d5a1e396
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f1c254'
+down_revision: Union[str, None] = 'f2c8d5a1e396'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index leads by lowercased email.
+    Reply polling resolves all senders of a poll with one lower(email) IN (...) lookup.
+    """
+    op.create_index('ix_leads_email_lower', 'leads', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade() -> None:
+    """Drop ix_leads_email_lower."""
+    op.drop_index('ix_leads_email_lower', table_name='leads')
@@ -0,0 +1,34 @@
+"""Add reply_decision_source to leads
+
+Revision ID: b5c1f8d2e637
+Revises: a7d3e9f1c254
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c1f8d2e637'
+down_revision: Union[str, None] = 'a7d3e9f1c254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add leads.reply_decision_source.
+    Records whether the rule-based pre-classifier or the LLM classified the reply.
+    """
+    op.add_column('leads', sa.Column(
+        'reply_decision_source', sa.String(length=20), nullable=True,
+        comment='rules | llm — which classifier stage set reply_classification.',
+    ))
+
+
+def downgrade() -> None:
+    """Drop leads.reply_decision_source."""
+    op.drop_column('leads', 'reply_decision_source')
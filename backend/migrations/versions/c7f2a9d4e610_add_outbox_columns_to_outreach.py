@@ -0,0 +1,45 @@
+"""Add outbox claim/lease columns to email_outreach
+
+Revision ID: c7f2a9d4e610
+Revises: a4d8c1e9b203
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f2a9d4e610'
+down_revision: Union[str, None] = 'a4d8c1e9b203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Turn email_outreach into a durable outbox.
+    Adds per-row attempt counts, retry scheduling and claim leases, plus an
+    index on (status, next_attempt_at) for the SKIP LOCKED claim query.
+    """
+    op.add_column('email_outreach', sa.Column('attempt_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('email_outreach', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('email_outreach', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('email_outreach', sa.Column('claimed_by', sa.String(length=128), nullable=True))
+    op.add_column('email_outreach', sa.Column('last_error', sa.Text(), nullable=True))
+    op.create_index(
+        'ix_email_outreach_status_next_attempt',
+        'email_outreach', ['status', 'next_attempt_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Remove outbox columns from email_outreach."""
+    op.drop_index('ix_email_outreach_status_next_attempt', table_name='email_outreach')
+    op.drop_column('email_outreach', 'last_error')
+    op.drop_column('email_outreach', 'claimed_by')
+    op.drop_column('email_outreach', 'lease_expires_at')
+    op.drop_column('email_outreach', 'next_attempt_at')
+    op.drop_column('email_outreach', 'attempt_count')
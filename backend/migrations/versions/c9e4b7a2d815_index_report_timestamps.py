@@ -0,0 +1,36 @@
+"""Index lifecycle timestamps filtered by the daily report
+
+Revision ID: c9e4b7a2d815
+Revises: b5c1f8d2e637
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e4b7a2d815'
+down_revision: Union[str, None] = 'b5c1f8d2e637'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_LEAD_COLUMNS = ('qualified_at', 'email_sent_at', 'first_opened_at', 'first_clicked_at', 'first_replied_at')
+
+
+def upgrade() -> None:
+    """
+    Add B-tree indexes for the report's half-open range predicates.
+    leads.discovered_at is already indexed.
+    """
+    for column in _LEAD_COLUMNS:
+        op.create_index(f'ix_leads_{column}', 'leads', [column], unique=False)
+    op.create_index('ix_email_outreach_sent_at', 'email_outreach', ['sent_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the report timestamp indexes."""
+    op.drop_index('ix_email_outreach_sent_at', table_name='email_outreach')
+    for column in reversed(_LEAD_COLUMNS):
+        op.drop_index(f'ix_leads_{column}', table_name='leads')
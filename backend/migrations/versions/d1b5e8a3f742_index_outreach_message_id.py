@@ -0,0 +1,34 @@
+"""Add unique index on email_outreach.brevo_message_id
+
+Revision ID: d1b5e8a3f742
+Revises: c7f2a9d4e610
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1b5e8a3f742'
+down_revision: Union[str, None] = 'c7f2a9d4e610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index brevo_message_id.
+    The column now holds the Message-ID generated for every outgoing email;
+    delivery webhooks and reply matching look rows up by it.
+    """
+    op.create_index(
+        op.f('ix_email_outreach_brevo_message_id'),
+        'email_outreach', ['brevo_message_id'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Drop the brevo_message_id index."""
+    op.drop_index(op.f('ix_email_outreach_brevo_message_id'), table_name='email_outreach')
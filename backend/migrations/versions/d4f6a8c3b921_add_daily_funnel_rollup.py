@@ -0,0 +1,70 @@
+"""Add daily_funnel rollup table
+
+Revision ID: d4f6a8c3b921
+Revises: c9e4b7a2d815
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f6a8c3b921'
+down_revision: Union[str, None] = 'c9e4b7a2d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# metric column → leads timestamp it is derived from
+_METRICS = (
+    ('discovered', 'discovered_at'),
+    ('qualified', 'qualified_at'),
+    ('emailed', 'email_sent_at'),
+    ('opened', 'first_opened_at'),
+    ('clicked', 'first_clicked_at'),
+    ('replied', 'first_replied_at'),
+)
+
+
+def upgrade() -> None:
+    """
+    Create daily_funnel (UTC day × city × category × tier counters).
+    Backfilled from the lifecycle timestamps already on leads, so the rollup
+    matches history from the first read.
+    """
+    op.create_table(
+        'daily_funnel',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('city', sa.String(length=100), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('tier', sa.String(length=2), nullable=False),
+        *(sa.Column(metric, sa.Integer(), nullable=False, server_default='0') for metric, _ in _METRICS),
+        sa.PrimaryKeyConstraint('day', 'city', 'category', 'tier'),
+    )
+
+    branches = []
+    for index, (_, column) in enumerate(_METRICS):
+        flags = ', '.join('1' if i == index else '0' for i in range(len(_METRICS)))
+        branches.append(
+            f"SELECT ({column} AT TIME ZONE 'UTC')::date AS day, COALESCE(city, '') AS city, "
+            f"COALESCE(category, '') AS category, COALESCE(lead_tier, '') AS tier, {flags} "
+            f"FROM leads WHERE {column} IS NOT NULL"
+        )
+    metrics = ', '.join(metric for metric, _ in _METRICS)
+    sums = ', '.join(f'SUM(m{i})' for i in range(len(_METRICS)))
+    aliases = ', '.join(f'm{i}' for i in range(len(_METRICS)))
+    op.execute(
+        f"""
+        INSERT INTO daily_funnel (day, city, category, tier, {metrics})
+        SELECT day, city, category, tier, {sums}
+        FROM ({' UNION ALL '.join(branches)}) AS t (day, city, category, tier, {aliases})
+        GROUP BY day, city, category, tier
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop daily_funnel."""
+    op.drop_table('daily_funnel')
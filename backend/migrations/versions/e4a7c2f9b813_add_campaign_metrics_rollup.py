@@ -0,0 +1,57 @@
+"""Add campaign_metrics hourly rollup table
+
+Revision ID: e4a7c2f9b813
+Revises: d1b5e8a3f742
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2f9b813'
+down_revision: Union[str, None] = 'd1b5e8a3f742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create campaign_metrics (campaign × UTC hour counters).
+    Existing campaign totals are carried over into one bucket per campaign at
+    the hour it started (or was created), so rollup sums match today's
+    counters from the first read.
+    """
+    op.create_table(
+        'campaign_metrics',
+        sa.Column('campaign_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('emails_sent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('emails_opened', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('links_clicked', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('replies_received', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('campaign_id', 'bucket_start'),
+    )
+    op.execute(
+        """
+        INSERT INTO campaign_metrics
+            (campaign_id, bucket_start, emails_sent, emails_opened, links_clicked, replies_received)
+        SELECT id,
+               date_trunc('hour', COALESCE(started_at, created_at, now())),
+               COALESCE(emails_sent, 0), COALESCE(emails_opened, 0),
+               COALESCE(links_clicked, 0), COALESCE(replies_received, 0)
+        FROM campaigns
+        WHERE COALESCE(emails_sent, 0) + COALESCE(emails_opened, 0)
+            + COALESCE(links_clicked, 0) + COALESCE(replies_received, 0) > 0
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop campaign_metrics."""
+    op.drop_table('campaign_metrics')
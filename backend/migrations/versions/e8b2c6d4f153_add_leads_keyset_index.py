@@ -0,0 +1,30 @@
+"""Add (created_at, id) index on leads for keyset pagination
+
+Revision ID: e8b2c6d4f153
+Revises: d4f6a8c3b921
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2c6d4f153'
+down_revision: Union[str, None] = 'd4f6a8c3b921'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index leads by (created_at, id).
+    GET /leads pages with (created_at, id) < (:c, :i) ORDER BY created_at DESC, id DESC.
+    """
+    op.create_index('ix_leads_created_at_id', 'leads', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop ix_leads_created_at_id."""
+    op.drop_index('ix_leads_created_at_id', table_name='leads')
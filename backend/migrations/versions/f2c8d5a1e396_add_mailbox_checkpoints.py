@@ -0,0 +1,38 @@
+"""Add mailbox_checkpoints table for the IMAP reply poller
+
+Revision ID: f2c8d5a1e396
+Revises: e4a7c2f9b813
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8d5a1e396'
+down_revision: Union[str, None] = 'e4a7c2f9b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create mailbox_checkpoints.
+    Holds the UIDVALIDITY / last UID pair per polled mailbox.
+    """
+    op.create_table(
+        'mailbox_checkpoints',
+        sa.Column('mailbox', sa.String(length=512), nullable=False),
+        sa.Column('uid_validity', sa.BigInteger(), nullable=False),
+        sa.Column('last_uid', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('mailbox'),
+    )
+
+
+def downgrade() -> None:
+    """Drop mailbox_checkpoints."""
+    op.drop_table('mailbox_checkpoints')
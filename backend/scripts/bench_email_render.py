@@ -0,0 +1,103 @@
+"""
+scripts/bench_email_render.py
+=============================
+Micro-benchmark for the outreach email rendering path.
+
+Compares the legacy per-call behaviour (fresh Jinja2 Environment, template
+existence check, template recompilation and ``bleach.clean`` with freshly
+built allow-lists) against the module-level engine in
+``app.modules.personalization.email_generator``.
+
+**Usage:**
+    cd backend
+    python scripts/bench_email_render.py            # 2,000 renders per variant
+    python scripts/bench_email_render.py -n 10000
+
+No database, network or real credentials are needed; placeholder values are
+filled in for any required settings that are not already set.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for _key in (
+    "APP_SECRET_KEY", "API_KEY", "SECURITY_SALT", "DATABASE_URL", "SUPABASE_URL",
+    "SUPABASE_ANON_KEY", "GOOGLE_PLACES_API_KEY", "GROQ_API_KEY", "BREVO_SMTP_USER",
+    "BREVO_SMTP_PASSWORD", "FROM_EMAIL", "REPLY_TO_EMAIL", "IMAP_USER", "IMAP_PASSWORD",
+    "ADMIN_EMAIL",
+):
+    os.environ.setdefault(_key, "bench")
+os.environ.setdefault("APP_ENV", "production")
+
+import bleach
+from jinja2 import Environment, FileSystemLoader
+
+from app.modules.personalization import email_generator
+
+AI_BODY = (
+    "<p>Hi there, I noticed <strong>Sunrise Dental</strong> has great reviews.</p>"
+    "<p>A modern booking site could turn more searches into appointments.</p>"
+    "<script>alert('x')</script><p style='color:#333'>Free consultation?</p>"
+)
+LEAD = {"business_name": "Sunrise Dental"}
+TOKEN = "bench-token"
+APP_URL = "https://example.com"
+
+
+def legacy_render() -> str:
+    """Reproduces the pre-optimisation render path, one call at a time."""
+    allowed_tags = [
+        'p', 'br', 'strong', 'em', 'u', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+        'ul', 'ol', 'li', 'span', 'div', 'a', 'b', 'i'
+    ]
+    allowed_attrs = {'a': ['href', 'title', 'target'], '*': ['style']}
+    sanitized = bleach.clean(AI_BODY, tags=allowed_tags, attributes=allowed_attrs, strip=True)
+
+    template_dir = email_generator.TEMPLATE_DIR
+    os.makedirs(template_dir, exist_ok=True)
+    env = Environment(loader=FileSystemLoader(template_dir))
+    if not os.path.exists(os.path.join(template_dir, email_generator.TEMPLATE_NAME)):
+        raise FileNotFoundError(email_generator.TEMPLATE_NAME)
+    return env.get_template(email_generator.TEMPLATE_NAME).render(
+        business_name=LEAD["business_name"],
+        ai_body_html=sanitized,
+        tracking_token=TOKEN,
+        app_url=APP_URL,
+        reply_email="replies@example.com",
+        logo_url="",
+    )
+
+
+def cached_render() -> str:
+    return email_generator.render_email_html(LEAD, AI_BODY, TOKEN, APP_URL)
+
+
+def bench(label: str, fn, iterations: int) -> float:
+    fn()  # warm-up (first compile for the cached engine)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    rate = iterations / elapsed
+    print(f"{label:<10} {iterations:>7} renders in {elapsed:7.3f}s  →  {rate:10.1f} renders/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark outreach email rendering.")
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    assert "<script>" not in cached_render()
+
+    before = bench("before", legacy_render, args.iterations)
+    after = bench("after", cached_render, args.iterations)
+    print(f"speed-up: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Rebuilds the daily_funnel rollup from the leads table.
+
+Use it to backfill history or to repair days after a missed write. The days
+in the range are replaced, not added to, so it is safe to re-run.
+
+    python scripts/rebuild_daily_funnel.py --days 7
+    python scripts/rebuild_daily_funnel.py --since 2026-01-01 --until 2026-10-01
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+# Add parent dir to path so we can import app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import get_session_maker
+import app.models  # noqa: F401 — registers every model so Lead's relationships resolve
+from app.modules.analytics.daily_funnel import days_back, rebuild_daily_funnel
+
+
+async def rebuild(since: date, until: date):
+    async with get_session_maker()() as db:
+        rows = await rebuild_daily_funnel(db, since, until)
+    print(f"Rebuilt daily_funnel for [{since}, {until}): {rows} rows.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=2, help="Rebuild the last N days including today (default 2).")
+    parser.add_argument("--since", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD).")
+    parser.add_argument("--until", type=date.fromisoformat, help="Day after the last one to rebuild (exclusive).")
+    args = parser.parse_args()
+
+    since, until = days_back(args.days)
+    asyncio.run(rebuild(args.since or since, args.until or until))
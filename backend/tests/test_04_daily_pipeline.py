@@ -12,6 +12,8 @@ from app.tasks.daily_pipeline import (
 
 from contextlib import asynccontextmanager
 
+from app.modules.tracking.reply_tracker import ReplyBatch
+
 @pytest.fixture(autouse=True)
 def mock_job_manager():
     @asynccontextmanager
@@ -69,7 +71,7 @@ async def test_run_outreach_stage(db_session):
 @pytest.mark.asyncio
 async def test_run_reply_polling_task(db_session):
     with patch("app.tasks.daily_pipeline.fetch_recent_replies") as mock_fetch:
-        mock_fetch.return_value = []
+        mock_fetch.return_value = ReplyBatch(replies=[], mailbox="test")
         await poll_replies()
         assert mock_fetch.called
 
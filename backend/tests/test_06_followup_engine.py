@@ -42,3 +42,102 @@ async def test_followup_cancellation(db_session):
     # Reload from db
     await db_session.refresh(lead)
     assert lead.followup_sequence_active is False
+
+@pytest.mark.asyncio
+async def test_followup_is_stamped_at_send_time(db_session):
+    """sent_at and the next follow-up follow the actual send, not the run's start."""
+    import asyncio
+    from datetime import datetime, timedelta
+    from unittest.mock import AsyncMock
+    from sqlalchemy import select
+    from app.models.campaign import EmailOutreach
+    from app.modules.outreach.dispatch_scheduler import DispatchScheduler
+    from app.modules.outreach.followup_engine import run_followup_dispatch
+    from app.modules.outreach.sender_pool import SenderAccount, SenderPool
+
+    lead = Lead(
+        place_id="test_place_3", business_name="Late Sender", email="late@example.com",
+        status="email_sent", followup_sequence_active=True, followup_count=0,
+        next_followup_at=datetime.utcnow() - timedelta(minutes=1),
+    )
+    db_session.add(lead)
+    await db_session.commit()
+
+    delivered_at = []
+
+    async def slow_send(**kwargs):
+        await asyncio.sleep(0.2)  # stands in for scheduler pacing
+        delivered_at.append(datetime.utcnow())
+        return True
+
+    account = SenderAccount(id="s1", host="h", port=25, username="u", password="p",
+                            from_email="s1@example.com", from_name="S1")
+    groq = MagicMock()
+    groq.return_value.generate_followup_email_batch = AsyncMock(
+        return_value={lead.id: {"subject": "Checking in", "body_html": "<p>Hi</p>"}}
+    )
+    with patch("app.core.job_manager.job_manager.is_job_active", return_value=True), \
+         patch("app.modules.notifications.telegram_bot.send_telegram_alert", AsyncMock()), \
+         patch("app.modules.outreach.followup_engine.GroqClient", groq), \
+         patch("app.modules.outreach.followup_engine.send_email", slow_send), \
+         patch("app.modules.outreach.followup_engine.sender_pool", SenderPool([account])), \
+         patch("app.modules.outreach.followup_engine.dispatch_scheduler",
+               DispatchScheduler(send_interval_seconds=0.01, sender_burst=10)):
+        await run_followup_dispatch()
+
+    outreach = (await db_session.execute(select(EmailOutreach))).scalars().one()
+    await db_session.refresh(lead)
+    assert outreach.sent_at >= delivered_at[0]
+    assert lead.followup_count == 1
+    assert lead.next_followup_at == outreach.sent_at + timedelta(days=4)
+
+
+@pytest.mark.asyncio
+async def test_failed_followup_does_not_abort_the_run(db_session):
+    """A failed send's rollback leaves the other follow-ups sendable; IDs use the sender's domain."""
+    import asyncio
+    from datetime import datetime, timedelta
+    from unittest.mock import AsyncMock
+    import aiosmtplib
+    from sqlalchemy import select
+    from app.models.campaign import EmailOutreach
+    from app.modules.outreach.dispatch_scheduler import DispatchScheduler
+    from app.modules.outreach.followup_engine import run_followup_dispatch
+    from app.modules.outreach.sender_pool import SenderAccount, SenderPool
+
+    due = datetime.utcnow() - timedelta(minutes=1)
+    bad, good = (
+        Lead(place_id=f"test_place_{name}", business_name=name, email=f"{name}@{name}.example",
+             status="email_sent", followup_sequence_active=True, followup_count=0, next_followup_at=due)
+        for name in ("bad", "good")
+    )
+    db_session.add_all([bad, good])
+    await db_session.commit()
+
+    async def send(**kwargs):
+        if kwargs["to_email"] == "bad@bad.example":
+            raise aiosmtplib.SMTPRecipientRefused(550, "5.1.1 User unknown", kwargs["to_email"])
+        await asyncio.sleep(0.1)  # lands after the failed send's rollback
+        return True
+
+    account = SenderAccount(id="s1", host="h", port=25, username="u", password="p",
+                            from_email="s1@sender.test", from_name="S1")
+    groq = MagicMock()
+    groq.return_value.generate_followup_email_batch = AsyncMock(return_value={
+        lead.id: {"subject": "Checking in", "body_html": "<p>Hi</p>"} for lead in (bad, good)
+    })
+    with patch("app.core.job_manager.job_manager.is_job_active", return_value=True), \
+         patch("app.modules.notifications.telegram_bot.send_telegram_alert", AsyncMock()), \
+         patch("app.modules.outreach.followup_engine.GroqClient", groq), \
+         patch("app.modules.outreach.followup_engine.send_email", send), \
+         patch("app.modules.outreach.followup_engine.sender_pool", SenderPool([account])), \
+         patch("app.modules.outreach.followup_engine.dispatch_scheduler",
+               DispatchScheduler(send_interval_seconds=0.01, sender_burst=10)):
+        await run_followup_dispatch()
+
+    outreach = (await db_session.execute(select(EmailOutreach))).scalars().one()
+    assert outreach.lead_id == good.id
+    assert outreach.brevo_message_id.endswith("@sender.test>")
+    await db_session.refresh(bad)
+    await db_session.refresh(good)
+    assert (bad.followup_count, good.followup_count) == (0, 1)
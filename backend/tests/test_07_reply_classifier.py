@@ -22,3 +22,46 @@ async def test_classify_reply():
         result = await classify_reply("Can you send me your pricing?", "Re: Web design")
         assert result["classification"] == "interested"
         assert result["confidence"] == 0.95
+
+
+def _reply(subject="Re: Web design", body="", sender="owner@acme.com", headers=()):
+    from datetime import datetime
+    from app.modules.tracking.reply_tracker import InboundReply
+    return InboundReply(sender, subject, datetime(2026, 10, 1), body, (), tuple(headers))
+
+
+def test_rules_settle_obvious_replies_locally():
+    """Auto-replies, delivery reports and short opt-outs never need the LLM."""
+    from app.modules.tracking.reply_rules import BOUNCE, is_bounce, pre_classify
+
+    assert pre_classify(_reply(headers=[("auto-submitted", "auto-replied")]))["classification"] == "auto_reply"
+    assert pre_classify(_reply(headers=[("precedence", "auto_reply")]))["classification"] == "auto_reply"
+    assert pre_classify(_reply(subject="Automatic reply: Web design"))["classification"] == "auto_reply"
+    assert pre_classify(_reply(headers=[("auto-submitted", "no")], body="Tell me more")) is None
+
+    dsn = _reply(sender="mailer-daemon@mx.example.com", subject="Undeliverable: Web design")
+    assert is_bounce(dsn) and pre_classify(dsn)["classification"] == BOUNCE
+    assert is_bounce(_reply(headers=[("content-type", "multipart/report; report-type=delivery-status")]))
+
+    quoted = "Unsubscribe\n\nOn Mon, Oct 5, 2026 at 10:00 AM Jane <j@x.com> wrote:\n> Hi there, long pitch..."
+    assert pre_classify(_reply(body=quoted))["classification"] == "not_interested"
+    assert pre_classify(_reply(body="No thanks, we're not interested."))["classification"] == "not_interested"
+    assert pre_classify(_reply(body="Jane no longer works here."))["classification"] == "wrong_person"
+
+    # Anything with substance is left to the LLM.
+    assert pre_classify(_reply(body="Not interested in SEO, but what would a new site cost?")) is None
+
+
+@pytest.mark.asyncio
+async def test_classify_inbound_only_calls_llm_when_rules_abstain():
+    from app.modules.tracking import reply_classifier
+
+    llm = AsyncMock(return_value={"classification": "question", "confidence": 0.8, "key_signal": "cost?"})
+    with patch.object(reply_classifier, "classify_reply", llm):
+        data, source = await reply_classifier.classify_inbound(_reply(body="Please remove me from your list"))
+        assert (data["classification"], source) == ("not_interested", "rules")
+        llm.assert_not_awaited()
+
+        data, source = await reply_classifier.classify_inbound(_reply(body="What would this cost?"))
+        assert (data["classification"], source) == ("question", "llm")
+        llm.assert_awaited_once()
@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _completion(content: str, tokens: int = 120):
+    completion = MagicMock()
+    completion.choices = [MagicMock(message=MagicMock(content=content))]
+    completion.usage.total_tokens = tokens
+    return completion
+
+
+@pytest.mark.asyncio
+async def test_cached_completion_reuses_identical_prompt():
+    """Identical opted-in prompts hit Groq once and record the tokens saved."""
+    from app.modules.personalization.llm_cache import cached_json_completion, llm_cache
+
+    llm_cache.clear()
+    before = dict(llm_cache.stats)
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=_completion('{"ok": true}'))
+
+    first = await cached_json_completion(client, "m", "same prompt", 0.0, use_cache=True)
+    second = await cached_json_completion(client, "m", "same prompt", 0.0, use_cache=True)
+
+    assert first == second == {"ok": True}
+    assert client.chat.completions.create.await_count == 1
+    assert llm_cache.stats["hits"] - before["hits"] == 1
+    assert llm_cache.stats["tokens_saved"] - before["tokens_saved"] == 120
+
+
+@pytest.mark.asyncio
+async def test_cache_is_opt_in_and_skips_invalid_json():
+    """Calls without use_cache, and unparseable responses, are never cached."""
+    from app.modules.personalization.llm_cache import cached_json_completion, llm_cache
+
+    llm_cache.clear()
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=_completion('{"ok": 1}'))
+
+    await cached_json_completion(client, "m", "p", 0.7)
+    await cached_json_completion(client, "m", "p", 0.7)
+    assert client.chat.completions.create.await_count == 2
+    assert llm_cache.snapshot()["entries"] == 0
+
+    client.chat.completions.create = AsyncMock(return_value=_completion("not json"))
+    with pytest.raises(ValueError):
+        await cached_json_completion(client, "m", "bad", 0.7, use_cache=True)
+    assert llm_cache.snapshot()["entries"] == 0
+
+
+def test_cache_expiry_and_eviction():
+    """Entries expire after the TTL and the oldest are evicted past max_entries."""
+    from app.modules.personalization.llm_cache import LLMResponseCache
+
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.put("c", "3")
+    assert cache.get("a") is None
+    assert cache.stats["evictions"] == 1
+
+    cache.ttl_seconds = -1
+    assert cache.get("c") is None
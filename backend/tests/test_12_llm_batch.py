@@ -0,0 +1,60 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _completion(payload):
+    completion = MagicMock()
+    completion.choices = [MagicMock(message=MagicMock(content=json.dumps(payload)))]
+    completion.usage.total_tokens = 0
+    return completion
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_only_valid_known_items():
+    """Invalid, duplicate and unknown IDs are dropped from the batched result."""
+    from app.modules.personalization.llm_batch import batch_json_completion
+
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=_completion({"results": [
+        {"id": "a", "subject": "Hi A"},
+        {"id": "b", "subject": 42},
+        {"id": "a", "subject": "Duplicate"},
+        {"id": "zzz", "subject": "Unknown"},
+    ]}))
+
+    served = await batch_json_completion(
+        client, "m", "Write a subject.", {"a": {"name": "A"}, "b": {"name": "B"}},
+        result_fields='"subject": "..."',
+        validate=lambda item: isinstance(item.get("subject"), str),
+        temperature=0.7,
+    )
+
+    assert served == {"a": {"subject": "Hi A"}}
+    assert client.chat.completions.create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_email_batch_falls_back_to_single_calls():
+    """Leads missing from the batched response are generated individually."""
+    from app.modules.personalization.groq_client import GroqClient
+
+    client = GroqClient()
+    client.client = MagicMock()
+    client.client.chat.completions.create = AsyncMock(return_value=_completion({"results": [
+        {"id": "1", "subject": "For One", "body_html": "<p>1</p>", "benefits": ["x"]},
+    ]}))
+    single = AsyncMock(return_value={"subject": "Single", "body_html": "<p>2</p>", "benefits": []})
+
+    with patch("app.modules.personalization.groq_client._load_prompt_override",
+               AsyncMock(return_value=None)), \
+         patch.object(client, "generate_email_content", single):
+        results = await client.generate_email_content_batch({
+            "1": {"business_name": "One"},
+            "2": {"business_name": "Two"},
+        })
+
+    assert results["1"]["subject"] == "For One"
+    assert results["2"]["subject"] == "Single"
+    single.assert_awaited_once()
+    assert client.client.chat.completions.create.await_count == 1
@@ -0,0 +1,116 @@
+import pytest
+from email.message import EmailMessage
+from unittest.mock import patch
+
+import aiosmtplib
+
+
+class FakeSMTP:
+    """Stands in for aiosmtplib.SMTP; records connects and sends."""
+    instances = []
+    fail_next_with = None
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.is_connected = False
+        self.sent = 0
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def send_message(self, message):
+        if FakeSMTP.fail_next_with is not None:
+            exc, FakeSMTP.fail_next_with = FakeSMTP.fail_next_with, None
+            raise exc
+        self.sent += 1
+
+    async def noop(self):
+        pass
+
+    async def rset(self):
+        self.resets = getattr(self, "resets", 0) + 1
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+def _message():
+    msg = EmailMessage()
+    msg["To"] = "lead@example.com"
+    msg.set_content("hi")
+    return msg
+
+
+@pytest.fixture
+def fake_smtp():
+    FakeSMTP.instances = []
+    FakeSMTP.fail_next_with = None
+    with patch("app.modules.outreach.smtp_pool.aiosmtplib.SMTP", FakeSMTP):
+        yield FakeSMTP
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_authenticated_connection(fake_smtp):
+    """Consecutive sends share one connection instead of reconnecting."""
+    from app.modules.outreach.smtp_pool import SMTPConnectionPool
+
+    pool = SMTPConnectionPool("smtp.test", 587, "user", "pw")
+    for _ in range(3):
+        await pool.send_message(_message())
+    await pool.close()
+
+    assert len(fake_smtp.instances) == 1
+    assert fake_smtp.instances[0].sent == 3
+    assert pool.stats["reuses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_on_421(fake_smtp):
+    """A 421 drops the connection and the message is retried on a new one."""
+    from app.modules.outreach.smtp_pool import SMTPConnectionPool
+
+    pool = SMTPConnectionPool("smtp.test", 587, "user", "pw")
+    fake_smtp.fail_next_with = aiosmtplib.SMTPResponseException(421, "closing")
+    await pool.send_message(_message())
+    await pool.close()
+
+    assert len(fake_smtp.instances) == 2
+    assert fake_smtp.instances[1].sent == 1
+    assert pool.stats["reconnects"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_raises_on_rejection(fake_smtp):
+    """Non-transient SMTP errors surface to the caller without a reconnect."""
+    from app.modules.outreach.smtp_pool import SMTPConnectionPool
+
+    pool = SMTPConnectionPool("smtp.test", 587, "user", "pw")
+    fake_smtp.fail_next_with = aiosmtplib.SMTPResponseException(550, "no such user")
+    with pytest.raises(aiosmtplib.SMTPResponseException):
+        await pool.send_message(_message())
+    await pool.close()
+
+    assert pool.stats["reconnects"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_recipient_keeps_connection_pooled(fake_smtp):
+    """A 550 resets the envelope and the next message reuses the same connection."""
+    from app.modules.outreach.smtp_pool import SMTPConnectionPool
+
+    pool = SMTPConnectionPool("smtp.test", 587, "user", "pw")
+    fake_smtp.fail_next_with = aiosmtplib.SMTPRecipientsRefused(
+        [aiosmtplib.SMTPRecipientRefused(550, "5.1.1 User unknown", "lead@example.com")]
+    )
+    with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+        await pool.send_message(_message())
+    await pool.send_message(_message())
+    await pool.close()
+
+    (conn,) = fake_smtp.instances
+    assert (conn.resets, conn.sent) == (1, 1)
+    assert pool.stats["rejected"] == 1 and pool.stats["reuses"] == 1
@@ -0,0 +1,70 @@
+import pytest
+from datetime import datetime
+
+
+def _scheduler(**overrides):
+    from app.modules.outreach.dispatch_scheduler import DispatchScheduler
+
+    options = dict(
+        send_interval_seconds=60,
+        sender_burst=3,
+        domain_max_per_hour=60,
+        daily_cap=100,
+        window_start_hour=8,
+        window_end_hour=20,
+        clock=lambda: 1000.0,
+        local_now=lambda: datetime(2024, 5, 1, 10, 0),
+    )
+    options.update(overrides)
+    return DispatchScheduler(**options)
+
+
+def test_plan_interleaves_domains():
+    """A second message to a busy domain waits; other domains go immediately."""
+    scheduler = _scheduler()
+    items = ["a@gmail.com", "b@gmail.com", "c@outlook.com"]
+
+    plan = scheduler.plan(items, recipient=lambda email: email)
+
+    assert plan.deferred == []
+    assert [(round(delay), email) for delay, email in plan.scheduled] == [
+        (0, "a@gmail.com"),
+        (0, "c@outlook.com"),
+        (60, "b@gmail.com"),
+    ]
+
+
+def test_plan_respects_daily_cap():
+    """Messages beyond the remaining daily budget are deferred."""
+    scheduler = _scheduler(daily_cap=5)
+    scheduler.sync_sent_today(4)
+
+    plan = scheduler.plan(["a@x.com", "b@y.com"], recipient=lambda email: email)
+
+    assert len(plan.scheduled) == 1
+    assert plan.deferred == ["b@y.com"]
+
+
+def test_plan_defers_outside_window():
+    """Nothing is planned before the window opens."""
+    scheduler = _scheduler(local_now=lambda: datetime(2024, 5, 1, 6, 0))
+
+    plan = scheduler.plan(["a@x.com"], recipient=lambda email: email)
+
+    assert plan.scheduled == []
+    assert plan.deferred == ["a@x.com"]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_counts_successes():
+    """dispatch() sends every scheduled item and counts successful sends."""
+    scheduler = _scheduler()
+
+    async def send(email):
+        return not email.startswith("bad@")
+
+    sent, deferred = await scheduler.dispatch(
+        ["ok@x.com", "bad@y.com"], recipient=lambda e: e, send=send
+    )
+    assert deferred == []
+    assert sent == 1
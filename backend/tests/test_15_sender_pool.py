@@ -0,0 +1,104 @@
+import pytest
+from datetime import date, timedelta
+
+import aiosmtplib
+
+
+def _account(account_id, **overrides):
+    from app.modules.outreach.sender_pool import SenderAccount
+
+    options = dict(
+        id=account_id, host="smtp.test", port=587, username=account_id,
+        password="pw", from_email=f"{account_id}@example.com", from_name="Test",
+        daily_quota=10,
+    )
+    options.update(overrides)
+    return SenderAccount(**options)
+
+
+def test_assign_spreads_by_load_and_quota():
+    """Messages go to the least-loaded account; combined quota bounds volume."""
+    from app.modules.outreach.sender_pool import SenderPool
+
+    pool = SenderPool([_account("a", daily_quota=2), _account("b", daily_quota=2)])
+    assigned = pool.assign(list(range(5)), key=lambda i: i)
+
+    assert len(assigned) == 4
+    assert sorted(a.id for a in assigned.values()) == ["a", "a", "b", "b"]
+
+
+def test_warmup_ramps_quota():
+    """A warming account starts low and reaches its full quota after warm-up."""
+    today = date.today()
+    account = _account("a", daily_quota=100, warmup_days=10, warmup_start=20, started_on=today)
+
+    assert account.effective_quota(today) == 20
+    assert account.effective_quota(today + timedelta(days=5)) == 60
+    assert account.effective_quota(today + timedelta(days=10)) == 100
+
+
+@pytest.mark.asyncio
+async def test_failover_on_auth_error():
+    """An authentication failure benches the account and retries on another."""
+    from app.modules.outreach.sender_pool import SenderPool, send_with_failover
+
+    pool = SenderPool([_account("a"), _account("b")])
+    first = pool.choose()
+    pool.reserve(first)
+
+    async def send(account):
+        if account.id == first.id:
+            raise aiosmtplib.SMTPAuthenticationError(535, "bad credentials")
+        return True
+
+    used = await send_with_failover(pool, first, send)
+
+    assert used is not None and used.id != first.id
+    assert not first.is_healthy(pool.clock())
+    assert pool.choose().id == used.id
+
+
+@pytest.mark.asyncio
+async def test_recipient_rejection_leaves_account_healthy():
+    """A 550 for one recipient fails that message only; the sender keeps sending."""
+    from app.modules.outreach.sender_pool import SenderPool, is_account_error, send_with_failover
+
+    account = _account("a")
+    pool = SenderPool([account])
+    unknown_user = aiosmtplib.SMTPRecipientRefused(550, "5.1.1 User unknown; rate of delivery limited", "x@example.com")
+    assert not is_account_error(unknown_user)
+
+    for _ in range(5):
+        pool.reserve(account)
+
+        async def send(_account):
+            raise unknown_user
+
+        with pytest.raises(aiosmtplib.SMTPRecipientRefused):
+            await send_with_failover(pool, account, send)
+
+    assert account.is_healthy(pool.clock())
+    assert account.transient_failures == 0
+    assert pool.remaining(account) == 10
+    assert pool.choose() is account
+
+
+@pytest.mark.asyncio
+async def test_quota_reply_benches_account_for_the_day():
+    """A 452 quota reply benches the sender for today and fails over."""
+    from app.modules.outreach.sender_pool import SenderPool, send_with_failover
+
+    pool = SenderPool([_account("a"), _account("b")])
+    first = pool.choose()
+    pool.reserve(first)
+
+    async def send(account):
+        if account.id == first.id:
+            raise aiosmtplib.SMTPResponseException(452, "4.5.3 Daily sending quota exceeded")
+        return True
+
+    used = await send_with_failover(pool, first, send)
+
+    assert used is not None and used.id != first.id
+    assert pool.remaining(first) == 0
+    assert pool.choose().id == used.id
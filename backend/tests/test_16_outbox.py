@@ -0,0 +1,297 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.campaign import Campaign, EmailOutreach
+from app.models.lead import Lead
+
+
+async def _queue_email(db_session, token: str) -> EmailOutreach:
+    lead = Lead(place_id=f"place_{token}", business_name="Outbox Biz", email=f"{token}@example.com")
+    campaign = Campaign(name="Outbox", campaign_date=datetime.utcnow().date())
+    db_session.add_all([lead, campaign])
+    await db_session.flush()
+    row = EmailOutreach(
+        lead_id=lead.id, campaign_id=campaign.id, to_email=lead.email,
+        subject="Hi", body_html="<p>Hi</p>", tracking_token=token, status="queued",
+    )
+    db_session.add(row)
+    await db_session.commit()
+    return row
+
+
+@pytest.mark.asyncio
+async def test_claim_is_exclusive_until_lease_expires(db_session):
+    """A claimed row is skipped by other workers until its lease lapses."""
+    from app.modules.outreach import outbox
+
+    row = await _queue_email(db_session, "tok_claim")
+
+    claimed = await outbox.claim_batch(db_session, "worker-a", 10)
+    assert [r.id for r in claimed] == [row.id]
+    assert claimed[0].status == "sending"
+    assert claimed[0].attempt_count == 1
+
+    assert await outbox.claim_batch(db_session, "worker-b", 10) == []
+
+    # Simulate worker-a crashing: its lease lapses.
+    claimed[0].lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    await db_session.commit()
+
+    reclaimed = await outbox.claim_batch(db_session, "worker-b", 10)
+    assert [r.claimed_by for r in reclaimed] == ["worker-b"]
+    assert reclaimed[0].attempt_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_backs_off_then_fails(db_session):
+    """Failures requeue with backoff until attempts are exhausted."""
+    from app.modules.outreach import outbox
+    from app.config import get_settings
+
+    row = await _queue_email(db_session, "tok_fail")
+    (claimed,) = await outbox.claim_batch(db_session, "worker-a", 10)
+    assert claimed.id == row.id
+
+    outbox.mark_failed_attempt(claimed, "421 try later")
+    await db_session.commit()
+    assert claimed.status == "queued"
+    assert claimed.next_attempt_at > datetime.utcnow()
+    assert await outbox.claim_batch(db_session, "worker-a", 10) == []
+
+    claimed.attempt_count = get_settings().OUTBOX_MAX_ATTEMPTS
+    outbox.mark_failed_attempt(claimed, "still failing")
+    assert claimed.status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_apply_outcomes_updates_leads_and_counters(db_session):
+    """Sent rows transition their leads and increment campaign counters in bulk."""
+    from sqlalchemy import select
+    from app.modules.outreach import outbox
+
+    first = await _queue_email(db_session, "tok_ok_1")
+    second = await _queue_email(db_session, "tok_ok_2")
+    second.campaign_id = first.campaign_id
+    await db_session.commit()
+
+    claimed = await outbox.claim_batch(db_session, "worker-a", 10)
+    for row in claimed:
+        outbox.mark_sent(row, "sender@example.com", datetime.utcnow())
+    await outbox.apply_outcomes(db_session, claimed, [])
+
+    campaign = (await db_session.execute(
+        select(Campaign).where(Campaign.id == first.campaign_id)
+        .execution_options(populate_existing=True)
+    )).scalars().one()
+    assert campaign.status == "active"
+
+    from app.modules.analytics.campaign_metrics import campaign_totals, merge_campaign_metrics
+    totals = await campaign_totals(db_session, [campaign.id])
+    assert totals[campaign.id]["emails_sent"] == 2
+
+    await merge_campaign_metrics(db_session)
+    await db_session.refresh(campaign)
+    assert campaign.emails_sent == 2
+
+    leads = (await db_session.execute(
+        select(Lead).where(Lead.id.in_([first.lead_id, second.lead_id]))
+        .execution_options(populate_existing=True)
+    )).scalars().all()
+    assert {lead.status for lead in leads} == {"email_sent"}
+    assert all(lead.followup_sequence_active for lead in leads)
+
+
+@pytest.mark.asyncio
+async def test_apply_outcomes_stamps_each_lead_with_its_send_time(db_session):
+    """A flush applies each row's own sent_at, so the funnel counts the send day."""
+    from sqlalchemy import select
+    from app.modules.analytics.daily_funnel import funnel_totals
+    from app.modules.outreach import outbox
+    from app.modules.outreach.followup_engine import FOLLOWUP_SCHEDULE
+
+    early = await _queue_email(db_session, "tok_early")
+    late = await _queue_email(db_session, "tok_late")
+    late_at = datetime.utcnow().replace(microsecond=0)
+    early_at = late_at - timedelta(days=1)
+    sent_at = {early.lead_id: early_at, late.lead_id: late_at}
+
+    claimed = await outbox.claim_batch(db_session, "worker-a", 10)
+    for row in claimed:
+        outbox.mark_sent(row, "sender@example.com", sent_at[row.lead_id])
+    await outbox.apply_outcomes(db_session, claimed, [])
+
+    leads = (await db_session.execute(
+        select(Lead).where(Lead.id.in_(list(sent_at)))
+        .execution_options(populate_existing=True)
+    )).scalars().all()
+    first_followup = timedelta(days=FOLLOWUP_SCHEDULE[0]["days_after"])
+    for lead in leads:
+        assert lead.email_sent_at == sent_at[lead.id]
+        assert lead.next_followup_at == sent_at[lead.id] + first_followup
+
+    for day in (early_at.date(), late_at.date()):
+        totals = await funnel_totals(db_session, day, day + timedelta(days=1))
+        assert totals["emailed"] == 1
+
+
+def _dispatch_patches(send_email):
+    """Patches the outreach worker's scheduler, sender pool and SMTP send."""
+    from contextlib import ExitStack
+    from unittest.mock import patch
+    from app.modules.outreach.dispatch_scheduler import DispatchScheduler
+    from app.modules.outreach.sender_pool import SenderAccount, SenderPool
+
+    account = SenderAccount(id="s1", host="h", port=25, username="u", password="p",
+                            from_email="s1@example.com", from_name="S1")
+    stack = ExitStack()
+    stack.enter_context(patch("app.tasks.daily_pipeline.dispatch_scheduler",
+                              DispatchScheduler(send_interval_seconds=0.01, sender_burst=10)))
+    stack.enter_context(patch("app.tasks.daily_pipeline.sender_pool", SenderPool([account])))
+    stack.enter_context(patch("app.tasks.daily_pipeline.send_email", send_email))
+    stack.enter_context(patch("app.tasks.daily_pipeline._OUTCOME_RETRY_SECONDS", 0))
+    return stack
+
+
+@pytest.mark.asyncio
+async def test_delivered_row_survives_failed_outcome_write(db_session):
+    """A failed outcome write is retried; the delivered row ends 'sent' and is sent once."""
+    from unittest.mock import AsyncMock, patch
+    from app.modules.outreach import outbox
+    from app.tasks.daily_pipeline import _run_outbox_worker
+
+    row = await _queue_email(db_session, "tok_retry")
+    send_email = AsyncMock(return_value=True)
+    real_apply = outbox.apply_outcomes
+    calls = []
+
+    async def flaky_apply(db, sent, failed):
+        calls.append(len(sent))
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        await real_apply(db, sent, failed)
+
+    with _dispatch_patches(send_email), patch.object(outbox, "apply_outcomes", flaky_apply):
+        assert await _run_outbox_worker() == 1
+        assert await _run_outbox_worker() == 0
+
+    await db_session.refresh(row)
+    assert (row.status, row.sender_account) == ("sent", "s1")
+    assert calls == [1, 1]
+    assert send_email.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_delivery_is_recorded_when_outcome_writes_keep_failing(db_session):
+    """If every retry fails, the row is still marked sent so a lapsed lease cannot resend it."""
+    from unittest.mock import AsyncMock, patch
+    from app.modules.outreach import outbox
+    from app.tasks.daily_pipeline import _run_outbox_worker
+
+    row = await _queue_email(db_session, "tok_broken")
+    send_email = AsyncMock(return_value=True)
+
+    with _dispatch_patches(send_email), \
+            patch.object(outbox, "apply_outcomes", AsyncMock(side_effect=RuntimeError("db down"))):
+        await _run_outbox_worker()
+
+    await db_session.refresh(row)
+    assert row.status == "sent" and row.brevo_message_id
+    row.lease_expires_at = datetime.utcnow() - timedelta(hours=1)
+    await db_session.commit()
+    assert await outbox.claim_batch(db_session, "worker-b", 10) == []
+    assert send_email.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_proposal_is_rendered_in_memory_at_dispatch(db_session, tmp_path, monkeypatch):
+    """A row with a proposal_context is sent with freshly rendered bytes and no files."""
+    import tempfile
+    from unittest.mock import AsyncMock, patch
+    from app.modules.outreach.artifact_store import ArtifactStore, content_digest
+    from app.modules.personalization.proposal_artifacts import build_proposal_context, proposal_filenames
+    from app.tasks.daily_pipeline import _run_outbox_worker
+
+    row = await _queue_email(db_session, "tok_proposal")
+    lead = await db_session.get(Lead, row.lead_id)
+    row.proposal_context = build_proposal_context(lead, ["Faster booking"])
+    row.attachment_names = proposal_filenames(lead.id)
+    row.has_attachment = True
+    await db_session.commit()
+
+    # Any stray file write would land in one of these.
+    scratch = tmp_path / "tmp"
+    scratch.mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+
+    send_email = AsyncMock(return_value=True)
+    with _dispatch_patches(send_email), \
+            patch("app.modules.personalization.proposal_artifacts.artifact_store", ArtifactStore()):
+        assert await _run_outbox_worker() == 1
+
+    kwargs = send_email.await_args.kwargs
+    attachments = kwargs["attachments"]
+    assert kwargs["attachment_paths"] == []
+    assert [a.filename for a in attachments] == proposal_filenames(lead.id)
+    assert attachments[0].content.startswith(b"%PDF")
+    assert attachments[1].content.startswith(b"PK")
+    assert all(a.digest == content_digest(a.content) for a in attachments)
+    assert list(tmp_path.rglob("*")) == [scratch]
+
+    await db_session.refresh(row)
+    assert [ref["sha256"] for ref in row.attachment_refs] == [a.digest for a in attachments]
+
+
+@pytest.mark.asyncio
+async def test_legacy_rows_send_their_attachment_paths(db_session):
+    """Rows queued before lazy rendering still send the files named in attachment_names."""
+    from unittest.mock import AsyncMock
+    from app.tasks.daily_pipeline import _run_outbox_worker
+
+    row = await _queue_email(db_session, "tok_legacy")
+    row.has_attachment = True
+    row.attachment_names = ["/app/attachments/Proposal_legacy.pdf"]
+    await db_session.commit()
+
+    send_email = AsyncMock(return_value=True)
+    with _dispatch_patches(send_email):
+        assert await _run_outbox_worker() == 1
+
+    kwargs = send_email.await_args.kwargs
+    assert kwargs["attachment_paths"] == ["/app/attachments/Proposal_legacy.pdf"]
+    assert kwargs["attachments"] == []
+    await db_session.refresh(row)
+    assert row.status == "sent" and row.attachment_refs is None
+
+
+@pytest.mark.asyncio
+async def test_no_transaction_is_held_open_while_sends_are_paced(db_session):
+    """No database connection stays checked out (idle in transaction) during a send."""
+    from unittest.mock import AsyncMock
+    from sqlalchemy import event
+    from app.tasks.daily_pipeline import _run_outbox_worker
+
+    await _queue_email(db_session, "tok_idle")
+    pool = db_session.bind.sync_engine.pool
+    checked_out = [0]
+    held_during_send = []
+
+    def on_checkout(*args):
+        checked_out[0] += 1
+
+    def on_checkin(*args):
+        checked_out[0] -= 1
+
+    async def send_email(**kwargs):
+        held_during_send.append(checked_out[0])
+        return True
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+    try:
+        with _dispatch_patches(AsyncMock(side_effect=send_email)):
+            assert await _run_outbox_worker() == 1
+    finally:
+        event.remove(pool, "checkout", on_checkout)
+        event.remove(pool, "checkin", on_checkin)
+    assert held_during_send == [0]
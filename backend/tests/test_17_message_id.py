@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from app.models.campaign import Campaign, EmailOutreach
+from app.models.lead import Lead
+
+
+def test_message_ids_are_unique_and_normalized():
+    from app.modules.outreach.email_sender import make_message_id, normalize_message_id
+
+    first = make_message_id("sales@agency.test")
+    assert first.startswith("<") and first.endswith("@agency.test>")
+    assert first != make_message_id("sales@agency.test")
+
+    assert normalize_message_id(" abc@agency.test ") == "<abc@agency.test>"
+    assert normalize_message_id("<abc@agency.test>") == "<abc@agency.test>"
+    assert normalize_message_id("") is None
+
+
+@pytest.mark.asyncio
+async def test_send_email_uses_supplied_message_id():
+    """The stored Message-ID is the one that goes out on the wire."""
+    from app.modules.outreach import email_sender
+
+    pool = AsyncMock()
+    with patch.object(email_sender, "get_smtp_pool", return_value=pool):
+        ok = await email_sender.send_email(
+            "lead@example.com", "Hi", "<p>Hi</p>", message_id="<fixed@agency.test>",
+        )
+    assert ok
+    sent = pool.send_message.await_args.args[0]
+    assert sent["Message-ID"] == "<fixed@agency.test>"
+
+
+@pytest.mark.asyncio
+async def test_brevo_webhook_matches_by_message_id(client, db_session):
+    """Delivery and bounce events update the row with that Message-ID only."""
+    lead = Lead(place_id="place_msgid", business_name="MsgId Biz", email="lead@example.com")
+    campaign = Campaign(name="MsgId", campaign_date=datetime.utcnow().date())
+    db_session.add_all([lead, campaign])
+    await db_session.flush()
+    rows = [
+        EmailOutreach(
+            lead_id=lead.id, campaign_id=campaign.id, to_email=lead.email,
+            subject="Hi", body_html="<p>Hi</p>", tracking_token=f"tok_msgid_{i}",
+            status="sent", brevo_message_id=f"<m{i}@agency.test>",
+        )
+        for i in range(2)
+    ]
+    db_session.add_all(rows)
+    await db_session.commit()
+
+    # Brevo may report the ID with or without angle brackets.
+    resp = await client.post("/api/v1/webhooks/brevo", json={
+        "event": "delivered", "email": lead.email, "message-id": "m0@agency.test",
+    })
+    assert resp.json()["status"] == "ok"
+    await client.post("/api/v1/webhooks/brevo", json={
+        "event": "hard_bounce", "email": lead.email, "message-id": "<m1@agency.test>",
+        "reason": "mailbox unavailable",
+    })
+
+    from app.modules.tracking.delivery_events import delivery_event_buffer
+    await delivery_event_buffer.flush()
+
+    for row in rows:
+        await db_session.refresh(row)
+    assert rows[0].status == "delivered"
+    assert rows[0].delivered_at is not None
+    assert rows[1].status == "bounced"
+    assert rows[1].bounce_reason == "mailbox unavailable"
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from datetime import datetime
+
+from app.models.campaign import Campaign, EmailOutreach
+from app.models.lead import Lead
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_full_batches_and_on_interval():
+    """A full batch flushes at once; a partial one after the interval."""
+    from app.core.write_behind import WriteBehindBuffer
+
+    batches = []
+
+    async def flush(items):
+        batches.append(list(items))
+
+    buffer = WriteBehindBuffer("test", flush, max_batch=3, flush_interval_ms=50, max_pending=5)
+    for i in range(3):
+        assert buffer.put(i)
+    await asyncio.sleep(0.01)
+    assert batches == [[0, 1, 2]]
+
+    buffer.put(3)
+    await asyncio.sleep(0.01)
+    assert len(batches) == 1
+    await asyncio.sleep(0.1)
+    assert batches == [[0, 1, 2], [3]]
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_buffer_rejects_when_full_and_drains_on_close():
+    from app.core.write_behind import WriteBehindBuffer
+
+    flushed = []
+
+    async def flush(items):
+        flushed.extend(items)
+
+    buffer = WriteBehindBuffer("test", flush, max_batch=100, flush_interval_ms=60000, max_pending=2)
+    assert buffer.put("a") and buffer.put("b")
+    assert not buffer.put("c")
+    assert buffer.stats["rejected"] == 1
+
+    await buffer.close()
+    assert flushed == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_batched_brevo_payload_is_acknowledged_then_applied(client, db_session):
+    """An array payload is queued, acknowledged, and applied in one flush."""
+    from app.modules.tracking.delivery_events import delivery_event_buffer
+
+    lead = Lead(place_id="place_wb", business_name="WB Biz", email="wb@example.com")
+    campaign = Campaign(name="WB", campaign_date=datetime.utcnow().date())
+    db_session.add_all([lead, campaign])
+    await db_session.flush()
+    rows = [
+        EmailOutreach(
+            lead_id=lead.id, campaign_id=campaign.id, to_email=lead.email,
+            subject="Hi", body_html="<p>Hi</p>", tracking_token=f"tok_wb_{i}",
+            status="sent", brevo_message_id=f"<wb{i}@agency.test>",
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(rows)
+    await db_session.commit()
+
+    resp = await client.post("/api/v1/webhooks/brevo", json=[
+        {"event": "delivered", "message-id": "<wb0@agency.test>"},
+        {"event": "delivered", "message-id": "<wb1@agency.test>"},
+        {"event": "soft_bounce", "message-id": "<wb2@agency.test>", "reason": "mailbox full"},
+        {"event": "request", "message-id": "<wb0@agency.test>"},
+    ])
+    assert resp.json() == {"status": "ok", "accepted": 3}
+    assert len(delivery_event_buffer) == 3
+
+    await delivery_event_buffer.flush()
+    for row in rows:
+        await db_session.refresh(row)
+    assert [r.status for r in rows] == ["delivered", "delivered", "bounced"]
+    assert rows[2].bounce_reason == "mailbox full"
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_the_in_flight_batch():
+    """Closing mid-flush lets that batch finish, then drains the rest."""
+    from app.core.write_behind import WriteBehindBuffer
+
+    flushed = []
+    started = asyncio.Event()
+
+    async def flush(items):
+        started.set()
+        await asyncio.sleep(0.05)
+        flushed.extend(items)
+
+    buffer = WriteBehindBuffer("test", flush, max_batch=2, flush_interval_ms=60000, max_pending=10)
+    buffer.put(0)
+    buffer.put(1)
+    await started.wait()
+    buffer.put(2)
+
+    await buffer.close()
+    assert flushed == [0, 1, 2]
+    assert buffer.stats["errors"] == 0 and len(buffer) == 0
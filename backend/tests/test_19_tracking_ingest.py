@@ -0,0 +1,97 @@
+import pytest
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import func, select
+
+from app.models.campaign import Campaign, EmailOutreach
+from app.models.email_event import EmailEvent
+from app.models.lead import Lead
+
+BROWSER = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0"}
+
+
+async def _sent_emails(db_session, count: int):
+    from app.modules.tracking.token_codec import encode_tracking_token
+
+    campaign = Campaign(name="Tracking", campaign_date=datetime.utcnow().date())
+    db_session.add(campaign)
+    await db_session.flush()
+    leads, rows = [], []
+    for i in range(count):
+        lead = Lead(place_id=f"place_trk_{i}", business_name=f"Biz {i}",
+                    email=f"trk{i}@example.com", status="email_sent", followup_sequence_active=True)
+        db_session.add(lead)
+        await db_session.flush()
+        outreach_id = uuid.uuid4()
+        rows.append(EmailOutreach(
+            id=outreach_id, lead_id=lead.id, campaign_id=campaign.id, to_email=lead.email, subject="Hi",
+            body_html="<p>Hi</p>", tracking_token=encode_tracking_token(outreach_id, lead.id, campaign.id),
+            status="sent",
+        ))
+        leads.append(lead)
+    db_session.add_all(rows)
+    await db_session.commit()
+    return campaign, leads, rows
+
+
+@pytest.mark.asyncio
+async def test_pixel_queues_event_without_touching_the_database(client, db_session):
+    from app.modules.tracking.pixel_tracker import tracking_event_buffer
+
+    _, _, rows = await _sent_emails(db_session, 1)
+    resp = await client.get(f"/api/v1/track/open/{rows[0].tracking_token}", headers=BROWSER)
+    assert resp.headers["content-type"] == "image/gif"
+    assert len(tracking_event_buffer) == 1
+
+    count = await db_session.scalar(select(func.count(EmailEvent.id)))
+    assert count == 0
+    await tracking_event_buffer.flush()
+    count = await db_session.scalar(select(func.count(EmailEvent.id)))
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_first_open_and_click_once(db_session):
+    """Repeated opens count once per lead; a click also counts as an open."""
+    from app.modules.tracking.pixel_tracker import TrackingEvent, apply_tracking_events
+
+    campaign, leads, rows = await _sent_emails(db_session, 3)
+    def event(row, event_type, **kwargs):
+        return TrackingEvent(row.tracking_token, event_type, row.lead_id, row.campaign_id, row.id, **kwargs)
+
+    events = [
+        event(rows[0], "open"),
+        event(rows[0], "open"),
+        event(rows[1], "click", url_clicked="https://x.test"),
+        TrackingEvent("stale", "open", leads[2].id, campaign.id, uuid.uuid4()),
+    ]
+    first_clicked = await apply_tracking_events(db_session, events)
+    assert [lead.id for lead in first_clicked] == [leads[1].id]
+
+    # A second batch with the same events must not double count.
+    await apply_tracking_events(db_session, events[:3])
+
+    for obj in (campaign, *leads, *rows):
+        await db_session.refresh(obj)
+    from app.modules.analytics.campaign_metrics import campaign_totals
+    totals = (await campaign_totals(db_session, [campaign.id]))[campaign.id]
+    assert totals["emails_opened"] == 2
+    assert totals["links_clicked"] == 1
+    assert [l.status for l in leads] == ["opened", "clicked", "email_sent"]
+    assert [r.status for r in rows] == ["opened", "clicked", "sent"]
+    assert leads[1].followup_sequence_active is False
+    assert leads[0].followup_sequence_active is True
+    assert await db_session.scalar(select(func.count(EmailEvent.id))) == 6
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_falls_back_to_inline_write(client, db_session):
+    from app.modules.tracking import pixel_tracker
+
+    _, _, rows = await _sent_emails(db_session, 1)
+    with patch.object(pixel_tracker.tracking_event_buffer, "put", return_value=False), \
+         patch("app.api.v1.tracking.record_tracking_events", new=AsyncMock()) as record:
+        await client.get(f"/api/v1/track/open/{rows[0].tracking_token}", headers=BROWSER)
+    assert record.await_count == 1
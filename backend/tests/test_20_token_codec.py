@@ -0,0 +1,73 @@
+import base64
+import hashlib
+import hmac
+import uuid
+
+import pytest
+
+from app.models.lead import Lead
+
+
+def test_token_round_trips_ids():
+    from app.modules.tracking.token_codec import decode_tracking_token, encode_tracking_token
+
+    outreach_id, lead_id, campaign_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    token = encode_tracking_token(outreach_id, lead_id, campaign_id)
+    assert "." not in token and len(token) == 82
+
+    claims = decode_tracking_token(token)
+    assert (claims.outreach_id, claims.lead_id, claims.campaign_id) == (outreach_id, lead_id, campaign_id)
+    # Every email gets its own token, even for the same lead and campaign.
+    assert encode_tracking_token(uuid.uuid4(), lead_id, campaign_id) != token
+
+
+def test_tampered_and_malformed_tokens_are_rejected():
+    from app.modules.tracking.token_codec import decode_tracking_token, encode_tracking_token
+
+    token = encode_tracking_token(uuid.uuid4(), uuid.uuid4(), uuid.uuid4())
+    raw = bytearray(base64.urlsafe_b64decode(token + "=="))
+    raw[20] ^= 0x01
+    forged = base64.urlsafe_b64encode(bytes(raw)).decode().rstrip("=")
+
+    assert decode_tracking_token(forged) is None
+    assert decode_tracking_token("not-a-token") is None
+    assert decode_tracking_token("a.b") is None
+
+
+def _legacy_token(lead_id, campaign_id, salt: str) -> str:
+    payload = f"{lead_id}_{campaign_id}"
+    sig = hmac.new(salt.encode(), payload.encode(), hashlib.sha256).digest()
+    b64 = lambda b: base64.urlsafe_b64encode(b).decode().rstrip("=")
+    return f"{b64(payload.encode())}.{b64(sig)}"
+
+
+def test_legacy_tokens_still_decode():
+    from app.config import get_settings
+    from app.modules.tracking.token_codec import decode_tracking_token
+
+    lead_id, campaign_id = uuid.uuid4(), uuid.uuid4()
+    claims = decode_tracking_token(_legacy_token(lead_id, campaign_id, get_settings().SECURITY_SALT))
+    assert claims.lead_id == lead_id and claims.campaign_id == campaign_id
+    assert claims.outreach_id is None
+    assert decode_tracking_token(_legacy_token(lead_id, campaign_id, "wrong-salt")) is None
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_updates_lead_from_token(client, db_session):
+    from app.modules.tracking.token_codec import encode_tracking_token
+
+    lead = Lead(place_id="place_unsub", business_name="Unsub Biz", email="unsub@example.com",
+                followup_sequence_active=True)
+    db_session.add(lead)
+    await db_session.commit()
+
+    token = encode_tracking_token(uuid.uuid4(), lead.id, uuid.uuid4())
+    resp = await client.get(f"/api/v1/unsubscribe/{token}")
+    assert resp.status_code == 200
+
+    await db_session.refresh(lead)
+    assert lead.status == "unsubscribed"
+    assert lead.followup_sequence_active is False
+
+    resp = await client.get(f"/api/v1/unsubscribe/{token[:-2]}xx")
+    assert resp.status_code == 400
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.campaign import Campaign
+
+
+@pytest.mark.asyncio
+async def test_increments_accumulate_per_hour_bucket(db_session):
+    """Upserts add to the current bucket; a new hour starts a new bucket."""
+    from app.modules.analytics.campaign_metrics import campaign_totals, record_metrics
+    from app.models.campaign_metric import CampaignMetric
+    from sqlalchemy import func, select
+
+    campaign = Campaign(name="Metrics", campaign_date=datetime.utcnow().date())
+    db_session.add(campaign)
+    await db_session.commit()
+
+    now = datetime(2026, 10, 19, 10, 15)
+    await record_metrics(db_session, {campaign.id: {"emails_sent": 3}}, at=now)
+    await record_metrics(db_session, {campaign.id: {"emails_sent": 1, "emails_opened": 2}}, at=now)
+    await record_metrics(db_session, {campaign.id: {"replies_received": 1}}, at=now + timedelta(hours=1))
+    await db_session.commit()
+
+    assert await db_session.scalar(select(func.count()).select_from(CampaignMetric)) == 2
+    totals = (await campaign_totals(db_session, [campaign.id]))[campaign.id]
+    assert totals == {"emails_sent": 4, "emails_opened": 2, "links_clicked": 0, "replies_received": 1}
+
+    first_hour = await campaign_totals(db_session, since=now.replace(minute=0), until=now.replace(minute=59))
+    assert first_hour[campaign.id]["replies_received"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_increments_are_not_lost():
+    """Separate sessions incrementing the same bucket all land."""
+    from app.modules.analytics.campaign_metrics import campaign_totals, record_metrics
+    from tests.conftest import TestingSessionLocal, test_engine
+    from app.models import Base
+
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with TestingSessionLocal() as db:
+            campaign = Campaign(name="Hot", campaign_date=datetime.utcnow().date())
+            db.add(campaign)
+            await db.commit()
+
+        async def hit():
+            async with TestingSessionLocal() as db:
+                await record_metrics(db, {campaign.id: {"links_clicked": 1}})
+                await db.commit()
+
+        for _ in range(5):
+            await asyncio.gather(*(hit() for _ in range(4)))
+
+        async with TestingSessionLocal() as db:
+            totals = await campaign_totals(db, [campaign.id])
+        assert totals[campaign.id]["links_clicked"] == 20
+    finally:
+        async with test_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
@@ -0,0 +1,80 @@
+import uuid
+
+import pytest
+
+CHROME = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0"
+
+
+def _filter(**kwargs):
+    from app.modules.tracking.bot_filter import TrackingFilter
+
+    now = [0.0]
+    f = TrackingFilter(window_seconds=300, clock=lambda: now[0], **kwargs)
+    return f, now
+
+
+def test_classifies_scanners_prefetchers_and_proxies():
+    f, _ = _filter()
+    assert f.classify("203.0.113.7", CHROME) == "human"
+    assert f.classify("203.0.113.7", "Mozilla/5.0 (compatible; Barracuda Sentinel)") == "scanner"
+    assert f.classify("203.0.113.7", "python-requests/2.31") == "scanner"
+    assert f.classify("203.0.113.7", "") == "scanner"
+    assert f.classify("17.58.101.2", "Mozilla/5.0") == "prefetch"
+    assert f.classify("66.249.84.10", "Mozilla/5.0 (via ggpht.com GoogleImageProxy)") == "proxy"
+
+
+def test_repeats_from_same_network_are_dropped_within_window():
+    f, now = _filter()
+    token = "tok"
+    assert f.check(token, "open", "198.51.100.10", CHROME) == (True, "human")
+    assert f.check(token, "open", "198.51.100.77", CHROME) == (False, "duplicate")
+    # A click is a different event; another network is a different reader.
+    assert f.check(token, "click", "198.51.100.10", CHROME)[0]
+    assert f.check(token, "open", "192.0.2.1", CHROME)[0]
+
+    now[0] += 301
+    assert f.check(token, "open", "198.51.100.10", CHROME)[0]
+
+
+def test_suppressed_classes_and_lru_bound():
+    from app.modules.tracking.bot_filter import PROXY, SCANNER
+
+    f, _ = _filter(suppress=(SCANNER, PROXY), max_entries=2)
+    assert f.check("t", "open", "66.249.84.10", "GoogleImageProxy") == (False, "proxy")
+    for i in range(3):
+        f.check(f"t{i}", "open", "198.51.100.1", CHROME)
+    assert len(f._seen) == 2
+    assert f.stats["suppressed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scanner_hits_never_reach_the_buffer(client, db_session):
+    from app.modules.tracking.pixel_tracker import tracking_event_buffer
+    from app.modules.tracking.token_codec import encode_tracking_token
+
+    token = encode_tracking_token(uuid.uuid4(), uuid.uuid4(), uuid.uuid4())
+    before = len(tracking_event_buffer)
+    resp = await client.get(f"/api/v1/track/open/{token}", headers={"user-agent": "Mimecast-Scanner/1.0"})
+    assert resp.headers["content-type"] == "image/gif"
+    assert len(tracking_event_buffer) == before
+
+
+@pytest.mark.parametrize("entry", ["203.0.113.0/24", "typo:203.0.113.0/24", "scanner:not-a-network"])
+def test_malformed_bot_networks_are_rejected_at_load(entry):
+    from pydantic import ValidationError
+
+    from app.config import Settings
+    from app.modules.tracking.bot_filter import _load_networks
+
+    with pytest.raises(ValueError, match="Bot network"):
+        _load_networks([entry])
+    with pytest.raises(ValidationError, match="TRACKING_BOT_NETWORKS"):
+        Settings(TRACKING_BOT_NETWORKS=[entry])
+
+
+def test_configured_bot_network_classifies_hits():
+    from app.modules.tracking.bot_filter import _load_networks
+
+    f, _ = _filter(networks=_load_networks([" scanner : 203.0.113.0/24"]))
+    assert f.check("t", "open", "203.0.113.9", CHROME) == (False, "scanner")
+    assert f.stats["scanner"] == 1
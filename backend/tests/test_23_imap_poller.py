@@ -0,0 +1,158 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.modules.tracking import reply_tracker
+from app.modules.tracking.reply_tracker import (
+    ReplyBatch,
+    TextPart,
+    decode_text_part,
+    fetch_recent_replies,
+    find_text_part,
+    load_checkpoint,
+    parse_bodystructure,
+    parse_fetch_items,
+    parse_headers,
+    save_checkpoint,
+)
+
+HEADERS = (
+    b"From: Jane Doe <Jane@Example.com>\r\n"
+    b"Subject: =?utf-8?q?Re:_Caf=C3=A9?=\r\n"
+    b"Date: Mon, 05 Oct 2026 10:00:00 +0000\r\n\r\n"
+)
+
+# multipart/mixed( multipart/alternative(text/plain, text/html), image/png attachment )
+MIXED = (
+    b'BODYSTRUCTURE ((("TEXT" "PLAIN" ("CHARSET" "iso-8859-1") NIL NIL "QUOTED-PRINTABLE" 120 4 NIL NIL NIL)'
+    b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "7BIT" 900 20 NIL NIL NIL) "ALTERNATIVE" ("BOUNDARY" "b2") NIL NIL)'
+    b'("IMAGE" "PNG" ("NAME" "logo.png") NIL NIL "BASE64" 40000 NIL ("ATTACHMENT" ("FILENAME" "logo.png")) NIL)'
+    b' "MIXED" ("BOUNDARY" "b1") NIL NIL)'
+)
+
+
+def _response(lines, result="OK"):
+    return SimpleNamespace(result=result, lines=lines)
+
+
+def test_parse_headers_and_fetch_items():
+    reply = parse_headers(HEADERS, "body")
+    assert reply.sender == "jane@example.com"
+    assert reply.subject == "Re: Café"
+    assert reply.reply_time.year == 2026 and reply.reply_time.tzinfo is None
+    assert reply.body == "body"
+
+    lines = [
+        b"1 FETCH (UID 41 BODY[HEADER.FIELDS (FROM)] {10}", bytearray(HEADERS), b")",
+        # UID after the literal is valid too.
+        b"2 FETCH (BODY[HEADER.FIELDS (FROM)] {10}", bytearray(HEADERS), b" UID 42)",
+        b"Fetch completed.",
+    ]
+    items = parse_fetch_items(lines)
+    assert [i.uid for i in items] == [41, 42]
+    assert items[1].literals == [HEADERS]
+
+
+def test_locates_plain_text_part_in_bodystructure():
+    part = find_text_part(parse_bodystructure(b"1 FETCH (UID 5 " + MIXED + b")"))
+    assert part == TextPart("1.1", "iso-8859-1", "QUOTED-PRINTABLE")
+
+    single = b'BODYSTRUCTURE ("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "BASE64" 12 1 NIL NIL NIL)'
+    assert find_text_part(parse_bodystructure(single)).section == "1"
+
+    html_only = b'BODYSTRUCTURE ("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "7BIT" 12 1 NIL NIL NIL)'
+    assert find_text_part(parse_bodystructure(html_only)) is None
+
+    # A byte cap can cut base64 mid-quantum and QP mid-escape.
+    assert decode_text_part(b"SGVsbG8gd29y\r\nbGQhIE", TextPart("1", "utf-8", "BASE64")) == "Hello world!"
+    assert decode_text_part(b"Caf=E9 =", TextPart("1", "iso-8859-1", "QUOTED-PRINTABLE")).startswith("Café")
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_advances_and_resets_on_uidvalidity(db_session):
+    key = "u@imap.example.com/INBOX"
+    await save_checkpoint(db_session, ReplyBatch([], key))  # nothing read: no row
+    assert await load_checkpoint(db_session, key) is None
+
+    await save_checkpoint(db_session, ReplyBatch([], key, uid_validity=7, last_uid=50))
+    await save_checkpoint(db_session, ReplyBatch([], key, uid_validity=7, last_uid=40))
+    assert (await load_checkpoint(db_session, key)).last_uid == 50
+
+    await save_checkpoint(db_session, ReplyBatch([], key, uid_validity=8, last_uid=3))
+    checkpoint = await load_checkpoint(db_session, key)
+    assert (checkpoint.uid_validity, checkpoint.last_uid) == (8, 3)
+
+
+@pytest.mark.asyncio
+async def test_fetch_only_requests_uids_after_checkpoint():
+    imap = AsyncMock()
+    imap.select.return_value = _response([b"[UIDVALIDITY 7] UIDs valid", b"Select completed."])
+    # "UID 43:*" also matches the current highest UID (42) when nothing is new.
+    imap.uid_search.return_value = _response([b"42 43 44", b"Search completed."])
+    imap.uid.side_effect = [
+        _response([
+            b"1 FETCH (UID 43 " + MIXED + b" BODY[HEADER.FIELDS (FROM SUBJECT DATE)] {10}",
+            bytearray(HEADERS), b")",
+            b"2 FETCH (UID 44 " + MIXED + b" BODY[HEADER.FIELDS (FROM SUBJECT DATE)] {10}",
+            bytearray(HEADERS), b")",
+            b"Fetch completed.",
+        ]),
+        _response([
+            b"1 FETCH (UID 43 BODY[1.1]<0> {8}", bytearray(b"Caf=E9 ok"), b")",
+            b"2 FETCH (UID 44 BODY[1.1]<0> {8}", bytearray(b"later"), b")",
+            b"Fetch completed.",
+        ]),
+    ]
+    checkpoint = SimpleNamespace(uid_validity=7, last_uid=42)
+
+    with patch.object(reply_tracker, "_connect", AsyncMock(return_value=imap)), \
+         patch.object(reply_tracker.settings, "IMAP_USER", "u"), \
+         patch.object(reply_tracker.settings, "IMAP_PASSWORD", "p"), \
+         patch.object(reply_tracker.settings, "IMAP_BODY_MAX_BYTES", 4096):
+        batch = await fetch_recent_replies(checkpoint)
+
+    imap.uid_search.assert_awaited_once_with("UID 43:*", charset=None)
+    first, second = imap.uid.await_args_list
+    assert first.args == ("fetch", "43,44", f"(UID BODYSTRUCTURE {reply_tracker.HEADER_FIELDS})")
+    assert second.args == ("fetch", "43,44", "(BODY.PEEK[1.1]<0.4096>)")
+    assert [r.body for r in batch.replies] == ["Café ok", "later"]
+    assert (batch.uid_validity, batch.last_uid) == (7, 44)
+
+
+@pytest.mark.asyncio
+async def test_fetch_rescans_by_date_when_uidvalidity_changes():
+    imap = AsyncMock()
+    imap.select.return_value = _response([b"[UIDVALIDITY 9] UIDs valid", b"Select completed."])
+    imap.uid_search.return_value = _response([b"", b"Search completed."])
+
+    with patch.object(reply_tracker, "_connect", AsyncMock(return_value=imap)), \
+         patch.object(reply_tracker.settings, "IMAP_USER", "u"), \
+         patch.object(reply_tracker.settings, "IMAP_PASSWORD", "p"):
+        batch = await fetch_recent_replies(SimpleNamespace(uid_validity=7, last_uid=42))
+
+    assert imap.uid_search.await_args.args[0].startswith("SINCE ")
+    imap.uid.assert_not_awaited()
+    assert batch.replies == [] and (batch.uid_validity, batch.last_uid) == (9, 0)
+
+
+@pytest.mark.asyncio
+async def test_first_poll_seeds_checkpoint_from_uidnext(db_session):
+    """With no checkpoint yet, nothing already in the mailbox is re-processed."""
+    imap = AsyncMock()
+    imap.select.return_value = _response([
+        b"[UIDVALIDITY 7] UIDs valid", b"[UIDNEXT 120] Predicted next UID", b"Select completed.",
+    ])
+
+    with patch.object(reply_tracker, "_connect", AsyncMock(return_value=imap)), \
+         patch.object(reply_tracker.settings, "IMAP_USER", "u"), \
+         patch.object(reply_tracker.settings, "IMAP_PASSWORD", "p"):
+        batch = await fetch_recent_replies(None)
+
+    imap.uid_search.assert_not_awaited()
+    imap.uid.assert_not_awaited()
+    assert batch.replies == [] and (batch.uid_validity, batch.last_uid) == (7, 119)
+
+    await save_checkpoint(db_session, batch)
+    checkpoint = await load_checkpoint(db_session, batch.mailbox)
+    assert (checkpoint.uid_validity, checkpoint.last_uid) == (7, 119)
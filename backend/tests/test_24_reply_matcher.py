@@ -0,0 +1,116 @@
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.campaign import Campaign, EmailOutreach
+from app.models.lead import Lead
+from app.modules.tracking.reply_tracker import InboundReply
+
+
+async def _lead_with_outreach(db_session, campaign, name, email, message_ids):
+    lead = Lead(place_id=f"place_{name}", business_name=name, email=email, status="email_sent")
+    db_session.add(lead)
+    await db_session.flush()
+    rows = []
+    for offset, mid in enumerate(message_ids):
+        row = EmailOutreach(
+            lead_id=lead.id, campaign_id=campaign.id, to_email=email,
+            subject="Hi", body_html="<p>Hi</p>", tracking_token=f"tok_{mid}",
+            status="sent", brevo_message_id=mid,
+            created_at=datetime.utcnow() + timedelta(minutes=offset),
+        )
+        db_session.add(row)
+        rows.append(row)
+    await db_session.flush()
+    return lead, rows
+
+
+def _reply(sender, references=()):
+    return InboundReply(sender, "Re: Hi", datetime(2026, 10, 1, 9, 0), "Sounds good", tuple(references))
+
+
+@pytest.mark.asyncio
+async def test_thread_headers_win_over_sender_and_case_is_ignored(db_session):
+    from app.modules.tracking.reply_matcher import SENDER, THREAD, match_replies
+
+    campaign = Campaign(name="Replies", campaign_date=datetime.utcnow().date())
+    db_session.add(campaign)
+    await db_session.flush()
+    acme, (first, latest) = await _lead_with_outreach(
+        db_session, campaign, "Acme", "Owner@Acme.com", ["<a1@x>", "<a2@x>"],
+    )
+    other, (other_out,) = await _lead_with_outreach(db_session, campaign, "Other", "hi@other.com", ["<o1@x>"])
+    await db_session.commit()
+
+    matches = await match_replies(db_session, [
+        # A colleague answers the first email: credited to Acme by thread.
+        _reply("assistant@acme.com", ["<a1@x>", "<unrelated@y>"]),
+        _reply("owner@acme.com"),  # second reply from the same lead this poll
+        _reply("hi@other.com"),
+        _reply("stranger@nowhere.com"),
+    ])
+
+    assert [(m.lead.id, m.outreach_id, m.matched_by) for m in matches] == [
+        (acme.id, first.id, THREAD),
+        (other.id, other_out.id, SENDER),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_apply_replies_updates_leads_outreach_and_metrics_in_bulk(db_session):
+    from app.modules.analytics.campaign_metrics import campaign_totals
+    from app.modules.tracking.reply_matcher import apply_replies, match_replies
+
+    campaign = Campaign(name="Bulk", campaign_date=datetime.utcnow().date())
+    db_session.add(campaign)
+    await db_session.flush()
+    lead_a, (out_a,) = await _lead_with_outreach(db_session, campaign, "A", "a@a.com", ["<ma@x>"])
+    lead_b, (_, out_b) = await _lead_with_outreach(db_session, campaign, "B", "b@b.com", ["<mb1@x>", "<mb2@x>"])
+    await db_session.commit()
+
+    matches = await match_replies(db_session, [_reply("a@a.com"), _reply("b@b.com")])
+    for match in matches:
+        match.classification, match.confidence = "interested", 0.9
+    await apply_replies(db_session, matches)
+
+    leads = (await db_session.execute(
+        select(Lead.status, Lead.reply_classification, Lead.followup_sequence_active)
+        .where(Lead.id.in_([lead_a.id, lead_b.id]))
+    )).all()
+    assert set(leads) == {("replied", "interested", False)}
+    statuses = (await db_session.execute(
+        select(EmailOutreach.id, EmailOutreach.status).where(EmailOutreach.status == "replied")
+    )).all()
+    # The reply by sender lands on the lead's most recent email.
+    assert {row.id for row in statuses} == {out_a.id, out_b.id}
+
+    totals = await campaign_totals(db_session, [campaign.id])
+    assert totals[campaign.id]["replies_received"] == 2
+
+    # Already-replied leads are not matched again.
+    assert await match_replies(db_session, [_reply("a@a.com")]) == []
+
+
+@pytest.mark.asyncio
+async def test_overlapping_runs_count_a_reply_once(db_session):
+    """IDLE push and the scheduled poll can match the same reply; only the first apply counts."""
+    from app.modules.analytics.campaign_metrics import campaign_totals
+    from app.modules.analytics.daily_funnel import funnel_totals
+    from app.modules.tracking.reply_matcher import apply_replies, match_replies
+
+    campaign = Campaign(name="Overlap", campaign_date=datetime.utcnow().date())
+    db_session.add(campaign)
+    await db_session.flush()
+    await _lead_with_outreach(db_session, campaign, "Dup", "dup@dup.com", ["<md@x>"])
+    await db_session.commit()
+
+    push = await match_replies(db_session, [_reply("dup@dup.com")])
+    poll = await match_replies(db_session, [_reply("dup@dup.com")])
+    await apply_replies(db_session, push)
+    await apply_replies(db_session, poll)
+
+    totals = await campaign_totals(db_session, [campaign.id])
+    assert totals[campaign.id]["replies_received"] == 1
+    day = datetime(2026, 10, 1).date()
+    assert (await funnel_totals(db_session, day, day + timedelta(days=1)))["replied"] == 1
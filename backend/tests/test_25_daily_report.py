@@ -0,0 +1,55 @@
+import pytest
+from datetime import date, datetime
+
+from app.models.lead import Lead
+
+DAY = date(2026, 10, 5)
+
+
+@pytest.mark.asyncio
+async def test_daily_metrics_use_half_open_day_ranges(db_session):
+    from app.modules.analytics.daily_funnel import rebuild_daily_funnel
+    from app.modules.reporting.daily_metrics import daily_report_leads, daily_report_metrics
+
+    start, late, next_day, prev_day = (
+        datetime(2026, 10, 5, 0, 0), datetime(2026, 10, 5, 23, 59, 59),
+        datetime(2026, 10, 6, 0, 0), datetime(2026, 10, 4, 23, 59, 59),
+    )
+    db_session.add_all([
+        Lead(place_id="r1", business_name="Found today", discovered_at=start, email_sent_at=late),
+        Lead(place_id="r2", business_name="Qualified today", discovered_at=prev_day,
+             qualified_at=late, status="phone_qualified"),
+        # Sent yesterday, opened, clicked and replied today.
+        Lead(place_id="r3", business_name="Engaged", discovered_at=prev_day, email_sent_at=prev_day,
+             first_opened_at=start, first_clicked_at=late, first_replied_at=late, status="replied"),
+        Lead(place_id="r4", business_name="Tomorrow", discovered_at=next_day, first_opened_at=next_day),
+    ])
+    await db_session.commit()
+    await rebuild_daily_funnel(db_session, date(2026, 10, 1), date(2026, 10, 8))
+
+    assert await daily_report_metrics(db_session, DAY) == {
+        "leads_discovered": 1,
+        "leads_qualified": 1,
+        "emails_sent": 1,
+        "emails_opened": 1,
+        "links_clicked": 1,
+        "replies_received": 1,
+    }
+
+    rows = await daily_report_leads(db_session, DAY)
+    assert sorted(r["business_name"] for r in rows) == ["Engaged", "Found today"]
+    assert set(rows[0]) == {
+        "business_name", "category", "city", "email_sent_at", "first_opened_at",
+        "first_clicked_at", "first_replied_at", "status", "phone", "google_maps_url", "lead_tier",
+    }
+
+
+def test_report_filters_are_sargable():
+    """No date() wrapper hides the indexed column."""
+    from sqlalchemy.dialects import postgresql
+
+    from app.modules.reporting.daily_metrics import day_range, in_range
+
+    sql = str(in_range(Lead.discovered_at, day_range(DAY)).compile(dialect=postgresql.dialect()))
+    assert "date(" not in sql.lower()
+    assert "leads.discovered_at >=" in sql and "leads.discovered_at <" in sql
@@ -0,0 +1,109 @@
+import pytest
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from app.models.lead import Lead
+
+DAY = date(2026, 10, 5)
+AT = datetime(2026, 10, 5, 12, 0)
+
+
+def _lead(city="Pune", category="bakery", lead_tier="A"):
+    return SimpleNamespace(city=city, category=category, lead_tier=lead_tier)
+
+
+@pytest.mark.asyncio
+async def test_incremental_upserts_accumulate_per_segment(db_session):
+    from app.modules.analytics.daily_funnel import count_funnel, funnel_breakdown, funnel_totals, record_funnel
+
+    await record_funnel(db_session, count_funnel([(_lead(), AT), (_lead(), AT), (_lead(lead_tier=None), AT)], "opened"))
+    await record_funnel(db_session, count_funnel([(_lead(), AT)], "opened"))
+    await record_funnel(db_session, count_funnel([(_lead(city="Goa"), AT + timedelta(days=1))], "replied"))
+    await db_session.commit()
+
+    totals = await funnel_totals(db_session, DAY, DAY + timedelta(days=2))
+    assert (totals["opened"], totals["replied"]) == (4, 1)
+    assert (await funnel_totals(db_session, DAY, DAY + timedelta(days=1), tier="A"))["opened"] == 3
+
+    by_tier = await funnel_breakdown(db_session, DAY, DAY + timedelta(days=1), ["tier"])
+    assert [(r["tier"], r["opened"]) for r in by_tier] == [("", 1), ("A", 3)]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_replaces_days_from_leads(db_session):
+    from app.modules.analytics.daily_funnel import count_funnel, funnel_totals, rebuild_daily_funnel, record_funnel
+
+    db_session.add_all([
+        Lead(place_id="f1", business_name="A", city="Pune", discovered_at=AT, first_opened_at=AT),
+        Lead(place_id="f2", business_name="B", city="Pune", discovered_at=AT - timedelta(days=3)),
+    ])
+    # A stale increment the rebuild must discard.
+    await record_funnel(db_session, count_funnel([(_lead(), AT)], "opened"))
+    await db_session.commit()
+
+    await rebuild_daily_funnel(db_session, DAY, DAY + timedelta(days=1))
+    totals = await funnel_totals(db_session, DAY, DAY + timedelta(days=1))
+    assert (totals["discovered"], totals["opened"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_funnel_endpoint_reads_rollup(client, db_session):
+    from app.api.deps import get_api_key, get_current_user
+    from app.main import app
+    from app.modules.analytics.daily_funnel import count_funnel, record_funnel
+
+    await record_funnel(db_session, count_funnel([(_lead(), AT), (_lead(city="Goa"), AT)], "discovered"))
+    await db_session.commit()
+    app.dependency_overrides[get_api_key] = lambda: "test"
+    app.dependency_overrides[get_current_user] = lambda: None
+
+    res = await client.get("/api/v1/reports/funnel", params={"start": "2026-10-05", "end": "2026-10-05", "group_by": "city"})
+    assert res.status_code == 200
+    assert [(r["city"], r["discovered"]) for r in res.json()] == [("Goa", 1), ("Pune", 1)]
+    assert "day" not in res.json()[0]
+
+    bad = await client.get("/api/v1/reports/funnel", params={"start": "2026-10-05", "end": "2026-10-05", "group_by": "email"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_incremental_rollup_matches_rebuild_after_qualification(db_session):
+    from contextlib import asynccontextmanager
+    from unittest.mock import AsyncMock, patch
+
+    from app.modules.analytics.daily_funnel import count_funnel, days_back, funnel_breakdown, rebuild_daily_funnel, record_funnel
+    from app.tasks.daily_pipeline import run_qualification_stage
+
+    @asynccontextmanager
+    async def no_lock(*args, **kwargs):
+        yield
+
+    async def qualify(lead, db):
+        lead.lead_tier = "A"
+        return True, 80, "ok"
+
+    # Discovery records the lead before it has a tier, as the stage does.
+    lead = Lead(place_id="q1", business_name="Q", city="Pune", category="bakery",
+                email="q@example.com", status="discovered", discovered_at=datetime.utcnow())
+    db_session.add(lead)
+    await record_funnel(db_session, count_funnel([(lead, lead.discovered_at)], "discovered"))
+    await db_session.commit()
+
+    with patch("app.tasks.daily_pipeline.job_manager.is_job_active", return_value=True), \
+         patch("app.tasks.daily_pipeline.advisory_lock", new=no_lock), \
+         patch("app.tasks.daily_pipeline.qualify_lead", side_effect=qualify), \
+         patch("app.tasks.daily_pipeline.send_telegram_alert", new=AsyncMock()):
+        await run_qualification_stage()
+
+    since, until = days_back(1)
+    group_by = ["day", "city", "category", "tier"]
+
+    async def snapshot():
+        rows = await funnel_breakdown(db_session, since, until, group_by)
+        return [r for r in rows if any(r[m] for m in ("discovered", "qualified"))]
+
+    incremental = await snapshot()
+    assert [(r["tier"], r["discovered"], r["qualified"]) for r in incremental] == [("A", 1, 1)]
+
+    await rebuild_daily_funnel(db_session, since, until)
+    assert await snapshot() == incremental
@@ -0,0 +1,77 @@
+import io
+import pytest
+from datetime import date, datetime, timedelta
+
+from openpyxl import load_workbook
+
+from app.models.lead import Lead
+
+START = date(2026, 9, 1)
+
+
+def test_daily_workbook_is_written_in_write_only_mode(tmp_path, monkeypatch):
+    from app.modules.reporting.excel_builder import LEAD_HEADERS, generate_daily_report_excel
+
+    monkeypatch.chdir(tmp_path)
+    leads = [
+        {"business_name": f"Biz {i}", "city": "Pune", "email_sent_at": datetime(2026, 9, 1) if i % 2 else None}
+        for i in range(3)
+    ]
+    path = generate_daily_report_excel({"leads_discovered": 3, "emails_sent": 1}, leads, START)
+
+    wb = load_workbook(path)
+    assert wb.sheetnames == ["Daily Summary", "Lead Details"]
+    summary = wb["Daily Summary"]
+    assert summary["A1"].value == "Cold Scout  ·  Daily Report  ·  2026-09-01"
+    assert [summary.cell(row=r, column=2).value for r in range(4, 10)] == [3, 0, 1, 0, 0, 0]
+    details = wb["Lead Details"]
+    assert tuple(c.value for c in details[1]) == LEAD_HEADERS
+    assert [details.cell(row=r, column=4).value for r in range(2, 5)] == ["No", "Yes", "No"]
+    assert details.column_dimensions["J"].width == 36
+
+
+@pytest.mark.asyncio
+async def test_report_leads_stream_in_batches(db_session):
+    from app.modules.reporting.daily_metrics import iter_report_leads
+
+    base = datetime(2026, 9, 1, 8, 0)
+    db_session.add_all([
+        Lead(place_id=f"s{i}", business_name=f"Lead {i}", discovered_at=base + timedelta(days=i))
+        for i in range(6)
+    ])
+    await db_session.commit()
+
+    batches = [b async for b in iter_report_leads(db_session, START, START + timedelta(days=5), batch_size=2)]
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert [row["business_name"] for b in batches for row in b][:2] == ["Lead 0", "Lead 1"]
+
+
+@pytest.mark.asyncio
+async def test_range_export_endpoint_streams_workbook(client, db_session):
+    from app.api.deps import get_api_key, get_current_user
+    from app.main import app
+    from app.modules.analytics.daily_funnel import rebuild_daily_funnel
+
+    db_session.add_all([
+        Lead(place_id="e1", business_name="Early", discovered_at=datetime(2026, 9, 2, 9, 0)),
+        Lead(place_id="e2", business_name="Late", discovered_at=datetime(2026, 10, 30, 9, 0),
+             email_sent_at=datetime(2026, 10, 30, 10, 0)),
+        Lead(place_id="e3", business_name="Outside", discovered_at=datetime(2026, 11, 2, 9, 0)),
+    ])
+    await db_session.commit()
+    await rebuild_daily_funnel(db_session, START, date(2026, 12, 1))
+    app.dependency_overrides[get_api_key] = lambda: "test"
+    app.dependency_overrides[get_current_user] = lambda: None
+
+    res = await client.get("/api/v1/reports/export", params={"start": "2026-09-01", "end": "2026-10-31"})
+    assert res.status_code == 200
+    assert "ColdScout_Report_2026-09-01_2026-10-31.xlsx" in res.headers["content-disposition"]
+
+    wb = load_workbook(io.BytesIO(res.content))
+    assert wb.sheetnames == ["Daily Summary", "Daily Breakdown", "Lead Details"]
+    assert [wb["Daily Summary"].cell(row=r, column=2).value for r in (4, 6)] == [2, 1]
+    assert wb["Daily Breakdown"].max_row == 3
+    assert [row[0].value for row in wb["Lead Details"].iter_rows(min_row=2)] == ["Early", "Late"]
+
+    bad = await client.get("/api/v1/reports/export", params={"start": "2026-10-31", "end": "2026-09-01"})
+    assert bad.status_code == 400
@@ -0,0 +1,69 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.lead import Lead
+
+BASE = datetime(2026, 10, 1, 12, 0)
+
+
+@pytest.fixture
+def authed():
+    from app.api.deps import get_api_key, get_current_user
+    from app.main import app
+
+    app.dependency_overrides[get_api_key] = lambda: "test"
+    app.dependency_overrides[get_current_user] = lambda: None
+
+
+async def _seed(db_session):
+    # Two leads share a created_at so the id tie-break is exercised.
+    offsets = [0, 1, 2, 2, 3, 4, 5]
+    db_session.add_all([
+        Lead(place_id=f"k{i}", business_name=f"Lead {i}", city="Pune" if i % 2 else "Goa",
+             category="bakery", created_at=BASE + timedelta(minutes=m))
+        for i, m in enumerate(offsets)
+    ])
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_cursor_walk_covers_every_lead_once_in_both_directions(client, db_session, authed):
+    await _seed(db_session)
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        body = (await client.get("/api/v1/leads", params=params)).json()
+        pages.append(body)
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    names = [lead["business_name"] for body in pages for lead in body["leads"]]
+    assert [len(body["leads"]) for body in pages] == [3, 3, 1]
+    assert sorted(names) == [f"Lead {i}" for i in range(7)]
+    assert names[0] == "Lead 6" and names[-1] == "Lead 0"
+    assert pages[0]["prev_cursor"] is None
+
+    # Stepping back from the last page reproduces the middle page.
+    back = (await client.get("/api/v1/leads", params={"limit": 3, "cursor": pages[-1]["prev_cursor"]})).json()
+    assert back["leads"] == pages[1]["leads"]
+    first = (await client.get("/api/v1/leads", params={"limit": 3, "cursor": back["prev_cursor"]})).json()
+    assert first["leads"] == pages[0]["leads"]
+    assert first["prev_cursor"] is None and first["next_cursor"]
+
+
+@pytest.mark.asyncio
+async def test_total_is_exact_only_on_request(client, db_session, authed):
+    await _seed(db_session)
+
+    exact = (await client.get("/api/v1/leads", params={"city": "pune", "count": "true"})).json()
+    assert (exact["total"], exact["total_exact"]) == (3, True)
+
+    # Unfiltered totals come from table statistics or the funnel rollup.
+    estimate = (await client.get("/api/v1/leads")).json()
+    assert estimate["total_exact"] is False
+    assert len(estimate["leads"]) == 7
+
+    bad = await client.get("/api/v1/leads", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
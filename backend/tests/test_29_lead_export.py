@@ -0,0 +1,78 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.lead import Lead
+
+BASE = datetime(2026, 10, 1, 12, 0)
+
+
+@pytest.fixture
+def authed():
+    from app.api.deps import get_api_key, get_current_user
+    from app.main import app
+
+    app.dependency_overrides[get_api_key] = lambda: "test"
+    app.dependency_overrides[get_current_user] = lambda: None
+
+
+async def _seed(db_session, count=5):
+    db_session.add_all([
+        Lead(place_id=f"x{i}", business_name=f"Lead, {i}", city="Pune" if i % 2 else "Goa",
+             category="bakery", email=None if i == 0 else f"l{i}@x.com",
+             created_at=BASE + timedelta(minutes=i))
+        for i in range(count)
+    ])
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_rows_are_encoded_one_chunk_per_cursor_batch(db_session):
+    from app.core.streaming_export import NDJSON, stream_rows
+
+    await _seed(db_session)
+    columns = (("Name", Lead.business_name), ("Email", Lead.email))
+    stmt = select(Lead).order_by(Lead.created_at)
+
+    chunks = [c async for c in stream_rows(stmt, columns, batch_size=2)]
+    assert len(chunks) == 1 + 3  # header, then batches of 2, 2, 1
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["Name", "Email"]
+    assert rows[1] == ["Lead, 0", ""]
+
+    lines = b"".join([c async for c in stream_rows(stmt, columns, NDJSON, batch_size=2)]).decode().splitlines()
+    assert json.loads(lines[0]) == {"business_name": "Lead, 0", "email": None}
+    assert len(lines) == 5
+
+
+@pytest.mark.asyncio
+async def test_csv_export_is_not_capped_or_flagged(client, db_session, authed):
+    await _seed(db_session, count=12)
+
+    res = await client.get("/api/v1/leads/export/csv", params={"city": "pune"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert "x-export-truncated" not in res.headers
+    rows = list(csv.reader(io.StringIO(res.text)))
+    assert rows[0][:2] == ["ID", "Business Name"]
+    assert [r[1] for r in rows[1:]] == [f"Lead, {i}" for i in (11, 9, 7, 5, 3, 1)]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_with_gzip(client, db_session, authed):
+    await _seed(db_session)
+
+    res = await client.get("/api/v1/leads/export", params={"format": "ndjson", "gzip": "true"})
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/gzip"
+    assert res.headers["content-disposition"].endswith(".ndjson.gz")
+    records = [json.loads(line) for line in gzip.decompress(res.content).decode().splitlines()]
+    assert [r["business_name"] for r in records] == [f"Lead, {i}" for i in range(4, -1, -1)]
+    assert set(records[0]) == {"id", "business_name", "email", "phone", "city", "category", "status", "created_at"}
+
+    assert (await client.get("/api/v1/leads/export", params={"format": "xml"})).status_code == 422
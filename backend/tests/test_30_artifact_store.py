@@ -0,0 +1,82 @@
+import base64
+import os
+import time
+import uuid
+
+import pytest
+
+
+def _store(tmp_path=None):
+    from app.modules.outreach.artifact_store import ArtifactStore
+
+    return ArtifactStore(root=str(tmp_path) if tmp_path else None, max_memory_bytes=1024 * 1024)
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    from app.modules.outreach.artifact_store import content_digest
+
+    store = _store(tmp_path)
+    first = store.put(b"%PDF-1.7 proposal")
+    second = store.put(b"%PDF-1.7 proposal")
+
+    assert first == second == content_digest(b"%PDF-1.7 proposal")
+    assert [p.name for p in tmp_path.glob("??/*")] == [first]
+    assert (store.stats["puts"], store.stats["dedup_hits"]) == (2, 1)
+    assert store.get(first) == b"%PDF-1.7 proposal"
+
+
+def test_encoded_payload_round_trips_and_is_encoded_once():
+    store = _store()
+    content = os.urandom(5000)
+    digest = store.put(content)
+
+    encoded = store.encoded_payload(digest)
+    assert all(len(line) <= 76 for line in encoded.splitlines())
+    assert base64.b64decode(encoded) == content
+    assert store.encoded_payload(digest) is encoded
+    assert (store.stats["encode_misses"], store.stats["encode_hits"]) == (1, 1)
+    assert store.encoded_payload("0" * 64) is None
+
+
+@pytest.mark.asyncio
+async def test_prune_keeps_blobs_of_unsent_rows(tmp_path, db_session):
+    from app.models.campaign import EmailOutreach
+    from app.modules.outreach.outbox import pending_artifact_digests
+
+    store = _store(tmp_path)
+    queued, sent, orphan = (store.put(data) for data in (b"queued", b"sent", b"orphan"))
+    old = time.time() - 30 * 86400
+    for path in tmp_path.glob("??/*"):
+        os.utime(path, (old, old))
+
+    for status, digest in (("queued", queued), ("sent", sent)):
+        db_session.add(EmailOutreach(
+            to_email="a@example.com", subject="s", tracking_token=uuid.uuid4().hex,
+            status=status, attachment_refs=[{"kind": "pdf", "sha256": digest}],
+        ))
+    await db_session.commit()
+
+    referenced = await pending_artifact_digests(db_session)
+    assert referenced == {queued}
+    assert store.prune(86400, referenced) == 2
+    assert [p.name for p in tmp_path.glob("??/*")] == [queued]
+    assert store.get(queued) == b"queued"
+    assert store.get(orphan) is None
+
+
+def test_proposal_workbook_renders_are_byte_identical():
+    """Identical inputs give identical XLSX bytes, so the store dedups the workbook."""
+    import io
+    from openpyxl import load_workbook
+    from app.modules.personalization.proposal_xlsx_generator import render_proposal_xlsx_bytes
+
+    context = dict(business_name="Cafe Uno", category="cafe", benefits=["Online booking"],
+                   rating=4.5, review_count=120, city="Pune")
+    first = render_proposal_xlsx_bytes(**context)
+    time.sleep(1.1)  # past the second-resolution document timestamps
+    assert render_proposal_xlsx_bytes(**context) == first
+
+    store = _store()
+    assert store.put(first) == store.put(render_proposal_xlsx_bytes(**context))
+    assert store.stats["dedup_hits"] == 1
+    assert "ROI Projection" in " ".join(load_workbook(io.BytesIO(first)).sheetnames)
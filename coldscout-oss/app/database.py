@@ -18,10 +18,13 @@ class Base(DeclarativeBase):
 
 
 async def init_db():
-    """Create all tables on startup."""
-    from app.models import lead, campaign, daily_report  # noqa: F401 — register models
+    """Create all tables on startup and backfill the funnel rollup if it is new."""
+    from app.models import lead, campaign, daily_report, daily_funnel  # noqa: F401 — register models
+    from app.modules.analytics.daily_funnel import backfill_daily_funnel
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as db:
+        await backfill_daily_funnel(db)
 
 
 async def get_db():
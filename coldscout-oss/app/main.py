@@ -105,14 +105,11 @@ async def status():
                 "next_run": job.next_run_time.isoformat() if job.next_run_time else None,
             })
 
-    from sqlalchemy import select, func
-    from app.models.lead import Lead
-    from app.models.campaign import EmailOutreach
+    from app.modules.analytics.daily_funnel import funnel_totals
 
     async with SessionLocal() as db:
-        total_leads = await db.scalar(select(func.count(Lead.id))) or 0
-        qualified = await db.scalar(select(func.count(Lead.id)).where(Lead.status.in_(["qualified", "phone_qualified"]))) or 0
-        sent = await db.scalar(select(func.count(EmailOutreach.id)).where(EmailOutreach.status == "sent")) or 0
+        funnel = await funnel_totals(db)
+    total_leads, qualified, sent = funnel["discovered"], funnel["qualified"], funnel["emailed"]
 
     return {
         "pipeline": pipeline_state,
@@ -0,0 +1,17 @@
+"""Daily funnel rollup model for Cold Scout OSS."""
+from sqlalchemy import Column, Date, Integer, String
+from app.database import Base
+
+
+class DailyFunnel(Base):
+    """Funnel transitions per day and lead segment (city × category × tier)."""
+    __tablename__ = "daily_funnel"
+
+    day      = Column(Date, primary_key=True)
+    city     = Column(String(100), primary_key=True, default="")
+    category = Column(String(100), primary_key=True, default="")
+    tier     = Column(String(2), primary_key=True, default="")
+
+    discovered = Column(Integer, nullable=False, default=0, server_default="0")
+    qualified  = Column(Integer, nullable=False, default=0, server_default="0")
+    emailed    = Column(Integer, nullable=False, default=0, server_default="0")
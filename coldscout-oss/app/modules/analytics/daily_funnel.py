@@ -0,0 +1,155 @@
+"""
+Daily funnel rollup for Cold Scout OSS.
+
+The pipeline stages add to ``daily_funnel`` as leads move through the funnel
+(discovery → ``discovered``, qualification → ``qualified``, outreach →
+``emailed``), keyed by UTC day and the lead's current segment. Discovery
+records leads untiered; qualification moves them to their tier. Readers sum
+rows instead of counting ``leads``/``email_outreach``.
+"""
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import Date, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.daily_funnel import DailyFunnel
+from app.models.lead import Lead
+
+FUNNEL_METRICS = ("discovered", "qualified", "emailed")
+SEGMENTS = ("city", "category", "tier")
+_UPSERT_CHUNK = 1000
+
+_TIMESTAMPS = {
+    "discovered": Lead.discovered_at,
+    "qualified": Lead.qualified_at,
+    "emailed": Lead.email_sent_at,
+}
+
+FunnelKey = Tuple[date, str, str, str]
+
+
+def segment_of(lead) -> Tuple[str, str, str]:
+    return (lead.city or "", lead.category or "", lead.lead_tier or "")
+
+
+def count_funnel(transitions: Iterable[Tuple[object, Optional[datetime]]], metric: str) -> Dict[FunnelKey, Counter]:
+    """Deltas counting one ``metric`` per ``(lead, when)`` pair (``when`` defaults to now)."""
+    deltas: Dict[FunnelKey, Counter] = {}
+    for lead, when in transitions:
+        day = (when or datetime.utcnow()).date()
+        deltas.setdefault((day, *segment_of(lead)), Counter())[metric] += 1
+    return deltas
+
+
+def retier_discovered(leads: Iterable) -> Dict[FunnelKey, Counter]:
+    """Deltas moving each tiered lead's ``discovered`` count from the untiered segment to its tier."""
+    deltas: Dict[FunnelKey, Counter] = {}
+    for lead in leads:
+        if not lead.lead_tier or lead.discovered_at is None:
+            continue
+        city, category, tier = segment_of(lead)
+        day = lead.discovered_at.date()
+        deltas.setdefault((day, city, category, ""), Counter())["discovered"] -= 1
+        deltas.setdefault((day, city, category, tier), Counter())["discovered"] += 1
+    return deltas
+
+
+def merge_funnel(*parts: Mapping[FunnelKey, Counter]) -> Dict[FunnelKey, Counter]:
+    merged: Dict[FunnelKey, Counter] = {}
+    for part in parts:
+        for key, counts in part.items():
+            merged.setdefault(key, Counter()).update(counts)
+    return merged
+
+
+async def record_funnel(db: AsyncSession, deltas: Mapping[FunnelKey, Mapping[str, int]]) -> None:
+    """Adds ``deltas`` to the rollup in the caller's transaction (one upsert per 1000 rows)."""
+    rows = []
+    for (day, city, category, tier), counts in deltas.items():
+        row = {name: int(counts.get(name, 0)) for name in FUNNEL_METRICS}
+        if any(row.values()):
+            rows.append({"day": day, "city": city, "category": category, "tier": tier, **row})
+    if not rows:
+        return
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        stmt = insert(DailyFunnel).values(rows[start:start + _UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyFunnel.day, DailyFunnel.city, DailyFunnel.category, DailyFunnel.tier],
+            set_={name: getattr(DailyFunnel, name) + getattr(stmt.excluded, name) for name in FUNNEL_METRICS},
+        )
+        await db.execute(stmt)
+
+
+def _filters(since: date, until: date, segment: Mapping[str, Optional[str]]) -> list:
+    conditions = [DailyFunnel.day >= since, DailyFunnel.day < until]
+    for name in SEGMENTS:
+        if segment.get(name) is not None:
+            conditions.append(getattr(DailyFunnel, name) == segment[name])
+    return conditions
+
+
+async def funnel_totals(db: AsyncSession, since: date = date.min, until: date = date.max, **segment: Optional[str]) -> Dict[str, int]:
+    """Funnel counters summed over ``[since, until)`` (all time by default)."""
+    row = (await db.execute(
+        select(*(func.coalesce(func.sum(getattr(DailyFunnel, m)), 0).label(m) for m in FUNNEL_METRICS))
+        .where(*_filters(since, until, segment))
+    )).one()
+    return {m: int(row._mapping[m]) for m in FUNNEL_METRICS}
+
+
+async def funnel_breakdown(
+    db: AsyncSession,
+    since: date = date.min,
+    until: date = date.max,
+    group_by: Sequence[str] = ("day",),
+    **segment: Optional[str],
+) -> List[Dict]:
+    """Funnel counters over ``[since, until)`` grouped by ``day`` and/or segment columns."""
+    keys = [getattr(DailyFunnel, name) for name in group_by]
+    rows = await db.execute(
+        select(*keys, *(func.sum(getattr(DailyFunnel, m)).label(m) for m in FUNNEL_METRICS))
+        .where(*_filters(since, until, segment))
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+async def rebuild_daily_funnel(db: AsyncSession, since: date = date.min, until: date = date.max) -> int:
+    """Recomputes ``[since, until)`` from ``leads`` and replaces those days. Commits."""
+    start, end = (datetime.combine(d, datetime.min.time()) for d in (since, until))
+    counts: Dict[FunnelKey, Counter] = {}
+    for metric, column in _TIMESTAMPS.items():
+        day = func.date(column, type_=Date).label("day")
+        rows = await db.execute(
+            select(
+                day,
+                func.coalesce(Lead.city, "").label("city"),
+                func.coalesce(Lead.category, "").label("category"),
+                func.coalesce(Lead.lead_tier, "").label("tier"),
+                func.count().label("n"),
+            )
+            .where(column >= start, column < end)
+            .group_by(day, Lead.city, Lead.category, Lead.lead_tier)
+        )
+        for row in rows:
+            counts.setdefault((row.day, row.city, row.category, row.tier), Counter())[metric] += row.n
+
+    await db.execute(delete(DailyFunnel).where(DailyFunnel.day >= since, DailyFunnel.day < until))
+    await record_funnel(db, counts)
+    await db.commit()
+    logger.info(f"Rebuilt daily_funnel for {since} → {until}: {len(counts)} rows")
+    return len(counts)
+
+
+async def backfill_daily_funnel(db: AsyncSession) -> None:
+    """Builds the rollup from ``leads`` once, for databases created before it existed."""
+    if await db.scalar(select(DailyFunnel.day).limit(1)) is not None:
+        return
+    if await db.scalar(select(Lead.id).limit(1)) is None:
+        return
+    await rebuild_daily_funnel(db)
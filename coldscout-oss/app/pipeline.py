@@ -16,6 +16,7 @@ from app.models.lead import Lead, SearchHistory
 from app.models.campaign import Campaign, EmailOutreach
 from app.models.daily_report import DailyReport
 from app.config import get_settings
+from app.modules.analytics.daily_funnel import count_funnel, merge_funnel, record_funnel, retier_discovered
 
 settings = get_settings()
 
@@ -35,6 +36,7 @@ from app.modules.reporting.excel_builder import generate_daily_report_excel
 async def run_discovery_stage():
     logger.info("Starting Discovery Stage")
     discovered_count = 0
+    new_leads = []
     client = GooglePlacesClient()
     groq_client = GroqClient()
     seen_place_ids: set = set()
@@ -105,8 +107,10 @@ async def run_discovery_stage():
                         email=email, status="discovered", raw_places_data=place,
                     )
                     db.add(lead)
+                    new_leads.append(lead)
                     discovered_count += 1
 
+            await record_funnel(db, count_funnel(((lead, None) for lead in new_leads), "discovered"))
             db_report.pipeline_status = "completed"
             db_report.pipeline_ended_at = datetime.utcnow()
             await db.commit()
@@ -160,6 +164,8 @@ async def run_qualification_stage():
                 lead.status = "rejected"
 
         if leads:
+            qualified = [(l, l.qualified_at) for l in leads if l.status in ("qualified", "phone_qualified")]
+            await record_funnel(db, merge_funnel(retier_discovered(leads), count_funnel(qualified, "qualified")))
             await db.commit()
 
         if qualified_count > 0 or phone_qualified_count > 0:
@@ -276,7 +282,8 @@ async def run_outreach_stage():
                     lead = lead_res.scalars().first()
                     if lead:
                         lead.status = "email_sent"
-                        lead.email_sent_at = datetime.utcnow()
+                        lead.email_sent_at = email_task.sent_at
+                        await record_funnel(db, count_funnel([(lead, lead.email_sent_at)], "emailed"))
 
                     camp_res = await db.execute(select(Campaign).where(Campaign.id == email_task.campaign_id))
                     camp = camp_res.scalars().first()
@@ -3,20 +3,21 @@ import { getLeads, getLead, updateLead, deleteLead } from '../lib/api';
 import toast from 'react-hot-toast';
 
 /**
- * Fetches a paginated, filtered list of leads from the backend.
+ * Fetches a cursor-paginated, filtered list of leads from the backend.
  *
  * Uses TanStack Query to automatically cache results by the full set of filter
- * parameters. Any change to `page`, `status`, `city`, or `category` triggers a
+ * parameters. Any change to `cursor`, `status`, `city`, or `category` triggers a
  * fresh network request, keeping the table view always in sync.
  *
  * @param params - Filter and pagination options forwarded to the API.
- * @returns TanStack Query result containing `data.leads`, `data.total`, `data.pages`, and loading state.
+ * @returns TanStack Query result containing `data.leads`, `data.total`, `data.next_cursor`,
+ *   `data.prev_cursor`, and loading state.
  *
  * @example
- * const { data, isLoading } = useLeads({ page: 1, limit: 25, status: 'qualified' });
+ * const { data, isLoading } = useLeads({ limit: 25, status: 'qualified' });
  */
 export function useLeads(params: {
-  page?: number;
+  cursor?: string;
   limit?: number;
   status?: string;
   city?: string;
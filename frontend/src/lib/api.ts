@@ -220,9 +220,12 @@ export interface OutreachRecord {
 
 export interface LeadListResponse {
   leads: Lead[];
+  /** Estimated unless the request passed `count: true` (see `total_exact`). */
   total: number;
-  page: number;
-  pages: number;
+  total_exact: boolean;
+  limit: number;
+  next_cursor: string | null;
+  prev_cursor: string | null;
 }
 
 export interface Campaign {
@@ -344,11 +347,13 @@ export const updateJobsConfig = (config: Record<string, unknown>) =>
 
 // Leads
 /**
- * Retrieves paginated leads with support for geographic and status-based filtering.
+ * Retrieves one cursor page of leads with support for geographic and status-based filtering.
+ * Pass a page's `next_cursor` / `prev_cursor` back as `cursor` to move between pages.
  */
 export const getLeads = (params: {
-  page?: number;
+  cursor?: string;
   limit?: number;
+  count?: boolean;
   status?: string;
   city?: string;
   category?: string;
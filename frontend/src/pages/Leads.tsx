@@ -24,9 +24,9 @@ import { downloadBlob } from '../lib/utils';
  *
  * Key capabilities:
  * - **Filtering**: City text search, category text search, and status dropdown
- *   all reset pagination to page 1 to avoid showing stale results.
- * - **Pagination**: A 25-per-page limit is enforced on the backend; the UI
- *   shows previous/next controls and a "page X of Y" counter.
+ *   all reset pagination to the first page to avoid showing stale results.
+ * - **Pagination**: Cursor-based, 25 per page; previous/next follow the cursors
+ *   returned by the API and the "page X of Y" counter uses its (estimated) total.
  * - **CSV Export**: The export button calls the API with the active filters applied,
  *   so the downloaded file always matches what the user currently sees on screen.
  * - **Row Navigation**: Clicking any row navigates to `/leads/:id` for a full
@@ -34,6 +34,7 @@ import { downloadBlob } from '../lib/utils';
  */
 export default function Leads() {
   const navigate = useNavigate();
+  const [cursor, setCursor] = useState<string | undefined>();
   const [page, setPage] = useState(1);
   const [status, setStatus] = useState('');
   const [city, setCity] = useState('');
@@ -41,13 +42,28 @@ export default function Leads() {
   const limit = 25;
 
   const { data, isLoading } = useLeads({
-    page,
+    cursor,
     limit,
     status: status || undefined,
     city: city || undefined,
     category: category || undefined,
   });
 
+  const resetPage = () => {
+    setCursor(undefined);
+    setPage(1);
+  };
+
+  const goTo = (target: string | null, step: number) => {
+    if (!target) return;
+    setCursor(target);
+    setPage((p) => Math.max(1, p + step));
+  };
+
+  // Totals are estimates unless requested exactly; the page count follows suit.
+  const approx = data && !data.total_exact ? '~' : '';
+  const pages = data ? Math.max(page, Math.ceil(data.total / limit)) : 1;
+
   const handleExport = async () => {
     try {
       const blob = await exportLeadsCsv({ status: status || undefined, city: city || undefined });
@@ -115,7 +131,7 @@ export default function Leads() {
               type="text"
               placeholder="Search by city..."
               value={city}
-              onChange={(e) => { setCity(e.target.value); setPage(1); }}
+              onChange={(e) => { setCity(e.target.value); resetPage(); }}
               className="w-full bg-accents-1 border border-accents-2 rounded-md pl-10 pr-4 py-2 text-sm text-secondary placeholder:text-secondary/50 focus:outline-none focus:ring-2 focus:ring-black/5 focus:border-accents-3 transition-colors"
             />
           </div>
@@ -124,13 +140,13 @@ export default function Leads() {
             type="text"
             placeholder="Category..."
             value={category}
-            onChange={(e) => { setCategory(e.target.value); setPage(1); }}
+            onChange={(e) => { setCategory(e.target.value); resetPage(); }}
             className="bg-accents-1 border border-accents-2 rounded-md px-4 py-2 text-sm text-secondary placeholder:text-secondary/50 focus:outline-none focus:ring-2 focus:ring-black/5 focus:border-accents-3 transition-colors min-w-[120px]"
           />
 
           <select
             value={status}
-            onChange={(e) => { setStatus(e.target.value); setPage(1); }}
+            onChange={(e) => { setStatus(e.target.value); resetPage(); }}
             className="bg-accents-1 border border-accents-2 rounded-md px-4 py-2 text-sm text-secondary focus:outline-none focus:ring-2 focus:ring-black/5 focus:border-accents-3 transition-colors"
           >
             <option value="">All Statuses</option>
@@ -158,30 +174,30 @@ export default function Leads() {
       </motion.div>
 
       {/* Pagination */}
-      {data && data.pages > 1 && (
+      {data && (data.next_cursor || data.prev_cursor) && (
         <motion.div variants={fadeInUp} initial="hidden" whileInView="visible" viewport={defaultViewport} className="flex flex-col sm:flex-row items-center justify-between gap-4">
           <span className="text-[10px] md:text-xs font-mono text-secondary/60 order-2 sm:order-1">
-            Showing {((page - 1) * limit) + 1}–{Math.min(page * limit, data.total)} of {data.total} leads
+            Showing {((page - 1) * limit) + 1}–{((page - 1) * limit) + data.leads.length} of {approx}{data.total} leads
           </span>
           <div className="flex items-center gap-2 order-1 sm:order-2">
             <Button
               variant="ghost"
               size="sm"
               icon={<ChevronLeft />}
-              onClick={() => setPage((p) => Math.max(1, p - 1))}
-              disabled={page === 1}
+              onClick={() => goTo(data.prev_cursor, -1)}
+              disabled={!data.prev_cursor}
               className="px-2"
             >
               <span className="hidden xs:inline">Prev</span>
             </Button>
             <span className="text-[10px] md:text-xs font-mono text-secondary min-w-[80px] text-center">
-              Page {page} of {data.pages}
+              Page {page} of {approx}{pages}
             </span>
             <Button
               variant="ghost"
               size="sm"
-              onClick={() => setPage((p) => Math.min(data.pages, p + 1))}
-              disabled={page >= data.pages}
+              onClick={() => goTo(data.next_cursor, 1)}
+              disabled={!data.next_cursor}
               className="px-2"
             >
               <span className="hidden xs:inline">Next</span> <ChevronRight />